@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Tail latency of Datadog reads with and without hedged requests
+
+Starts the Datadog stand-in with a long tail injected (by default 2% of
+responses take an extra second) and sends the same metric queries
+(/api/v1/query, distinct time ranges, no coalescing) through a DatadogClient
+twice: with hedging off, then on. Each run starts with a warm-up so the
+hedger has a p95 to hedge at. Hedging at p95 only helps a tail thinner
+than 5%: with more slow responses than that, the p95 itself is slow.
+
+Reports p50/p95/p99/max per request and the extra load hedging put on the
+server (requests the stand-in received vs requests sent), plus hedges, hedge
+wins and hedges denied by the budget.
+
+Usage:
+    python benchmarks/bench_hedging.py [--requests 400] [--concurrency 8]
+        [--slow-rate 0.02] [--slow-latency 1.0] [--budget 0.1]
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+import mcp_loader  # noqa: E402,F401  (loads tools before importing mcp modules directly)
+from benchmarks.datadog_standin import StandinConfig, start_standin  # noqa: E402
+from mcp.datadog_client import DatadogClient  # noqa: E402
+from mcp.hedging import Hedger  # noqa: E402
+
+WARMUP = 50
+QUERY = 'avg:system.cpu.user{env:production} by {host}'
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def run(base_url, server, hedging, args):
+    """Send WARMUP + args.requests queries; returns (latencies, upstream requests, hedging stats)"""
+    client = DatadogClient(coalesce_window=0,
+                           hedger=Hedger(enabled=hedging, budget=args.budget, workers=4 * args.concurrency))
+    url = f"{base_url}/api/v1/query"
+    headers = {'DD-API-KEY': 'benchmark', 'DD-APPLICATION-KEY': 'benchmark'}
+    now = int(time.time())
+
+    def query(i):
+        start = time.perf_counter()
+        client.get(url, headers=headers, params={'query': QUERY, 'from': now - 3600 - i, 'to': now - i}, timeout=10)
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(query, range(WARMUP)))
+        before = server.stats.get('requests', 0)
+        latencies = list(pool.map(query, range(WARMUP, WARMUP + args.requests)))
+    return latencies, server.stats.get('requests', 0) - before, client.stats()['hedging'].get('v1/query', {})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tail latency of Datadog reads with hedged requests")
+    parser.add_argument('--requests', type=int, default=400)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--latency', type=float, default=0.02, help="Seconds added to every response")
+    parser.add_argument('--slow-rate', type=float, default=0.02, help="Fraction of responses in the slow tail")
+    parser.add_argument('--slow-latency', type=float, default=1.0, help="Extra seconds for slow responses")
+    parser.add_argument('--budget', type=float, default=0.1, help="DD_HEDGE_BUDGET for the hedged run")
+    args = parser.parse_args()
+
+    server, base_url = start_standin(StandinConfig(logs=1000, monitors=50, dashboards=5, events=50,
+                                                   latency=args.latency, jitter=args.latency / 2,
+                                                   slow_rate=args.slow_rate, slow_latency=args.slow_latency))
+    print(f"🐢 Stand-in: {args.latency * 1000:.0f}ms per response, {args.slow_rate:.0%} take "
+          f"+{args.slow_latency:g}s; {args.requests} queries at concurrency {args.concurrency}")
+    try:
+        results = {label: run(base_url, server, hedging, args)
+                   for label, hedging in (('no hedging', False), ('hedging', True))}
+    finally:
+        server.shutdown()
+
+    print("\n🎯 /api/v1/query latency (ms):")
+    print(f"   {'':12} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8} {'upstream':>9} {'extra':>7}")
+    for label, (latencies, upstream, _) in results.items():
+        row = ' '.join(f"{_percentile(latencies, pct) * 1000:8.1f}" for pct in (50, 95, 99, 100))
+        print(f"   {label:12} {row} {upstream:9d} {(upstream - args.requests) / args.requests:7.1%}")
+    hedging = results['hedging'][2]
+    print(f"\n🔁 Hedges sent: {hedging.get('hedged', 0)}, won: {hedging.get('hedge_wins', 0)}, "
+          f"denied: {hedging.get('denied', 0)} (hedge delay = observed p95 {hedging.get('p95_seconds')}s)")
+
+
+if __name__ == "__main__":
+    main()
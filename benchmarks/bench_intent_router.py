@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+End-to-end latency benchmark: LLM tool selection vs the fast-path intent router
+
+Runs process_yoda_message over a set of common requests twice: with the
+router disabled (decision LLM call + tool + analysis LLM call, as before)
+and enabled (routed requests skip the decision call). The OpenAI call and
+the Datadog tool are replaced with fixed-latency stand-ins so the numbers
+show only what routing removes; the router's own matching cost is timed
+separately.
+
+Usage:
+    python benchmarks/bench_intent_router.py [--llm-latency 0.8] [--tool-latency 0.2] [--rounds 1]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DD_API_KEY', 'benchmark')
+os.environ.setdefault('DD_APP_KEY', 'benchmark')
+
+import mcp_loader  # noqa: E402,F401  (loads tools before importing mcp modules directly)
+import intent_router  # noqa: E402
+import ui_handlers  # noqa: E402
+
+MESSAGES = [
+    "show me all P1 alerts",
+    "get recent logs with errors",
+    "query CPU metrics for last hour",
+    "list production dashboards",
+    "show recent deployment events",
+    "errors for payment-api service in the last 4 hours",
+    "get alert events from last day",
+    "show monitors in alert state",
+    "find API errors in production",
+    "why is checkout slow since the last deploy?",
+]
+
+
+def _stand_ins(llm_latency, tool_latency, counters):
+    def fake_openai(messages, turn="analysis"):
+        counters[turn] = counters.get(turn, 0) + 1
+        time.sleep(llm_latency)
+        if turn == "decision":
+            return "TOOL_CALL: get_monitors(group_states=['alert'], priority='P1')"
+        return "Analysis complete, Commander."
+
+    def fake_tool(tool_name, **params):
+        counters['tool'] = counters.get('tool', 0) + 1
+        time.sleep(tool_latency)
+        return {"success": True, "data": [], "count": 0}
+
+    return fake_openai, fake_tool
+
+
+def run(messages, rounds, enabled, llm_latency, tool_latency):
+    counters = {}
+    ui_handlers.call_openai, ui_handlers.call_mcp_tool = _stand_ins(llm_latency, tool_latency, counters)
+    intent_router.INTENT_ROUTER_ENABLED = enabled
+    latencies = []
+    for _ in range(rounds):
+        for message in messages:
+            start = time.perf_counter()
+            ui_handlers.process_yoda_message(message, [])
+            latencies.append(time.perf_counter() - start)
+    return latencies, counters
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--llm-latency', type=float, default=0.8, help="Seconds per simulated OpenAI call")
+    parser.add_argument('--tool-latency', type=float, default=0.2, help="Seconds per simulated Datadog tool call")
+    parser.add_argument('--rounds', type=int, default=1)
+    args = parser.parse_args()
+
+    router = intent_router.get_intent_router()
+    routes = {message: router.route(message) for message in MESSAGES}
+
+    start = time.perf_counter()
+    iterations = 200
+    for _ in range(iterations):
+        for message in MESSAGES:
+            router.route(message)
+    route_cost_ms = (time.perf_counter() - start) / (iterations * len(MESSAGES)) * 1000
+
+    devnull = open(os.devnull, 'w')
+    stdout, sys.stdout = sys.stdout, devnull
+    try:
+        before, before_calls = run(MESSAGES, args.rounds, False, args.llm_latency, args.tool_latency)
+        after, after_calls = run(MESSAGES, args.rounds, True, args.llm_latency, args.tool_latency)
+    finally:
+        sys.stdout = stdout
+        devnull.close()
+
+    print(f"Simulated LLM latency {args.llm_latency:.2f}s, tool latency {args.tool_latency:.2f}s, "
+          f"{len(MESSAGES)} messages x {args.rounds} round(s)\n")
+    print(f"{'message':52} {'route':52} {'before':>8} {'after':>8}")
+    for i, message in enumerate(MESSAGES):
+        route = routes[message]
+        label = route.tool_call[len('TOOL_CALL: '):] if route else '(LLM decides)'
+        print(f"{message[:52]:52} {label[:52]:52} {before[i]:7.2f}s {after[i]:7.2f}s")
+
+    routed = sum(1 for route in routes.values() if route)
+    print(f"\nRouted locally: {routed}/{len(MESSAGES)}, router cost {route_cost_ms:.3f} ms/message")
+    print(f"Decision LLM calls: {before_calls.get('decision', 0)} -> {after_calls.get('decision', 0)}")
+    print(f"Mean latency: {statistics.mean(before):.2f}s -> {statistics.mean(after):.2f}s "
+          f"({(1 - statistics.mean(after) / statistics.mean(before)):.0%} lower)")
+    print(f"Median latency: {statistics.median(before):.2f}s -> {statistics.median(after):.2f}s")
+
+
+if __name__ == "__main__":
+    main()
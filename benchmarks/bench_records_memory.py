@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Retained-memory benchmark: per-item dicts vs __slots__ records
+
+Builds N formatted items the way the tools used to (one dict per item, plus
+a copied `attributes` dict per log) and the way they do now (mcp.records),
+from the same raw decoded elements, and reports the memory still held by the
+formatted results with tracemalloc. The raw elements are allocated before
+tracing starts, so only the formatted copies are counted.
+
+Usage:
+    python benchmarks/bench_records_memory.py [--count 100000]
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DD_API_KEY', 'benchmark')
+os.environ.setdefault('DD_APP_KEY', 'benchmark')
+
+import mcp_loader  # noqa: E402,F401  (loads tools before importing mcp modules directly)
+from mcp.records import LogRecord, MetricSeries, EventRecord, MonitorRecord  # noqa: E402
+
+_LOG_CORE = ['timestamp', 'message', 'status', 'service', 'source', 'host', 'tags']
+
+
+def _raw_logs(count):
+    return [{
+        "timestamp": "2024-05-01T12:%02d:%02d.000Z" % ((i // 60) % 60, i % 60),
+        "message": f"GET /api/v1/orders/{i} completed in {i % 900}ms",
+        "status": "error" if i % 13 == 0 else "info",
+        "service": f"service-{i % 25}",
+        "source": "python",
+        "host": f"host-{i % 40}",
+        "tags": ["env:prod", f"service:service-{i % 25}"],
+        "duration": i % 900,
+    } for i in range(count)]
+
+
+def _raw_series(count):
+    return [{"metric": "system.cpu.user", "scope": f"host:host-{i}",
+             "pointlist": [[1714560000000, 1.5], [1714560060000, 2.5]]} for i in range(count)]
+
+
+def _raw_events(count):
+    return [{"id": i, "title": f"Deploy {i}", "text": "deployed", "date_happened": 1714560000 + i,
+             "priority": "normal", "source_type_name": "deploy", "host": f"host-{i % 40}",
+             "tags": ["env:prod"], "url": f"/event/{i}", "alert_type": "info",
+             "aggregation_key": "", "source": "ci"} for i in range(count)]
+
+
+def _raw_monitors(count):
+    return [{"id": i, "name": f"Monitor {i}", "overall_state": "OK", "priority": i % 5 + 1,
+             "type": "metric alert", "query": "avg(last_5m):x > 1", "message": "msg",
+             "tags": ["env:prod"], "created": "2024-01-01", "modified": "2024-01-01",
+             "creator": {"name": "SRE Bot"}} for i in range(count)]
+
+
+def _as_dict_log(attributes):
+    entry = {k: attributes.get(k) for k in _LOG_CORE}
+    entry["attributes"] = {k: v for k, v in attributes.items() if k not in _LOG_CORE}
+    return entry
+
+
+def _as_dict_series(serie):
+    pointlist = serie.get('pointlist', [])
+    return {"metric": serie.get('metric', ''), "scope": serie.get('scope', {}), "pointlist": pointlist,
+            "data_points_count": len(pointlist), "latest_value": pointlist[-1][1],
+            "latest_timestamp": None, "min_value": 1.5, "max_value": 2.5, "avg_value": 2.0}
+
+
+def _as_record_series(serie):
+    pointlist = serie.get('pointlist', [])
+    record = MetricSeries(serie.get('metric', ''), serie.get('scope', {}), pointlist)
+    record.latest_value = pointlist[-1][1]
+    record.min_value, record.max_value, record.avg_value = 1.5, 2.5, 2.0
+    return record
+
+
+def _as_dict_event(event):
+    return {key: event.get(key) for key in EventRecord._fields if key != 'timestamp'} | {"timestamp": None}
+
+
+def _as_dict_monitor(monitor):
+    return {"id": monitor.get('id'), "name": monitor.get('name'), "status": monitor.get('overall_state'),
+            "priority": monitor.get('priority'), "type": monitor.get('type'), "query": monitor.get('query'),
+            "message": monitor.get('message'), "tags": monitor.get('tags', []),
+            "created": monitor.get('created'), "modified": monitor.get('modified'),
+            "creator": (monitor.get('creator') or {}).get('name')}
+
+
+def _retained(build, raw):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = [build(item) for item in raw]
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Retained-memory benchmark for formatted tool records")
+    parser.add_argument('--count', type=int, default=100000)
+    args = parser.parse_args()
+
+    cases = [
+        ('logs', _raw_logs, _as_dict_log, LogRecord),
+        ('metric series', _raw_series, _as_dict_series, _as_record_series),
+        ('events', _raw_events, _as_dict_event, lambda event: EventRecord(event, None)),
+        ('monitors', _raw_monitors, _as_dict_monitor, MonitorRecord),
+    ]
+
+    print(f"🧮 Retained memory for {args.count} formatted items (lower is better):")
+    for label, make_raw, as_dict, as_record in cases:
+        raw = make_raw(args.count)
+        dict_bytes, dict_time = _retained(as_dict, raw)
+        record_bytes, record_time = _retained(as_record, raw)
+        saving = (1 - record_bytes / dict_bytes) * 100 if dict_bytes else 0
+        print(f"   {label:<14} dict={dict_bytes / 1024 / 1024:7.2f} MB ({dict_time * 1000:6.1f} ms)  "
+              f"record={record_bytes / 1024 / 1024:7.2f} MB ({record_time * 1000:6.1f} ms)  saving={saving:5.1f}%")
+        del raw
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Memory-peak benchmark: buffered response.json() vs streaming decode
+
+For each tool (search_logs_mcp, query_metrics_mcp, get_monitors) a synthetic
+Datadog response body is served over HTTP by a local server. The buffered
+path fetches it with requests, decodes the whole body with response.json()
+and then builds the formatted copy (what the tools used to do); the streaming
+path runs the real tool through the shared Datadog client, which decodes
+elements incrementally via mcp.json_stream. tracemalloc reports the peak of
+each. The bodies are built before measuring, so the server only adds socket
+writes of existing bytes.
+
+Usage:
+    python benchmarks/bench_stream_memory.py [--logs 20000] [--series 200] [--points 2000] [--monitors 10000]
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DD_API_KEY', 'benchmark')
+os.environ.setdefault('DD_APP_KEY', 'benchmark')
+os.environ.setdefault('MONITOR_PAGE_SIZE', '1000')
+
+import mcp_loader  # noqa: E402,F401  (loads tools before importing mcp modules directly)
+import mcp.logs as logs_module  # noqa: E402
+import mcp.metrics as metrics_module  # noqa: E402
+import mcp.monitors as monitors_module  # noqa: E402
+import requests  # noqa: E402
+
+HEADERS = {'DD-API-KEY': 'benchmark', 'DD-APPLICATION-KEY': 'benchmark'}
+
+
+class _BodyHandler(BaseHTTPRequestHandler):
+    """Serves the prebuilt body for the requested path (monitor list: per page)"""
+
+    def _reply(self):
+        split = urlsplit(self.path)
+        body = self.server.bodies.get(split.path, b'[]')
+        if isinstance(body, list):
+            page = int(parse_qs(split.query).get('page', ['0'])[0])
+            body = body[page] if page < len(body) else b'[]'
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            self.rfile.read(length)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = _reply
+
+    def log_message(self, *args):
+        pass
+
+
+def _start_server(bodies):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _BodyHandler)
+    server.daemon_threads = True
+    server.bodies = bodies
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    # Point every tool at the local server
+    os.environ['DD_SITE'] = logs_module.DD_SITE = metrics_module.DD_SITE = base_url
+    return server, base_url
+
+
+def _logs_body(count):
+    return json.dumps({
+        "data": [{
+            "id": f"log-{i}",
+            "type": "log",
+            "attributes": {
+                "timestamp": "2024-05-01T12:%02d:%02d.000Z" % ((i // 60) % 60, i % 60),
+                "message": f"GET /api/v1/orders/{i} completed in {i % 900}ms status=200 user=user-{i % 97}",
+                "status": "error" if i % 13 == 0 else "info",
+                "service": f"service-{i % 25}",
+                "source": "python",
+                "host": f"host-{i % 40}",
+                "tags": ["env:prod", f"service:service-{i % 25}", f"version:1.{i % 7}"],
+                "http": {"method": "GET", "status_code": 200, "url": f"/api/v1/orders/{i}"},
+                "duration": i % 900,
+            }
+        } for i in range(count)],
+        "meta": {"page": {"after": "cursor"}, "status": "done"},
+    }).encode()
+
+
+def _metrics_body(series, points):
+    return json.dumps({
+        "status": "ok",
+        "res_type": "time_series",
+        "series": [{
+            "metric": "system.cpu.user",
+            "scope": f"host:host-{s}",
+            "display_name": "system.cpu.user",
+            "pointlist": [[1714560000000 + p * 1000, (s * 7 + p) % 100 + 0.5] for p in range(points)],
+            "length": points,
+        } for s in range(series)],
+        "from_date": 1714560000000,
+        "to_date": 1714563600000,
+    }).encode()
+
+
+def _monitors_body(start, count):
+    return json.dumps([{
+        "id": i,
+        "name": f"[P{i % 5 + 1}] High latency on service-{i % 50}",
+        "overall_state": ["Alert", "OK", "Warn", "No Data"][i % 4],
+        "priority": i % 5 + 1,
+        "type": "metric alert",
+        "query": f"avg(last_5m):avg:trace.http.request.duration{{service:service-{i % 50}}} > 2",
+        "message": "Latency is above threshold. @pagerduty-oncall " * 3,
+        "tags": ["env:prod", f"service:service-{i % 50}", f"team:team-{i % 9}"],
+        "options": {"thresholds": {"critical": 2, "warning": 1}, "notify_no_data": False,
+                    "renotify_interval": 0, "evaluation_delay": 60},
+        "state": {"groups": {f"host:host-{g}": {"status": "OK", "last_triggered_ts": None} for g in range(10)}},
+        "created": "2024-01-01T00:00:00.000000+00:00",
+        "modified": "2024-01-01T00:00:00.000000+00:00",
+        "creator": {"name": "SRE Bot", "handle": "sre@example.com"},
+    } for i in range(start, start + count)]).encode()
+
+
+def _measure(label, fn):
+    # Tool debug output would dominate the timings - silence it while measuring
+    real_stdout = sys.stdout
+    sys.stdout = open(os.devnull, 'w')
+    try:
+        tracemalloc.start()
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        sys.stdout.close()
+        sys.stdout = real_stdout
+    print(f"   {label:<10} peak={peak / 1024 / 1024:8.2f} MB  time={elapsed * 1000:8.1f} ms")
+    del result
+    return peak
+
+
+def bench_logs(count):
+    body = _logs_body(count)
+    print(f"📝 search_logs_mcp: {count} logs, body {len(body) / 1024 / 1024:.1f} MB")
+    server, base_url = _start_server({'/api/v2/logs/events/search': body})
+
+    def buffered():
+        data = requests.post(f"{base_url}/api/v2/logs/events/search", headers=HEADERS, json={}, timeout=30).json()
+        keep = ['timestamp', 'message', 'status', 'service', 'source', 'host', 'tags']
+        formatted = []
+        for log in data.get('data', []):
+            attributes = log.get('attributes', {})
+            entry = {k: attributes.get(k) for k in keep}
+            entry["attributes"] = {k: v for k, v in attributes.items() if k not in keep}
+            formatted.append(entry)
+        return formatted
+
+    try:
+        buffered_peak = _measure('buffered', buffered)
+        streamed_peak = _measure('streaming', lambda: logs_module.search_logs_mcp(query='*', limit=count))
+    finally:
+        server.shutdown()
+    return buffered_peak, streamed_peak
+
+
+def bench_metrics(series, points):
+    body = _metrics_body(series, points)
+    print(f"📊 query_metrics_mcp: {series} series x {points} points, body {len(body) / 1024 / 1024:.1f} MB")
+    server, base_url = _start_server({'/api/v1/query': body})
+
+    def buffered():
+        data = requests.get(f"{base_url}/api/v1/query", headers=HEADERS, timeout=30).json()
+        formatted = []
+        for serie in data.get('series', []):
+            pointlist = serie.get('pointlist', [])
+            values = [point[1] for point in pointlist if point[1] is not None]
+            formatted.append({"metric": serie.get('metric'), "scope": serie.get('scope'), "pointlist": pointlist,
+                              "min_value": min(values), "max_value": max(values), "avg_value": sum(values) / len(values)})
+        return formatted
+
+    try:
+        buffered_peak = _measure('buffered', buffered)
+        streamed_peak = _measure('streaming', lambda: metrics_module.query_metrics_mcp(query='avg:system.cpu.user{*}'))
+    finally:
+        server.shutdown()
+    return buffered_peak, streamed_peak
+
+
+def bench_monitors(count):
+    page_size = monitors_module.MONITOR_PAGE_SIZE
+    pages = [_monitors_body(start, min(page_size, count - start)) for start in range(0, count, page_size)]
+    full_body = _monitors_body(0, count)
+    print(f"🚨 get_monitors: {count} monitors, body {len(full_body) / 1024 / 1024:.1f} MB")
+
+    server, base_url = _start_server({'/api/v1/monitor': pages, '/api/v1/monitor/all': full_body})
+
+    def buffered():
+        monitors = requests.get(f"{base_url}/api/v1/monitor/all", headers=HEADERS, timeout=30).json()
+        return [{"id": m.get('id'), "name": m.get('name'), "status": m.get('overall_state'),
+                 "priority": m.get('priority'), "tags": m.get('tags', [])} for m in monitors]
+
+    try:
+        buffered_peak = _measure('buffered', buffered)
+        # The paged inventory load behind get_monitors' index
+        streamed_peak = _measure('streaming', monitors_module._load_monitor_inventory)
+    finally:
+        server.shutdown()
+    return buffered_peak, streamed_peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory-peak benchmark for streaming JSON decoding")
+    parser.add_argument('--logs', type=int, default=20000)
+    parser.add_argument('--series', type=int, default=200)
+    parser.add_argument('--points', type=int, default=2000)
+    parser.add_argument('--monitors', type=int, default=10000)
+    args = parser.parse_args()
+
+    results = {
+        'search_logs_mcp': bench_logs(args.logs),
+        'query_metrics_mcp': bench_metrics(args.series, args.points),
+        'get_monitors': bench_monitors(args.monitors),
+    }
+
+    print("\n🎯 Peak memory summary (lower is better):")
+    for name, (buffered_peak, streamed_peak) in results.items():
+        saving = (1 - streamed_peak / buffered_peak) * 100 if buffered_peak else 0
+        print(f"   {name:<18} buffered={buffered_peak / 1024 / 1024:8.2f} MB  "
+              f"streaming={streamed_peak / 1024 / 1024:8.2f} MB  saving={saving:5.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Per-phase latency of full chat turns, offline
+
+Starts the fake LLM server (benchmarks/fake_llm_server.py) and the Datadog
+stand-in (benchmarks/datadog_standin.py), points LLM_API_URL and DD_SITE at
+them, and runs the real process_yoda_message over a set of requests. The
+handler's collaborators are wrapped with timers, so each turn is split into:
+
+    route     fast-path intent routing
+    decision  decision LLM call (skipped for routed requests)
+    tool      MCP tool execution (Datadog calls, parsing, analysis)
+    format    format_tool_result
+    analysis  analysis LLM call
+    other     everything else (prompt/history building, response assembly)
+
+Usage:
+    python benchmarks/bench_turn_phases.py [--rounds 3] [--ttft 0.3] [--tokens-per-second 80]
+        [--dd-latency 0.05] [--no-router] [--llm-cache]
+"""
+
+import argparse
+import contextlib
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.datadog_standin import StandinConfig, start_standin  # noqa: E402
+from benchmarks.fake_llm_server import FakeLLMConfig, start_fake_llm  # noqa: E402
+
+MESSAGES = [
+    "show me all P1 alerts",
+    "get recent logs with errors",
+    "query CPU metrics for last hour",
+    "why is checkout slow right now?",
+    "anything unusual in payments today?",
+    "show recent deployment events",
+    "list production dashboards",
+    "hello there",
+]
+PHASES = ['route', 'decision', 'tool', 'format', 'analysis', 'other']
+
+
+class PhaseTimer:
+    """Accumulates time per phase for the turn running on the current thread"""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def start_turn(self):
+        self._local.phases = {}
+
+    def phases(self):
+        return dict(getattr(self._local, 'phases', {}))
+
+    def wrap(self, fn, phase_of):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                phase = phase_of(*args, **kwargs)
+                phases = self._local.phases
+                phases[phase] = phases.get(phase, 0.0) + time.perf_counter() - start
+        return timed
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def instrument(ui_handlers):
+    """Wrap the handler's collaborators with phase timers"""
+    timer = PhaseTimer()
+    ui_handlers.route_intent = timer.wrap(ui_handlers.route_intent, lambda *a, **k: 'route')
+    ui_handlers.call_openai = timer.wrap(ui_handlers.call_openai,
+                                         lambda messages, turn="analysis": turn)
+    ui_handlers.run_tool = timer.wrap(ui_handlers.run_tool, lambda *a, **k: 'tool')
+    ui_handlers.format_tool_result = timer.wrap(ui_handlers.format_tool_result, lambda *a, **k: 'format')
+    return timer
+
+
+def run(ui_handlers, timer, rounds):
+    """Return a list of (message, total_seconds, phases) per turn"""
+    turns = []
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for round_number in range(rounds):
+            for index, message in enumerate(MESSAGES):
+                timer.start_turn()
+                start = time.perf_counter()
+                # A fresh session per turn keeps history (and prompt size) constant across rounds
+                ui_handlers.process_yoda_message(message, [], f"phases-{round_number}-{index}")
+                total = time.perf_counter() - start
+                phases = timer.phases()
+                phases['other'] = max(0.0, total - sum(phases.values()))
+                turns.append((message, total, phases))
+    return turns
+
+
+def report(turns):
+    totals = [total for _, total, _ in turns]
+    grand_total = sum(totals)
+    print(f"{'phase':>10} {'turns':>6} {'mean':>8} {'p50':>8} {'p95':>8} {'share':>7}")
+    for phase in PHASES:
+        values = [phases[phase] for _, _, phases in turns if phase in phases]
+        if not values:
+            continue
+        print(f"{phase:>10} {len(values):>6} {statistics.mean(values) * 1000:7.1f}ms "
+              f"{_percentile(values, 50) * 1000:7.1f}ms {_percentile(values, 95) * 1000:7.1f}ms "
+              f"{sum(values) / grand_total:7.1%}")
+    print(f"{'turn':>10} {len(totals):>6} {statistics.mean(totals) * 1000:7.1f}ms "
+          f"{_percentile(totals, 50) * 1000:7.1f}ms {_percentile(totals, 95) * 1000:7.1f}ms {1:7.1%}")
+
+    print(f"\n{'request':<40} {'total':>8}  slowest phase")
+    for message in MESSAGES:
+        rows = [(total, phases) for text, total, phases in turns if text == message]
+        mean_total = statistics.mean(total for total, _ in rows)
+        phase_means = {phase: statistics.mean(phases.get(phase, 0.0) for _, phases in rows) for phase in PHASES}
+        slowest = max(phase_means, key=phase_means.get)
+        print(f"{message[:40]:<40} {mean_total * 1000:7.1f}ms  {slowest} ({phase_means[slowest] * 1000:.1f}ms)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--ttft', type=float, default=0.3, help="Fake LLM time to first token")
+    parser.add_argument('--tokens-per-second', type=float, default=80.0, help="Fake LLM generation rate")
+    parser.add_argument('--dd-latency', type=float, default=0.05, help="Datadog stand-in latency per call")
+    parser.add_argument('--logs', type=int, default=1_000_000)
+    parser.add_argument('--no-router', action='store_true', help="Disable the fast-path intent router")
+    parser.add_argument('--llm-cache', action='store_true', help="Keep the LLM response cache enabled")
+    args = parser.parse_args()
+
+    llm_server, llm_url = start_fake_llm(FakeLLMConfig(ttft=args.ttft, tokens_per_second=args.tokens_per_second))
+    dd_server, dd_url = start_standin(StandinConfig(logs=args.logs, latency=args.dd_latency))
+    os.environ['LLM_API_URL'] = llm_url
+    os.environ['OPENAI_API_KEY'] = 'benchmark'
+    os.environ['DD_SITE'] = dd_url
+    os.environ['DD_API_KEY'] = 'benchmark'
+    os.environ['DD_APP_KEY'] = 'benchmark'
+    os.environ['CACHE_DIR'] = tempfile.mkdtemp(prefix='yoda-phases-')
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+    os.environ['INTENT_ROUTER'] = 'false' if args.no_router else 'true'
+    if not args.llm_cache:
+        os.environ['LLM_CACHE_MODE'] = 'off'
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        import mcp_loader  # noqa: F401  (loads tools before importing mcp modules directly)
+        import ui_handlers
+
+    timer = instrument(ui_handlers)
+    print(f"{len(MESSAGES)} requests x {args.rounds} rounds, LLM TTFT {args.ttft:.2f}s at "
+          f"{args.tokens_per_second:.0f} tok/s, Datadog {args.dd_latency:.2f}s per call, "
+          f"router {'off' if args.no_router else 'on'}\n")
+    report(run(ui_handlers, timer, args.rounds))
+    print(f"\nFake LLM: {dict(sorted(llm_server.stats.items()))}")
+    print(f"Datadog stand-in: {dd_server.stats.get('requests', 0)} requests")
+    llm_server.shutdown()
+    dd_server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
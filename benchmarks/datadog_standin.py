@@ -0,0 +1,618 @@
+#!/usr/bin/env python3
+"""
+Offline Datadog stand-in for benchmarks and load tests
+
+Serves the endpoints the mcp modules call, with deterministic synthetic data:
+
+    GET  /api/v1/query               timeseries for `agg:metric{scope} by {tag}`
+    GET  /api/v1/search              metric name search (q=metrics:<text>)
+    GET  /api/v1/metrics/<name>      metric metadata (404 for unknown metrics)
+    POST /api/v2/logs/events/search  log search with query/time filters and cursor paging
+    GET  /api/v1/events              events in [start, end] with priority/sources/tags filters
+    GET  /api/v1/monitor             paged monitor inventory with state/tag/name filters
+    GET  /api/v1/dashboard[/<id>]    dashboard list and dashboard definitions with widgets
+
+Scale is configurable (defaults: 1M logs, 10k monitors, 3k dashboards). Logs
+are never materialized: log i is derived from its index, so searches only
+generate the slice of the time window they scan. Monitors and dashboard
+summaries are built once at start-up.
+
+Faults can be injected: fixed plus random latency, a slow tail (e.g. 2% of
+requests take 2s), per-endpoint rate limits answered with 429 and
+Datadog-style X-RateLimit headers, and a random 500/503 error rate. All
+randomness is seeded, so runs are repeatable.
+
+Point the app at it with DD_SITE=http://127.0.0.1:<port> (any DD_API_KEY /
+DD_APP_KEY value is accepted; missing keys get a 403 like the real API).
+
+Usage:
+    python benchmarks/datadog_standin.py [--port 8126] [--logs 1000000] [--monitors 10000] [--dashboards 3000]
+        [--latency 0.05] [--jitter 0.02] [--slow-rate 0.02] [--slow-latency 2.0]
+        [--rate-limit 100] [--rate-period 10] [--error-rate 0.01]
+
+In-process:
+    from benchmarks.datadog_standin import StandinConfig, start_standin
+    server, base_url = start_standin(StandinConfig(logs=100000, latency=0.02))
+"""
+
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+SERVICES = ['web-api', 'checkout', 'payment-api', 'orders', 'inventory', 'search', 'auth', 'notifications',
+            'front-prod', 'recommendations', 'shipping', 'billing', 'catalog', 'gateway', 'reporting',
+            'scheduler', 'media', 'profile', 'cart', 'pricing', 'fraud', 'ledger', 'email', 'analytics', 'cdn-edge']
+ENVIRONMENTS = ['production', 'staging', 'dev']
+TEAMS = ['core', 'payments', 'platform', 'growth', 'data']
+SOURCES = ['python', 'java', 'nginx', 'go', 'nodejs']
+MONITOR_STATES = [('OK', 80), ('Alert', 8), ('Warn', 7), ('No Data', 5)]
+_STATE_FILTERS = {'alert': 'Alert', 'warn': 'Warn', 'no data': 'No Data', 'ok': 'OK'}
+BASE_METRICS = ['system.cpu.user', 'system.cpu.system', 'system.cpu.idle', 'system.mem.used', 'system.mem.free',
+                'system.disk.used', 'system.load.1', 'system.net.bytes_rcvd', 'system.net.bytes_sent',
+                'kubernetes.cpu.usage.total', 'kubernetes.memory.usage', 'kubernetes.pods.running',
+                'kubernetes.containers.restarts', 'aws.elb.latency', 'aws.elb.request_count',
+                'aws.elasticache.cpuutilization', 'aws.elasticache.curr_connections', 'aws.rds.cpuutilization',
+                'aws.rds.database_connections', 'aws.ec2.cpuutilization', 'azure.cache_redis.server_load',
+                'azure.cache_redis.usedmemory', 'azure.sql_servers_databases.cpu_percent',
+                'azure.vm.percentage_cpu', 'redis.net.clients', 'redis.mem.used', 'postgresql.connections']
+TRACE_METRICS = ['hits', 'errors', 'duration', 'apdex']
+LOG_MESSAGES = {
+    'info': ['GET /api/v1/orders/{n} completed in {d}ms', 'User session refreshed for user-{n}',
+             'Cache hit for key product:{n}', 'Processed batch {n} with {d} items'],
+    'warn': ['Slow query took {d}ms on orders table', 'Retrying upstream call to inventory (attempt {r})',
+             'Connection pool at {p}% capacity'],
+    'error': ['Unhandled exception in request handler: TimeoutError after {d}ms',
+              'HTTP 500 Internal Server Error on POST /api/v1/checkout/{n}',
+              'Database connection refused: too many clients', 'NullPointerException in PaymentProcessor.charge'],
+}
+_MONITOR_SCOPE = re.compile(r'\{([^}]*)\}')
+_QUERY = re.compile(r'^\s*(?:(\w+):)?([\w.]+)\s*\{([^}]*)\}(?:\s+by\s+\{([^}]*)\})?')
+
+
+def _hash(*parts):
+    """Stable 32-bit hash of the parts"""
+    return zlib.crc32('|'.join(str(part) for part in parts).encode())
+
+
+def _iso(epoch_seconds):
+    return datetime.fromtimestamp(epoch_seconds, tz=timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+
+
+def _weighted(choices, value):
+    total = sum(weight for _, weight in choices)
+    value %= total
+    for choice, weight in choices:
+        if value < weight:
+            return choice
+        value -= weight
+    return choices[-1][0]
+
+
+class StandinConfig:
+    """Data scale and fault injection settings"""
+
+    def __init__(self, logs=1_000_000, monitors=10_000, dashboards=3_000, events=5_000, log_span_hours=24,
+                 latency=0.0, jitter=0.0, slow_rate=0.0, slow_latency=2.0, rate_limit=0, rate_period=10.0,
+                 error_rate=0.0, seed=42):
+        self.logs = logs
+        self.monitors = monitors
+        self.dashboards = dashboards
+        self.events = events
+        self.log_span_hours = log_span_hours
+        self.latency = latency
+        self.jitter = jitter
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.rate_limit = rate_limit
+        self.rate_period = rate_period
+        self.error_rate = error_rate
+        self.seed = seed
+
+
+class SyntheticDatadog:
+    """Deterministic data set behind the stand-in endpoints"""
+
+    def __init__(self, config):
+        self.config = config
+        # Newest log is "now" (rounded to the minute); older logs are spaced evenly across the span
+        self.anchor_ms = int(time.time() // 60 * 60 * 1000)
+        self.log_spacing_ms = max(1.0, config.log_span_hours * 3600 * 1000 / max(config.logs, 1))
+        self.metric_catalog = self._metric_catalog()
+        self.monitors = [self._monitor(i) for i in range(config.monitors)]
+        self.dashboards = [self._dashboard_summary(i) for i in range(config.dashboards)]
+        self.dashboard_index = {dashboard['id']: i for i, dashboard in enumerate(self.dashboards)}
+
+    # -- metrics ------------------------------------------------------------
+
+    def _metric_catalog(self):
+        catalog = list(BASE_METRICS)
+        for service in SERVICES:
+            catalog.extend(f"trace.{service.replace('-', '_')}.request.{kind}" for kind in TRACE_METRICS)
+        catalog.extend(f"trace.http.request.{kind}" for kind in TRACE_METRICS)
+        return catalog
+
+    def metric_value(self, metric, scope, ts):
+        """Smooth daily-ish wave plus noise, scaled per metric"""
+        base = _hash(metric, scope)
+        level = 5 + base % 70
+        wave = math.sin(ts / 3600 + base % 7) * (5 + base % 15)
+        noise = (_hash(metric, scope, ts) % 1000) / 100.0
+        return round(max(0.0, level + wave + noise), 3)
+
+    def query(self, query, start, end):
+        series = []
+        for part in query.split(','):
+            match = _QUERY.match(part)
+            if not match:
+                continue
+            metric, scope, group_by = match.group(2), (match.group(3) or '*').strip(), match.group(4)
+            step = max(20, (end - start) // 300 // 20 * 20 or 20)
+            scopes = [scope]
+            if group_by:
+                values = {'host': [f"host-{n:02d}" for n in range(8)], 'service': SERVICES[:10],
+                          'kube_deployment': SERVICES[:10]}.get(group_by.strip(), [f"{group_by}-{n}" for n in range(5)])
+                scopes = [f"{group_by.strip()}:{value}" if scope == '*' else f"{scope},{group_by.strip()}:{value}"
+                          for value in values]
+            for series_scope in scopes:
+                pointlist = [[ts * 1000.0, self.metric_value(metric, series_scope, ts)]
+                             for ts in range(start - start % step, end + 1, step) if ts >= start]
+                series.append({"metric": metric, "scope": series_scope, "expression": part.strip(),
+                               "pointlist": pointlist, "length": len(pointlist), "interval": step,
+                               "aggr": match.group(1) or 'avg'})
+        return {"status": "ok", "res_type": "time_series", "query": query, "from_date": start * 1000,
+                "to_date": end * 1000, "series": series}
+
+    def search_metrics(self, q):
+        text = q.split(':', 1)[1] if q.startswith('metrics:') else q
+        text = text.strip().lower()
+        names = self.metric_catalog if text in ('', '*') else [name for name in self.metric_catalog if text in name]
+        return {"results": {"metrics": names}}
+
+    def metric_metadata(self, name):
+        if name not in self.metric_catalog:
+            return None
+        unit = 'percent' if 'cpu' in name or 'load' in name else 'byte' if 'mem' in name or 'bytes' in name else None
+        return {"type": "gauge", "description": f"Synthetic metric {name}", "short_name": name.split('.')[-1],
+                "unit": unit, "per_unit": None, "statsd_interval": None, "integration": name.split('.')[0]}
+
+    # -- logs ---------------------------------------------------------------
+
+    def log(self, i):
+        """Log number i (0 = newest)"""
+        h = _hash('log', i)
+        service = SERVICES[h % len(SERVICES)]
+        status = 'error' if h % 13 == 0 else 'warn' if h % 7 == 0 else 'info'
+        templates = LOG_MESSAGES[status]
+        message = templates[(h >> 8) % len(templates)].format(n=(h >> 4) % 10000, d=(h >> 12) % 3000,
+                                                              r=1 + (h >> 3) % 3, p=60 + (h >> 5) % 40)
+        timestamp_ms = self.anchor_ms - int(i * self.log_spacing_ms)
+        env = ENVIRONMENTS[(h >> 16) % len(ENVIRONMENTS)]
+        host = f"{service}-{(h >> 20) % 4}"
+        return {
+            "id": f"AQAAAY{i:010d}",
+            "type": "log",
+            "attributes": {
+                "timestamp": _iso(timestamp_ms / 1000),
+                "message": message,
+                "status": status,
+                "service": service,
+                "source": SOURCES[(h >> 24) % len(SOURCES)],
+                "host": host,
+                "tags": [f"env:{env}", f"service:{service}", f"host:{host}", f"version:1.{(h >> 6) % 9}"],
+                "attributes": {"http": {"status_code": 500 if 'HTTP 500' in message else 200},
+                               "duration": (h >> 12) % 3000 * 1_000_000},
+            },
+        }
+
+    def _log_index_range(self, from_ms, to_ms):
+        """Indices of logs with from_ms <= timestamp <= to_ms (newest first)"""
+        first = max(0, math.ceil((self.anchor_ms - to_ms) / self.log_spacing_ms))
+        last = min(self.config.logs - 1, math.floor((self.anchor_ms - from_ms) / self.log_spacing_ms))
+        return first, last
+
+    @staticmethod
+    def _log_matcher(query):
+        """Compile a small subset of the log query syntax: key:value, -key:value, *text*, words, OR"""
+        query = (query or '*').strip()
+        groups = []
+        for group in re.split(r'\s+OR\s+', query.strip('()')):
+            terms = []
+            for term in group.split():
+                negate = term.startswith('-')
+                term = term.lstrip('-').strip('()')
+                if term in ('*', 'AND', ''):
+                    continue
+                if ':' in term:
+                    key, value = term.split(':', 1)
+                    key = key.lstrip('@')
+                    terms.append((negate, key.lower(), value.strip('"').lower()))
+                else:
+                    terms.append((negate, None, term.strip('*"').lower()))
+            groups.append(terms)
+
+        def matches(attributes):
+            for terms in groups:
+                ok = True
+                for negate, key, value in terms:
+                    if key is None:
+                        hit = value in attributes['message'].lower()
+                    elif key in ('status', 'service', 'host', 'source'):
+                        actual = attributes[key].lower()
+                        hit = actual == value or (value.endswith('*') and actual.startswith(value[:-1]))
+                    else:
+                        hit = f"{key}:{value}" in attributes['tags']
+                    if hit == negate:
+                        ok = False
+                        break
+                if ok:
+                    return True
+            return False
+
+        return matches
+
+    def search_logs(self, body, max_scan=500_000):
+        filters = body.get('filter') or {}
+        page = body.get('page') or {}
+        limit = min(int(page.get('limit') or 10), 1000)
+        from_ms = int(filters.get('from') or 0)
+        to_ms = int(filters.get('to') or self.anchor_ms)
+        first, last = self._log_index_range(from_ms, to_ms)
+        start = max(first, int(page.get('cursor') or first))
+        matches = self._log_matcher(filters.get('query'))
+        ascending = str(body.get('sort', '')).lstrip('-') == 'timestamp:asc' or body.get('sort') == 'timestamp'
+
+        logs = []
+        scanned = 0
+        position = start
+        while position <= last and len(logs) < limit and scanned < max_scan:
+            index = last - (position - first) if ascending else position
+            log = self.log(index)
+            if matches(log['attributes']):
+                logs.append(log)
+            position += 1
+            scanned += 1
+        meta = {"elapsed": scanned // 1000, "request_id": f"standin-{start}", "status": "done"}
+        if position <= last and len(logs) == limit:
+            meta["page"] = {"after": str(position)}
+        return {"data": logs, "meta": meta, "links": {"next": None}}
+
+    # -- events -------------------------------------------------------------
+
+    def events(self, start, end, priority=None, sources=None, tags=None):
+        span = self.config.log_span_hours * 3600
+        spacing = span / max(self.config.events, 1)
+        anchor = self.anchor_ms // 1000
+        first = max(0, math.ceil((anchor - end) / spacing))
+        last = min(self.config.events - 1, math.floor((anchor - start) / spacing))
+        source_filter = set(sources.split(',')) if sources else None
+        tag_filter = set(tags.split(',')) if tags else None
+        events = []
+        for i in range(first, last + 1):
+            h = _hash('event', i)
+            service = SERVICES[h % len(SERVICES)]
+            kind = ['deployment', 'alert', 'config change', 'autoscaling'][(h >> 4) % 4]
+            source = {'deployment': 'github', 'alert': 'monitor', 'config change': 'terraform',
+                      'autoscaling': 'kubernetes'}[kind]
+            event_priority = 'low' if h % 5 else 'normal'
+            event_tags = [f"service:{service}", f"env:{ENVIRONMENTS[(h >> 8) % 3]}", f"source:{source}"]
+            if priority and event_priority != priority:
+                continue
+            if source_filter and source not in source_filter:
+                continue
+            if tag_filter and not tag_filter <= set(event_tags):
+                continue
+            date_happened = int(anchor - i * spacing)
+            title, text = {
+                'deployment': ("Kubernetes deployment updated",
+                               f"deployment {service} rolled out: {service} updated to v1.{(h >> 16) % 40}"),
+                'alert': (f"[Triggered] High error rate on {service}", f"Error rate above threshold on {service}"),
+                'config change': (f"Config change applied to {service}", f"terraform apply for {service}"),
+                'autoscaling': (f"Scaled {service}", f"{service} replicas changed to {2 + (h >> 16) % 8}"),
+            }[kind]
+            events.append({
+                "id": 5_000_000_000 + i, "title": title, "text": text,
+                "date_happened": date_happened, "priority": event_priority, "source_type_name": source,
+                "host": f"{service}-{(h >> 12) % 4}", "tags": event_tags, "url": f"/event/event?id={i}",
+                "alert_type": 'error' if kind == 'alert' else 'info', "aggregation_key": f"{service}-{kind}",
+            })
+            if len(events) >= 1000:
+                break
+        return {"events": events}
+
+    # -- monitors -----------------------------------------------------------
+
+    def _monitor(self, i):
+        h = _hash('monitor', i)
+        service = SERVICES[h % len(SERVICES)]
+        env = ENVIRONMENTS[(h >> 4) % 3]
+        priority = 1 + (h >> 8) % 5 if (h >> 12) % 10 else None
+        kind = ['metric alert', 'query alert', 'log alert', 'service check'][(h >> 14) % 4]
+        what = ['high CPU', 'error rate', 'latency p95', 'memory usage', 'pod restarts', '5xx responses'][(h >> 16) % 6]
+        created = self.anchor_ms / 1000 - 86400 * (30 + h % 700)
+        # Multi-alert monitors group by host; the others are scoped to a single host
+        multi = h % 3 == 0
+        scope = f"service:{service},env:{env}" + ('' if multi else f",host:{service}-{(h >> 24) % 4}")
+        return {
+            "id": 10_000_000 + i,
+            "name": f"[{env}] {what} on {service}" + (f" (P{priority})" if priority else ''),
+            "overall_state": _weighted(MONITOR_STATES, h >> 18),
+            "priority": priority,
+            "type": kind,
+            "query": f"avg(last_5m):avg:system.cpu.user{{{scope}}}{' by {host}' if multi else ''} > 90",
+            "message": f"{what} detected on {service} @slack-{TEAMS[(h >> 20) % len(TEAMS)]}",
+            "tags": [f"env:{env}", f"service:{service}", f"team:{TEAMS[(h >> 20) % len(TEAMS)]}"]
+                    + ([f"priority:p{priority}"] if priority else []),
+            "created": _iso(created),
+            "modified": _iso(created + 86400 * ((h >> 22) % 30)),
+            "creator": {"name": f"SRE {TEAMS[(h >> 20) % len(TEAMS)]}", "email": "sre@example.com"},
+            "options": {"thresholds": {"critical": 90, "warning": 80}, "notify_no_data": bool(h % 2)},
+            "multi": multi,
+        }
+
+    def list_monitors(self, params):
+        states = {_STATE_FILTERS.get(state.strip().lower()) for state in params.get('group_states', '').split(',')
+                  if state.strip()}
+        names = [name.strip().lower() for name in params.get('name', '').split(',') if name.strip()]
+        tags = [tag.strip() for tag in params.get('tags', '').split(',') if tag.strip()]
+        monitor_tags = [tag.strip() for tag in params.get('monitor_tags', '').split(',') if tag.strip()]
+        # `tags` filters by the scope of the monitor query, `monitor_tags` by the monitor's own tags
+        selected = [monitor for monitor in self.monitors
+                    if (not states or monitor['overall_state'] in states)
+                    and (not names or any(name in monitor['name'].lower() for name in names))
+                    and all(tag in _MONITOR_SCOPE.search(monitor['query']).group(1).split(',') for tag in tags)
+                    and all(tag in monitor['tags'] for tag in monitor_tags)]
+        if 'page' not in params:
+            return selected
+        page_size = int(params.get('page_size') or 100)
+        page = int(params.get('page') or 0)
+        return selected[page * page_size:(page + 1) * page_size]
+
+    # -- dashboards ---------------------------------------------------------
+
+    def _dashboard_summary(self, i):
+        h = _hash('dashboard', i)
+        service = SERVICES[h % len(SERVICES)]
+        env = ENVIRONMENTS[(h >> 4) % 3]
+        topic = ['Overview', 'Performance', 'Errors', 'Deployment', 'Capacity', 'Kubernetes'][(h >> 8) % 6]
+        dashboard_id = f"{chr(97 + h % 26)}{h % 10}{chr(97 + (h >> 5) % 26)}-{(h >> 10) % 1000:03d}-{i:03x}"
+        created = self.anchor_ms / 1000 - 86400 * (10 + h % 900)
+        return {
+            "id": dashboard_id,
+            "title": f"{service} {topic} ({env})",
+            "description": f"{topic} dashboard for {service} in {env}",
+            "layout_type": 'ordered' if h % 2 else 'free',
+            "url": f"/dashboard/{dashboard_id}",
+            "is_read_only": bool(h % 5 == 0),
+            "created_at": _iso(created),
+            "modified_at": _iso(created + 86400 * ((h >> 12) % 60)),
+            "author_handle": f"{TEAMS[(h >> 14) % len(TEAMS)]}@example.com",
+        }
+
+    def dashboard(self, dashboard_id):
+        index = self.dashboard_index.get(dashboard_id)
+        if index is None:
+            return None
+        summary = self.dashboards[index]
+        service = summary['title'].split(' ')[0]
+        metrics = ['system.cpu.user', 'system.mem.used', f"trace.{service.replace('-', '_')}.request.hits",
+                   f"trace.{service.replace('-', '_')}.request.errors", 'kubernetes.pods.running']
+
+        def timeseries(n, metric):
+            return {"id": index * 100 + n, "definition": {
+                "type": "timeseries", "title": metric, "legend": {"enabled": n % 2 == 0},
+                "requests": [{"response_format": "timeseries", "queries": [
+                    {"data_source": "metrics", "name": "query1", "query": f"avg:{metric}{{service:{service}}}"}],
+                    "display_type": "line"}]}}
+
+        widgets = [{"id": index * 100, "definition": {
+            "type": "group", "title": "Service health", "layout_type": "ordered",
+            "widgets": [timeseries(n + 1, metric) for n, metric in enumerate(metrics[:3])]}}]
+        widgets.extend(timeseries(n + 10, metric) for n, metric in enumerate(metrics[3:]))
+        return dict(summary, widgets=widgets,
+                    template_variables=[{"name": "env", "prefix": "env", "default": "production"}])
+
+
+class _RateWindow:
+    """Fixed-window limit per endpoint family, reported through X-RateLimit headers"""
+
+    def __init__(self, limit, period):
+        self.limit = limit
+        self.period = period
+        self.windows = {}
+        self.lock = threading.Lock()
+
+    def check(self, family):
+        """Return (allowed, headers)"""
+        now = time.monotonic()
+        with self.lock:
+            start, count = self.windows.get(family, (now, 0))
+            if now - start >= self.period:
+                start, count = now, 0
+            count += 1
+            self.windows[family] = (start, count)
+        reset = max(0.0, self.period - (now - start))
+        headers = {'X-RateLimit-Limit': str(self.limit), 'X-RateLimit-Period': str(int(self.period)),
+                   'X-RateLimit-Remaining': str(max(0, self.limit - count)), 'X-RateLimit-Reset': f"{reset:.0f}",
+                   'X-RateLimit-Name': family}
+        return count <= self.limit, headers
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    """HTTP front end; the server object carries `data`, `config`, `rng`, `limits` and `stats`"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, payload, headers=None):
+        body = json.dumps(payload, separators=(',', ':')).encode()
+        try:
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def _count(self, key):
+        with self.server.stats_lock:
+            self.server.stats[key] = self.server.stats.get(key, 0) + 1
+
+    def _faults(self, family):
+        """Apply latency, rate limits and random errors; returns (status, headers) or None to proceed"""
+        config = self.server.config
+        with self.server.stats_lock:
+            roll, jitter, slow = self.server.rng.random(), self.server.rng.random(), self.server.rng.random()
+        delay = config.latency + jitter * config.jitter
+        if config.slow_rate and slow < config.slow_rate:
+            delay += config.slow_latency
+            self._count('slow')
+        if delay:
+            time.sleep(delay)
+        headers = {}
+        if self.server.limits is not None:
+            allowed, headers = self.server.limits.check(family)
+            if not allowed:
+                self._count('throttled')
+                return 429, headers
+        if config.error_rate and roll < config.error_rate:
+            self._count('errors')
+            return (503 if roll < config.error_rate / 2 else 500), headers
+        return None, headers
+
+    def _handle(self, method):
+        parts = urlsplit(self.path)
+        path = parts.path.rstrip('/')
+        params = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        segments = [segment for segment in path.split('/') if segment]
+        family = '/'.join(segments[1:3]) if len(segments) >= 3 else path
+        self._count('requests')
+        self._count(f"{method} {family}")
+
+        body = {}
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            try:
+                body = json.loads(self.rfile.read(length))
+            except ValueError:
+                self._send(400, {"errors": ["Invalid JSON body"]})
+                return
+
+        if not self.headers.get('DD-API-KEY'):
+            self._send(403, {"errors": ["Forbidden"]})
+            return
+
+        status, headers = self._faults(family)
+        if status is not None:
+            self._send(status, {"errors": ["Rate limit exceeded" if status == 429 else "Internal Server Error"]},
+                       headers)
+            return
+
+        data = self.server.data
+        now = int(time.time())
+        if method == 'GET' and path == '/api/v1/query':
+            payload = data.query(params.get('query', ''), int(params.get('from') or now - 3600),
+                                 int(params.get('to') or now))
+        elif method == 'GET' and path == '/api/v1/search':
+            payload = data.search_metrics(params.get('q', ''))
+        elif method == 'GET' and path.startswith('/api/v1/metrics/'):
+            payload = data.metric_metadata(unquote(path[len('/api/v1/metrics/'):]))
+            if payload is None:
+                self._send(404, {"errors": ["Metric not found"]}, headers)
+                return
+        elif method == 'POST' and path == '/api/v2/logs/events/search':
+            payload = data.search_logs(body)
+        elif method == 'GET' and path == '/api/v1/events':
+            payload = data.events(int(params.get('start') or now - 3600), int(params.get('end') or now),
+                                  params.get('priority'), params.get('sources'), params.get('tags'))
+        elif method == 'GET' and path == '/api/v1/monitor':
+            payload = data.list_monitors(params)
+        elif method == 'GET' and path == '/api/v1/dashboard':
+            payload = {"dashboards": data.dashboards}
+        elif method == 'GET' and path.startswith('/api/v1/dashboard/'):
+            payload = data.dashboard(path[len('/api/v1/dashboard/'):])
+            if payload is None:
+                self._send(404, {"errors": ["Dashboard not found"]}, headers)
+                return
+        else:
+            self._send(404, {"errors": [f"Not found: {method} {path}"]}, headers)
+            return
+        self._send(200, payload, headers)
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+
+def start_standin(config=None, host='127.0.0.1', port=0):
+    """
+    Start the stand-in on a background thread
+
+    Returns:
+        tuple: (server, base_url) - use base_url as DD_SITE; server.stats counts requests/faults
+    """
+    config = config or StandinConfig()
+    server = ThreadingHTTPServer((host, port), StandinHandler)
+    server.daemon_threads = True
+    server.config = config
+    server.data = SyntheticDatadog(config)
+    server.rng = random.Random(config.seed)
+    server.limits = _RateWindow(config.rate_limit, config.rate_period) if config.rate_limit else None
+    server.stats = {}
+    server.stats_lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8126)
+    parser.add_argument('--logs', type=int, default=1_000_000)
+    parser.add_argument('--monitors', type=int, default=10_000)
+    parser.add_argument('--dashboards', type=int, default=3_000)
+    parser.add_argument('--events', type=int, default=5_000)
+    parser.add_argument('--log-span-hours', type=float, default=24)
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Random extra seconds (0..jitter)")
+    parser.add_argument('--slow-rate', type=float, default=0.0, help="Fraction of requests that are slow")
+    parser.add_argument('--slow-latency', type=float, default=2.0, help="Extra seconds for slow requests")
+    parser.add_argument('--rate-limit', type=int, default=0, help="Requests per period per endpoint family (0 = off)")
+    parser.add_argument('--rate-period', type=float, default=10.0)
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of requests answered 500/503")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    config = StandinConfig(logs=args.logs, monitors=args.monitors, dashboards=args.dashboards, events=args.events,
+                           log_span_hours=args.log_span_hours, latency=args.latency, jitter=args.jitter,
+                           slow_rate=args.slow_rate, slow_latency=args.slow_latency, rate_limit=args.rate_limit,
+                           rate_period=args.rate_period, error_rate=args.error_rate, seed=args.seed)
+    start = time.perf_counter()
+    server, base_url = start_standin(config, args.host, args.port)
+    print(f"🛰️  Datadog stand-in on {base_url} ({config.logs:,} logs, {config.monitors:,} monitors, "
+          f"{config.dashboards:,} dashboards; built in {time.perf_counter() - start:.1f}s)")
+    print(f"   Set DD_SITE={base_url} (any DD_API_KEY / DD_APP_KEY value works)")
+    try:
+        while True:
+            time.sleep(60)
+            print(f"📊 {dict(sorted(server.stats.items()))}")
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
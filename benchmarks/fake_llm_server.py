@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Fake OpenAI-compatible chat completions server for offline benchmarks
+
+Answers POST /v1/chat/completions (and /chat/completions) from a script of
+rules, so full turns of process_yoda_message are deterministic and need no
+network:
+
+    decision turns  -> the first rule whose regex matches the user message,
+                       e.g. "TOOL_CALL: search_logs(query='status:error', ...)"
+    analysis turns  -> (last message starts with TOOL_RESULT) a canned analysis
+                       of about --analysis-tokens tokens naming the tool
+
+A script is a JSON list of {"turn": "decision"|"analysis"|"any", "match": regex,
+"response": text} rules; the first match wins and DEFAULT_SCRIPT is used when
+no script is given. `{tool}` in a response is replaced with the tool named in
+the TOOL_RESULT.
+
+Latency is modelled as time to first token plus completion tokens divided by
+--tokens-per-second. Requests with "stream": true get Server-Sent Events
+(chat.completion.chunk deltas, then "data: [DONE]") paced at the same rate.
+A fraction of requests can be answered 429 (with Retry-After) or 500.
+
+Point the app at it with LLM_API_URL=http://127.0.0.1:<port>/v1/chat/completions
+(any OPENAI_API_KEY value is accepted).
+
+Usage:
+    python benchmarks/fake_llm_server.py [--port 8127] [--ttft 0.3] [--tokens-per-second 80]
+        [--analysis-tokens 150] [--script rules.json] [--rate-limit-rate 0.0] [--error-rate 0.0]
+
+In-process:
+    from benchmarks.fake_llm_server import FakeLLMConfig, start_fake_llm
+    server, url = start_fake_llm(FakeLLMConfig(ttft=0.2))
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_SCRIPT = [
+    {"turn": "decision", "match": r"\b(p1|critical)\b.*\balert",
+     "response": "TOOL_CALL: get_monitors(group_states=['alert'], priority='P1')"},
+    {"turn": "decision", "match": r"\b(alert|monitor)",
+     "response": "TOOL_CALL: get_monitors(group_states=['alert', 'warn'])"},
+    {"turn": "decision", "match": r"\bslow|latency|performance",
+     "response": "TOOL_CALL: get_apm_metrics(service='checkout', time_range='1 hour')"},
+    {"turn": "decision", "match": r"\b(error|exception|fail)",
+     "response": "TOOL_CALL: search_error_logs(time_range='1 hour', limit=100)"},
+    {"turn": "decision", "match": r"\blogs?\b",
+     "response": "TOOL_CALL: search_logs(query='*', time_range='1 hour', limit=100)"},
+    {"turn": "decision", "match": r"\bcpu|memory|metric",
+     "response": "TOOL_CALL: query_metrics(query='avg:system.cpu.user{*} by {host}', time_range='1 hour')"},
+    {"turn": "decision", "match": r"\bdeploy",
+     "response": "TOOL_CALL: get_deployment_events(time_range='1 day')"},
+    {"turn": "decision", "match": r"\bevents?\b|unusual|today",
+     "response": "TOOL_CALL: analyze_event_patterns(time_range='1 day')"},
+    {"turn": "decision", "match": r"\bdashboards?\b",
+     "response": "TOOL_CALL: list_dashboards()"},
+    {"turn": "decision", "match": r".",
+     "response": "Greetings, Commander. YODA droid standing by - ask me about alerts, logs, metrics or events."},
+]
+
+ANALYSIS_SENTENCES = [
+    "Scan of {tool} complete, Commander.",
+    "The results show a stable baseline with a few outliers worth watching.",
+    "Error levels are concentrated in a small number of services.",
+    "No correlated deployment explains the change on its own.",
+    "Recommend checking the noisiest hosts first and confirming saturation on their dependencies.",
+    "Trend over the window is flat apart from one short spike.",
+]
+_TOOL_NAME = re.compile(r"TOOL_RESULT from (\w+)")
+
+
+def estimate_tokens(text):
+    """Rough token count (4 characters per token), the same rule the app uses"""
+    return max(1, len(text) // 4)
+
+
+class FakeLLMConfig:
+    """Script, latency model and fault injection settings"""
+
+    def __init__(self, script=None, ttft=0.3, tokens_per_second=0.0, analysis_tokens=150, rate_limit_rate=0.0,
+                 error_rate=0.0, seed=7):
+        self.script = script or DEFAULT_SCRIPT
+        self.ttft = ttft
+        self.tokens_per_second = tokens_per_second
+        self.analysis_tokens = analysis_tokens
+        self.rate_limit_rate = rate_limit_rate
+        self.error_rate = error_rate
+        self.seed = seed
+
+
+def scripted_reply(config, messages):
+    """Return (turn, content) for a chat request"""
+    last = str(messages[-1].get('content', '')) if messages else ''
+    turn = 'analysis' if last.startswith('TOOL_RESULT') else 'decision'
+    tool = _TOOL_NAME.search(last)
+    tool = tool.group(1) if tool else 'the requested tool'
+    for rule in config.script:
+        if rule.get('turn', 'any') not in (turn, 'any'):
+            continue
+        if re.search(rule.get('match', '.'), last if turn == 'decision' else last[:200], re.IGNORECASE):
+            return turn, rule['response'].replace('{tool}', tool)
+    if turn == 'analysis':
+        sentences = []
+        while estimate_tokens(' '.join(sentences)) < config.analysis_tokens:
+            sentences.append(ANALYSIS_SENTENCES[len(sentences) % len(ANALYSIS_SENTENCES)].format(tool=tool))
+        return turn, ' '.join(sentences)
+    return turn, "Roger roger."
+
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    """HTTP front end; the server object carries `config`, `rng` and `stats`"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def _count(self, key, amount=1):
+        with self.server.stats_lock:
+            self.server.stats[key] = self.server.stats.get(key, 0) + amount
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip('/').endswith('/models'):
+            self._send_json(200, {"object": "list", "data": [{"id": "gpt-4o-mini", "object": "model"}]})
+        else:
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+    def do_POST(self):
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            body = json.loads(self.rfile.read(length)) if length else {}
+            messages = body['messages']
+        except (ValueError, KeyError):
+            self._send_json(400, {"error": {"message": "Request body must be JSON with 'messages'"}})
+            return
+        if not self.headers.get('Authorization', '').startswith('Bearer '):
+            self._send_json(401, {"error": {"message": "Missing API key"}})
+            return
+
+        config = self.server.config
+        self._count('requests')
+        with self.server.stats_lock:
+            roll = self.server.rng.random()
+        if roll < config.rate_limit_rate:
+            self._count('throttled')
+            self._send_json(429, {"error": {"message": "Rate limit reached"}}, {'Retry-After': '1'})
+            return
+        if roll < config.rate_limit_rate + config.error_rate:
+            self._count('errors')
+            self._send_json(500, {"error": {"message": "The server had an error"}})
+            return
+
+        turn, content = scripted_reply(config, messages)
+        self._count(turn)
+        prompt_tokens = sum(estimate_tokens(str(msg.get('content', ''))) for msg in messages)
+        completion_tokens = estimate_tokens(content)
+        self._count('prompt_tokens', prompt_tokens)
+        self._count('completion_tokens', completion_tokens)
+        time.sleep(config.ttft)
+        model = body.get('model', 'gpt-4o-mini')
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        if body.get('stream'):
+            self._stream(completion_id, model, content)
+            return
+        if config.tokens_per_second:
+            time.sleep(completion_tokens / config.tokens_per_second)
+        self._send_json(200, {
+            "id": completion_id, "object": "chat.completion", "created": int(time.time()), "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        })
+
+    def _stream(self, completion_id, model, content):
+        """Send the reply as SSE chunks of about one token each"""
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+        delay = 1 / self.server.config.tokens_per_second if self.server.config.tokens_per_second else 0
+
+        def event(delta, finish_reason=None):
+            chunk = {"id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                     "model": model, "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+
+        try:
+            event({"role": "assistant"})
+            for start in range(0, len(content), 4):
+                if delay:
+                    time.sleep(delay)
+                event({"content": content[start:start + 4]})
+            event({}, "stop")
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+def start_fake_llm(config=None, host='127.0.0.1', port=0):
+    """
+    Start the fake server on a background thread
+
+    Returns:
+        tuple: (server, url) - url is the chat completions endpoint to use as LLM_API_URL
+    """
+    server = ThreadingHTTPServer((host, port), FakeLLMHandler)
+    server.daemon_threads = True
+    server.config = config or FakeLLMConfig()
+    server.rng = random.Random(server.config.seed)
+    server.stats = {}
+    server.stats_lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/v1/chat/completions"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8127)
+    parser.add_argument('--script', help="JSON file with a list of response rules")
+    parser.add_argument('--ttft', type=float, default=0.3, help="Seconds before the first token")
+    parser.add_argument('--tokens-per-second', type=float, default=0.0, help="Generation rate (0 = instant)")
+    parser.add_argument('--analysis-tokens', type=int, default=150)
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help="Fraction of requests answered 429")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of requests answered 500")
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    script = None
+    if args.script:
+        with open(args.script) as f:
+            script = json.load(f)
+    config = FakeLLMConfig(script=script, ttft=args.ttft, tokens_per_second=args.tokens_per_second,
+                           analysis_tokens=args.analysis_tokens, rate_limit_rate=args.rate_limit_rate,
+                           error_rate=args.error_rate, seed=args.seed)
+    server, url = start_fake_llm(config, args.host, args.port)
+    print(f"🤖 Fake LLM on {url} ({len(config.script)} rules, TTFT {config.ttft:.2f}s)")
+    print(f"   Set LLM_API_URL={url} (any OPENAI_API_KEY value works)")
+    try:
+        while True:
+            time.sleep(60)
+            print(f"📊 {dict(sorted(server.stats.items()))}")
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Load test: N concurrent chat sessions against stub Datadog and LLM servers
+
+Starts the fake LLM server (benchmarks/fake_llm_server.py) and the offline
+Datadog stand-in (benchmarks/datadog_standin.py), both with fixed latency, and
+points the app at them through LLM_API_URL and DD_SITE. Each simulated session
+then sends its messages one after another through process_yoda_message,
+the way a browser waits for each reply.
+
+A semaphore in front of the handler plays the role of Gradio's queue
+concurrency limit. The run is repeated with limit 1 (Gradio's default per
+event) and with GRADIO_CONCURRENCY_LIMIT, and reports throughput, latency
+percentiles (including queue wait), tool pool usage, and checks that no
+session's history leaked into another's.
+
+Usage:
+    python benchmarks/load_test_sessions.py [--sessions 20] [--turns 3] [--llm-latency 0.3] [--dd-latency 0.2]
+        [--logs 1000000] [--monitors 10000]
+"""
+
+import argparse
+import contextlib
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.datadog_standin import StandinConfig, start_standin  # noqa: E402
+from benchmarks.fake_llm_server import FakeLLMConfig, start_fake_llm  # noqa: E402
+
+MESSAGES = [
+    "show me all P1 alerts",
+    "get recent logs with errors",
+    "why is checkout slow right now?",
+    "query CPU metrics for last hour",
+    "anything unusual in payments today?",
+]
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def run(ui_handlers, sessions, turns, concurrency):
+    queue_slots = threading.Semaphore(concurrency)
+    latencies = []
+    failures = []
+    lock = threading.Lock()
+    shared_empty_history = []
+    histories = {}
+
+    def session(index):
+        session_id = f"load-{concurrency}-{index}"
+        history = shared_empty_history
+        sent = []
+        for turn in range(turns):
+            message = MESSAGES[(index + turn) % len(MESSAGES)]
+            start = time.perf_counter()
+            with queue_slots:
+                history, _ = ui_handlers.process_yoda_message(message, history, session_id)
+            with lock:
+                latencies.append(time.perf_counter() - start)
+            sent.append(message)
+        user_messages = [msg['content'] for msg in history if msg['role'] == 'user']
+        with lock:
+            histories[session_id] = history
+            if user_messages != sent:
+                failures.append(session_id)
+
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(sessions)]
+    start = time.perf_counter()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    elapsed = time.perf_counter() - start
+    if shared_empty_history:
+        failures.append('shared history list was mutated')
+    return elapsed, latencies, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sessions', type=int, default=20)
+    parser.add_argument('--turns', type=int, default=3)
+    parser.add_argument('--llm-latency', type=float, default=0.3)
+    parser.add_argument('--dd-latency', type=float, default=0.2)
+    parser.add_argument('--logs', type=int, default=1_000_000)
+    parser.add_argument('--monitors', type=int, default=10_000)
+    args = parser.parse_args()
+
+    llm_server, llm_url = start_fake_llm(FakeLLMConfig(ttft=args.llm_latency))
+    dd_server, dd_url = start_standin(StandinConfig(logs=args.logs, monitors=args.monitors, latency=args.dd_latency))
+
+    os.environ['LLM_API_URL'] = llm_url
+    os.environ['OPENAI_API_KEY'] = 'load-test'
+    os.environ['DD_SITE'] = dd_url
+    os.environ['DD_API_KEY'] = 'load-test'
+    os.environ['DD_APP_KEY'] = 'load-test'
+    os.environ['LLM_CACHE_MODE'] = 'off'
+    os.environ['CACHE_DIR'] = tempfile.mkdtemp(prefix='yoda-load-')
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        import mcp_loader  # noqa: F401  (loads tools before importing mcp modules directly)
+        import ui_handlers
+        from worker_pool import GRADIO_CONCURRENCY_LIMIT, get_tool_pool
+
+    print(f"{args.sessions} sessions x {args.turns} turns, LLM {args.llm_latency:.2f}s, "
+          f"Datadog {args.dd_latency:.2f}s per call\n")
+    print(f"{'queue concurrency':>18} {'elapsed':>8} {'turns/s':>8} {'p50':>7} {'p95':>7} {'max':>7}  isolation")
+    results = {}
+    for concurrency in (1, GRADIO_CONCURRENCY_LIMIT):
+        elapsed, latencies, failures = run(ui_handlers, args.sessions, args.turns, concurrency)
+        results[concurrency] = elapsed
+        print(f"{concurrency:>18} {elapsed:7.2f}s {len(latencies) / elapsed:8.2f} "
+              f"{statistics.median(latencies):6.2f}s {_percentile(latencies, 95):6.2f}s {max(latencies):6.2f}s  "
+              f"{'ok' if not failures else 'LEAK: ' + ', '.join(failures[:3])}")
+
+    pool = get_tool_pool().stats()
+    print(f"\nTool pool: {pool['workers']} workers, {pool['completed']} calls, max active {pool['max_active']}, "
+          f"failed {pool['failed']}")
+    print(f"Stub hits: LLM {llm_server.stats.get('requests', 0)}, Datadog {dd_server.stats.get('requests', 0)}")
+    print(f"Speed-up with concurrency {GRADIO_CONCURRENCY_LIMIT}: {results[1] / results[GRADIO_CONCURRENCY_LIMIT]:.1f}x")
+    llm_server.shutdown()
+    dd_server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
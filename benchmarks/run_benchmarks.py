@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the hot paths, with a saved-baseline comparison mode
+
+Every case runs against fixed fixtures: parsing and formatting use canned LLM
+responses and tool results, the tool cases query the offline Datadog stand-in
+(fixed data scale, no injected latency), and full turns run
+process_yoda_message against the fake LLM server with zero think time. The
+numbers are therefore the app's own CPU and I/O overhead, repeatable offline.
+
+Cases:
+    parse_tool_call, parse_function_parameters, format_tool_result,
+    analyze_log_patterns, analyze_metric_trends, analyze_event_patterns,
+    analyze_dashboard, get_service_health, process_yoda_message
+
+Each case reports call count and mean/p50/p95/p99/min per call. Save a
+baseline, change code, then compare: cases whose p50 grew by more than
+--threshold (and by more than the noise floor) are flagged and the exit code
+is 1, so the suite can gate a change.
+
+Usage:
+    python benchmarks/run_benchmarks.py [--only parse_tool_call,format_tool_result] [--quick]
+    python benchmarks/run_benchmarks.py --save-baseline [benchmarks/baseline.json]
+    python benchmarks/run_benchmarks.py --compare [benchmarks/baseline.json] [--threshold 0.25]
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.datadog_standin import StandinConfig, start_standin  # noqa: E402
+from benchmarks.fake_llm_server import FakeLLMConfig, start_fake_llm  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+# Changes smaller than this are treated as timer noise, whatever the percentage
+NOISE_FLOOR_SECONDS = 0.00005
+
+LLM_RESPONSES = [
+    "TOOL_CALL: get_monitors(group_states=['alert', 'warn'], priority='P1')",
+    "TOOL_CALL: search_logs(query='service:checkout status:error \"payment, declined\"', time_range='4 hours', limit=200)",
+    "TOOL_CALL: query_metrics(query='avg:system.cpu.user{env:production,service:web-api} by {host}', time_range='1 day')",
+    "TOOL_CALL: get_monitors_by_multiple_tags(tags=['env:production', 'team:payments'], group_states=['alert'], match='all')",
+    "Very well, Commander. Scanning now: `get_recent_events(time_range='4 hours', limit=50)`",
+    "The Force is strong with this one. All systems nominal, no scan is needed right now, Commander.",
+]
+PARAM_STRINGS = [
+    "group_states=['alert', 'warn'], priority='P1'",
+    "query='service:checkout status:error \"payment, declined\"', time_range='4 hours', limit=200",
+    "query='avg:system.cpu.user{env:production,service:web-api} by {host}', time_range='1 day'",
+    "tags=['env:production', 'team:payments'], group_states=['alert'], match='all', limit=None, force_refresh=True",
+    "dashboard_id='abc-123-xyz', time_range='1 week'",
+]
+TURN_MESSAGES = [
+    "show me all P1 alerts",
+    "get recent logs with errors",
+    "query CPU metrics for last hour",
+    "why is checkout slow right now?",
+]
+
+
+class Case:
+    """One benchmark: `fn(fixture)` is timed once per fixture item per round"""
+
+    def __init__(self, name, fn, fixtures, rounds, quick_rounds=None):
+        self.name = name
+        self.fn = fn
+        self.fixtures = fixtures
+        self.rounds = rounds
+        self.quick_rounds = quick_rounds or max(1, rounds // 10)
+
+    def run(self, quick=False):
+        fixtures = self.fixtures() if callable(self.fixtures) else self.fixtures
+        # Warm-up: imports, caches and connection pools
+        for fixture in fixtures:
+            self.fn(fixture)
+        timings = []
+        for _ in range(self.quick_rounds if quick else self.rounds):
+            for fixture in fixtures:
+                start = time.perf_counter()
+                self.fn(fixture)
+                timings.append(time.perf_counter() - start)
+        return summarize(timings)
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def summarize(timings):
+    return {
+        "calls": len(timings),
+        "mean": statistics.mean(timings),
+        "p50": _percentile(timings, 50),
+        "p95": _percentile(timings, 95),
+        "p99": _percentile(timings, 99),
+        "min": min(timings),
+    }
+
+
+def _ms(seconds):
+    return f"{seconds * 1000:9.3f}"
+
+
+def setup_environment():
+    """Start the stand-ins and import the app against them; returns the servers"""
+    dd_server, dd_url = start_standin(StandinConfig(logs=200_000, monitors=2_000, dashboards=300, events=2_000))
+    llm_server, llm_url = start_fake_llm(FakeLLMConfig(ttft=0, analysis_tokens=120))
+    os.environ['DD_SITE'] = dd_url
+    os.environ['DD_API_KEY'] = 'benchmark'
+    os.environ['DD_APP_KEY'] = 'benchmark'
+    os.environ['LLM_API_URL'] = llm_url
+    os.environ['OPENAI_API_KEY'] = 'benchmark'
+    os.environ['LLM_CACHE_MODE'] = 'off'
+    os.environ['CACHE_DIR'] = tempfile.mkdtemp(prefix='yoda-bench-')
+    # Debug lines are written by a background thread, after stdout is restored
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+    return dd_server, llm_server
+
+
+def build_cases():
+    """Import the app (after setup_environment) and return the benchmark cases"""
+    import mcp_loader  # noqa: F401  (loads tools before importing mcp modules directly)
+    import ui_handlers
+    from main_processing import format_tool_result, parse_function_parameters, parse_tool_call
+    from mcp.dashboards import analyze_dashboard_mcp, list_dashboards_mcp
+    from mcp.events import analyze_event_patterns_mcp
+    from mcp.logs import analyze_log_patterns_mcp, search_logs_mcp
+    from mcp.metrics import analyze_metric_trends_mcp, get_service_health_mcp, query_metrics_mcp
+    from mcp.monitors import get_monitors_mcp
+
+    def tool_results():
+        return [
+            search_logs_mcp(query='status:error', time_range='4 hours', limit=200),
+            get_monitors_mcp(group_states=['alert', 'warn']),
+            query_metrics_mcp(query='avg:system.cpu.user{*} by {host}', time_range='1 day'),
+            list_dashboards_mcp(),
+            {"success": False, "error": "Datadog API error: 403 Forbidden", "data": None},
+        ]
+
+    def dashboard_ids():
+        return [dashboard['id'] for dashboard in list_dashboards_mcp()['data'][:3]]
+
+    turn_count = [0]
+
+    def full_turn(message):
+        turn_count[0] += 1
+        ui_handlers.process_yoda_message(message, [], f"bench-{turn_count[0]}")
+
+    return [
+        Case('parse_tool_call', parse_tool_call, LLM_RESPONSES, rounds=2000),
+        Case('parse_function_parameters', parse_function_parameters, PARAM_STRINGS, rounds=2000),
+        Case('format_tool_result', format_tool_result, tool_results, rounds=200),
+        Case('analyze_log_patterns', lambda query: analyze_log_patterns_mcp(query=query, time_range='4 hours'),
+             ['status:error', 'service:checkout'], rounds=20),
+        Case('analyze_metric_trends', lambda query: analyze_metric_trends_mcp(query=query, time_range='1 day'),
+             ['avg:system.cpu.user{*}', 'avg:system.mem.used{*} by {host}'], rounds=20),
+        Case('analyze_event_patterns', lambda time_range: analyze_event_patterns_mcp(time_range=time_range),
+             ['1 day'], rounds=20),
+        Case('analyze_dashboard', lambda dashboard_id: analyze_dashboard_mcp(dashboard_id, time_range='1 day'),
+             dashboard_ids, rounds=10),
+        Case('get_service_health', lambda service: get_service_health_mcp(service, time_range='1 hour'),
+             ['checkout', 'redis-cache'], rounds=10),
+        Case('process_yoda_message', full_turn, TURN_MESSAGES, rounds=10),
+    ]
+
+
+def print_results(results):
+    print(f"{'case':<28} {'calls':>6} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'min ms':>9}")
+    for name, stats in results.items():
+        print(f"{name:<28} {stats['calls']:>6} {_ms(stats['mean'])} {_ms(stats['p50'])} {_ms(stats['p95'])} "
+              f"{_ms(stats['p99'])} {_ms(stats['min'])}")
+
+
+def compare(results, baseline, threshold):
+    """Print the comparison table and return the names of regressed cases"""
+    print(f"\nCompared with baseline from {baseline.get('created', '?')} (threshold +{threshold:.0%} p50)")
+    print(f"{'case':<28} {'base p50':>9} {'now p50':>9} {'change':>8}  status")
+    regressions = []
+    for name, stats in results.items():
+        before = baseline['results'].get(name)
+        if not before:
+            print(f"{name:<28} {'-':>9} {_ms(stats['p50'])} {'-':>8}  new")
+            continue
+        change = stats['p50'] / before['p50'] - 1 if before['p50'] else 0.0
+        grew = stats['p50'] - before['p50']
+        if change > threshold and grew > NOISE_FLOOR_SECONDS:
+            status = 'REGRESSION'
+            regressions.append(name)
+        elif change < -threshold and -grew > NOISE_FLOOR_SECONDS:
+            status = 'faster'
+        else:
+            status = 'ok'
+        print(f"{name:<28} {_ms(before['p50'])} {_ms(stats['p50'])} {change:+7.1%}  {status}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--only', help="Comma-separated case names to run")
+    parser.add_argument('--quick', action='store_true', help="Run a tenth of the rounds")
+    parser.add_argument('--save-baseline', nargs='?', const=DEFAULT_BASELINE, metavar='PATH')
+    parser.add_argument('--compare', nargs='?', const=DEFAULT_BASELINE, metavar='PATH')
+    parser.add_argument('--threshold', type=float, default=0.25, help="Allowed p50 growth before flagging")
+    args = parser.parse_args()
+
+    dd_server, llm_server = setup_environment()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        cases = build_cases()
+    if args.only:
+        wanted = {name.strip() for name in args.only.split(',')}
+        unknown = wanted - {case.name for case in cases}
+        if unknown:
+            parser.error(f"unknown case(s): {', '.join(sorted(unknown))}")
+        cases = [case for case in cases if case.name in wanted]
+
+    results = {}
+    for case in cases:
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            results[case.name] = case.run(quick=args.quick)
+        print(f"  ✓ {case.name}", file=sys.stderr)
+    print_results(results)
+
+    exit_code = 0
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s): {', '.join(regressions)}")
+            exit_code = 1
+        else:
+            print("\n✅ No regressions")
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump({"created": datetime.now().isoformat(timespec='seconds'), "python": platform.python_version(),
+                       "machine": platform.machine(), "quick": args.quick, "results": results}, f, indent=2)
+        print(f"\n💾 Baseline saved to {args.save_baseline}")
+
+    dd_server.shutdown()
+    llm_server.shutdown()
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Conversation history compaction for LLM prompts.
+
+Past assistant replies carry the debug section and the full formatted tool
+output ("Imperial Scan Results"), which the LLM has already analyzed. Before
+history is resent, those replies are compacted to the command that ran and
+the analysis. The most recent turns are kept (up to CONVERSATION_LIMIT
+conversations) while they fit in CONTEXT_TOKEN_BUDGET. Older turns are
+folded into a single summary message listing the services, time ranges,
+tools, requests and key findings they contained, so facts survive after
+their messages fall out of the window.
+
+Facts are extracted once per message (memoized on its content), so the
+summary rolls forward cheaply as the conversation grows.
+"""
+
+import re
+from functools import lru_cache
+from dotenv import load_dotenv
+
+from env_settings import validate_number
+from time_ranges import extract_time_range
+
+load_dotenv()
+
+
+# Token budget for conversation history
+CONTEXT_TOKEN_BUDGET = validate_number('CONTEXT_TOKEN_BUDGET', 4000, 500, 100000, cast=int)
+
+# Share of the budget the summary of older turns may use
+SUMMARY_BUDGET_SHARE = 0.25
+# Longest compacted assistant message kept verbatim (characters)
+MAX_ASSISTANT_CHARS = 1200
+# Items of each kind kept in the summary (most recent first to go)
+SUMMARY_ITEMS = 8
+_CHARS_PER_TOKEN = 4
+
+_COMMAND = re.compile(r'YODA Systems Engaged\*\*: `([^`]+)`')
+_DEBUG_SECTION = re.compile(r'🔍 \*\*MCP INTERACTION DEBUG\*\*:\s*```.*?```\s*', re.DOTALL)
+_SCAN_RESULTS = re.compile(r'🎯 \*\*Imperial Scan Results\*\*:\s*```.*?```\s*', re.DOTALL)
+_ANALYSIS = re.compile(r'🤖 \*\*YODA DROID ANALYSIS\*\*:\s*(.*?)\s*(?:\*End transmission\..*)?$', re.DOTALL)
+_TRANSMISSION = re.compile(r'🤖 \*\*YODA DROID TRANSMISSION\*\*:\s*(.*?)\s*(?:\*Roger roger.*)?$', re.DOTALL)
+_SERVICE_NAMES = [
+    re.compile(r"service[:=]\s*['\"]?([\w.-]+)"),
+    re.compile(r"\b([a-z][\w.-]*[\w])\s+service\b", re.IGNORECASE),
+]
+_NOT_SERVICES = frozenset(['the', 'a', 'an', 'this', 'that', 'which', 'each', 'every', 'any', 'specific', 'my',
+                           'your', 'our', 'same', 'one', 'per', 'and', 'or', 'of', 'for', 'api'])
+_TIME_RANGE_PARAM = re.compile(r"time_range=['\"]([^'\"]+)['\"]")
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+
+def estimate_tokens(text):
+    """Rough token count (about 4 characters per token for English/JSON)"""
+    return len(text) // _CHARS_PER_TOKEN + 1
+
+
+def _truncate(text, limit):
+    return text if len(text) <= limit else text[:limit - 3].rstrip() + '...'
+
+
+def compact_assistant_message(content):
+    """
+    Strip the debug section and raw tool output from a YODA reply
+
+    Tool replies become "Ran `tool(...)`." plus the analysis; plain
+    transmissions keep their text. Signoffs are dropped.
+    """
+    command = _COMMAND.search(content)
+    if command:
+        stripped = _SCAN_RESULTS.sub('', _DEBUG_SECTION.sub('', content))
+        analysis = _ANALYSIS.search(stripped)
+        text = f"Ran `{command.group(1)}`."
+        if analysis and analysis.group(1):
+            text += f" Analysis: {analysis.group(1)}"
+        return _truncate(text, MAX_ASSISTANT_CHARS)
+    transmission = _TRANSMISSION.search(content)
+    if transmission:
+        return _truncate(transmission.group(1), MAX_ASSISTANT_CHARS)
+    return _truncate(content, MAX_ASSISTANT_CHARS)
+
+
+def _normalize_history(history):
+    """Yield role/content dicts, converting legacy [user, assistant] pairs"""
+    for msg in history:
+        if isinstance(msg, dict) and "role" in msg and "content" in msg:
+            yield {"role": msg["role"], "content": msg["content"]}
+        elif isinstance(msg, (list, tuple)) and len(msg) >= 2:
+            if msg[0]:
+                yield {"role": "user", "content": msg[0]}
+            if msg[1]:
+                yield {"role": "assistant", "content": msg[1]}
+
+
+@lru_cache(maxsize=1024)
+def _message_facts(role, content):
+    """
+    Extract (services, time_ranges, commands, request, finding) from one message
+    """
+    if not isinstance(content, str):
+        return (), (), (), None, None
+    services = []
+    for pattern in _SERVICE_NAMES:
+        for name in pattern.findall(content):
+            if name.lower() not in _NOT_SERVICES:
+                services.append(name)
+    time_ranges = _TIME_RANGE_PARAM.findall(content)
+    phrase = extract_time_range(content.lower())[0]
+    if phrase:
+        time_ranges.append(phrase)
+    commands = tuple(_COMMAND.findall(content))
+
+    request = finding = None
+    if role == 'user':
+        request = _truncate(' '.join(content.split()), 120)
+    else:
+        compacted = compact_assistant_message(content)
+        if commands:
+            compacted = compacted.split(' Analysis: ', 1)[-1] if ' Analysis: ' in compacted else ''
+        sentences = _SENTENCE_END.split(' '.join(compacted.split()))
+        finding = _truncate(' '.join(sentences[:2]), 240) if compacted else None
+    return tuple(services), tuple(time_ranges), commands, request, finding
+
+
+def _recent_unique(values, limit=SUMMARY_ITEMS):
+    """Last `limit` distinct values, oldest first"""
+    seen = {}
+    for value in values:
+        seen.pop(value, None)
+        seen[value] = True
+    return list(seen)[-limit:]
+
+
+def summarize_messages(messages):
+    """Fold messages into a compact conversation-state summary (None when nothing to keep)"""
+    services, time_ranges, commands, requests_, findings = [], [], [], [], []
+    for msg in messages:
+        msg_services, msg_time_ranges, msg_commands, request, finding = _message_facts(msg['role'], msg['content'])
+        services.extend(msg_services)
+        time_ranges.extend(msg_time_ranges)
+        commands.extend(msg_commands)
+        if request:
+            requests_.append(request)
+        if finding:
+            findings.append(finding)
+
+    lines = []
+    if services:
+        lines.append(f"- Services mentioned: {', '.join(_recent_unique(services))}")
+    if time_ranges:
+        lines.append(f"- Time ranges used: {', '.join(_recent_unique(time_ranges))}")
+    if commands:
+        lines.append(f"- Tools run: {'; '.join(_truncate(command, 160) for command in _recent_unique(commands))}")
+    if requests_:
+        lines.append(f"- Earlier requests: {' | '.join(_recent_unique(requests_, 5))}")
+    if findings:
+        lines.append("- Key findings:")
+        lines.extend(f"  • {finding}" for finding in _recent_unique(findings, 5))
+    if not lines:
+        return None
+    return "CONVERSATION SUMMARY (older turns, compressed):\n" + "\n".join(lines)
+
+
+def build_history_context(history, max_messages, token_budget=None):
+    """
+    Select the history to resend with the next prompt
+
+    Args:
+        history (list): Chat history without the current user message
+        max_messages (int): Most recent messages to keep verbatim (CONVERSATION_LIMIT * 2)
+        token_budget (int): Token budget for summary + recent messages (default CONTEXT_TOKEN_BUDGET)
+
+    Returns:
+        tuple: (summary message dict or None, list of recent compacted messages, stats dict)
+    """
+    token_budget = token_budget or CONTEXT_TOKEN_BUDGET
+    messages = list(_normalize_history(history))
+    original_tokens = sum(estimate_tokens(str(msg['content'])) for msg in messages)
+
+    recent = []
+    used = 0
+    recent_budget = int(token_budget * (1 - SUMMARY_BUDGET_SHARE))
+    for msg in reversed(messages):
+        if len(recent) >= max_messages:
+            break
+        content = msg['content']
+        if msg['role'] == 'assistant' and isinstance(content, str):
+            content = compact_assistant_message(content)
+        tokens = estimate_tokens(str(content))
+        if used + tokens > recent_budget:
+            if recent:
+                break
+            # Always keep the latest message, cut to fit
+            content = _truncate(str(content), recent_budget * _CHARS_PER_TOKEN)
+            tokens = estimate_tokens(content)
+        recent.append({"role": msg['role'], "content": content})
+        used += tokens
+    recent.reverse()
+
+    older = messages[:len(messages) - len(recent)]
+    summary = summarize_messages(older) if older else None
+    summary_message = None
+    if summary:
+        summary = _truncate(summary, max(token_budget - used, 100) * _CHARS_PER_TOKEN)
+        summary_message = {"role": "system", "content": summary}
+        used += estimate_tokens(summary)
+
+    stats = {
+        "original_messages": len(messages),
+        "kept_messages": len(recent),
+        "summarized_messages": len(older),
+        "original_tokens": original_tokens,
+        "context_tokens": used,
+    }
+    return summary_message, recent, stats
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Per-tool deadlines and HTTP timeouts.
+
+`MCPLoader.call_tool` runs each tool inside `deadline_scope(tool_timeout(name))`.
+The deadline is a context variable, so it reaches the tool's handler and
+every Datadog request it makes (including calls made from the tool pool)
+without changing any signatures. Nested scopes keep the earlier deadline.
+
+    TOOL_TIMEOUT      seconds a tool call may take (default 60)
+    TOOL_TIMEOUTS     per-tool overrides, e.g. "analyze_dashboard=120,get_widget_data=90"
+    REQUEST_TIMEOUT   seconds per Datadog HTTP call (default 30), always capped by the
+                      time left before the deadline. requests applies it to the
+                      connect and to each socket read.
+
+The shared HTTP layer (mcp.datadog_client) asks `request_timeout()` for the
+timeout of every call, stops waiting for rate-limit tokens, coalesced
+responses and retries at the deadline, and raises DeadlineExceeded when no
+time is left.
+
+Tools that run several queries iterate with `until_deadline()`: once the
+deadline passes, the remaining queries are skipped and the result gets
+"partial": true with a "partial_reason":
+
+    batch = until_deadline(system_queries)
+    for query in batch:
+        ...
+    return {"success": True, "data": results, **batch.partial()}
+"""
+
+import contextvars
+import os
+import time
+from contextlib import contextmanager
+from dotenv import load_dotenv
+
+from env_settings import validate_number
+
+load_dotenv()
+
+
+class DeadlineExceeded(Exception):
+    """No time left before the current deadline"""
+
+
+def _parse_tool_timeouts():
+    """Parse TOOL_TIMEOUTS ("tool=seconds,...") into a dict, skipping invalid entries"""
+    timeouts = {}
+    for entry in os.getenv('TOOL_TIMEOUTS', '').split(','):
+        if not entry.strip():
+            continue
+        name, _, seconds = entry.partition('=')
+        try:
+            value = float(seconds)
+            if not 1 <= value <= 3600:
+                raise ValueError
+            timeouts[name.strip()] = value
+        except ValueError:
+            print(f"⚠️  Invalid TOOL_TIMEOUTS entry '{entry.strip()}'. Expected tool=seconds (1-3600)")
+    return timeouts
+
+
+REQUEST_TIMEOUT = validate_number('REQUEST_TIMEOUT', 30, 1, 600)
+TOOL_TIMEOUT = validate_number('TOOL_TIMEOUT', 60, 1, 3600)
+TOOL_TIMEOUTS = _parse_tool_timeouts()
+
+
+class Deadline:
+    """A point in time (monotonic clock) by which the work must finish"""
+
+    __slots__ = ('expires_at', 'seconds')
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self):
+        return self.expires_at - time.monotonic()
+
+    def expired(self):
+        return self.remaining() <= 0
+
+
+_current_deadline = contextvars.ContextVar('deadline', default=None)
+
+
+def tool_timeout(tool_name):
+    """Seconds allowed for one call of `tool_name`"""
+    return TOOL_TIMEOUTS.get(tool_name, TOOL_TIMEOUT)
+
+
+@contextmanager
+def deadline_scope(seconds):
+    """Run the block under a deadline `seconds` from now (or the enclosing one, if sooner)"""
+    deadline = Deadline(seconds)
+    outer = _current_deadline.get()
+    if outer is not None and outer.expires_at <= deadline.expires_at:
+        deadline = outer
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def current_deadline():
+    """The active Deadline, or None outside tool calls"""
+    return _current_deadline.get()
+
+
+def remaining_time(default=None):
+    """Seconds left before the deadline (`default` when there is none)"""
+    deadline = _current_deadline.get()
+    return default if deadline is None else deadline.remaining()
+
+
+def check_deadline():
+    """Raise DeadlineExceeded if the current deadline has passed"""
+    deadline = _current_deadline.get()
+    if deadline is not None and deadline.expired():
+        raise DeadlineExceeded(f"deadline of {deadline.seconds:g}s exceeded")
+
+
+def request_timeout(timeout=None):
+    """Timeout for one HTTP call: the call site's (or REQUEST_TIMEOUT), capped by the deadline"""
+    timeout = REQUEST_TIMEOUT if timeout is None else timeout
+    deadline = _current_deadline.get()
+    if deadline is None:
+        return timeout
+    check_deadline()
+    return min(timeout, deadline.remaining())
+
+
+class until_deadline:
+    """Iterate over queries until the deadline passes; `partial()` describes what was cut"""
+
+    def __init__(self, items, label='queries'):
+        self.items = list(items)
+        self.label = label
+        self.completed = 0
+        self.cut = False
+
+    def __iter__(self):
+        for item in self.items:
+            if self.cut or (current_deadline() is not None and current_deadline().expired()):
+                self.cut = True
+                return
+            yield item
+            if current_deadline() is not None and current_deadline().expired():
+                # The query that was running when time ran out was cut off too
+                self.cut = True
+            else:
+                self.completed += 1
+
+    def partial(self):
+        """{} when every query ran in time, else the partial marker for the tool result"""
+        if not self.cut:
+            return {}
+        deadline = current_deadline()
+        budget = f" ({deadline.seconds:g}s)" if deadline is not None else ''
+        return {"partial": True,
+                "partial_reason": f"deadline{budget} reached: {self.completed} of {len(self.items)} {self.label} "
+                                  f"completed, the rest were cut off or not run"}
+
+
+def partial_fields(result):
+    """The partial marker of a sub-result, to carry into the result built from it"""
+    return {key: result[key] for key in ('partial', 'partial_reason') if key in result}
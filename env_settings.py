@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+Numeric settings read from the environment.
+
+Modules read their tuning knobs once at import time. An unparsable or
+out-of-range value prints a warning and falls back to the default instead
+of stopping start-up:
+
+    TOOL_WORKERS = validate_number('TOOL_WORKERS', 8, 1, 128, cast=int)
+"""
+
+import os
+
+
+def validate_number(name, default, low, high, cast=float):
+    """Validate and return a numeric setting (low <= value <= high) with fallback to default"""
+    try:
+        value = cast(os.getenv(name, str(default)))
+        if low <= value <= high:
+            return value
+        print(f"⚠️  Invalid {name}={value}. Using default: {default}")
+        return default
+    except (ValueError, TypeError):
+        print(f"⚠️  Invalid {name}='{os.getenv(name)}'. Using default: {default}")
+        return default
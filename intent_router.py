@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Deterministic fast-path router for common requests.
+
+Messages such as "show me all P1 alerts" or "get recent logs with errors"
+map to exactly one tool call. `route_intent()` recognizes them locally so
+`process_yoda_message` can skip the tool-selection LLM call and use the LLM
+only to analyze the result. Two matchers run in order:
+
+1. A compiled pattern table for requests that carry an entity
+   (priority, service, host, monitor state, dashboard name).
+2. A fuzzy matcher over the dropdown commands (`get_common_commands`) and
+   the schema examples. Every significant word of the message must match a
+   word of the target (allowing typos), so "azure metrics" never routes to
+   an "AWS metrics" example.
+
+Time phrases ("last 4 hours", "past day") are extracted first and passed as
+`time_range` when the tool accepts one. Anything ambiguous returns None and
+goes through the LLM as before.
+"""
+
+import os
+import re
+from copy import deepcopy
+from difflib import SequenceMatcher
+from dotenv import load_dotenv
+
+from env_settings import validate_number
+from mcp_loader import get_available_mcp_tools, get_mcp_tool_examples, get_mcp_tool_info
+from main_processing import parse_function_parameters
+from time_ranges import extract_time_range
+
+load_dotenv()
+
+
+def _validate_router_enabled():
+    """Return whether the fast-path router is enabled"""
+    return os.getenv('INTENT_ROUTER', 'true').lower() in ('true', '1', 'yes', 'on')
+
+
+INTENT_ROUTER_ENABLED = _validate_router_enabled()
+# Minimum fuzzy-match confidence for routing
+INTENT_ROUTER_MIN_CONFIDENCE = validate_number('INTENT_ROUTER_MIN_CONFIDENCE', 0.85, 0.5, 1.0)
+
+# Two targets closer than this with different tool calls are ambiguous
+_AMBIGUITY_MARGIN = 0.03
+# Per-word similarity needed for two words to count as the same (typo tolerance)
+_WORD_MATCH_RATIO = 0.8
+
+# Dropdown commands that map to exactly one tool call. Commands missing here
+# (e.g. "find API errors in production") need the LLM to pick parameters.
+COMMAND_TOOL_CALLS = {
+    "show me all P1 alerts": "get_monitors(group_states=['alert'], priority='P1')",
+    "get critical monitors": "get_monitors(group_states=['alert'], priority='P1')",
+    "show monitors in alert state": "get_monitors(group_states=['alert'])",
+    "search error logs from last hour": "search_error_logs(time_range='1 hour')",
+    "show recent deployment events": "get_deployment_events(time_range='1 day')",
+    "get deployment events for API service": "get_deployment_events(service='api', time_range='1 day')",
+    "show CPU usage metrics": "query_metrics(query='avg:system.cpu.user{*}', time_range='1 hour')",
+    "analyze memory trends": "analyze_metric_trends(query='avg:system.mem.used{*}', time_range='4 hours')",
+    "get system metrics for last hour": "get_system_metrics(time_range='1 hour')",
+    "list all dashboards": "list_dashboards()",
+    "show me trace metrics for all services": "get_apm_metrics(time_range='1 hour')",
+    "get alert events from last day": "get_alert_events(time_range='1 day')",
+    "show application performance": "get_application_metrics(time_range='1 hour')",
+}
+
+# Schema examples are only used when their parameters carry no entity
+# (service, host, dashboard id, ...) that the user would have to supply
+_EXAMPLE_PARAMS = frozenset(['time_range', 'limit', 'priority', 'group_states', 'query',
+                             'metric_name', 'metric_types', 'force_refresh'])
+
+# Filler words ignored when comparing a message with a target
+_FILLER_WORDS = frozenset([
+    'show', 'get', 'list', 'find', 'display', 'give', 'fetch', 'pull', 'me', 'all', 'the', 'a', 'an',
+    'please', 'can', 'could', 'you', 'for', 'of', 'with', 'in', 'from', 'on', 'any', 'my', 'our',
+    'current', 'currently', 'latest', 'now',
+])
+
+# Service captures that are really environments - leave those to the LLM
+_ENVIRONMENT_WORDS = frozenset(['prod', 'production', 'staging', 'stage', 'dev', 'development', 'qa', 'test'])
+
+_NON_WORD = re.compile(r"[^\w\s.:-]+")
+_SPACES = re.compile(r'\s+')
+
+_LEAD = r'^(?:(?:please|can you|could you)\s+)?(?:show|get|list|find|display|give|fetch|pull|query)?\s*(?:me\s+)?(?:all\s+)?(?:the\s+)?'
+_SERVICE = r'(?:\s+(?:for|from|in|of)\s+(?:the\s+)?(?P<service>[\w.-]+?)(?:\s+service)?)?'
+
+
+def normalize_message(message):
+    """Lowercase, drop punctuation and collapse whitespace"""
+    return _SPACES.sub(' ', _NON_WORD.sub(' ', message.lower())).strip()
+
+
+def _significant_words(text):
+    return [word for word in text.split() if word not in _FILLER_WORDS]
+
+
+def _words_match(words, other_words):
+    """True when every word has a close counterpart in other_words (or is a misspelled filler word)"""
+    for word in words:
+        if word in other_words:
+            continue
+        if not any(SequenceMatcher(None, word, other).ratio() >= _WORD_MATCH_RATIO
+                   for candidates in (other_words, _FILLER_WORDS) for other in candidates):
+            return False
+    return True
+
+
+class Route:
+    """A tool call chosen without the LLM"""
+
+    __slots__ = ('tool_name', 'params', 'confidence', 'source', 'matched')
+
+    def __init__(self, tool_name, params, confidence, source, matched):
+        self.tool_name = tool_name
+        self.params = params
+        self.confidence = confidence
+        self.source = source
+        self.matched = matched
+
+    @property
+    def tool_call(self):
+        """The route in the LLM's `TOOL_CALL: tool(param='value')` format"""
+        args = ", ".join(f"{key}={value!r}" for key, value in self.params.items())
+        return f"TOOL_CALL: {self.tool_name}({args})"
+
+    def __repr__(self):
+        return f"Route({self.tool_call!r}, confidence={self.confidence:.2f}, source={self.source!r})"
+
+
+# ---------------------------------------------------------------------------
+# Pattern table: (compiled regex, builder(match) -> (tool_name, params) or None)
+# ---------------------------------------------------------------------------
+
+def _priority_alerts(match):
+    return 'get_monitors', {'group_states': ['alert'], 'priority': f"P{match.group('priority')}"}
+
+
+def _priority_monitors(match):
+    return 'get_monitors', {'priority': f"P{match.group('priority')}"}
+
+
+def _monitors_in_state(match):
+    return 'get_monitors', {'group_states': [match.group('state')]}
+
+
+def _service_monitors(match):
+    return 'get_monitors_by_service', {'service': match.group('service')}
+
+
+def _error_logs(match):
+    # A bare "errors" names no logs to search - leave it to the LLM
+    if not match.group('service'):
+        return None
+    return 'search_error_logs', {'service': match.group('service')}
+
+
+def _deployments(match):
+    params = {}
+    if match.group('service'):
+        params['service'] = match.group('service')
+    return 'get_deployment_events', params
+
+
+def _resource_metrics(match):
+    metric = 'system.cpu.user' if match.group('kind') == 'cpu' else 'system.mem.used'
+    if match.group('host'):
+        return 'get_system_metrics', {'host': match.group('host')}
+    if match.group('service'):
+        # Service CPU/memory comes from Kubernetes (see TOOL ACTIVATION PROTOCOLS)
+        return 'get_kubernetes_metrics', {'service': match.group('service')}
+    return 'query_metrics', {'query': f"avg:{metric}{{*}}"}
+
+
+def _dashboards(match):
+    name = match.group('name')
+    if name in _FILLER_WORDS or name in ('what', 'which', 'how', 'many'):
+        name = None
+    return 'list_dashboards', {'name': name} if name else {}
+
+
+def _alert_events(match):
+    return 'get_alert_events', {}
+
+
+PATTERNS = [
+    (re.compile(_LEAD + r'(?:open\s+|active\s+)?p(?P<priority>[1-5])\s+(?:alerts?|incidents?)$'), _priority_alerts),
+    (re.compile(_LEAD + r'p(?P<priority>[1-5])\s+monitors?$'), _priority_monitors),
+    (re.compile(_LEAD + r'monitors?\s+(?:in|with)\s+(?:an?\s+)?(?P<state>alert|warn|no data)\s+(?:state|status)$'),
+     _monitors_in_state),
+    (re.compile(_LEAD + r'monitors?\s+for\s+(?:the\s+)?(?P<service>[\w.-]+?)(?:\s+service)?$'), _service_monitors),
+    (re.compile(_LEAD + r'(?:recent\s+)?(?:error\s+logs|logs\s+with\s+errors|errors?\s+in\s+(?:the\s+)?logs|errors)'
+                + _SERVICE + r'$'), _error_logs),
+    (re.compile(_LEAD + r'(?:recent\s+|latest\s+)?deployments?(?:\s+events)?' + _SERVICE + r'$'), _deployments),
+    (re.compile(_LEAD + r'(?P<kind>cpu|memory)(?:\s+usage)?\s+metrics'
+                + r'(?:\s+for\s+(?:host\s+(?P<host>[\w.-]+)|(?:the\s+)?(?P<service>[\w.-]+?)(?:\s+service)?))?$'),
+     _resource_metrics),
+    (re.compile(_LEAD + r'(?:(?P<name>[\w.-]+)\s+)?dashboards$'), _dashboards),
+    (re.compile(_LEAD + r'(?:recent\s+)?alert\s+events$'), _alert_events),
+]
+
+
+class IntentRouter:
+    """
+    Routes unambiguous requests straight to a tool call
+
+    Targets (dropdown commands and entity-free schema examples) are built
+    once from the loaded schemas; only tools that are registered are routed.
+    """
+
+    def __init__(self, min_confidence=None):
+        self.min_confidence = INTENT_ROUTER_MIN_CONFIDENCE if min_confidence is None else min_confidence
+        self.available_tools = set(get_available_mcp_tools())
+        self.targets = self._build_targets()
+
+    def _build_targets(self):
+        """Return [(normalized text, significant words, tool_name, params, source)]"""
+        from ui_components import get_common_commands
+
+        candidates = [(command, COMMAND_TOOL_CALLS[command], 'command')
+                      for command in get_common_commands() if command in COMMAND_TOOL_CALLS]
+        for tool_name, description, call in get_mcp_tool_examples():
+            if 'specific' not in description.lower():
+                candidates.append((description, call, 'example'))
+
+        targets = []
+        for text, call, source in candidates:
+            parsed = self._parse_call(call)
+            if parsed is None:
+                continue
+            tool_name, params = parsed
+            if source == 'example' and not set(params) <= _EXAMPLE_PARAMS:
+                continue
+            time_range, text = extract_time_range(normalize_message(text))
+            if time_range and 'time_range' not in params:
+                params['time_range'] = time_range
+            words = _significant_words(text)
+            if words:
+                targets.append((text, words, tool_name, params, source))
+        return targets
+
+    def _parse_call(self, call):
+        """Parse `tool(key='value', ...)` with keyword arguments only"""
+        match = re.match(r'^(\w+)\((.*)\)$', call.strip(), re.DOTALL)
+        if not match or match.group(1) not in self.available_tools:
+            return None
+        params = parse_function_parameters(match.group(2))
+        if 'tag_filter' in params:
+            # Positional arguments are tool-specific - skip them
+            return None
+        return match.group(1), params
+
+    def _accepts(self, tool_name, param):
+        info = get_mcp_tool_info(tool_name) or {}
+        return param in info.get('parameters', {})
+
+    def route(self, message):
+        """
+        Return a Route for an unambiguous request, or None to fall back to the LLM
+        """
+        time_range, text = extract_time_range(normalize_message(message))
+        if not text:
+            return None
+
+        route = self._match_pattern(text) or self._match_fuzzy(text)
+        if route is None or route.tool_name not in self.available_tools:
+            return None
+        if time_range and self._accepts(route.tool_name, 'time_range'):
+            route.params['time_range'] = time_range
+        return route
+
+    def _match_pattern(self, text):
+        for pattern, builder in PATTERNS:
+            match = pattern.match(text)
+            if not match:
+                continue
+            service = match.groupdict().get('service')
+            if service and service in _ENVIRONMENT_WORDS:
+                return None
+            built = builder(match)
+            if built is None:
+                return None
+            tool_name, params = built
+            return Route(tool_name, params, 1.0, 'pattern', pattern.pattern)
+        return None
+
+    def _match_fuzzy(self, text):
+        words = _significant_words(text)
+        if not words:
+            return None
+        scored = []
+        for target_text, target_words, tool_name, params, source in self.targets:
+            matcher = SequenceMatcher(None, text, target_text)
+            # Cheap upper bounds first - most targets are rejected here
+            if matcher.real_quick_ratio() < self.min_confidence or matcher.quick_ratio() < self.min_confidence:
+                continue
+            confidence = matcher.ratio()
+            if confidence < self.min_confidence:
+                continue
+            if not (_words_match(words, target_words) and _words_match(target_words, words)):
+                continue
+            scored.append((confidence, tool_name, params, source, target_text))
+        if not scored:
+            return None
+
+        scored.sort(key=lambda item: item[0], reverse=True)
+        best = scored[0]
+        for runner_up in scored[1:]:
+            if best[0] - runner_up[0] > _AMBIGUITY_MARGIN:
+                break
+            if (runner_up[1], runner_up[2]) != (best[1], best[2]):
+                return None
+        confidence, tool_name, params, source, target_text = best
+        return Route(tool_name, deepcopy(params), confidence, source, target_text)
+
+
+_router = None
+
+
+def get_intent_router():
+    """Return the process-wide router (built on first use)"""
+    global _router
+    if _router is None:
+        _router = IntentRouter()
+    return _router
+
+
+def route_intent(message):
+    """Return a Route for the message, or None when the LLM should decide"""
+    if not INTENT_ROUTER_ENABLED:
+        return None
+    return get_intent_router().route(message)
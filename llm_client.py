@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Pooled HTTP client for OpenAI-compatible chat completion endpoints.
+
+Every LLM call goes through one keep-alive `requests.Session`, so only the
+first request to LLM_API_URL pays for the TCP/TLS handshake. Calls have
+separate connect and read timeouts, so a stalled endpoint cannot hang a
+Gradio worker. 429 and 5xx responses, and failures to connect, are retried
+a bounded number of times with jittered exponential backoff, honoring
+Retry-After when the server sends it. Read timeouts are not retried: the
+request may still be running upstream and retrying would multiply the wait.
+
+Latency, attempts and token usage are recorded per call and in totals.
+
+Usage:
+    from llm_client import get_llm_client, LLMError
+
+    completion = get_llm_client().complete(url, headers, data)
+    content = completion['content']
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from dotenv import load_dotenv
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from mcp_loader import get_requests_verify
+from env_settings import validate_number
+from yoda_logging import get_logger
+
+load_dotenv()
+
+logger = get_logger(__name__)
+
+RETRY_STATUS_CODES = frozenset([429, 500, 502, 503, 504])
+_BACKOFF_BASE_SECONDS = 0.5
+_BACKOFF_CAP_SECONDS = 8.0
+# Per-call records kept for stats()
+_CALL_HISTORY = 100
+
+
+LLM_CONNECT_TIMEOUT = validate_number('LLM_CONNECT_TIMEOUT', 5.0, 0.5, 60)
+LLM_READ_TIMEOUT = validate_number('LLM_READ_TIMEOUT', 60.0, 1, 600)
+# Retries for 429/5xx/connection failures
+LLM_MAX_RETRIES = validate_number('LLM_MAX_RETRIES', 2, 0, 5, cast=int)
+LLM_HTTP_POOL_SIZE = validate_number('LLM_HTTP_POOL_SIZE', 10, 1, 100, cast=int)
+
+
+class LLMError(Exception):
+    """A completion that failed after all retries"""
+
+    def __init__(self, message, status_code=None, body=''):
+        super().__init__(message)
+        self.status_code = status_code
+        self.body = body
+
+
+def _retry_after(headers):
+    value = headers.get('Retry-After') if headers else None
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class LLMClient:
+    """Keep-alive chat completion client with timeouts, bounded retries and usage accounting"""
+
+    def __init__(self, connect_timeout=None, read_timeout=None, max_retries=None, pool_size=None):
+        self.connect_timeout = LLM_CONNECT_TIMEOUT if connect_timeout is None else connect_timeout
+        self.read_timeout = LLM_READ_TIMEOUT if read_timeout is None else read_timeout
+        self.max_retries = LLM_MAX_RETRIES if max_retries is None else max_retries
+        pool_size = pool_size or LLM_HTTP_POOL_SIZE
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self._lock = threading.Lock()
+        self._calls = deque(maxlen=_CALL_HISTORY)
+        self._totals = {'calls': 0, 'failures': 0, 'retries': 0, 'timeouts': 0, 'latency_seconds': 0.0,
+                        'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0}
+
+    def retry_delay(self, attempt, headers=None):
+        """Retry-After when the server sent one, else full-jitter exponential backoff"""
+        retry_after = _retry_after(headers)
+        if retry_after is not None:
+            return min(retry_after + random.uniform(0, _BACKOFF_BASE_SECONDS), _BACKOFF_CAP_SECONDS)
+        return random.uniform(0, min(_BACKOFF_CAP_SECONDS, _BACKOFF_BASE_SECONDS * (2 ** attempt)))
+
+    def complete(self, url, headers, data):
+        """
+        POST a chat completion request
+
+        Args:
+            url (str): Chat completions endpoint
+            headers (dict): Request headers (Authorization, Content-Type)
+            data (dict): OpenAI-style request body
+
+        Returns:
+            dict: content, usage, model, latency_seconds, attempts
+
+        Raises:
+            LLMError: Non-retryable status, retries exhausted, timeout or malformed response
+        """
+        start = time.perf_counter()
+        attempt = 0
+        while True:
+            try:
+                response = self.session.post(url, headers=headers, json=data, verify=get_requests_verify(),
+                                             timeout=(self.connect_timeout, self.read_timeout))
+            except requests.exceptions.ReadTimeout as e:
+                self._record(data, start, attempt, error='timeout')
+                raise LLMError(f"LLM read timeout after {self.read_timeout:.0f}s: {e}") from e
+            except (requests.exceptions.ConnectionError, requests.exceptions.ConnectTimeout) as e:
+                if attempt >= self.max_retries:
+                    self._record(data, start, attempt, error='connection')
+                    raise LLMError(f"LLM connection failed: {e}") from e
+                delay = self.retry_delay(attempt)
+                logger.warning("⏳ LLM connection failed, retry %s/%s in %.1fs", attempt + 1, self.max_retries, delay)
+            else:
+                if response.status_code == 200:
+                    try:
+                        body = response.json()
+                        content = body['choices'][0]['message']['content']
+                    except (ValueError, KeyError, IndexError, TypeError) as e:
+                        self._record(data, start, attempt, error='malformed')
+                        raise LLMError(f"Malformed LLM response: {e}", response.status_code, response.text) from e
+                    usage = body.get('usage') or {}
+                    latency = self._record(data, start, attempt, usage=usage)
+                    return {'content': content, 'usage': usage, 'model': body.get('model', data.get('model')),
+                            'latency_seconds': latency, 'attempts': attempt + 1}
+                if response.status_code not in RETRY_STATUS_CODES or attempt >= self.max_retries:
+                    self._record(data, start, attempt, error=str(response.status_code))
+                    raise LLMError(f"LLM API error: {response.status_code}", response.status_code, response.text)
+                delay = self.retry_delay(attempt, response.headers)
+                response.close()
+                logger.warning("⏳ LLM API returned %s, retry %s/%s in %.1fs",
+                               response.status_code, attempt + 1, self.max_retries, delay)
+            time.sleep(delay)
+            attempt += 1
+
+    def _record(self, data, start, attempt, usage=None, error=None):
+        """Account one call (all of its attempts) and return its latency"""
+        latency = time.perf_counter() - start
+        usage = usage or {}
+        call = {
+            'model': data.get('model'),
+            'latency_seconds': round(latency, 3),
+            'attempts': attempt + 1,
+            'prompt_tokens': usage.get('prompt_tokens', 0),
+            'completion_tokens': usage.get('completion_tokens', 0),
+            'total_tokens': usage.get('total_tokens', 0),
+            'error': error,
+        }
+        with self._lock:
+            totals = self._totals
+            totals['calls'] += 1
+            totals['retries'] += attempt
+            totals['latency_seconds'] += latency
+            if error:
+                totals['failures'] += 1
+                if error == 'timeout':
+                    totals['timeouts'] += 1
+            for key in ('prompt_tokens', 'completion_tokens', 'total_tokens'):
+                totals[key] += call[key]
+            self._calls.append(call)
+        return latency
+
+    def stats(self):
+        """Return totals, average/max latency and the most recent calls"""
+        with self._lock:
+            stats = dict(self._totals)
+            calls = list(self._calls)
+        stats['latency_seconds'] = round(stats['latency_seconds'], 3)
+        stats['avg_latency_seconds'] = round(stats['latency_seconds'] / stats['calls'], 3) if stats['calls'] else 0.0
+        stats['max_latency_seconds'] = max((call['latency_seconds'] for call in calls), default=0.0)
+        stats['last_call'] = calls[-1] if calls else None
+        stats['recent_calls'] = calls
+        return stats
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_llm_client():
+    """Return the process-wide LLM client"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = LLMClient()
+    return _client
@@ -1,14 +1,21 @@
 #!/usr/bin/env python3
 
 import re
-import requests
 import os
 import sys
+import json
+import hashlib
 from dotenv import load_dotenv
 
 # Add current directory to path for imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-from mcp_loader import get_requests_verify, get_llm_api_url, get_log_display_limit, get_max_message_length
+from mcp_loader import get_llm_api_url, get_log_display_limit, get_max_message_length
+from mcp.cache import get_cache, CacheLoadError
+from llm_client import get_llm_client, LLMError
+from tracing import current_span
+from yoda_logging import get_logger, preview
+
+logger = get_logger(__name__)
 
 # Initialize
 load_dotenv()
@@ -16,6 +23,19 @@ load_dotenv()
 # OpenAI API
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
 
+# LLM RESPONSE CACHE CONFIGURATION
+LLM_CACHE_MODES = ('off', 'decision', 'all')
+
+def _validate_llm_cache_mode():
+    """Validate and return the LLM cache mode with fallback to default"""
+    mode = os.getenv('LLM_CACHE_MODE', 'decision').lower().strip()
+    if mode in LLM_CACHE_MODES:
+        return mode
+    print(f"⚠️  Invalid LLM_CACHE_MODE='{mode}'. Using default: decision")
+    return 'decision'
+
+LLM_CACHE_MODE = _validate_llm_cache_mode()
+
 def parse_tool_call(llm_response):
     """
     Parse LLM response for tool calls in multiple formats:
@@ -31,7 +51,7 @@ def parse_tool_call(llm_response):
     if match:
         tool_name = match.group(1)
         params_str = match.group(2)
-        print(f"🔍 Tool Parse Result: tool='{tool_name}', params_raw='{params_str[:100]}'")
+        logger.debug("🔍 Tool Parse Result: tool='%s', params_raw='%s'", tool_name, params_str[:100])
     else:
         # Try flexible patterns for YODA-themed responses
         # Look for function calls in backticks or after colons
@@ -52,15 +72,15 @@ def parse_tool_call(llm_response):
                 if (potential_tool.endswith('_mcp') or 
                     any(word in potential_tool.lower() for word in ['get', 'search', 'list', 'analyze', 'query', 'fetch', 'find'])):
                     tool_name = potential_tool
-                    print(f"🔍 Tool Parse Result: tool='{tool_name}', params_raw='{params_str[:100]}'")
+                    logger.debug("🔍 Tool Parse Result: tool='%s', params_raw='%s'", tool_name, params_str[:100])
                     break
                 else:
                     # Keep looking with other patterns
                     continue
         else:
             # No tool call found
-            print(f"🔍 Tool Parse Result: tool='None', params=None")
-            print(f"   ℹ️ No tool call detected - responding with droid personality")
+            logger.debug("🔍 Tool Parse Result: tool='None', params=None")
+            logger.debug("   ℹ️ No tool call detected - responding with droid personality")
             return None, None
     
     # Parse parameters
@@ -68,10 +88,10 @@ def parse_tool_call(llm_response):
     if params_str.strip():
         try:
             params = parse_function_parameters(params_str)
-            print(f"   📋 Parsed params: {params}")
+            logger.debug("   📋 Parsed params: %s", preview(params))
         except Exception as e:
-            print(f"❌ Error parsing parameters: {params_str}")
-            print(f"❌ Parse error: {str(e)}")
+            logger.error("❌ Error parsing parameters: %s", params_str)
+            logger.error("❌ Parse error: %s", str(e))
     
     return tool_name, params
 
@@ -199,8 +219,35 @@ def parse_function_parameters(params_str):
     
     return params
 
-def call_openai(messages):
-    """Call OpenAI API"""
+def _llm_cache_key(messages, data):
+    """
+    Cache key for a completion: model settings, system prompt version,
+    the (already truncated) history and the whitespace/case-normalized user message
+    """
+    system_prompt = messages[0]['content'] if messages and messages[0].get('role') == 'system' else ''
+    prompt_version = hashlib.sha256(system_prompt.encode('utf-8')).hexdigest()[:12]
+    start = 1 if system_prompt else 0
+    history = [(msg.get('role'), msg.get('content')) for msg in messages[start:-1]]
+    user_message = ' '.join(str(messages[-1].get('content', '')).split()).casefold() if messages else ''
+    payload = json.dumps([data['model'], data['temperature'], data['max_tokens'], history, user_message],
+                         ensure_ascii=False)
+    return f"{prompt_version}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+def get_llm_cache_stats():
+    """Return hit/miss counters and hit rate of the LLM response cache"""
+    stats = get_cache().stats().get('llm', {'hits': 0, 'misses': 0, 'stale': 0, 'loads': 0, 'errors': 0, 'hit_rate': 0.0})
+    return dict(stats, mode=LLM_CACHE_MODE)
+
+def call_openai(messages, turn="analysis"):
+    """
+    Call OpenAI API
+    
+    Args:
+        messages (list): Chat messages (system prompt first)
+        turn (str): 'decision' for the tool-selection turn, 'analysis' for the turn
+                    that interprets tool results. LLM_CACHE_MODE=decision caches only
+                    decision turns, 'all' caches both, 'off' disables the cache.
+    """
     if not OPENAI_API_KEY:
         return "❌ OpenAI API key not found. Please set OPENAI_API_KEY in .env file."
     
@@ -216,13 +263,46 @@ def call_openai(messages):
         "max_tokens": 1500,
         "temperature": 0.3
     }
+    
+    if LLM_CACHE_MODE == 'off' or (LLM_CACHE_MODE == 'decision' and turn != 'decision'):
+        current_span().set_attribute('llm.cache_hit', False)
+        return _post_completion(url, headers, data)
+    
+    def load_completion():
+        content = _post_completion(url, headers, data)
+        # Errors and empty replies are returned to the user but never cached
+        if not content or not content.strip() or content.startswith("❌"):
+            raise CacheLoadError(content)
+        return content
+    
+    try:
+        # Expired completions are recomputed, never served stale
+        lookup = get_cache().get_or_load('llm', _llm_cache_key(messages, data), load_completion, revalidate=False)
+    except CacheLoadError as e:
+        return e.args[0]
+    
+    current_span().set_attribute('llm.cache_hit', lookup.from_cache)
+    if lookup.from_cache:
+        logger.info("⚡ LLM cache hit (%s turn, age %.0fs, hit rate %.0f%%)", turn, lookup.age_seconds,
+                    get_llm_cache_stats()['hit_rate'] * 100)
+    return lookup.value
 
+def _post_completion(url, headers, data):
+    """POST a chat completion request and return the message content or an error string"""
     try:
-        response = requests.post(url, headers=headers, json=data, verify=get_requests_verify())
-        if response.status_code == 200:
-            return response.json()['choices'][0]['message']['content']
-        else:
-            return f"❌ OpenAI API error: {response.status_code} - {response.text}"
+        completion = get_llm_client().complete(url, headers, data)
+        usage = completion['usage']
+        current_span().set_attributes({'llm.prompt_tokens': usage.get('prompt_tokens', 0),
+                                       'llm.completion_tokens': usage.get('completion_tokens', 0),
+                                       'llm.attempts': completion['attempts']})
+        logger.info("🧠 LLM call: %.2fs, %s attempt(s), %s+%s tokens",
+                    completion['latency_seconds'], completion['attempts'],
+                    usage.get('prompt_tokens', 0), usage.get('completion_tokens', 0))
+        return completion['content']
+    except LLMError as e:
+        if e.status_code is not None:
+            return f"❌ OpenAI API error: {e.status_code} - {e.body}"
+        return f"❌ Error calling OpenAI: {str(e)}"
     except Exception as e:
         return f"❌ Error calling OpenAI: {str(e)}"
 
@@ -249,6 +329,9 @@ def format_tool_result(result):
     """Format tool result for display"""
     if not result['success']:
         return f"❌ Tool Error: {result['error']}"
+    if result.get('partial'):
+        notice = f"⚠️ Partial result ({result.get('partial_reason', 'incomplete data')})\n"
+        return notice + format_tool_result(dict(result, partial=False))
     
     # Handle different result formats
     if 'data' in result:
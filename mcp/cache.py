@@ -0,0 +1,495 @@
+"""
+Shared two-tier cache for MCP tools.
+
+Values are kept in a per-process in-memory LRU in front of a SQLite file
+shared by every worker process. SQLite provides the atomic writes and the
+cross-process locking (WAL journal + busy timeout), so concurrent workers
+never see a half-written entry.
+
+Each namespace (services, monitor_tags, ...) has its own TTL. Within the
+stale window after the TTL, `get_or_load` returns the stale value right away
+and refreshes it in a background thread (stale-while-revalidate). Loads are
+single-flight: concurrent callers of the same key share one upstream call.
+Hits, misses, stale serves and loads are counted per namespace.
+
+Keys requested with `keep_warm=True` are also renewed ahead of expiry by
+`CacheRefresher` (started by `start_background_refresh()`), so discovery
+data is normally refreshed before any chat turn finds it expired. Keys not
+read for KEEP_WARM_IDLE_TTLS of their TTL stop being renewed.
+
+Usage:
+    from mcp.cache import get_cache, CacheLoadError
+
+    result = get_cache().get_or_load('services', time_range, load_services)
+    result.value, result.source, result.age_seconds
+"""
+
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dotenv import load_dotenv
+
+from env_settings import validate_number
+from tracing import current_span
+from yoda_logging import get_logger
+
+load_dotenv()
+
+logger = get_logger(__name__)
+
+_PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_DB_NAME = 'yoda_cache.sqlite3'
+
+
+CACHE_DIR = os.getenv('CACHE_DIR') or _PROJECT_DIR
+CACHE_MEMORY_ENTRIES = validate_number('CACHE_MEMORY_ENTRIES', 256, 1, 100000, cast=int)
+# Background refresh interval (seconds, 0 disables)
+CACHE_REFRESH_INTERVAL = validate_number('CACHE_REFRESH_INTERVAL', 60, 0, 3600, cast=int)
+# Fraction of the TTL after which kept-warm entries are renewed
+CACHE_REFRESH_AHEAD = validate_number('CACHE_REFRESH_AHEAD', 0.8, 0.5, 0.95)
+# Random spread (fraction of TTL / of interval) so workers do not refresh in lockstep
+REFRESH_JITTER = 0.1
+# Expired rows of a namespace are purged from the shared store every N writes to it
+PRUNE_EVERY_WRITES = 100
+# Keep-warm keys not read for this many TTLs are no longer renewed
+KEEP_WARM_IDLE_TTLS = 3
+# Shortest wait between refresher checks (seconds), however short the TTLs
+MIN_REFRESH_INTERVAL = 1
+
+# Per-namespace TTLs (hours, 0 disables, at most one week). Stale values are served for one more TTL
+# while refreshing.
+NAMESPACE_TTL_HOURS = {
+    'services': validate_number('SERVICES_CACHE_HOURS', 4, 0, 168),
+    'monitor_tags': validate_number('MONITOR_TAGS_CACHE_HOURS', 4, 0, 168),
+    # Monitor states change during incidents - the inventory is kept short-lived and warm
+    'monitors': validate_number('MONITORS_CACHE_HOURS', 0.05, 0, 168),
+    'metric_search': validate_number('METRIC_SEARCH_CACHE_HOURS', 1, 0, 168),
+    'dashboards': validate_number('DASHBOARDS_CACHE_HOURS', 0.25, 0, 168),
+    'llm': validate_number('LLM_CACHE_HOURS', 1, 0, 168),
+}
+DEFAULT_TTL_HOURS = 1
+
+
+class CacheLoadError(Exception):
+    """Raised by a loader when the upstream call failed and nothing should be cached"""
+
+
+class _Flight:
+    """One in-progress load shared by every caller of the same key"""
+
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class CacheResult:
+    """
+    Outcome of a cache lookup
+
+    Attributes:
+        value: The cached or freshly loaded value
+        source (str): 'memory', 'disk', 'stale' or 'loaded'
+        age_seconds (float): Age of the value when returned
+        stored_at (float): Epoch seconds when the value was stored
+    """
+
+    __slots__ = ('value', 'source', 'age_seconds', 'stored_at')
+
+    def __init__(self, value, source, stored_at):
+        self.value = value
+        self.source = source
+        self.stored_at = stored_at
+        self.age_seconds = max(0.0, time.time() - stored_at)
+
+    @property
+    def from_cache(self):
+        return self.source != 'loaded'
+
+
+class Cache:
+    """Namespaced in-memory LRU over a persistent SQLite store"""
+
+    def __init__(self, path=None, memory_entries=None, ttl_hours=None):
+        self.path = path or os.path.join(CACHE_DIR, CACHE_DB_NAME)
+        self.memory_entries = memory_entries or CACHE_MEMORY_ENTRIES
+        self.ttl_hours = dict(NAMESPACE_TTL_HOURS if ttl_hours is None else ttl_hours)
+        self._memory = OrderedDict()
+        self._lock = threading.RLock()
+        self._inflight = {}
+        self._keep_warm = {}
+        self._writes = {}
+        self._stats = {}
+        self._conn = self._open()
+
+    def _open(self):
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA busy_timeout = 10000")
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, stored_at REAL NOT NULL, "
+                "PRIMARY KEY (namespace, key))"
+            )
+            return conn
+        except sqlite3.Error as e:
+            logger.warning("⚠️ Persistent cache unavailable at %s: %s. Using memory only.", self.path, e)
+            return None
+
+    def _ttl_seconds(self, namespace):
+        return self.ttl_hours.get(namespace, DEFAULT_TTL_HOURS) * 3600
+
+    def _count(self, namespace, event):
+        counters = self._stats.setdefault(namespace, {'hits': 0, 'misses': 0, 'stale': 0, 'loads': 0, 'errors': 0})
+        counters[event] += 1
+
+    def _read_memory(self, namespace, key):
+        """Return (value, stored_at, 'memory') or None"""
+        memory_key = (namespace, key)
+        with self._lock:
+            entry = self._memory.get(memory_key)
+            if entry is None:
+                return None
+            self._memory.move_to_end(memory_key)
+            return entry[0], entry[1], 'memory'
+
+    def _read_disk(self, namespace, key):
+        """Return (value, stored_at, 'disk') or None, promoting the entry to memory"""
+        memory_key = (namespace, key)
+        with self._lock:
+            if self._conn is None:
+                return None
+            try:
+                row = self._conn.execute(
+                    "SELECT value, stored_at FROM cache_entries WHERE namespace = ? AND key = ?",
+                    (namespace, key)
+                ).fetchone()
+            except sqlite3.Error as e:
+                logger.warning("⚠️ Error reading cache %s/%s: %s", namespace, key, e)
+                return None
+        if row is None:
+            return None
+        # Decode outside the lock - a multi-MB entry must not stall other readers
+        value = json.loads(row[0])
+        with self._lock:
+            current = self._memory.get(memory_key)
+            # A newer value may have been stored while this one was decoded
+            if current is None or current[1] <= row[1]:
+                self._remember(memory_key, value, row[1])
+        return value, row[1], 'disk'
+
+    def _remember(self, memory_key, value, stored_at):
+        self._memory[memory_key] = (value, stored_at)
+        self._memory.move_to_end(memory_key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, namespace, key, allow_stale=False):
+        """Return a CacheResult for a fresh (or, if allowed, stale) entry, else None"""
+        ttl = self._ttl_seconds(namespace)
+        with self._lock:
+            warm = self._keep_warm.get((namespace, key))
+            if warm is not None:
+                warm[1] = time.time()
+        entry = self._read_memory(namespace, key)
+        if entry is None or time.time() - entry[1] >= ttl:
+            # Another worker may have refreshed the shared store since we cached it
+            disk_entry = self._read_disk(namespace, key)
+            if disk_entry is not None and (entry is None or disk_entry[1] > entry[1]):
+                entry = disk_entry
+        if entry is None:
+            return None
+        value, stored_at, tier = entry
+        age = time.time() - stored_at
+        if age < ttl:
+            return CacheResult(value, tier, stored_at)
+        if allow_stale and age < 2 * ttl:
+            return CacheResult(value, 'stale', stored_at)
+        return None
+
+    def set(self, namespace, key, value):
+        """Store a JSON-serializable value in both tiers"""
+        return self._store(namespace, key, value)[1]
+
+    def _store(self, namespace, key, value):
+        """Store a value and return (normalized_value, stored_at)"""
+        stored_at = time.time()
+        # Serialize outside the lock - a multi-MB inventory must not stall other readers.
+        # The memory tier keeps exactly what a disk read would return.
+        payload = json.dumps(value, default=list)
+        normalized = json.loads(payload)
+        with self._lock:
+            if self._conn is not None:
+                try:
+                    # Single-statement upsert runs in its own transaction - readers never see partial rows
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO cache_entries (namespace, key, value, stored_at) VALUES (?, ?, ?, ?)",
+                        (namespace, key, payload, stored_at)
+                    )
+                except sqlite3.Error as e:
+                    logger.warning("⚠️ Error saving cache %s/%s: %s", namespace, key, e)
+                self._writes[namespace] = self._writes.get(namespace, 0) + 1
+                if self._writes[namespace] % PRUNE_EVERY_WRITES == 0:
+                    self.prune(namespace)
+            self._remember((namespace, key), normalized, stored_at)
+        return normalized, stored_at
+
+    def stored_at(self, namespace, key):
+        """Return when the newest copy of an entry (memory or shared store) was stored, or None"""
+        with self._lock:
+            entry = self._memory.get((namespace, key))
+            newest = entry[1] if entry is not None else None
+            if self._conn is not None:
+                # Only the timestamp - the refresher checks often and must not decode the value
+                try:
+                    row = self._conn.execute(
+                        "SELECT stored_at FROM cache_entries WHERE namespace = ? AND key = ?", (namespace, key)
+                    ).fetchone()
+                except sqlite3.Error as e:
+                    logger.warning("⚠️ Error reading cache %s/%s: %s", namespace, key, e)
+                    row = None
+                if row is not None and (newest is None or row[0] > newest):
+                    newest = row[0]
+            return newest
+
+    def prune(self, namespace):
+        """Delete entries of a namespace that are past their stale window from the shared store"""
+        if self._conn is None:
+            return 0
+        cutoff = time.time() - 2 * self._ttl_seconds(namespace)
+        with self._lock:
+            try:
+                return self._conn.execute(
+                    "DELETE FROM cache_entries WHERE namespace = ? AND stored_at < ?", (namespace, cutoff)
+                ).rowcount
+            except sqlite3.Error as e:
+                logger.warning("⚠️ Error pruning cache %s: %s", namespace, e)
+                return 0
+
+    def invalidate(self, namespace, key=None):
+        """Drop one key, or a whole namespace when key is None"""
+        with self._lock:
+            for memory_key in [k for k in self._memory if k[0] == namespace and (key is None or k[1] == key)]:
+                del self._memory[memory_key]
+            if self._conn is not None:
+                if key is None:
+                    self._conn.execute("DELETE FROM cache_entries WHERE namespace = ?", (namespace,))
+                else:
+                    self._conn.execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def get_or_load(self, namespace, key, loader, force_refresh=False, keep_warm=False, revalidate=True):
+        """
+        Return a cached value or load, store and return a fresh one
+
+        Args:
+            namespace (str): Cache namespace (selects the TTL)
+            key (str): Key within the namespace
+            loader (callable): Zero-argument function returning the value to cache.
+                               Raise CacheLoadError to report a failure without caching.
+            force_refresh (bool): Skip the cache and reload
+            keep_warm (bool): Let the background refresher renew this key before it expires
+            revalidate (bool): Serve expired entries while refreshing in the background.
+                               When False, expired entries are treated as misses.
+
+        Returns:
+            CacheResult
+        """
+        key = str(key)
+        if keep_warm and self._ttl_seconds(namespace) > 0:
+            with self._lock:
+                self._keep_warm[(namespace, key)] = [loader, time.time()]
+        if not force_refresh and self._ttl_seconds(namespace) > 0:
+            cached = self.get(namespace, key, allow_stale=revalidate)
+            current_span().set_attribute(f"cache.{namespace}", cached.source if cached is not None else 'miss')
+            if cached is not None:
+                with self._lock:
+                    if cached.source == 'stale':
+                        self._count(namespace, 'stale')
+                    else:
+                        self._count(namespace, 'hits')
+                if cached.source == 'stale':
+                    self._revalidate(namespace, key, loader)
+                return cached
+
+        with self._lock:
+            self._count(namespace, 'misses')
+        return self._load(namespace, key, loader)
+
+    def _load(self, namespace, key, loader):
+        """Run the loader once per key at a time; concurrent callers wait for that result"""
+        flight_key = (namespace, key)
+        with self._lock:
+            flight = self._inflight.get(flight_key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._inflight[flight_key] = flight
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            value, stored_at = self._store(namespace, key, loader())
+            flight.result = CacheResult(value, 'loaded', stored_at)
+            with self._lock:
+                self._count(namespace, 'loads')
+            return flight.result
+        except Exception as e:
+            flight.error = e
+            with self._lock:
+                self._count(namespace, 'errors')
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[flight_key]
+            flight.done.set()
+
+    def refresh(self, namespace, key, loader):
+        """Reload an entry now unless a load for it is already in flight"""
+        with self._lock:
+            if (namespace, key) in self._inflight:
+                return None
+        return self._load(namespace, key, loader)
+
+    def _revalidate(self, namespace, key, loader):
+        """Refresh a stale entry in the background without blocking the caller"""
+        with self._lock:
+            if (namespace, key) in self._inflight:
+                return
+
+        def refresh():
+            try:
+                if self.refresh(namespace, key, loader) is not None:
+                    logger.debug("🔄 Cache refreshed in background: %s/%s", namespace, key)
+            except Exception as e:
+                logger.warning("⚠️ Background cache refresh failed for %s/%s: %s", namespace, key, e)
+
+        threading.Thread(target=refresh, name=f"cache-refresh-{namespace}", daemon=True).start()
+
+    def keep_warm_items(self):
+        """Return [((namespace, key), loader)] registered with keep_warm=True"""
+        with self._lock:
+            return [(warm_key, loader) for warm_key, (loader, _) in self._keep_warm.items()]
+
+    def drop_idle_keep_warm(self, idle_ttls=None):
+        """Stop renewing keep-warm keys not read for `idle_ttls` of their TTL. Returns the dropped keys."""
+        idle_ttls = idle_ttls or KEEP_WARM_IDLE_TTLS
+        now = time.time()
+        with self._lock:
+            idle = [warm_key for warm_key, (_, last_read) in self._keep_warm.items()
+                    if now - last_read > idle_ttls * self._ttl_seconds(warm_key[0])]
+            for warm_key in idle:
+                del self._keep_warm[warm_key]
+        return idle
+
+    def stats(self):
+        """Return {namespace: {hits, misses, stale, loads, errors, hit_rate}}"""
+        with self._lock:
+            snapshot = {}
+            for namespace, counters in self._stats.items():
+                lookups = counters['hits'] + counters['stale'] + counters['misses']
+                snapshot[namespace] = dict(counters, hit_rate=round((counters['hits'] + counters['stale']) / lookups, 3) if lookups else 0.0)
+            return snapshot
+
+
+class CacheRefresher:
+    """
+    Daemon thread that renews keep-warm entries before they expire
+
+    Every interval (+/- jitter) each keep-warm key whose newest copy is older
+    than `refresh_ahead` of its TTL (minus a random jitter) is reloaded on this
+    thread. Chat turns keep reading the current value meanwhile, and loads go
+    through the cache's single-flight path, so a user request and the
+    refresher never hit Datadog twice for the same key.
+
+    The interval shrinks to fit the shortest keep-warm TTL, so every key is
+    checked at least once between `refresh_ahead` and expiry. Keys nobody
+    read for KEEP_WARM_IDLE_TTLS of their TTL are dropped instead of renewed.
+    """
+
+    def __init__(self, cache, interval_seconds=None, refresh_ahead=None):
+        self.cache = cache
+        self.interval_seconds = CACHE_REFRESH_INTERVAL if interval_seconds is None else interval_seconds
+        self.refresh_ahead = refresh_ahead or CACHE_REFRESH_AHEAD
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None or not self.interval_seconds:
+            return False
+        self._thread = threading.Thread(target=self._run, name="cache-refresher", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        self._stop.set()
+
+    def current_interval(self):
+        """Seconds until the next check: the configured interval, shortened for short keep-warm TTLs"""
+        ttls = [self.cache._ttl_seconds(namespace) for (namespace, _), _ in self.cache.keep_warm_items()]
+        window = min(ttls, default=0) * (1 - self.refresh_ahead)
+        if window <= 0:
+            return self.interval_seconds
+        return max(MIN_REFRESH_INTERVAL, min(self.interval_seconds, window / 2))
+
+    def _run(self):
+        while not self._stop.wait(self.current_interval() * random.uniform(1 - REFRESH_JITTER, 1 + REFRESH_JITTER)):
+            self.run_once()
+
+    def run_once(self):
+        """Refresh every keep-warm entry that is due. Returns the refreshed keys."""
+        for namespace, key in self.cache.drop_idle_keep_warm():
+            logger.debug("💤 Cache key no longer kept warm (not read recently): %s/%s", namespace, key)
+        refreshed = []
+        for (namespace, key), loader in self.cache.keep_warm_items():
+            ttl = self.cache._ttl_seconds(namespace)
+            stored_at = self.cache.stored_at(namespace, key)
+            threshold = ttl * (self.refresh_ahead - random.uniform(0, REFRESH_JITTER))
+            if stored_at is not None and time.time() - stored_at < threshold:
+                continue
+            try:
+                if self.cache.refresh(namespace, key, loader) is not None:
+                    refreshed.append((namespace, key))
+                    logger.debug("🔄 Cache renewed ahead of expiry: %s/%s", namespace, key)
+            except Exception as e:
+                logger.warning("⚠️ Background cache refresh failed for %s/%s: %s", namespace, key, e)
+        return refreshed
+
+
+_cache = None
+_cache_lock = threading.Lock()
+_refresher = None
+
+
+def get_cache():
+    """Return the process-wide cache instance"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = Cache()
+    return _cache
+
+
+def start_background_refresh():
+    """Start the process-wide CacheRefresher (no-op if disabled or already running)"""
+    global _refresher
+    cache = get_cache()
+    with _cache_lock:
+        if _refresher is None:
+            _refresher = CacheRefresher(cache)
+            if _refresher.start():
+                logger.info("🔄 Background cache refresh enabled (every ~%ss, renewing at %.0f%% of TTL)",
+                            _refresher.interval_seconds, _refresher.refresh_ahead * 100)
+    return _refresher
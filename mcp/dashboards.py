@@ -1,4 +1,3 @@
-import requests
 import os
 import sys
 import time
@@ -10,7 +9,12 @@ from colorama import Fore
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from mcp_loader import get_requests_verify
+from mcp.datadog_client import get_datadog_client, datadog_api_base
+from mcp.cache import get_cache, CacheLoadError
+from deadlines import partial_fields, until_deadline
+from yoda_logging import get_logger, VERBOSE
+
+logger = get_logger(__name__)
 
 # Load environment variables
 load_dotenv()
@@ -18,6 +22,9 @@ DD_API_KEY = os.getenv('DD_API_KEY')
 DD_APP_KEY = os.getenv('DD_APP_KEY')
 DD_SITE = os.getenv('DD_SITE', 'api.datadoghq.com')
 
+# Dashboard list fields kept in the cache
+_DASHBOARD_SUMMARY_FIELDS = ('id', 'title', 'description', 'layout_type', 'created_at', 'modified_at', 'author_handle')
+
 def _detect_unit(query_text):
     """
     Detect the appropriate unit for a metric query
@@ -97,7 +104,7 @@ def list_dashboards_mcp(name=None, tags=None, **kwargs):
     
     # DATADOG API CALL
     try:
-        url = f"https://{DD_SITE}/api/v1/dashboard"
+        url = f"{datadog_api_base(DD_SITE)}/api/v1/dashboard"
         headers = {
             'DD-API-KEY': DD_API_KEY,
             'DD-APPLICATION-KEY': DD_APP_KEY,
@@ -111,71 +118,83 @@ def list_dashboards_mcp(name=None, tags=None, **kwargs):
             filters_applied.append(f"tags={tags}")
         filter_info = ", ".join(filters_applied) if filters_applied else "no filters"
         
-        print(f"🔄 MCP: Calling Datadog Dashboards API with {filter_info}")
-        print(f"🌐 API URL: {url}")
-        response = requests.get(url, headers=headers, verify=get_requests_verify())
+        logger.info("🔄 MCP: Calling Datadog Dashboards API with %s", filter_info)
+        logger.debug("🌐 API URL: %s", url)
         
-        if response.status_code == 200:
+        def load_dashboards():
+            response = get_datadog_client().get(url, headers=headers)
+            if response.status_code != 200:
+                raise CacheLoadError(f"Datadog API error: {response.status_code} - {response.text}")
             data = response.json()
-            dashboards = data.get('dashboards', [])
-            print(f"📥 API Response: {response.status_code} - {len(dashboards)} dashboards received")
-            print(f"🔍 Raw response keys: {list(data.keys())}")
-            
-            filtered_dashboards = []
-            skipped_by_name = 0
-            skipped_by_tags = 0
-            
-            for dashboard in dashboards:
-                # Apply name filter if provided
-                if name:
-                    dashboard_title = dashboard.get('title', '').lower()
-                    if name.lower() not in dashboard_title:
-                        skipped_by_name += 1
-                        continue
-                
-                # Apply tags filter if provided
-                if tags:
-                    dashboard_description = dashboard.get('description', '')
-                    dashboard_tags = [tag.strip() for tag in dashboard_description.split(',') if tag.strip()]
-                    if not all(tag in dashboard_tags for tag in tags):
-                        skipped_by_tags += 1
-                        continue
-                
-                dashboard_info = {
-                    "id": dashboard.get('id'),
-                    "title": dashboard.get('title'),
-                    "description": dashboard.get('description'),
-                    "layout_type": dashboard.get('layout_type'),
-                    "created_at": dashboard.get('created_at'),
-                    "modified_at": dashboard.get('modified_at'),
-                    "author_handle": dashboard.get('author_handle'),
-                    "url": f"https://app.datadoghq.com/dashboard/{dashboard.get('id')}"
-                }
-                filtered_dashboards.append(dashboard_info)
-            
-            # Debug summary
-            total_received = len(dashboards)
-            total_returned = len(filtered_dashboards)
-            print(f"🎯 Filtering Summary:")
-            print(f"   📊 Total received: {total_received}")
-            print(f"   🚫 Skipped by name filter: {skipped_by_name}")
-            print(f"   🚫 Skipped by tags filter: {skipped_by_tags}")
-            print(f"   ✅ Final results: {total_returned}")
-            
-            return {
-                "success": True,
-                "error": None,
-                "data": filtered_dashboards,
-                "total_dashboards": len(dashboards),
-                "filtered_dashboards": len(filtered_dashboards)
-            }
-            
-        else:
+            logger.debug("📥 API Response: %s - %s dashboards received",
+                         response.status_code, len(data.get('dashboards', [])))
+            logger.debug("🔍 Raw response keys: %s", list(data.keys()), extra=VERBOSE)
+            # Only the summary fields are cached
+            return [{field: dashboard[field] for field in _DASHBOARD_SUMMARY_FIELDS if field in dashboard}
+                    for dashboard in data.get('dashboards', [])]
+        
+        try:
+            lookup = get_cache().get_or_load('dashboards', 'all', load_dashboards,
+                                             force_refresh=kwargs.get('force_refresh', False))
+        except CacheLoadError as e:
             return {
                 "success": False,
-                "error": f"Datadog API error: {response.status_code} - {response.text}",
+                "error": str(e),
                 "data": []
             }
+        dashboards = lookup.value
+        if lookup.from_cache:
+            logger.debug("✅ Using cached dashboard list (%s dashboards, age: %.0fm)",
+                         len(dashboards), lookup.age_seconds / 60)
+        
+        filtered_dashboards = []
+        skipped_by_name = 0
+        skipped_by_tags = 0
+        
+        for dashboard in dashboards:
+            # Apply name filter if provided
+            if name:
+                dashboard_title = dashboard.get('title', '').lower()
+                if name.lower() not in dashboard_title:
+                    skipped_by_name += 1
+                    continue
+            
+            # Apply tags filter if provided
+            if tags:
+                dashboard_description = dashboard.get('description', '')
+                dashboard_tags = [tag.strip() for tag in dashboard_description.split(',') if tag.strip()]
+                if not all(tag in dashboard_tags for tag in tags):
+                    skipped_by_tags += 1
+                    continue
+            
+            dashboard_info = {
+                "id": dashboard.get('id'),
+                "title": dashboard.get('title'),
+                "description": dashboard.get('description'),
+                "layout_type": dashboard.get('layout_type'),
+                "created_at": dashboard.get('created_at'),
+                "modified_at": dashboard.get('modified_at'),
+                "author_handle": dashboard.get('author_handle'),
+                "url": f"https://app.datadoghq.com/dashboard/{dashboard.get('id')}"
+            }
+            filtered_dashboards.append(dashboard_info)
+        
+        # Debug summary
+        total_received = len(dashboards)
+        total_returned = len(filtered_dashboards)
+        logger.debug("🎯 Filtering Summary:")
+        logger.debug("   📊 Total received: %s", total_received)
+        logger.debug("   🚫 Skipped by name filter: %s", skipped_by_name)
+        logger.debug("   🚫 Skipped by tags filter: %s", skipped_by_tags)
+        logger.debug("   ✅ Final results: %s", total_returned)
+        
+        return {
+            "success": True,
+            "error": None,
+            "data": filtered_dashboards,
+            "total_dashboards": len(dashboards),
+            "filtered_dashboards": len(filtered_dashboards)
+        }
             
     except Exception as e:
         return {
@@ -206,15 +225,15 @@ def get_dashboard_mcp(dashboard_id, **kwargs):
     
     # DATADOG API CALL
     try:
-        url = f"https://{DD_SITE}/api/v1/dashboard/{dashboard_id}"
+        url = f"{datadog_api_base(DD_SITE)}/api/v1/dashboard/{dashboard_id}"
         headers = {
             'DD-API-KEY': DD_API_KEY,
             'DD-APPLICATION-KEY': DD_APP_KEY,
             'Accept': 'application/json'
         }
         
-        print(f"🔄 MCP: Getting dashboard {dashboard_id} from Datadog API...")
-        response = requests.get(url, headers=headers, verify=get_requests_verify())
+        logger.info("🔄 MCP: Getting dashboard %s from Datadog API...", dashboard_id)
+        response = get_datadog_client().get(url, headers=headers)
         
         if response.status_code == 200:
             dashboard = response.json()
@@ -276,11 +295,11 @@ def get_widget_data_mcp(dashboard_id, time_range="1 week", **kwargs):
         }
     
     try:
-        print(f"🔄 MCP: Getting REAL widget data for dashboard {dashboard_id} (time_range: {time_range})...")
+        logger.info("🔄 MCP: Getting REAL widget data for dashboard %s (time_range: %s)...", dashboard_id, time_range)
         
         # Parse time range
         time_range_seconds = parse_time_range(time_range)
-        print(f"📅 Time range: {time_range} = {time_range_seconds} seconds")
+        logger.debug("📅 Time range: %s = %s seconds", time_range, time_range_seconds)
         
         # Get dashboard configuration first
         dashboard_result = get_dashboard_mcp(dashboard_id)
@@ -302,15 +321,17 @@ def get_widget_data_mcp(dashboard_id, time_range="1 week", **kwargs):
         now = int(time.time())
         time_ago = now - time_range_seconds
         
-        print(f"🕒 Query time range: {datetime.fromtimestamp(time_ago)} to {datetime.fromtimestamp(now)}")
+        logger.debug("🕒 Query time range: %s to %s", datetime.fromtimestamp(time_ago), datetime.fromtimestamp(now))
         
         # Process each widget using the WORKING logic from test_dashboard_direct.py
-        for i, widget in enumerate(widgets):
+        # (widgets left when the tool's deadline passes are skipped - the result is marked partial)
+        batch = until_deadline(widgets, label='widgets')
+        for i, widget in enumerate(batch):
             widget_def = widget.get('definition', {})
             widget_type = widget_def.get('type', 'unknown')
             widget_title = widget_def.get('title', f'Widget {i+1}')
             
-            print(f"📊 Processing widget {i+1}: {widget_title} (type: {widget_type})")
+            logger.debug("📊 Processing widget %s: %s (type: %s)", i+1, widget_title, widget_type, extra=VERBOSE)
             
             widget_current_data = {
                 'widget_index': i,
@@ -324,24 +345,24 @@ def get_widget_data_mcp(dashboard_id, time_range="1 week", **kwargs):
             # WORKING LOGIC: Handle group widgets (most dashboard widgets are groups)
             if widget_type == 'group':
                 sub_widgets = widget_def.get('widgets', [])
-                print(f"   🔍 Group widget has {len(sub_widgets)} sub-widgets")
+                logger.debug("   🔍 Group widget has %s sub-widgets", len(sub_widgets), extra=VERBOSE)
                 
                 for j, sub_widget in enumerate(sub_widgets):
                     sub_def = sub_widget.get('definition', {})
                     sub_title = sub_def.get('title', f'Sub-widget {j+1}')
                     sub_requests = sub_def.get('requests', [])
                     
-                    print(f"      📊 Sub-widget: {sub_title} - {len(sub_requests)} requests")
+                    logger.debug("      📊 Sub-widget: %s - %s requests", sub_title, len(sub_requests), extra=VERBOSE)
                     
                     for req in sub_requests:
                         queries_array = req.get('queries', [])
                         for query_obj in queries_array:
                             query_text = query_obj.get('query', '')
                             if query_text:  # Execute ALL queries, not just trace
-                                print(f"🚀 EXECUTING: {query_text}")
+                                logger.debug("🚀 EXECUTING: %s", query_text, extra=VERBOSE)
                                 
                                 # Use correct metrics API endpoint
-                                query_url = f"https://{DD_SITE}/api/v1/query"
+                                query_url = f"{datadog_api_base(DD_SITE)}/api/v1/query"
                                 query_params = {
                                     'query': query_text,
                                     'from': time_ago,
@@ -349,19 +370,20 @@ def get_widget_data_mcp(dashboard_id, time_range="1 week", **kwargs):
                                 }
                                 
                                 try:
-                                    response = requests.get(query_url, headers=headers, params=query_params, verify=get_requests_verify())
-                                    print(f"📈 Response: {response.status_code}")
+                                    response = get_datadog_client().get(query_url, headers=headers, params=query_params)
+                                    logger.debug("📈 Response: %s", response.status_code, extra=VERBOSE)
                                     
                                     if response.status_code == 200:
                                         query_data = response.json()
                                         series = query_data.get('series', [])
-                                        print(f"📊 Found {len(series)} series")
+                                        logger.debug("📊 Found %s series", len(series), extra=VERBOSE)
                                         
                                         if series:
                                             for serie in series:
                                                 pointlist = serie.get('pointlist', [])
                                                 scope = serie.get('scope', 'unknown')
-                                                print(f"   📈 Series: {scope} - {len(pointlist)} points")
+                                                logger.debug("   📈 Series: %s - %s points",
+                                                             scope, len(pointlist), extra=VERBOSE)
                                                 
                                                 if pointlist:
                                                     # Get latest value - THIS IS THE WORKING LOGIC
@@ -380,13 +402,15 @@ def get_widget_data_mcp(dashboard_id, time_range="1 week", **kwargs):
                                                             'data_points_count': len(pointlist)
                                                         })
                                                         
-                                                        print(f"✅ SUCCESS: {latest_value:.2f} at {datetime.fromtimestamp(latest_time/1000)}")
+                                                        logger.debug("✅ SUCCESS: %.2f at %s",
+                                                                     latest_value, datetime.fromtimestamp(latest_time/1000),
+                                                                     extra=VERBOSE)
                                                     else:
-                                                        print(f"⚠️ No valid latest value")
+                                                        logger.debug("⚠️ No valid latest value", extra=VERBOSE)
                                                 else:
-                                                    print(f"⚠️ No data points for series")
+                                                    logger.debug("⚠️ No data points for series", extra=VERBOSE)
                                         else:
-                                            print(f"⚠️ No series data")
+                                            logger.debug("⚠️ No series data", extra=VERBOSE)
                                         
                                         widget_current_data['queries_executed'].append({
                                             'query': query_text,
@@ -396,7 +420,7 @@ def get_widget_data_mcp(dashboard_id, time_range="1 week", **kwargs):
                                         })
                                     else:
                                         error_msg = f"API Error {response.status_code}: {response.text}"
-                                        print(f"❌ {error_msg}")
+                                        logger.error("❌ %s", error_msg)
                                         widget_current_data['queries_executed'].append({
                                             'query': query_text,
                                             'status': 'error',
@@ -405,7 +429,7 @@ def get_widget_data_mcp(dashboard_id, time_range="1 week", **kwargs):
                                         
                                 except Exception as e:
                                     error_msg = f"Exception: {str(e)}"
-                                    print(f"❌ {error_msg}")
+                                    logger.error("❌ %s", error_msg)
                                     widget_current_data['queries_executed'].append({
                                         'query': query_text,
                                         'status': 'error',
@@ -414,16 +438,16 @@ def get_widget_data_mcp(dashboard_id, time_range="1 week", **kwargs):
             else:
                 # Handle non-group widgets (less common but still support them)
                 requests_data = widget_def.get('requests', [])
-                print(f"   📊 Non-group widget has {len(requests_data)} requests")
+                logger.debug("   📊 Non-group widget has %s requests", len(requests_data), extra=VERBOSE)
                 
                 for req in requests_data:
                     queries_array = req.get('queries', [])
                     for query_obj in queries_array:
                         query_text = query_obj.get('query', '')
                         if query_text:
-                            print(f"🚀 EXECUTING: {query_text}")
+                            logger.debug("🚀 EXECUTING: %s", query_text, extra=VERBOSE)
                             
-                            query_url = f"https://{DD_SITE}/api/v1/query"
+                            query_url = f"{datadog_api_base(DD_SITE)}/api/v1/query"
                             query_params = {
                                 'query': query_text,
                                 'from': time_ago,
@@ -431,7 +455,7 @@ def get_widget_data_mcp(dashboard_id, time_range="1 week", **kwargs):
                             }
                             
                             try:
-                                response = requests.get(query_url, headers=headers, params=query_params, verify=get_requests_verify())
+                                response = get_datadog_client().get(query_url, headers=headers, params=query_params)
                                 if response.status_code == 200:
                                     query_data = response.json()
                                     series = query_data.get('series', [])
@@ -454,7 +478,7 @@ def get_widget_data_mcp(dashboard_id, time_range="1 week", **kwargs):
                                                         'data_points_count': len(pointlist)
                                                     })
                                                     
-                                                    print(f"✅ SUCCESS: {latest_value}")
+                                                    logger.debug("✅ SUCCESS: %s", latest_value, extra=VERBOSE)
                                 
                                 widget_current_data['queries_executed'].append({
                                     'query': query_text,
@@ -462,7 +486,7 @@ def get_widget_data_mcp(dashboard_id, time_range="1 week", **kwargs):
                                 })
                                 
                             except Exception as e:
-                                print(f"❌ Error: {str(e)}")
+                                logger.error("❌ Error: %s", str(e))
                                 widget_current_data['queries_executed'].append({
                                     'query': query_text,
                                     'status': 'error',
@@ -477,7 +501,8 @@ def get_widget_data_mcp(dashboard_id, time_range="1 week", **kwargs):
             "data": {
                 'dashboard_info': dashboard,
                 'widgets_current_data': widget_data_results
-            }
+            },
+            **batch.partial()
         }
         
     except Exception as e:
@@ -633,7 +658,7 @@ def analyze_dashboard_mcp(dashboard_id, time_range="1 week", **kwargs):
             })
     
     # Get actual current data from widgets
-    print(f"🔄 MCP: Getting current data from widgets...")
+    logger.info("🔄 MCP: Getting current data from widgets...")
     widget_data_result = get_widget_data_mcp(dashboard_id, time_range=time_range)
     
     current_data_summary = {
@@ -708,5 +733,6 @@ def analyze_dashboard_mcp(dashboard_id, time_range="1 week", **kwargs):
     return {
         "success": True,
         "error": None,
-        "data": dashboard_summary
+        "data": dashboard_summary,
+        **partial_fields(widget_data_result)
     } 
\ No newline at end of file
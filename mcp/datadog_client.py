@@ -0,0 +1,336 @@
+"""
+Shared HTTP client for Datadog API calls.
+
+All MCP tools send their Datadog requests through one pooled
+`requests.Session`. Identical requests that are in flight at the same time
+are coalesced: the first caller (the leader) performs the HTTP call, reads
+the body once, and every concurrent caller with the same method, URL,
+headers, params and JSON body receives a response over that same buffer.
+
+Streamed calls (stream=True, used for large list responses) are only
+buffered when someone actually joined them. If no identical request arrived
+before the response headers, the leader gets the live response and decodes
+the body straight from the socket.
+
+Time-range values (`from`/`to`/`start`/`end`, seconds or milliseconds) are
+aligned to DD_COALESCE_WINDOW seconds when building the coalescing key, so
+two users asking for "the last hour" a second apart share one call.
+
+Upstream calls are paced per endpoint family by mcp.rate_limiter, which
+learns Datadog's X-RateLimit headers and retries 429/5xx with backoff.
+
+Idempotent reads can be hedged (DD_HEDGING, see mcp.hedging): a read still
+running after its endpoint's observed p95 is sent again and the first
+response wins, within a budget of extra calls.
+
+Every call has a timeout: the call site's, or REQUEST_TIMEOUT, capped by the
+deadline of the tool call it belongs to (see deadlines.py). Waits for rate
+limit tokens, coalesced responses and retries also end at that deadline.
+
+Usage:
+    from mcp.datadog_client import get_datadog_client
+
+    response = get_datadog_client().get(url, headers=headers, params=params, timeout=30)
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from dotenv import load_dotenv
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mcp_loader import get_requests_verify
+from mcp.hedging import READ_ONLY_POST_FAMILIES, Hedger
+from mcp.rate_limiter import RateLimiter, RETRY_STATUS_CODES, endpoint_family
+from env_settings import validate_number
+from deadlines import DeadlineExceeded, check_deadline, remaining_time, request_timeout
+from telemetry import DATADOG_METRIC, span
+from tracing import current_span, trace_span
+from yoda_logging import get_logger
+
+load_dotenv()
+
+logger = get_logger(__name__)
+
+_TIME_KEYS = frozenset(['from', 'to', 'start', 'end'])
+# Epoch values above this are milliseconds
+_EPOCH_MS_THRESHOLD = 10 ** 11
+
+
+# Coalescing time-window alignment (seconds); 0 coalesces only byte-identical requests
+DD_COALESCE_WINDOW = validate_number('DD_COALESCE_WINDOW', 5, 0, 300, cast=int)
+DD_HTTP_POOL_SIZE = validate_number('DD_HTTP_POOL_SIZE', 20, 1, 200, cast=int)
+
+
+def datadog_api_base(site):
+    """
+    Base URL for a DD_SITE value
+
+    Examples:
+    - 'api.datadoghq.com' -> 'https://api.datadoghq.com'
+    - 'http://127.0.0.1:8126' -> 'http://127.0.0.1:8126' (local stand-in, see benchmarks/datadog_standin.py)
+    """
+    site = (site or 'api.datadoghq.com').strip().rstrip('/')
+    return site if '://' in site else f"https://{site}"
+
+
+def _align(value, window):
+    """Round an epoch timestamp (s or ms) down to the coalescing window"""
+    if not window or isinstance(value, bool) or not isinstance(value, (int, float)):
+        return value
+    step = window * 1000 if value > _EPOCH_MS_THRESHOLD else window
+    return value - value % step
+
+
+def _freeze(value, window, key=None):
+    """Turn params/JSON bodies into a hashable, order-independent key"""
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), _freeze(v, window, k)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item, window) for item in value)
+    if key in _TIME_KEYS:
+        if isinstance(value, str) and value.isdigit():
+            return str(_align(int(value), window))
+        return _align(value, window)
+    return value
+
+
+class BufferedResponse:
+    """
+    A Datadog response whose body was read once and is shared by coalesced callers
+
+    Offers the subset of requests.Response the tools use: status_code, ok,
+    headers, content, text, json(), iter_content() and close().
+    """
+
+    __slots__ = ('status_code', 'headers', 'content', 'url', 'encoding', 'reason')
+
+    def __init__(self, status_code, headers, content, url, encoding=None, reason=''):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.url = url
+        self.encoding = encoding
+        self.reason = reason
+
+    @classmethod
+    def from_response(cls, response):
+        try:
+            return cls(response.status_code, response.headers, response.content, response.url,
+                       response.encoding, response.reason)
+        finally:
+            response.close()
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding or 'utf-8', errors='replace')
+
+    def json(self):
+        return json.loads(self.content)
+
+    def iter_content(self, chunk_size=1, decode_unicode=False):
+        view = memoryview(self.content)
+        for start in range(0, len(view), chunk_size):
+            yield bytes(view[start:start + chunk_size])
+
+    def close(self):
+        pass
+
+
+class _InFlight:
+    """One upstream call shared by every identical concurrent request"""
+
+    __slots__ = ('done', 'response', 'error', 'waiters')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.response = None
+        self.error = None
+        self.waiters = 0
+
+
+class DatadogClient:
+    """Pooled Datadog HTTP client with single-flight request coalescing"""
+
+    def __init__(self, coalesce_window=None, pool_size=None, rate_limiter=None, hedger=None):
+        self.coalesce_window = DD_COALESCE_WINDOW if coalesce_window is None else coalesce_window
+        self.rate_limiter = rate_limiter or RateLimiter()
+        pool_size = pool_size or DD_HTTP_POOL_SIZE
+        self.hedger = hedger or Hedger(workers=2 * pool_size)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._stats = {'requests': 0, 'upstream_calls': 0, 'coalesced': 0, 'streamed': 0, 'errors': 0}
+
+    def _key(self, method, url, headers, params, json_body):
+        window = self.coalesce_window
+        return (method.upper(), url, _freeze(headers or {}, 0), _freeze(params or {}, window),
+                _freeze(json_body, window))
+
+    def request(self, method, url, headers=None, params=None, json=None, timeout=None, stream=False, coalesce=True):
+        """
+        Send a request, sharing the result with identical in-flight requests
+
+        Args:
+            method (str): HTTP method
+            url (str): Full Datadog API URL
+            headers (dict): Request headers (API/app keys are part of the coalescing key)
+            params (dict): Query parameters
+            json: JSON body
+            timeout: Seconds per connect/read (None uses REQUEST_TIMEOUT); capped by the deadline
+            stream (bool): Leave the body on the socket for iter_content() unless a
+                           coalesced caller has to share it
+            coalesce (bool): Set False to always issue a dedicated call
+
+        Returns:
+            BufferedResponse, or the live requests.Response of a streamed call nobody shared
+            (the caller reads it to the end or closes it)
+        """
+        with trace_span('datadog.request', **{'datadog.endpoint': endpoint_family(url),
+                                              'http.method': method.upper()}) as trace:
+            response = self._request(method, url, headers, params, json, timeout, coalesce, stream)
+            trace.set_attribute('http.status_code', response.status_code)
+            if isinstance(response, BufferedResponse):
+                trace.set_attribute('http.response_bytes', len(response.content or b''))
+            trace.set_attribute('http.streamed', not isinstance(response, BufferedResponse))
+            return response
+
+    def _request(self, method, url, headers, params, json, timeout, coalesce, stream):
+        with self._lock:
+            self._stats['requests'] += 1
+            key = self._key(method, url, headers, params, json) if coalesce else None
+            flight = self._in_flight.get(key) if key is not None else None
+            leader = flight is None
+            if leader:
+                flight = _InFlight()
+                if key is not None:
+                    self._in_flight[key] = flight
+            else:
+                flight.waiters += 1
+                self._stats['coalesced'] += 1
+
+        current_span().set_attribute('datadog.coalesced', not leader)
+        if not leader:
+            if not flight.done.wait(remaining_time()):
+                raise DeadlineExceeded("deadline exceeded waiting for a coalesced Datadog response")
+            if flight.error is not None:
+                raise flight.error
+            return flight.response
+
+        try:
+            response = self._send(method, url, headers, params, json, timeout, stream)
+            if stream:
+                with self._lock:
+                    shared = flight.waiters > 0
+                    if not shared:
+                        # Nobody joined before the headers arrived: later callers start their own call
+                        # and this one reads the body straight from the socket
+                        self._release(key, flight)
+                        self._stats['streamed'] += 1
+                if not shared:
+                    return response
+            flight.response = BufferedResponse.from_response(response)
+            return flight.response
+        except Exception as e:
+            flight.error = e
+            with self._lock:
+                self._stats['errors'] += 1
+            raise
+        finally:
+            with self._lock:
+                self._release(key, flight)
+            flight.done.set()
+
+    def _release(self, key, flight):
+        """Stop new callers from joining `flight` (caller holds the lock)"""
+        if key is not None and self._in_flight.get(key) is flight:
+            del self._in_flight[key]
+
+    def _send(self, method, url, headers, params, json_body, timeout, stream=False):
+        """Paced upstream call with retries on 429/5xx; returns the (unread, if streamed) requests.Response"""
+        family = endpoint_family(url)
+        limiter = self.rate_limiter
+        attempt = 0
+        while True:
+            check_deadline()
+            limiter.acquire(family, max_wait=remaining_time())
+            call_timeout = request_timeout(timeout)
+            with self._lock:
+                self._stats['upstream_calls'] += 1
+            with span(DATADOG_METRIC, endpoint=family, method=method.upper(), status='error') as labels:
+                def send():
+                    return self.session.request(method, url, headers=headers, params=params, json=json_body,
+                                                timeout=call_timeout, verify=get_requests_verify(), stream=stream)
+                if self._hedgeable(method, family):
+                    response = self.hedger.call(
+                        family, send, may_hedge=lambda: self._may_hedge(family),
+                        retryable=lambda hedged: hedged.status_code in RETRY_STATUS_CODES,
+                        on_discard=lambda hedged: limiter.observe(family, hedged.status_code, hedged.headers))
+                else:
+                    response = send()
+                labels['status'] = response.status_code
+            limiter.observe(family, response.status_code, response.headers)
+            current_span().set_attribute('datadog.attempts', attempt + 1)
+            if response.status_code not in RETRY_STATUS_CODES or attempt >= limiter.max_retries:
+                return response
+            delay = limiter.retry_delay(family, attempt, response.status_code, response.headers)
+            if delay >= remaining_time(float('inf')):
+                # No time for another attempt before the deadline - hand back this response
+                return response
+            response.close()
+            logger.warning("⏳ Datadog %s returned %s, retry %s/%s in %.1fs",
+                           family, response.status_code, attempt + 1, limiter.max_retries, delay)
+            time.sleep(delay)
+            attempt += 1
+
+    def _hedgeable(self, method, family):
+        return self.hedger.hedges(family) and (method.upper() == 'GET' or family in READ_ONLY_POST_FAMILIES)
+
+    def _may_hedge(self, family):
+        """A hedge is an extra upstream call: it needs a free rate-limit token"""
+        if not self.rate_limiter.try_acquire(family):
+            return False
+        with self._lock:
+            self._stats['upstream_calls'] += 1
+        return True
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def stats(self):
+        """Return counters: requests, upstream_calls, coalesced, streamed, errors, in_flight, rate_limits, hedging"""
+        with self._lock:
+            stats = dict(self._stats, in_flight=len(self._in_flight))
+        stats['rate_limits'] = self.rate_limiter.stats()
+        stats['hedging'] = self.hedger.stats()
+        return stats
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_datadog_client():
+    """Return the process-wide Datadog client"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = DatadogClient()
+    return _client
@@ -1,4 +1,3 @@
-import requests
 import os
 import sys
 import time
@@ -9,7 +8,11 @@ from colorama import Fore
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from mcp_loader import get_requests_verify
+from mcp.datadog_client import get_datadog_client, datadog_api_base
+from mcp.records import EventRecord
+from yoda_logging import get_logger, VERBOSE
+
+logger = get_logger(__name__)
 
 # Load environment variables
 load_dotenv()
@@ -90,17 +93,17 @@ def search_events_mcp(query="", time_range="1 day", priority=None, sources=None,
         }
     
     try:
-        print(f"🔄 MCP: Searching events with query: '{query}' (time_range: {time_range}, limit: {limit})")
+        logger.info("🔄 MCP: Searching events with query: '%s' (time_range: %s, limit: %s)", query, time_range, limit)
         
         # Parse time range
         time_range_seconds = parse_time_range(time_range)
         now = int(time.time())
         time_ago = now - time_range_seconds
         
-        print(f"🕒 Query time range: {datetime.fromtimestamp(time_ago)} to {datetime.fromtimestamp(now)}")
+        logger.debug("🕒 Query time range: %s to %s", datetime.fromtimestamp(time_ago), datetime.fromtimestamp(now))
         
         # DATADOG EVENTS API CALL
-        url = f"https://{DD_SITE}/api/v1/events"
+        url = f"{datadog_api_base(DD_SITE)}/api/v1/events"
         headers = {
             'DD-API-KEY': DD_API_KEY,
             'DD-APPLICATION-KEY': DD_APP_KEY,
@@ -122,17 +125,17 @@ def search_events_mcp(query="", time_range="1 day", priority=None, sources=None,
         if tags:
             params['tags'] = ','.join(tags)
         
-        response = requests.get(url, headers=headers, params=params, verify=get_requests_verify())
+        response = get_datadog_client().get(url, headers=headers, params=params)
         
         if response.status_code == 200:
             data = response.json()
             events = data.get('events', [])
-            print(f"📥 API Response: {response.status_code} - {len(events)} events received")
-            print(f"🔍 Raw response keys: {list(data.keys())}")
+            logger.debug("📥 API Response: %s - %s events received", response.status_code, len(events))
+            logger.debug("🔍 Raw response keys: %s", list(data.keys()), extra=VERBOSE)
             
             # Filter by text query if provided
             if query.strip():
-                print(f"🔍 Applying text filter for query: '{query}'")
+                logger.debug("🔍 Applying text filter for query: '%s'", query)
                 filtered_events = []
                 query_lower = query.lower()
                 for event in events:
@@ -143,31 +146,17 @@ def search_events_mcp(query="", time_range="1 day", priority=None, sources=None,
                     if query_lower in title or query_lower in text:
                         filtered_events.append(event)
                 events = filtered_events
-                print(f"🎯 After text filtering: {len(events)} events remain")
+                logger.debug("🎯 After text filtering: %s events remain", len(events))
             
             # Limit results
             events = events[:limit]
-            print(f"📊 Final result: {len(events)} events (after limit={limit})")
+            logger.debug("📊 Final result: %s events (after limit=%s)", len(events), limit)
             
             # Format events for easier reading
             formatted_events = []
             for event in events:
-                formatted_event = {
-                    "id": event.get('id'),
-                    "title": event.get('title', ''),
-                    "text": event.get('text', ''),
-                    "date_happened": event.get('date_happened'),
-                    "timestamp": datetime.fromtimestamp(event.get('date_happened', 0)).isoformat() if event.get('date_happened') else None,
-                    "priority": event.get('priority', 'normal'),
-                    "source_type_name": event.get('source_type_name', ''),
-                    "host": event.get('host', ''),
-                    "tags": event.get('tags', []),
-                    "url": event.get('url', ''),
-                    "alert_type": event.get('alert_type', ''),
-                    "aggregation_key": event.get('aggregation_key', ''),
-                    "source": event.get('source', '')
-                }
-                formatted_events.append(formatted_event)
+                timestamp = datetime.fromtimestamp(event.get('date_happened', 0)).isoformat() if event.get('date_happened') else None
+                formatted_events.append(EventRecord(event, timestamp))
             
             return {
                 "success": True,
@@ -0,0 +1,215 @@
+"""
+Hedged requests for idempotent Datadog reads.
+
+A few slow Datadog responses dominate the p99 of metric queries, log
+searches and monitor lists. With hedging on, a read that has not returned
+after its endpoint family's observed p95 latency is sent a second time; the
+first usable response is used and the other one is discarded (requests
+cannot abort a call in flight, so the loser's response is closed when it
+completes and its connection goes back to the pool). A response the caller
+would retry (429/5xx) only wins when the other copy fails too, and the
+discarded copy is still shown to the caller, e.g. to learn its rate-limit
+headers.
+
+Extra load is capped by a budget: every hedgeable request earns
+DD_HEDGE_BUDGET of a hedge token (0.05 = at most ~5% extra requests, plus a
+small burst), and a hedge also needs a free rate-limit token for its family -
+a hedge never waits in the rate limiter's queue.
+
+Settings:
+    DD_HEDGING         true/false (default false)
+    DD_HEDGE_ENDPOINTS endpoint families to hedge (default v1/query,v2/logs,v1/monitor)
+    DD_HEDGE_BUDGET    extra requests allowed, as a fraction of hedgeable requests (default 0.05)
+    DD_HEDGE_MIN_DELAY lower bound for the hedge delay in seconds (default 0.05)
+
+Until a family has _MIN_SAMPLES latencies, its requests are not hedged.
+Hedges, hedge wins and denied hedges (budget or rate limit) are counted per family.
+"""
+
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, TimeoutError as FutureTimeout, wait
+from dotenv import load_dotenv
+
+from env_settings import validate_number
+from tracing import current_span
+
+load_dotenv()
+
+DEFAULT_HEDGE_ENDPOINTS = 'v1/query,v2/logs,v1/monitor'
+# Families whose POSTs are searches (safe to send twice); other POSTs are never hedged
+READ_ONLY_POST_FAMILIES = frozenset({'v2/logs'})
+# Latencies kept per family for the p95 estimate
+_LATENCY_WINDOW = 200
+_MIN_SAMPLES = 20
+# Hedge tokens that can be saved up for a burst of slow responses
+_BUDGET_BURST = 5.0
+
+
+DD_HEDGING = os.getenv('DD_HEDGING', 'false').lower() in ('true', '1', 'yes', 'on')
+DD_HEDGE_ENDPOINTS = frozenset(family.strip() for family in
+                               os.getenv('DD_HEDGE_ENDPOINTS', DEFAULT_HEDGE_ENDPOINTS).split(',') if family.strip())
+DD_HEDGE_BUDGET = validate_number('DD_HEDGE_BUDGET', 0.05, 0.0, 1.0)
+DD_HEDGE_MIN_DELAY = validate_number('DD_HEDGE_MIN_DELAY', 0.05, 0.0, 60.0)
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def _discard(future, on_discard):
+    """Hand the losing copy's response to `on_discard`, then close it"""
+    if future.cancelled() or future.exception() is not None:
+        return
+    response = future.result()[0]
+    try:
+        if on_discard is not None:
+            on_discard(response)
+    finally:
+        response.close()
+
+
+class _FamilyStats:
+    __slots__ = ('latencies', 'requests', 'hedged', 'hedge_wins', 'denied')
+
+    def __init__(self):
+        self.latencies = deque(maxlen=_LATENCY_WINDOW)
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.denied = 0
+
+
+class Hedger:
+    """Races a duplicate of slow idempotent reads against the original"""
+
+    def __init__(self, enabled=None, endpoints=None, budget=None, min_delay=None, workers=32):
+        self.enabled = DD_HEDGING if enabled is None else enabled
+        self.endpoints = DD_HEDGE_ENDPOINTS if endpoints is None else frozenset(endpoints)
+        self.budget = DD_HEDGE_BUDGET if budget is None else budget
+        self.min_delay = DD_HEDGE_MIN_DELAY if min_delay is None else min_delay
+        self._workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+        self._families = {}
+        self._tokens = 1.0
+
+    def _family(self, family):
+        stats = self._families.get(family)
+        if stats is None:
+            stats = self._families[family] = _FamilyStats()
+        return stats
+
+    def hedges(self, family):
+        return self.enabled and family in self.endpoints
+
+    def hedge_delay(self, family):
+        """Seconds to wait before hedging: the family's observed p95 (None while too few samples)"""
+        with self._lock:
+            latencies = list(self._family(family).latencies)
+        if len(latencies) < _MIN_SAMPLES:
+            return None
+        return max(self.min_delay, _percentile(latencies, 95))
+
+    def _timed(self, family, send):
+        start = time.perf_counter()
+        response = send()
+        seconds = time.perf_counter() - start
+        with self._lock:
+            self._family(family).latencies.append(seconds)
+        return response, seconds
+
+    def _take_budget(self, family, may_hedge):
+        with self._lock:
+            if self._tokens >= 1 and (may_hedge is None or may_hedge()):
+                self._tokens -= 1
+                self._family(family).hedged += 1
+                return True
+            self._family(family).denied += 1
+            return False
+
+    def _pool(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix='yoda-hedge')
+        return self._executor
+
+    def _submit(self, family, send):
+        # Copy the caller's context so the call stays in its trace span
+        return self._pool().submit(contextvars.copy_context().run, self._timed, family, send)
+
+    def call(self, family, send, may_hedge=None, retryable=None, on_discard=None):
+        """
+        Run `send()` (one HTTP call), hedging it if it is slower than the family's p95
+
+        Args:
+            family (str): Endpoint family of the request
+            send: Zero-argument function performing the request
+            may_hedge: Optional check (e.g. a free rate-limit token) that must pass to send a hedge
+            retryable: Optional check for responses that should not win while the other copy may succeed
+            on_discard: Optional callback receiving the response of the copy that was not used
+
+        Returns:
+            The first usable response (else the first response, else the primary's error is raised)
+        """
+        if not self.hedges(family):
+            return send()
+        with self._lock:
+            self._family(family).requests += 1
+            self._tokens = min(_BUDGET_BURST, self._tokens + self.budget)
+        delay = self.hedge_delay(family)
+        if delay is None:
+            return self._timed(family, send)[0]
+
+        primary = self._submit(family, send)
+        try:
+            return primary.result(timeout=delay)[0]
+        except FutureTimeout:
+            pass
+        if not self._take_budget(family, may_hedge):
+            return primary.result()[0]
+
+        hedge = self._submit(family, send)
+        current_span().set_attribute('datadog.hedged', True)
+        done, _ = wait([primary, hedge], return_when=FIRST_COMPLETED)
+        first = primary if primary in done else hedge
+        other = hedge if first is primary else primary
+
+        def usable(future):
+            return future.exception() is None and not (retryable and retryable(future.result()[0]))
+
+        # An error or a retryable status only wins if the other copy does no better
+        winner = first
+        if not usable(first):
+            wait([other])
+            if usable(other) or first.exception() is not None:
+                winner = other
+        if winner.exception() is not None:
+            return primary.result()[0]
+        loser = other if winner is first else first
+        loser.add_done_callback(lambda future: _discard(future, on_discard))
+        if winner is hedge:
+            with self._lock:
+                self._family(family).hedge_wins += 1
+            current_span().set_attribute('datadog.hedge_won', True)
+        return winner.result()[0]
+
+    def stats(self):
+        """Return {family: {requests, hedged, hedge_wins, denied, p95_seconds}} for hedged families"""
+        with self._lock:
+            snapshot = {}
+            for family, stats in self._families.items():
+                latencies = list(stats.latencies)
+                snapshot[family] = {
+                    "requests": stats.requests,
+                    "hedged": stats.hedged,
+                    "hedge_wins": stats.hedge_wins,
+                    "denied": stats.denied,
+                    "p95_seconds": round(_percentile(latencies, 95), 4) if latencies else None,
+                }
+            return snapshot
@@ -0,0 +1,162 @@
+"""
+Incremental JSON decoding for large Datadog responses.
+
+Datadog list endpoints return one big array (logs `data`, metric `series`,
+the monitor list itself). Instead of `response.json()` materializing the
+whole object graph before we reformat it, these helpers decode one array
+element at a time straight from `response.iter_content()`, so callers can
+build their formatted records while the raw element is discarded.
+
+Only the standard library is used: elements are decoded with
+`json.JSONDecoder.raw_decode` over a rolling text buffer.
+"""
+
+import codecs
+import json
+
+STREAM_CHUNK_SIZE = 64 * 1024
+_WHITESPACE = ' \t\n\r'
+
+
+class _JSONStreamReader:
+    """Rolling text buffer over an iterator of byte chunks"""
+
+    def __init__(self, byte_chunks):
+        self._chunks = iter(byte_chunks)
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._json = json.JSONDecoder()
+        self.buf = ''
+        self.pos = 0
+        self.exhausted = False
+
+    def _fill(self):
+        """Append the next chunk to the buffer. Returns False at end of stream."""
+        if self.exhausted:
+            return False
+        # Drop the consumed prefix so the buffer only holds unread text
+        if self.pos:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        for chunk in self._chunks:
+            if not chunk:
+                continue
+            text = self._decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+            if text:
+                self.buf += text
+                return True
+        self.buf += self._decoder.decode(b'', final=True)
+        self.exhausted = True
+        return False
+
+    def peek(self):
+        """Return the next non-whitespace character without consuming it ('' at EOF)"""
+        while True:
+            buf = self.buf
+            pos = self.pos
+            length = len(buf)
+            while pos < length and buf[pos] in _WHITESPACE:
+                pos += 1
+            self.pos = pos
+            if pos < length:
+                return buf[pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected '{char}' in JSON stream, found '{found or 'EOF'}'")
+        self.pos += 1
+
+    def _complete(self, end):
+        """True when the value decoded up to `end` cannot continue in the next chunk"""
+        buf = self.buf
+        # Strings, arrays and objects end with their closing delimiter
+        if buf[end - 1] in '"]}':
+            return True
+        # A number or literal is only complete once a delimiter follows it:
+        # '2.' or '1e' at the buffer end decodes as 2 or 1 but may continue
+        length = len(buf)
+        while end < length and buf[end] in _WHITESPACE:
+            end += 1
+        return end < length and buf[end] in ',]}'
+
+    def decode_value(self):
+        """Decode one complete JSON value starting at the next non-whitespace char"""
+        self.peek()
+        needed = 0
+        while True:
+            available = len(self.buf) - self.pos
+            if available >= needed:
+                try:
+                    value, end = self._json.raw_decode(self.buf, self.pos)
+                    if self.exhausted or self._complete(end):
+                        self.pos = end
+                        return value
+                except json.JSONDecodeError:
+                    if self.exhausted:
+                        raise
+                # Grow geometrically so very large values are not re-parsed per chunk
+                needed = max(available * 2, 1)
+            if not self._fill():
+                value, end = self._json.raw_decode(self.buf, self.pos)
+                self.pos = end
+                return value
+
+    def iter_array_items(self):
+        """Yield elements of an array whose opening '[' was already consumed"""
+        while True:
+            char = self.peek()
+            if char == ']':
+                self.pos += 1
+                return
+            if char == ',':
+                self.pos += 1
+                continue
+            if char == '':
+                raise ValueError("Unexpected end of JSON stream inside array")
+            yield self.decode_value()
+
+
+def iter_json_array(response, array_key=None, extra=None, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Yield the elements of a JSON array from a streamed HTTP response
+
+    Args:
+        response: requests.Response (ideally requested with stream=True)
+        array_key (str): Top-level key holding the array (e.g. 'data', 'series').
+                         None when the body itself is an array (e.g. monitor list).
+        extra (dict): Optional dict that receives every other top-level key.
+                      Only complete once the generator has been fully consumed.
+        chunk_size (int): Bytes read from the socket per chunk
+
+    Examples:
+        for log in iter_json_array(response, 'data', extra=meta_holder): ...
+        for monitor in iter_json_array(response): ...
+    """
+    reader = _JSONStreamReader(response.iter_content(chunk_size=chunk_size))
+
+    if array_key is None:
+        reader.expect('[')
+        yield from reader.iter_array_items()
+        return
+
+    reader.expect('{')
+    while True:
+        char = reader.peek()
+        if char == '}' or char == '':
+            return
+        if char == ',':
+            reader.pos += 1
+            continue
+
+        key = reader.decode_value()
+        reader.expect(':')
+
+        if key == array_key and reader.peek() == '[':
+            reader.pos += 1
+            yield from reader.iter_array_items()
+        else:
+            value = reader.decode_value()
+            if extra is not None:
+                extra[key] = value
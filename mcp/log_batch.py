@@ -0,0 +1,202 @@
+"""
+Columnar batch of log records for analytics.
+
+`LogBatch.from_logs()` loads the output of `search_logs_mcp` into columns:
+categorical fields (status, service, source, host, message prefix) are
+interned into integer codes held in `array('i')`, and timestamps become
+int64 epoch milliseconds in `array('q')` plus the UTC offset each one is
+displayed in. Distributions and the hourly histogram are then single
+`collections.Counter` passes over those arrays.
+"""
+
+from array import array
+from collections import Counter
+from datetime import datetime, timezone
+from operator import attrgetter
+
+from mcp.records import LogRecord
+
+CATEGORY_COLUMNS = ('status', 'service', 'source', 'host')
+MESSAGE_KEY_LENGTH = 100
+MISSING_TIMESTAMP = -(1 << 63)
+_MS_PER_HOUR = 3600 * 1000
+
+
+class _Interner:
+    """Maps values to dense integer codes in first-seen order"""
+
+    __slots__ = ('codes', 'values')
+
+    def __init__(self):
+        self.codes = {}
+        self.values = []
+
+    def code(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(value)
+        return code
+
+
+class _TimestampParser:
+    """
+    Converts Datadog timestamps to epoch milliseconds
+
+    ISO strings such as '2024-05-01T12:34:56.789Z' are parsed by slicing:
+    the epoch of each 'YYYY-MM-DDTHH' prefix is computed once and cached,
+    only minutes/seconds/millis are parsed per log. Anything else goes
+    through datetime.fromisoformat.
+
+    Each timestamp also gets the UTC offset (ms) its hour is labelled in, as
+    the per-log timeline did: the string's own offset (none for 'Z' or naive
+    strings) and the local timezone for numeric epoch milliseconds.
+    """
+
+    def __init__(self):
+        self._hour_cache = {}
+        self._local_offsets = {}
+
+    def to_epoch_ms(self, value):
+        if not value:
+            return MISSING_TIMESTAMP
+        if not isinstance(value, str):
+            # Numeric timestamps are already epoch milliseconds
+            try:
+                return int(value)
+            except (TypeError, ValueError):
+                return MISSING_TIMESTAMP
+        try:
+            if len(value) >= 20 and value[-1] == 'Z' and value[13] == ':' and value[16] == ':':
+                hour_ms = self._hour_cache.get(value[:13])
+                if hour_ms is None:
+                    hour_dt = datetime.strptime(value[:13], '%Y-%m-%dT%H').replace(tzinfo=timezone.utc)
+                    hour_ms = int(hour_dt.timestamp()) * 1000
+                    self._hour_cache[value[:13]] = hour_ms
+                millis = 0
+                if value[19] == '.':
+                    millis = int((value[20:-1] + '000')[:3])
+                return hour_ms + int(value[14:16]) * 60000 + int(value[17:19]) * 1000 + millis
+            dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+            if dt.tzinfo is None:
+                dt = dt.replace(tzinfo=timezone.utc)
+            return int(dt.timestamp() * 1000)
+        except ValueError:
+            return MISSING_TIMESTAMP
+
+    def utc_offset_ms(self, value):
+        """Offset of the wall-clock time `value` is displayed in ('Z' and naive strings: 0)"""
+        if not value:
+            return 0
+        if not isinstance(value, str):
+            try:
+                hour = int(value) // _MS_PER_HOUR
+            except (TypeError, ValueError):
+                return 0
+            offset = self._local_offsets.get(hour)
+            if offset is None:
+                local = datetime.fromtimestamp(hour * 3600, tz=timezone.utc).astimezone()
+                offset = int(local.utcoffset().total_seconds()) * 1000
+                self._local_offsets[hour] = offset
+            return offset
+        if value[-1] == 'Z':
+            return 0
+        try:
+            offset = datetime.fromisoformat(value).utcoffset()
+        except ValueError:
+            return 0
+        return int(offset.total_seconds()) * 1000 if offset else 0
+
+
+def _column_values(logs, field, default):
+    """Pull one field from every log, reading slots directly for LogRecords"""
+    if all(type(log) is LogRecord for log in logs):
+        return list(map(attrgetter(field), logs))
+    return [log.get(field, default) for log in logs]
+
+
+def _count_codes(codes, size):
+    """Return a list of occurrence counts for codes 0..size-1"""
+    if not size:
+        return []
+    counter = Counter(codes)
+    return [counter.get(code, 0) for code in range(size)]
+
+
+class LogBatch:
+    """
+    Columnar view over a list of log records (LogRecord or dict)
+
+    Attributes:
+        size (int): Number of logs loaded
+        columns (dict): Column name -> array('i') of interned codes
+        vocabularies (dict): Column name -> list of distinct values (index = code)
+        timestamps (array): array('q') of epoch ms, MISSING_TIMESTAMP when absent/unparseable
+        utc_offsets (array): array('i') of the UTC offset (ms) each timestamp is labelled in
+    """
+
+    def __init__(self):
+        self.size = 0
+        self.columns = {name: array('i') for name in CATEGORY_COLUMNS + ('message_key',)}
+        self._interners = {name: _Interner() for name in self.columns}
+        self.timestamps = array('q')
+        self.utc_offsets = array('i')
+        self._timestamp_parser = _TimestampParser()
+
+    @classmethod
+    def from_logs(cls, logs):
+        """Build a batch from `search_logs_mcp` results"""
+        batch = cls()
+        batch.extend(logs)
+        return batch
+
+    def extend(self, logs):
+        """Append logs to the batch"""
+        logs = list(logs)
+        for name in CATEGORY_COLUMNS:
+            self._append_codes(name, _column_values(logs, name, 'unknown'))
+        messages = _column_values(logs, 'message', None)
+        self._append_codes('message_key', [(message or '')[:MESSAGE_KEY_LENGTH] for message in messages])
+        stamps = _column_values(logs, 'timestamp', None)
+        self.timestamps.extend(map(self._timestamp_parser.to_epoch_ms, stamps))
+        self.utc_offsets.extend(map(self._timestamp_parser.utc_offset_ms, stamps))
+        self.size += len(logs)
+
+    def _append_codes(self, column, values):
+        interner = self._interners[column]
+        # dict.fromkeys keeps first-seen order, so new values are interned in C
+        for value in dict.fromkeys(values):
+            interner.code(value)
+        self.columns[column].extend(map(interner.codes.__getitem__, values))
+
+    @property
+    def vocabularies(self):
+        return {name: interner.values for name, interner in self._interners.items()}
+
+    def distribution(self, column):
+        """
+        Count occurrences of each value of a categorical column
+
+        Returns a {value: count} dict in first-seen order.
+        """
+        values = self._interners[column].values
+        counts = _count_codes(self.columns[column], len(values))
+        return {value: count for value, count in zip(values, counts) if count}
+
+    def hourly_histogram(self):
+        """
+        Count logs per wall-clock hour
+
+        Hours are labelled as the per-log timeline did: ISO strings in their
+        own offset (UTC for Datadog's 'Z'), epoch milliseconds in local time.
+        Returns a chronologically ordered {'YYYY-MM-DD HH:00': count} dict.
+        Logs without a parseable timestamp are skipped.
+        """
+        buckets = sorted(Counter((stamp + offset) // _MS_PER_HOUR
+                                 for stamp, offset in zip(self.timestamps, self.utc_offsets)
+                                 if stamp != MISSING_TIMESTAMP).items())
+        return {
+            datetime.fromtimestamp(hour * 3600, tz=timezone.utc).strftime('%Y-%m-%d %H:00'): count
+            for hour, count in buckets
+        }
@@ -1,15 +1,20 @@
-import requests
 import os
 import sys
 import time
-import json
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 from colorama import Fore
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from mcp_loader import get_requests_verify
+from mcp.datadog_client import get_datadog_client, datadog_api_base
+from mcp.json_stream import iter_json_array
+from mcp.records import LogRecord
+from mcp.log_batch import LogBatch
+from mcp.cache import get_cache, CacheLoadError
+from yoda_logging import get_logger, preview, VERBOSE
+
+logger = get_logger(__name__)
 
 # Load environment variables
 load_dotenv()
@@ -17,10 +22,6 @@ DD_API_KEY = os.getenv('DD_API_KEY')
 DD_APP_KEY = os.getenv('DD_APP_KEY')
 DD_SITE = os.getenv('DD_SITE', 'api.datadoghq.com')
 
-# Cache configuration
-CACHE_FILE = 'services_cache.json'
-CACHE_DURATION_HOURS = 4  # Cache expires after 4 hours
-
 def parse_time_range(time_range_str="1 hour"):
     """
     Parse time range string and return seconds ago from now.
@@ -92,7 +93,7 @@ def search_logs_mcp(query="", time_range="1 hour", limit=100, sort="desc", **kwa
         }
     
     try:
-        print(f"🔄 MCP: Searching logs with query: '{query}' (time_range: {time_range}, limit: {limit})")
+        logger.info("🔄 MCP: Searching logs with query: '%s' (time_range: %s, limit: %s)", query, time_range, limit)
         
         # Parse time range
         time_range_seconds = parse_time_range(time_range)
@@ -103,11 +104,11 @@ def search_logs_mcp(query="", time_range="1 hour", limit=100, sort="desc", **kwa
         time_from = time_ago * 1000
         time_to = now * 1000
         
-        print(f"🕒 Query time range: {datetime.fromtimestamp(time_ago)} to {datetime.fromtimestamp(now)}")
+        logger.debug("🕒 Query time range: %s to %s", datetime.fromtimestamp(time_ago), datetime.fromtimestamp(now))
         
         # DATADOG LOGS API CALL
-        url = f"https://{DD_SITE}/api/v2/logs/events/search"
-        print(f"🌐 API URL: {url}")
+        url = f"{datadog_api_base(DD_SITE)}/api/v2/logs/events/search"
+        logger.debug("🌐 API URL: %s", url)
         
         headers = {
             'DD-API-KEY': DD_API_KEY,
@@ -132,34 +133,22 @@ def search_logs_mcp(query="", time_range="1 hour", limit=100, sort="desc", **kwa
         if query.strip():
             payload["filter"]["query"] = query
         
-        print(f"📋 API Payload: {payload}")
+        logger.debug("📋 API Payload: %s", preview(payload), extra=VERBOSE)
         
-        response = requests.post(url, headers=headers, json=payload, verify=get_requests_verify())
+        response = get_datadog_client().post(url, headers=headers, json=payload, stream=True)
         
         if response.status_code == 200:
-            data = response.json()
-            logs = data.get('data', [])
-            print(f"📥 API Response: {response.status_code} - {len(logs)} logs received")
-            print(f"🔍 Raw response keys: {list(data.keys())}")
-            
-            # Format log entries for easier reading
+            # Decode log entries one at a time and format them as they arrive
+            response_extra = {}
             formatted_logs = []
-            for log in logs:
-                attributes = log.get('attributes', {})
-                formatted_log = {
-                    "timestamp": attributes.get('timestamp'),
-                    "message": attributes.get('message', ''),
-                    "status": attributes.get('status', ''),
-                    "service": attributes.get('service', ''),
-                    "source": attributes.get('source', ''),
-                    "host": attributes.get('host', ''),
-                    "tags": attributes.get('tags', []),
-                    "attributes": {k: v for k, v in attributes.items() 
-                                if k not in ['timestamp', 'message', 'status', 'service', 'source', 'host', 'tags']}
-                }
-                formatted_logs.append(formatted_log)
+            for log in iter_json_array(response, 'data', extra=response_extra):
+                formatted_logs.append(LogRecord(log.get('attributes', {})))
+            response.close()
+            
+            logger.debug("📥 API Response: %s - %s logs received", response.status_code, len(formatted_logs))
+            logger.debug("🔍 Raw response keys: %s", ['data'] + list(response_extra.keys()), extra=VERBOSE)
             
-            meta = data.get('meta', {})
+            meta = response_extra.get('meta', {})
             
             return {
                 "success": True,
@@ -255,51 +244,26 @@ def analyze_log_patterns_mcp(query="", time_range="1 hour", **kwargs):
     
     insights = []
     
+    # Distributions and timeline are counted over interned columns
+    batch = LogBatch.from_logs(logs)
+    patterns["status_distribution"] = batch.distribution('status')
+    patterns["service_distribution"] = batch.distribution('service')
+    patterns["source_distribution"] = batch.distribution('source')
+    patterns["host_distribution"] = batch.distribution('host')
+    patterns["common_messages"] = batch.distribution('message_key')
+    patterns["timeline"] = batch.hourly_histogram()
+    
+    # Error patterns
     for log in logs:
-        # Status distribution
-        status = log.get('status', 'unknown')
-        patterns["status_distribution"][status] = patterns["status_distribution"].get(status, 0) + 1
-        
-        # Service distribution
-        service = log.get('service', 'unknown')
-        patterns["service_distribution"][service] = patterns["service_distribution"].get(service, 0) + 1
-        
-        # Source distribution
-        source = log.get('source', 'unknown')
-        patterns["source_distribution"][source] = patterns["source_distribution"].get(source, 0) + 1
-        
-        # Host distribution
-        host = log.get('host', 'unknown')
-        patterns["host_distribution"][host] = patterns["host_distribution"].get(host, 0) + 1
-        
-        # Error patterns
         message = log.get('message') or ''
-        message_lower = message.lower() if message else ''
+        message_lower = message.lower()
         if any(error_word in message_lower for error_word in ['error', 'exception', 'failed', 'timeout', 'crash']):
             patterns["error_patterns"].append({
                 "timestamp": log.get('timestamp'),
-                "service": service,
+                "service": log.get('service', 'unknown'),
                 "message": message,
-                "status": status
+                "status": log.get('status', 'unknown')
             })
-        
-        # Common messages (first 100 chars)
-        message_key = log.get('message', '')[:100]
-        patterns["common_messages"][message_key] = patterns["common_messages"].get(message_key, 0) + 1
-        
-        # Timeline (group by hour)
-        if log.get('timestamp'):
-            try:
-                # Parse timestamp
-                if isinstance(log['timestamp'], str):
-                    dt = datetime.fromisoformat(log['timestamp'].replace('Z', '+00:00'))
-                else:
-                    dt = datetime.fromtimestamp(log['timestamp'] / 1000)
-                
-                hour_key = dt.strftime('%Y-%m-%d %H:00')
-                patterns["timeline"][hour_key] = patterns["timeline"].get(hour_key, 0) + 1
-            except:
-                pass
     
     # Generate insights
     total_logs = len(logs)
@@ -368,6 +332,124 @@ def search_error_logs_mcp(time_range="1 hour", limit=100, service=None, **kwargs
     
     return search_logs_mcp(query=error_query, time_range=time_range, limit=limit, **kwargs) 
 
+def _discover_services(time_range):
+    """
+    Fetch recent logs and build the activity-sorted service list (cache loader)
+    
+    Args:
+        time_range (str): Time range to look for active services
+    
+    Raises:
+        CacheLoadError: When the Datadog Logs API call fails
+    """
+    # Parse time range
+    time_range_seconds = parse_time_range(time_range)
+    now = int(time.time())
+    time_ago = now - time_range_seconds
+    
+    # Get services from logs (most comprehensive)
+    url = f"{datadog_api_base(DD_SITE)}/api/v2/logs/events/search"
+    headers = {
+        'DD-API-KEY': DD_API_KEY,
+        'DD-APPLICATION-KEY': DD_APP_KEY,
+        'Content-Type': 'application/json'
+    }
+    
+    # Query to get logs and extract services
+    payload = {
+        "filter": {
+            "from": time_ago * 1000,  # Convert to milliseconds
+            "to": now * 1000,
+            "query": "*"  # Get all logs
+        },
+        "page": {
+            "limit": 1000  # Get many logs to find services
+        },
+        "sort": "timestamp:desc"
+    }
+    
+    response = get_datadog_client().post(url, headers=headers, json=payload)
+    
+    if response.status_code != 200:
+        raise CacheLoadError(f"Datadog Logs API error: {response.status_code} - {response.text}")
+    
+    data = response.json()
+    logs = data.get('data', [])
+    logger.debug("📥 API Response: %s - %s logs received for service discovery", response.status_code, len(logs))
+    
+    # Extract services from logs
+    services_count = {}
+    services_info = {}
+    
+    for log in logs:
+        # Get service from log attributes
+        service = None
+        attributes = log.get('attributes', {})
+        
+        # Try different ways to get service name
+        if 'service' in attributes:
+            service = attributes['service']
+        elif 'tags' in attributes:
+            # Look for service tag
+            for tag in attributes['tags']:
+                if tag.startswith('service:'):
+                    service = tag.replace('service:', '')
+                    break
+        
+        if service and service.strip():
+            service = service.strip()
+            services_count[service] = services_count.get(service, 0) + 1
+            
+            # Store additional info about the service
+            if service not in services_info:
+                services_info[service] = {
+                    'name': service,
+                    'log_count': 0,
+                    'hosts': set(),
+                    'last_seen': None,
+                    'environments': set()
+                }
+            
+            services_info[service]['log_count'] += 1
+            
+            # Add host info
+            host = attributes.get('host', '')
+            if host:
+                services_info[service]['hosts'].add(host)
+            
+            # Add environment info
+            env = attributes.get('env', '')
+            if env:
+                services_info[service]['environments'].add(env)
+            
+            # Update last seen
+            timestamp = log.get('timestamp')
+            if timestamp and (not services_info[service]['last_seen'] or timestamp > services_info[service]['last_seen']):
+                services_info[service]['last_seen'] = timestamp
+    
+    # Convert sets to lists for JSON serialization and sort by activity.
+    # The full list is cached; callers apply their own limit.
+    sorted_services = sorted(services_count.items(), key=lambda x: x[1], reverse=True)
+    
+    service_list = []
+    for service_name, count in sorted_services:
+        info = services_info[service_name]
+        service_data = {
+            'name': service_name,
+            'log_count': count,
+            'host_count': len(info['hosts']),
+            'hosts': list(info['hosts'])[:5],  # Limit hosts shown
+            'environments': list(info['environments']),
+            'last_seen': info['last_seen'],
+            'activity_level': 'high' if count > 1000 else 'medium' if count > 100 else 'low'
+        }
+        service_list.append(service_data)
+    
+    return {
+        'services': service_list,
+        'total_logs': len(logs)
+    }
+
 def get_available_services_mcp(time_range="1 day", limit=50, force_refresh=False, **kwargs):
     """
     MCP Function to discover available services with recent activity (with intelligent caching)
@@ -387,175 +469,45 @@ def get_available_services_mcp(time_range="1 day", limit=50, force_refresh=False
         }
     
     try:
-        print(f"🔍 MCP: Discovering available services with activity in {time_range}")
-        
-        # Check cache first (unless force refresh)
-        if not force_refresh and os.path.exists(CACHE_FILE):
-            try:
-                with open(CACHE_FILE, 'r') as f:
-                    cache_data = json.load(f)
-                
-                cache_age_hours = (datetime.now() - datetime.fromtimestamp(cache_data['timestamp'])).total_seconds() / 3600
-                
-                # Check if cache is fresh
-                if 'timestamp' in cache_data and cache_age_hours < CACHE_DURATION_HOURS:
-                    print(f"✅ Using cached services from {datetime.fromtimestamp(cache_data['timestamp']).strftime('%Y-%m-%d %H:%M:%S')} (age: {cache_age_hours:.1f}h)")
-                    
-                    # Apply limit to cached data
-                    limited_services = cache_data['services'][:limit]
-                    
-                    return {
-                        "success": True,
-                        "error": None,
-                        "data": limited_services,
-                        "discovery_info": {
-                            "total_services_found": len(cache_data['services']),
-                            "returned_services": len(limited_services),
-                            "time_range": time_range,
-                            "logs_analyzed": cache_data.get('total_logs', 0),
-                            "discovery_method": "cache",
-                            "cache_age_hours": round(cache_age_hours, 1)
-                        }
-                    }
-                else:
-                    print(f"⚠️ Cache expired ({cache_age_hours:.1f}h old, max {CACHE_DURATION_HOURS}h). Refreshing from API.")
-            except Exception as e:
-                print(f"⚠️ Error loading cache: {e}. Refreshing from API.")
-        elif force_refresh:
-            print(f"🔄 Force refresh requested. Fetching fresh data from API.")
+        logger.info("🔍 MCP: Discovering available services with activity in %s", time_range)
+        if force_refresh:
+            logger.debug("🔄 Force refresh requested. Fetching fresh data from API.")
         
-        # Parse time range
-        time_range_seconds = parse_time_range(time_range)
-        now = int(time.time())
-        time_ago = now - time_range_seconds
-        
-        # Get services from logs (most comprehensive)
-        url = f"https://{DD_SITE}/api/v2/logs/events/search"
-        headers = {
-            'DD-API-KEY': DD_API_KEY,
-            'DD-APPLICATION-KEY': DD_APP_KEY,
-            'Content-Type': 'application/json'
-        }
-        
-        # Query to get logs and extract services
-        payload = {
-            "filter": {
-                "from": time_ago * 1000,  # Convert to milliseconds
-                "to": now * 1000,
-                "query": "*"  # Get all logs
-            },
-            "page": {
-                "limit": 1000  # Get many logs to find services
-            },
-            "sort": "timestamp:desc"
-        }
-        
-        response = requests.post(url, headers=headers, json=payload, verify=get_requests_verify())
-        
-        if response.status_code == 200:
-            data = response.json()
-            logs = data.get('data', [])
-            print(f"📥 API Response: {response.status_code} - {len(logs)} logs received for service discovery")
-            
-            # Extract services from logs
-            services_count = {}
-            services_info = {}
-            
-            for log in logs:
-                # Get service from log attributes
-                service = None
-                attributes = log.get('attributes', {})
-                
-                # Try different ways to get service name
-                if 'service' in attributes:
-                    service = attributes['service']
-                elif 'tags' in attributes:
-                    # Look for service tag
-                    for tag in attributes['tags']:
-                        if tag.startswith('service:'):
-                            service = tag.replace('service:', '')
-                            break
-                
-                if service and service.strip():
-                    service = service.strip()
-                    services_count[service] = services_count.get(service, 0) + 1
-                    
-                    # Store additional info about the service
-                    if service not in services_info:
-                        services_info[service] = {
-                            'name': service,
-                            'log_count': 0,
-                            'hosts': set(),
-                            'last_seen': None,
-                            'environments': set()
-                        }
-                    
-                    services_info[service]['log_count'] += 1
-                    
-                    # Add host info
-                    host = attributes.get('host', '')
-                    if host:
-                        services_info[service]['hosts'].add(host)
-                    
-                    # Add environment info
-                    env = attributes.get('env', '')
-                    if env:
-                        services_info[service]['environments'].add(env)
-                    
-                    # Update last seen
-                    timestamp = log.get('timestamp')
-                    if timestamp and (not services_info[service]['last_seen'] or timestamp > services_info[service]['last_seen']):
-                        services_info[service]['last_seen'] = timestamp
-            
-            # Convert sets to lists for JSON serialization and sort by activity
-            sorted_services = sorted(services_count.items(), key=lambda x: x[1], reverse=True)[:limit]
-            
-            service_list = []
-            for service_name, count in sorted_services:
-                info = services_info[service_name]
-                service_data = {
-                    'name': service_name,
-                    'log_count': count,
-                    'host_count': len(info['hosts']),
-                    'hosts': list(info['hosts'])[:5],  # Limit hosts shown
-                    'environments': list(info['environments']),
-                    'last_seen': info['last_seen'],
-                    'activity_level': 'high' if count > 1000 else 'medium' if count > 100 else 'low'
-                }
-                service_list.append(service_data)
-            
-            # Save to cache
-            cache_data = {
-                'timestamp': int(time.time()),
-                'services': service_list,
-                'total_logs': len(logs)
-            }
-            try:
-                with open(CACHE_FILE, 'w') as f:
-                    json.dump(cache_data, f, indent=4)
-                print(f"✅ Services cached to {CACHE_FILE}")
-            except Exception as e:
-                print(f"⚠️ Error saving cache: {e}")
-
-            return {
-                "success": True,
-                "error": None,
-                "data": service_list,
-                "discovery_info": {
-                    "total_services_found": len(services_count),
-                    "returned_services": len(service_list),
-                    "time_range": time_range,
-                    "logs_analyzed": len(logs),
-                    "discovery_method": "logs_analysis"
-                }
-            }
-            
-        else:
+        try:
+            lookup = get_cache().get_or_load('services', time_range, lambda: _discover_services(time_range),
+                                             force_refresh=force_refresh, keep_warm=True)
+        except CacheLoadError as e:
             return {
                 "success": False,
-                "error": f"Datadog Logs API error: {response.status_code} - {response.text}",
+                "error": str(e),
                 "data": []
             }
+        
+        cached = lookup.value
+        limited_services = cached['services'][:limit]
+        discovery_info = {
+            "total_services_found": len(cached['services']),
+            "returned_services": len(limited_services),
+            "time_range": time_range,
+            "logs_analyzed": cached.get('total_logs', 0),
+            "discovery_method": "cache" if lookup.from_cache else "logs_analysis"
+        }
+        
+        if lookup.from_cache:
+            cache_age_hours = lookup.age_seconds / 3600
+            discovery_info["cache_age_hours"] = round(cache_age_hours, 1)
+            logger.debug("✅ Using cached services from %s (age: %.1fh, %s)",
+                         datetime.fromtimestamp(lookup.stored_at).strftime('%Y-%m-%d %H:%M:%S'),
+                         cache_age_hours, lookup.source)
+        else:
+            logger.debug("✅ Services cached (%s services)", len(cached['services']))
+        
+        return {
+            "success": True,
+            "error": None,
+            "data": limited_services,
+            "discovery_info": discovery_info
+        }
             
     except Exception as e:
         return {
@@ -1,4 +1,3 @@
-import requests
 import os
 import sys
 import time
@@ -9,7 +8,14 @@ from colorama import Fore
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from mcp_loader import get_requests_verify
+from mcp.datadog_client import get_datadog_client, datadog_api_base
+from mcp.json_stream import iter_json_array
+from mcp.records import MetricSeries
+from mcp.cache import get_cache, CacheLoadError
+from deadlines import partial_fields, until_deadline
+from yoda_logging import get_logger, preview, VERBOSE
+
+logger = get_logger(__name__)
 
 # Load environment variables
 load_dotenv()
@@ -93,18 +99,18 @@ def query_metrics_mcp(query, time_range="1 hour", **kwargs):
         }
     
     try:
-        print(f"🔄 MCP: Querying metrics: '{query}' (time_range: {time_range})")
+        logger.info("🔄 MCP: Querying metrics: '%s' (time_range: %s)", query, time_range)
         
         # Parse time range
         time_range_seconds = parse_time_range(time_range)
         now = int(time.time())
         time_ago = now - time_range_seconds
         
-        print(f"🕒 Query time range: {datetime.fromtimestamp(time_ago)} to {datetime.fromtimestamp(now)}")
+        logger.debug("🕒 Query time range: %s to %s", datetime.fromtimestamp(time_ago), datetime.fromtimestamp(now))
         
         # DATADOG METRICS API CALL
-        url = f"https://{DD_SITE}/api/v1/query"
-        print(f"🌐 API URL: {url}")
+        url = f"{datadog_api_base(DD_SITE)}/api/v1/query"
+        logger.debug("🌐 API URL: %s", url)
         
         headers = {
             'DD-API-KEY': DD_API_KEY,
@@ -118,43 +124,34 @@ def query_metrics_mcp(query, time_range="1 hour", **kwargs):
             'to': now
         }
         
-        print(f"📋 API Params: {params}")
+        logger.debug("📋 API Params: %s", preview(params), extra=VERBOSE)
         
-        response = requests.get(url, headers=headers, params=params, timeout=30, verify=get_requests_verify())
+        response = get_datadog_client().get(url, headers=headers, params=params, timeout=30, stream=True)
         
         if response.status_code == 200:
-            data = response.json()
-            series = data.get('series', [])
-            print(f"📥 API Response: {response.status_code} - {len(series)} metrics series received")
-            print(f"🔍 Raw response keys: {list(data.keys())}")
-            
-            # Format metrics data for easier reading
+            # Decode series one at a time and format them as they arrive
+            response_extra = {}
             formatted_metrics = []
-            for serie in series:
-                metric_data = {
-                    "metric": serie.get('metric', ''),
-                    "scope": serie.get('scope', {}),
-                    "pointlist": serie.get('pointlist', []),
-                    "data_points_count": len(serie.get('pointlist', [])),
-                    "latest_value": None,
-                    "latest_timestamp": None,
-                    "min_value": None,
-                    "max_value": None,
-                    "avg_value": None
-                }
+            for serie in iter_json_array(response, 'series', extra=response_extra):
+                pointlist = serie.get('pointlist', [])
+                metric_data = MetricSeries(serie.get('metric', ''), serie.get('scope', {}), pointlist)
                 
                 # Calculate statistics
-                pointlist = serie.get('pointlist', [])
                 if pointlist:
                     values = [point[1] for point in pointlist if point[1] is not None]
                     if values:
-                        metric_data["latest_value"] = pointlist[-1][1]
-                        metric_data["latest_timestamp"] = datetime.fromtimestamp(pointlist[-1][0] / 1000).isoformat()
-                        metric_data["min_value"] = min(values)
-                        metric_data["max_value"] = max(values)
-                        metric_data["avg_value"] = sum(values) / len(values)
+                        metric_data.latest_value = pointlist[-1][1]
+                        metric_data.latest_timestamp = datetime.fromtimestamp(pointlist[-1][0] / 1000).isoformat()
+                        metric_data.min_value = min(values)
+                        metric_data.max_value = max(values)
+                        metric_data.avg_value = sum(values) / len(values)
                 
                 formatted_metrics.append(metric_data)
+            response.close()
+            
+            logger.debug("📥 API Response: %s - %s metrics series received",
+                         response.status_code, len(formatted_metrics))
+            logger.debug("🔍 Raw response keys: %s", ['series'] + list(response_extra.keys()), extra=VERBOSE)
             
             return {
                 "success": True,
@@ -200,10 +197,10 @@ def search_metrics_mcp(metric_name="", **kwargs):
         }
     
     try:
-        print(f"🔄 MCP: Searching metrics with name filter: '{metric_name}'")
+        logger.info("🔄 MCP: Searching metrics with name filter: '%s'", metric_name)
         
         # DATADOG METRICS SEARCH API CALL
-        url = f"https://{DD_SITE}/api/v1/search"
+        url = f"{datadog_api_base(DD_SITE)}/api/v1/search"
         headers = {
             'DD-API-KEY': DD_API_KEY,
             'DD-APPLICATION-KEY': DD_APP_KEY,
@@ -217,34 +214,40 @@ def search_metrics_mcp(metric_name="", **kwargs):
         else:
             params['q'] = "metrics:*"
         
-        response = requests.get(url, headers=headers, params=params, verify=get_requests_verify())
+        def load_metric_names():
+            response = get_datadog_client().get(url, headers=headers, params=params)
+            if response.status_code != 200:
+                raise CacheLoadError(f"Datadog Metrics Search API error: {response.status_code} - {response.text}")
+            return response.json().get('results', {}).get('metrics', [])
         
-        if response.status_code == 200:
-            data = response.json()
-            metrics = data.get('results', {}).get('metrics', [])
-            
-            # Format metrics list
-            formatted_metrics = []
-            for metric in metrics:
-                formatted_metrics.append({
-                    "name": metric,
-                    "type": "metric"
-                })
-            
-            return {
-                "success": True,
-                "error": None,
-                "data": formatted_metrics,
-                "total_metrics": len(formatted_metrics),
-                "search_term": metric_name
-            }
-            
-        else:
+        try:
+            lookup = get_cache().get_or_load('metric_search', params['q'], load_metric_names,
+                                             force_refresh=kwargs.get('force_refresh', False))
+        except CacheLoadError as e:
             return {
                 "success": False,
-                "error": f"Datadog Metrics Search API error: {response.status_code} - {response.text}",
+                "error": str(e),
                 "data": []
             }
+        metrics = lookup.value
+        if lookup.from_cache:
+            logger.debug("✅ Using cached metric search for '%s' (age: %.0fm)", params['q'], lookup.age_seconds / 60)
+        
+        # Format metrics list
+        formatted_metrics = []
+        for metric in metrics:
+            formatted_metrics.append({
+                "name": metric,
+                "type": "metric"
+            })
+        
+        return {
+            "success": True,
+            "error": None,
+            "data": formatted_metrics,
+            "total_metrics": len(formatted_metrics),
+            "search_term": metric_name
+        }
             
     except Exception as e:
         return {
@@ -277,17 +280,17 @@ def get_metric_metadata_mcp(metric_name, **kwargs):
         }
     
     try:
-        print(f"🔄 MCP: Getting metadata for metric: '{metric_name}'")
+        logger.info("🔄 MCP: Getting metadata for metric: '%s'", metric_name)
         
         # DATADOG METRICS METADATA API CALL
-        url = f"https://{DD_SITE}/api/v1/metrics/{metric_name}"
+        url = f"{datadog_api_base(DD_SITE)}/api/v1/metrics/{metric_name}"
         headers = {
             'DD-API-KEY': DD_API_KEY,
             'DD-APPLICATION-KEY': DD_APP_KEY,
             'Accept': 'application/json'
         }
         
-        response = requests.get(url, headers=headers, verify=get_requests_verify())
+        response = get_datadog_client().get(url, headers=headers)
         
         if response.status_code == 200:
             data = response.json()
@@ -469,7 +472,8 @@ def get_system_metrics_mcp(time_range="1 hour", host=None, **kwargs):
     ]
     
     results = []
-    for query in system_queries:
+    batch = until_deadline(system_queries)
+    for query in batch:
         result = query_metrics_mcp(query=query, time_range=time_range, **kwargs)
         if result['success']:
             results.extend(result['data'])
@@ -480,7 +484,8 @@ def get_system_metrics_mcp(time_range="1 hour", host=None, **kwargs):
         "data": results,
         "host_filter": host,
         "time_range": time_range,
-        "metrics_queried": system_queries
+        "metrics_queried": system_queries,
+        **batch.partial()
     }
 
 def get_application_metrics_mcp(service=None, time_range="1 hour", **kwargs):
@@ -504,7 +509,8 @@ def get_application_metrics_mcp(service=None, time_range="1 hour", **kwargs):
     ]
     
     results = []
-    for query in app_queries:
+    batch = until_deadline(app_queries)
+    for query in batch:
         result = query_metrics_mcp(query=query, time_range=time_range, **kwargs)
         if result['success']:
             results.extend(result['data'])
@@ -515,7 +521,8 @@ def get_application_metrics_mcp(service=None, time_range="1 hour", **kwargs):
         "data": results,
         "service_filter": service,
         "time_range": time_range,
-        "metrics_queried": app_queries
+        "metrics_queried": app_queries,
+        **batch.partial()
     } 
 
 def get_kubernetes_metrics_mcp(service=None, time_range="1 hour", **kwargs):
@@ -544,7 +551,8 @@ def get_kubernetes_metrics_mcp(service=None, time_range="1 hour", **kwargs):
     ]
     
     results = []
-    for query in k8s_queries:
+    batch = until_deadline(k8s_queries)
+    for query in batch:
         result = query_metrics_mcp(query=query, time_range=time_range, **kwargs)
         if result['success']:
             results.extend(result['data'])
@@ -556,7 +564,8 @@ def get_kubernetes_metrics_mcp(service=None, time_range="1 hour", **kwargs):
         "service_filter": service,
         "time_range": time_range,
         "metrics_queried": k8s_queries,
-        "deployment_name": service
+        "deployment_name": service,
+        **batch.partial()
     } 
 
 def get_apm_metrics_mcp(service=None, time_range="1 hour", metric_types=None, limit=20, **kwargs):
@@ -583,7 +592,7 @@ def get_apm_metrics_mcp(service=None, time_range="1 hour", metric_types=None, li
     available_metrics = trace_search['data']
     metric_names = [m['name'] for m in available_metrics]
     
-    print(f"🔍 Auto-discovery: Found {len(metric_names)} trace metrics")
+    logger.debug("🔍 Auto-discovery: Found %s trace metrics", len(metric_names))
     
     # Step 2: AUTO-DISCOVER metric types by analyzing suffixes
     discovered_types = {}
@@ -609,13 +618,13 @@ def get_apm_metrics_mcp(service=None, time_range="1 hour", metric_types=None, li
     if not metric_types:
         # Use top discovered types
         metric_types = sorted(discovered_types.keys(), key=lambda x: discovered_types[x], reverse=True)[:5]
-        print(f"📊 Auto-discovered metric types: {metric_types}")
+        logger.debug("📊 Auto-discovered metric types: %s", metric_types)
     
     # Step 4: Smart filtering based on service
     filtered_metrics = []
     
     if service:
-        print(f"🎯 Filtering for service: '{service}'")
+        logger.debug("🎯 Filtering for service: '%s'", service)
         # Multiple strategies for service matching
         for metric_name in metric_names:
             service_lower = service.lower()
@@ -658,13 +667,14 @@ def get_apm_metrics_mcp(service=None, time_range="1 hour", metric_types=None, li
     else:
         final_metrics = type_filtered_metrics
     
-    print(f"📈 Querying {len(final_metrics)} metrics out of {len(type_filtered_metrics)} candidates")
+    logger.debug("📈 Querying %s metrics out of %s candidates", len(final_metrics), len(type_filtered_metrics))
     
     # Step 7: Query actual metrics
     results = []
     queries_made = []
     
-    for metric_name in final_metrics:
+    batch = until_deadline(final_metrics)
+    for metric_name in batch:
         query = f"avg:{metric_name}{{*}}"
         queries_made.append(query)
         
@@ -698,7 +708,8 @@ def get_apm_metrics_mcp(service=None, time_range="1 hour", metric_types=None, li
             "metrics_with_data": len(results)
         },
         "time_range": time_range,
-        "queries_executed": queries_made
+        "queries_executed": queries_made,
+        **batch.partial()
     }
 
 def get_redis_metrics_mcp(service=None, time_range="1 hour", cloud_provider="auto", resource_group=None, **kwargs):
@@ -712,7 +723,7 @@ def get_redis_metrics_mcp(service=None, time_range="1 hour", cloud_provider="aut
         resource_group (str): Azure resource group
     """
     
-    print(f"🔍 Getting Redis metrics for: {service or 'all'}")
+    logger.debug("🔍 Getting Redis metrics for: %s", service or 'all')
     
     # Auto-detect cloud provider if needed
     if cloud_provider == "auto":
@@ -765,9 +776,10 @@ def get_redis_metrics_mcp(service=None, time_range="1 hour", cloud_provider="aut
     successful_queries = []
     failed_queries = []
     
-    print(f"🚀 Executing {len(cache_queries)} Redis metric queries...")
+    logger.debug("🚀 Executing %s Redis metric queries...", len(cache_queries))
     
-    for query in cache_queries:
+    batch = until_deadline(cache_queries)
+    for query in batch:
         result = query_metrics_mcp(query=query, time_range=time_range, **kwargs)
         if result['success'] and result['data']:
             results.extend(result['data'])
@@ -785,7 +797,8 @@ def get_redis_metrics_mcp(service=None, time_range="1 hour", cloud_provider="aut
         "time_range": time_range,
         "successful_queries": successful_queries,
         "failed_queries": failed_queries,
-        "metrics_with_data": len(results)
+        "metrics_with_data": len(results),
+        **batch.partial()
     }
 
 def get_sql_metrics_mcp(service=None, time_range="1 hour", cloud_provider="auto", resource_group=None, **kwargs):
@@ -799,7 +812,7 @@ def get_sql_metrics_mcp(service=None, time_range="1 hour", cloud_provider="auto"
         resource_group (str): Azure resource group
     """
     
-    print(f"🔍 Getting SQL metrics for: {service or 'all'}")
+    logger.debug("🔍 Getting SQL metrics for: %s", service or 'all')
     
     # Auto-detect cloud provider if needed
     if cloud_provider == "auto":
@@ -850,9 +863,10 @@ def get_sql_metrics_mcp(service=None, time_range="1 hour", cloud_provider="auto"
     successful_queries = []
     failed_queries = []
     
-    print(f"🚀 Executing {len(sql_queries)} SQL metric queries...")
+    logger.debug("🚀 Executing %s SQL metric queries...", len(sql_queries))
     
-    for query in sql_queries:
+    batch = until_deadline(sql_queries)
+    for query in batch:
         result = query_metrics_mcp(query=query, time_range=time_range, **kwargs)
         if result['success'] and result['data']:
             results.extend(result['data'])
@@ -870,7 +884,8 @@ def get_sql_metrics_mcp(service=None, time_range="1 hour", cloud_provider="auto"
         "time_range": time_range,
         "successful_queries": successful_queries,
         "failed_queries": failed_queries,
-        "metrics_with_data": len(results)
+        "metrics_with_data": len(results),
+        **batch.partial()
     }
 
 def get_compute_metrics_mcp(service=None, time_range="1 hour", compute_type="auto", resource_group=None, **kwargs):
@@ -884,7 +899,7 @@ def get_compute_metrics_mcp(service=None, time_range="1 hour", compute_type="aut
         resource_group (str): For filtering
     """
     
-    print(f"🔍 Getting Compute metrics for: {service or 'all'}")
+    logger.debug("🔍 Getting Compute metrics for: %s", service or 'all')
     
     # Auto-detect compute type
     if compute_type == "auto":
@@ -941,9 +956,10 @@ def get_compute_metrics_mcp(service=None, time_range="1 hour", compute_type="aut
     successful_queries = []
     failed_queries = []
     
-    print(f"🚀 Executing {len(compute_queries)} Compute metric queries...")
+    logger.debug("🚀 Executing %s Compute metric queries...", len(compute_queries))
     
-    for query in compute_queries:
+    batch = until_deadline(compute_queries)
+    for query in batch:
         result = query_metrics_mcp(query=query, time_range=time_range, **kwargs)
         if result['success'] and result['data']:
             results.extend(result['data'])
@@ -961,7 +977,8 @@ def get_compute_metrics_mcp(service=None, time_range="1 hour", compute_type="aut
         "time_range": time_range,
         "successful_queries": successful_queries,
         "failed_queries": failed_queries,
-        "metrics_with_data": len(results)
+        "metrics_with_data": len(results),
+        **batch.partial()
     }
 
 def get_service_health_mcp(service_name, service_type="auto", time_range="1 hour", resource_group=None, cloud_provider=None, **kwargs):
@@ -988,7 +1005,7 @@ def get_service_health_mcp(service_name, service_type="auto", time_range="1 hour
         else:
             service_type = "system"
     
-    print(f"🔍 Analyzing {service_type} service: {service_name}")
+    logger.debug("🔍 Analyzing %s service: %s", service_type, service_name)
     
     # Get metrics based on service type and cloud provider
     if service_type == "redis":
@@ -1028,13 +1045,13 @@ def get_service_health_mcp(service_name, service_type="auto", time_range="1 hour
         
         else:
             # Try both if auto-detection
-            aws_result = get_redis_cache_metrics_mcp(
+            aws_result = get_redis_metrics_mcp(
                 service=service_name, 
                 time_range=time_range, 
                 cloud_provider="aws", 
                 **kwargs
             )
-            azure_result = get_redis_cache_metrics_mcp(
+            azure_result = get_redis_metrics_mcp(
                 service=service_name, 
                 time_range=time_range, 
                 cloud_provider="azure", 
@@ -1042,10 +1059,10 @@ def get_service_health_mcp(service_name, service_type="auto", time_range="1 hour
             )
             
             # Use whichever has data
-            if aws_result['metrics_with_data'] > 0:
+            if aws_result.get('metrics_with_data', 0) > 0:
                 metrics_result = aws_result
                 provider = "AWS ElastiCache"
-            elif azure_result['metrics_with_data'] > 0:
+            elif azure_result.get('metrics_with_data', 0) > 0:
                 metrics_result = azure_result
                 provider = "Azure Redis Cache"
             else:
@@ -1058,19 +1075,21 @@ def get_service_health_mcp(service_name, service_type="auto", time_range="1 hour
         # Execute queries if we have specific cloud provider
         if 'aws_queries' in locals():
             results = []
-            for query in aws_queries:
+            batch = until_deadline(aws_queries)
+            for query in batch:
                 result = query_metrics_mcp(query=query, time_range=time_range, **kwargs)
                 if result['success'] and result['data']:
                     results.extend(result['data'])
-            metrics_result = {"success": True, "data": results}
+            metrics_result = {"success": True, "data": results, **batch.partial()}
             
         elif 'azure_queries' in locals():
             results = []
-            for query in azure_queries:
+            batch = until_deadline(azure_queries)
+            for query in batch:
                 result = query_metrics_mcp(query=query, time_range=time_range, **kwargs)
                 if result['success'] and result['data']:
                     results.extend(result['data'])
-            metrics_result = {"success": True, "data": results}
+            metrics_result = {"success": True, "data": results, **batch.partial()}
             
     elif service_type == "k8s":
         metrics_result = get_kubernetes_metrics_mcp(
@@ -1246,7 +1265,8 @@ def get_service_health_mcp(service_name, service_type="auto", time_range="1 hour
     return {
         "success": True,
         "error": None,
-        "data": health_analysis
+        "data": health_analysis,
+        **partial_fields(metrics_result)
     }
 
 def get_cloud_resource_health_mcp(resource_name, resource_type, cloud_provider, resource_group=None, time_range="1 hour", **kwargs):
@@ -1261,9 +1281,9 @@ def get_cloud_resource_health_mcp(resource_name, resource_type, cloud_provider,
         time_range (str): Time range for analysis
     """
     
-    print(f"🔍 Analyzing {cloud_provider.upper()} {resource_type} resource: {resource_name}")
+    logger.debug("🔍 Analyzing %s %s resource: %s", cloud_provider.upper(), resource_type, resource_name)
     if resource_group:
-        print(f"📁 Resource group/filter: {resource_group}")
+        logger.debug("📁 Resource group/filter: %s", resource_group)
     
     # Build cloud-specific filters
     if cloud_provider.lower() == "azure":
@@ -1380,7 +1400,8 @@ def get_cloud_resource_health_mcp(resource_name, resource_type, cloud_provider,
     successful_queries = []
     failed_queries = []
     
-    for query in metric_queries:
+    batch = until_deadline(metric_queries)
+    for query in batch:
         result = query_metrics_mcp(query=query, time_range=time_range, **kwargs)
         if result['success'] and result['data']:
             results.extend(result['data'])
@@ -1426,7 +1447,8 @@ def get_cloud_resource_health_mcp(resource_name, resource_type, cloud_provider,
     return {
         "success": True,
         "error": None,
-        "data": raw_data
+        "data": raw_data,
+        **batch.partial()
     }
 
 def get_dynamic_resource_metrics_mcp(resource_pattern, cloud_provider=None, time_range="1 hour", max_metrics=20, **kwargs):
@@ -1440,7 +1462,7 @@ def get_dynamic_resource_metrics_mcp(resource_pattern, cloud_provider=None, time
         max_metrics (int): Maximum number of metrics to query
     """
     
-    print(f"🔍 Dynamic discovery for pattern: '{resource_pattern}'")
+    logger.debug("🔍 Dynamic discovery for pattern: '%s'", resource_pattern)
     
     # Step 1: Auto-discover all metrics matching the pattern
     search_result = search_metrics_mcp(metric_name=resource_pattern)
@@ -1452,12 +1474,12 @@ def get_dynamic_resource_metrics_mcp(resource_pattern, cloud_provider=None, time
         }
     
     all_metrics = [m['name'] for m in search_result['data']]
-    print(f"📊 Found {len(all_metrics)} metrics matching '{resource_pattern}'")
+    logger.debug("📊 Found %s metrics matching '%s'", len(all_metrics), resource_pattern)
     
     # Step 2: Filter by cloud provider if specified
     if cloud_provider:
         cloud_filtered = [m for m in all_metrics if cloud_provider.lower() in m.lower()]
-        print(f"☁️ Filtered to {len(cloud_filtered)} {cloud_provider} metrics")
+        logger.debug("☁️ Filtered to %s %s metrics", len(cloud_filtered), cloud_provider)
         all_metrics = cloud_filtered
     
     if not all_metrics:
@@ -1506,7 +1528,7 @@ def get_dynamic_resource_metrics_mcp(resource_pattern, cloud_provider=None, time
     sorted_metrics = sorted(scoring.items(), key=lambda x: x[1], reverse=True)
     selected_metrics = [metric for metric, score in sorted_metrics[:max_metrics] if score > 0]
     
-    print(f"🎯 Selected top {len(selected_metrics)} metrics by intelligence score")
+    logger.debug("🎯 Selected top %s metrics by intelligence score", len(selected_metrics))
     
     # Step 5: Smart aggregation detection
     queries = []
@@ -1534,9 +1556,10 @@ def get_dynamic_resource_metrics_mcp(resource_pattern, cloud_provider=None, time
     successful_queries = []
     failed_queries = []
     
-    print(f"🚀 Executing {len(queries)} intelligent queries...")
+    logger.debug("🚀 Executing %s intelligent queries...", len(queries))
     
-    for query in queries:
+    batch = until_deadline(queries)
+    for query in batch:
         result = query_metrics_mcp(query=query, time_range=time_range, **kwargs)
         if result['success'] and result['data']:
             results.extend(result['data'])
@@ -1564,5 +1587,6 @@ def get_dynamic_resource_metrics_mcp(resource_pattern, cloud_provider=None, time
         "analysis": analysis,
         "discovery_method": "Dynamic Intelligence (Zero Hardcoding)",
         "successful_queries": successful_queries,
-        "failed_queries": failed_queries
+        "failed_queries": failed_queries,
+        **batch.partial()
     } 
\ No newline at end of file
@@ -0,0 +1,221 @@
+"""
+Bitmap posting-list index over a Datadog monitor inventory.
+
+Every monitor gets a position in the inventory. Tags, scope tags, overall
+states and normalized priorities map to posting lists of positions which
+are turned into integer bitmaps on first use, so multi-tag AND/OR, state
+and priority filters resolve by bitwise intersection instead of rescanning
+monitors.
+
+Monitor tags are the tags set on the monitor itself (`monitor_tags` of
+/api/v1/monitor). Scope tags are the tags its query is scoped to, e.g.
+`host:web-1` in `avg:system.cpu.user{env:prod,host:web-1}` (`tags` of
+/api/v1/monitor).
+"""
+
+import re
+
+_SCOPE = re.compile(r'(\bby\s*)?\{([^{}]*)\}')
+_SCOPE_SEPARATOR = re.compile(r'\s*,\s*|\s+AND\s+', re.IGNORECASE)
+
+
+def normalize_priority(priority):
+    """
+    Normalize a monitor priority to the 'P<n>' form
+
+    Examples:
+    - 1 -> 'P1'
+    - '2' -> 'P2'
+    - 'p3' -> 'P3'
+    - None -> None
+    """
+    if priority is None:
+        return None
+    priority_str = str(priority).strip().upper()
+    if not priority_str:
+        return None
+    if priority_str.startswith('P'):
+        priority_str = priority_str[1:]
+    return f"P{priority_str}"
+
+
+def scope_tags(query):
+    """
+    Return the scope tags of a monitor query - the tags inside {...}, not the `by {...}` groups
+
+    Examples:
+    - 'avg(last_5m):avg:system.cpu.user{env:prod,host:web-1} by {host} > 90' -> ['env:prod', 'host:web-1']
+    - 'avg(last_5m):avg:system.load.1{*} > 4' -> []
+    """
+    tags = []
+    for match in _SCOPE.finditer(query or ''):
+        if match.group(1):
+            continue
+        for tag in _SCOPE_SEPARATOR.split(match.group(2).strip()):
+            # Wildcards, exclusions and nested boolean expressions do not name a scope
+            if tag and tag != '*' and not tag.startswith(('!', '-')) and ' ' not in tag and tag not in tags:
+                tags.append(tag)
+    return tags
+
+
+def _positions_to_bitmap(positions):
+    """Build an integer bitmap from a list of positions in O(n)"""
+    if not positions:
+        return 0
+    buffer = bytearray((positions[-1] >> 3) + 1)
+    for pos in positions:
+        buffer[pos >> 3] |= 1 << (pos & 7)
+    return int.from_bytes(buffer, 'little')
+
+
+def _bitmap_to_positions(bitmap):
+    """Enumerate set bits of an integer bitmap in ascending order"""
+    positions = []
+    if not bitmap:
+        return positions
+    raw = bitmap.to_bytes((bitmap.bit_length() + 7) // 8, 'little')
+    for byte_index, byte in enumerate(raw):
+        if not byte:
+            continue
+        base = byte_index << 3
+        for bit in range(8):
+            if byte & (1 << bit):
+                positions.append(base + bit)
+    return positions
+
+
+class MonitorIndex:
+    """
+    Inverted index over raw monitor dicts returned by /api/v1/monitor
+
+    Posting lists are kept for:
+    - tags (exact tag string, e.g. 'env:production')
+    - scope tags parsed from the query (e.g. 'host:web-1')
+    - overall_state (lowercased, e.g. 'alert')
+    - priority (normalized, e.g. 'P1')
+    """
+
+    def __init__(self, monitors=None):
+        self.monitors = []
+        self._tag_postings = {}
+        self._scope_postings = {}
+        self._state_postings = {}
+        self._priority_postings = {}
+        self._bitmap_cache = {}
+        if monitors:
+            self.add_all(monitors)
+
+    def __len__(self):
+        return len(self.monitors)
+
+    def add(self, monitor):
+        """Add a single raw monitor to the index"""
+        pos = len(self.monitors)
+        self.monitors.append(monitor)
+
+        for tag in set(monitor.get('tags') or []):
+            self._tag_postings.setdefault(tag, []).append(pos)
+
+        for tag in scope_tags(monitor.get('query')):
+            self._scope_postings.setdefault(tag, []).append(pos)
+
+        state = (monitor.get('overall_state') or '').lower()
+        self._state_postings.setdefault(state, []).append(pos)
+
+        priority = normalize_priority(monitor.get('priority'))
+        if priority:
+            self._priority_postings.setdefault(priority, []).append(pos)
+
+        # Postings changed - cached bitmaps are no longer valid
+        self._bitmap_cache.clear()
+
+    def add_all(self, monitors):
+        """Add an iterable of raw monitors to the index"""
+        for monitor in monitors:
+            self.add(monitor)
+
+    def _bitmap(self, kind, postings, key):
+        cache_key = (kind, key)
+        bitmap = self._bitmap_cache.get(cache_key)
+        if bitmap is None:
+            bitmap = _positions_to_bitmap(postings.get(key, []))
+            self._bitmap_cache[cache_key] = bitmap
+        return bitmap
+
+    def _all_bitmap(self):
+        return (1 << len(self.monitors)) - 1
+
+    def tag_bitmap(self, tag):
+        return self._bitmap('tag', self._tag_postings, tag)
+
+    def scope_bitmap(self, tag):
+        return self._bitmap('scope', self._scope_postings, tag)
+
+    def state_bitmap(self, states):
+        """Union of bitmaps for the given states (case-insensitive)"""
+        bitmap = 0
+        for state in states:
+            bitmap |= self._bitmap('state', self._state_postings, (state or '').lower())
+        return bitmap
+
+    def priority_bitmap(self, priority):
+        return self._bitmap('priority', self._priority_postings, normalize_priority(priority))
+
+    def resolve(self, tags_all=None, tags_any=None, states=None, priority=None, scopes_all=None, scopes_any=None):
+        """
+        Resolve a filter to a bitmap of matching monitor positions
+
+        Args:
+            tags_all (list): Monitor must carry every one of these tags (AND)
+            tags_any (list): Monitor must carry at least one of these tags (OR)
+            scopes_all (list): Monitor query must be scoped to every one of these tags (AND)
+            scopes_any (list): Monitor query must be scoped to at least one of these tags (OR)
+            states (list): Monitor overall_state must be one of these
+            priority (str|int): Monitor priority (P1/1, P2/2, ...)
+        """
+        bitmap = self._all_bitmap()
+        if tags_all:
+            for tag in tags_all:
+                bitmap &= self.tag_bitmap(tag)
+        if tags_any:
+            any_bitmap = 0
+            for tag in tags_any:
+                any_bitmap |= self.tag_bitmap(tag)
+            bitmap &= any_bitmap
+        if scopes_all:
+            for tag in scopes_all:
+                bitmap &= self.scope_bitmap(tag)
+        if scopes_any:
+            any_bitmap = 0
+            for tag in scopes_any:
+                any_bitmap |= self.scope_bitmap(tag)
+            bitmap &= any_bitmap
+        if states:
+            bitmap &= self.state_bitmap(states)
+        if priority:
+            bitmap &= self.priority_bitmap(priority)
+        return bitmap
+
+    def select(self, tags_all=None, tags_any=None, states=None, priority=None, scopes_all=None, scopes_any=None):
+        """Return matching raw monitors in inventory order"""
+        return self.select_bitmap(self.resolve(tags_all=tags_all, tags_any=tags_any, states=states, priority=priority,
+                                               scopes_all=scopes_all, scopes_any=scopes_any))
+
+    def select_bitmap(self, bitmap):
+        """Return raw monitors for an already resolved bitmap"""
+        return [self.monitors[pos] for pos in _bitmap_to_positions(bitmap)]
+
+    def count(self, tags_all=None, tags_any=None, states=None, priority=None, scopes_all=None, scopes_any=None):
+        """Count matching monitors without materializing them"""
+        return self.resolve(tags_all=tags_all, tags_any=tags_any, states=states, priority=priority,
+                            scopes_all=scopes_all, scopes_any=scopes_any).bit_count()
+
+    def tag_counts(self):
+        """Return {tag: monitor_count} straight from the posting lists"""
+        return {tag: len(positions) for tag, positions in self._tag_postings.items()}
+
+    def state_counts(self):
+        return {state: len(positions) for state, positions in self._state_postings.items()}
+
+    def priority_counts(self):
+        return {priority: len(positions) for priority, positions in self._priority_postings.items()}
@@ -1,12 +1,21 @@
-import requests
+import logging
 import os
 import sys
+import threading
 from dotenv import load_dotenv
 from colorama import Fore
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from mcp_loader import get_requests_verify
+from mcp.datadog_client import get_datadog_client, datadog_api_base
+from mcp.monitor_index import MonitorIndex, normalize_priority, scope_tags
+from mcp.json_stream import iter_json_array
+from mcp.records import MonitorRecord
+from mcp.cache import get_cache, CacheLoadError
+from env_settings import validate_number
+from yoda_logging import get_logger, preview, VERBOSE
+
+logger = get_logger(__name__)
 
 # Load environment variables
 load_dotenv()
@@ -14,17 +23,44 @@ DD_API_KEY = os.getenv('DD_API_KEY')
 DD_APP_KEY = os.getenv('DD_APP_KEY')
 DD_SITE = os.getenv('DD_SITE', 'api.datadoghq.com')
 
-def get_monitors(group_states=None, priority=None, names=None, tags=None, monitor_tags=None):
+# Raw monitor fields we keep - the rest (options, state groups, ...) is dropped while streaming
+_MONITOR_FIELDS = ('id', 'name', 'overall_state', 'priority', 'type', 'query', 'message',
+                   'tags', 'created', 'modified', 'creator')
+
+# Datadog accepts at most 1000 monitors per page
+MONITOR_PAGE_SIZE = validate_number('MONITOR_PAGE_SIZE', 1000, 1, 1000, cast=int)
+
+def _iter_monitor_pages(url, headers, params, page_size=None):
     """
-    Get monitors from Datadog with optional filtering.
+    Yield (page_number, response, monitors) for each page of /api/v1/monitor
     
-    Args:
-        group_states: List of states to filter by (e.g., ['alert', 'warn'])
-        priority: Priority to filter by (e.g., 'P1', 'P2', etc.)
-        names: List of monitor names to filter by
-        tags: List of tags to filter by
-        monitor_tags: List of monitor tags to filter by
+    monitors is None when the page failed. Iteration ends after a short page
+    or a failed page.
     """
+    page_size = page_size or MONITOR_PAGE_SIZE
+    page_number = 0
+    while True:
+        page_params = dict(params, page=page_number, page_size=page_size)
+        response = get_datadog_client().get(url, headers=headers, params=page_params, timeout=30, stream=True)
+        
+        if response.status_code != 200:
+            yield page_number, response, None
+            return
+        
+        # Decode monitors one at a time, keeping only the fields we use
+        monitors = [
+            {field: monitor[field] for field in _MONITOR_FIELDS if field in monitor}
+            for monitor in iter_json_array(response)
+        ]
+        response.close()
+        yield page_number, response, monitors
+        
+        if len(monitors) < page_size:
+            return
+        page_number += 1
+
+def _monitor_api():
+    """Return (url, headers) for /api/v1/monitor, or None when credentials are missing"""
     load_dotenv()
     
     DD_API_KEY = os.getenv('DD_API_KEY')
@@ -32,32 +68,190 @@ def get_monitors(group_states=None, priority=None, names=None, tags=None, monito
     DD_SITE = os.getenv('DD_SITE', 'api.datadoghq.com')
     
     if not DD_API_KEY or not DD_APP_KEY:
-        return {"error": "Missing DD_API_KEY or DD_APP_KEY environment variables"}
+        return None
     
-    url = f"https://{DD_SITE}/api/v1/monitor"
+    url = f"{datadog_api_base(DD_SITE)}/api/v1/monitor"
     headers = {
         'DD-API-KEY': DD_API_KEY,
         'DD-APPLICATION-KEY': DD_APP_KEY,
         'Accept': 'application/json'
     }
+    return url, headers
+
+def _load_monitor_inventory():
+    """
+    Fetch the whole monitor inventory page by page (cache loader)
     
-    # Build API parameters
+    Raises:
+        CacheLoadError: When credentials are missing or a page failed
+    """
+    api = _monitor_api()
+    if api is None:
+        raise CacheLoadError("Missing DD_API_KEY or DD_APP_KEY environment variables")
+    url, headers = api
+    
+    inventory = []
+    for page_number, response, monitors in _iter_monitor_pages(url, headers, {}):
+        if monitors is None:
+            raise CacheLoadError(f"API Error {response.status_code}: {response.text}")
+        inventory.extend(monitors)
+        logger.debug("📥 API Response: page %s - %s monitors received from DataDog", page_number, len(monitors))
+    logger.debug("📊 Monitor inventory loaded: %s monitors", len(inventory))
+    return inventory
+
+# Index over the cached inventory, rebuilt only when the cache holds a newer inventory
+_index_lock = threading.Lock()
+_index_stored_at = None
+_index = None
+
+def get_monitor_index(force_refresh=False):
+    """
+    Return (MonitorIndex, CacheResult) for the cached monitor inventory
+    
+    The inventory lives in the 'monitors' cache namespace and is renewed in the
+    background; the index over it is kept between chat questions and rebuilt
+    only after the inventory was reloaded.
+    
+    Raises:
+        CacheLoadError: When the inventory could not be fetched
+    """
+    lookup = get_cache().get_or_load('monitors', 'inventory', _load_monitor_inventory, force_refresh=force_refresh,
+                                     keep_warm=True, revalidate=False)
+    return _index_for(lookup), lookup
+
+def _cached_monitor_index():
+    """Return (MonitorIndex, CacheResult) when a fresh inventory is cached, else None - never fetches"""
+    lookup = get_cache().get('monitors', 'inventory')
+    if lookup is None:
+        return None
+    return _index_for(lookup), lookup
+
+def _index_for(lookup):
+    """Return the index over the inventory of a cache lookup, building it once per stored inventory"""
+    global _index, _index_stored_at
+    with _index_lock:
+        if _index is None or _index_stored_at != lookup.stored_at:
+            _index = MonitorIndex(lookup.value)
+            _index_stored_at = lookup.stored_at
+            logger.debug("🗂️ Monitor index built over %s monitors", len(_index))
+        return _index
+
+def _select_from_index(index, group_states, priority, tags, monitor_tags, tag_match):
+    """Filter the persisted inventory index; returns (raw monitors, skip counts)"""
+    # Every filter is a bitmap intersection over the persisted index: `tags`
+    # against the query scope postings, `monitor_tags` against the monitor's own tags
+    scopes_any = tags if tags and tag_match == 'any' else None
+    scopes_all = tags if tags and tag_match != 'any' else None
+    
+    tag_bitmap = index.resolve(tags_all=monitor_tags, scopes_all=scopes_all, scopes_any=scopes_any)
+    state_bitmap = tag_bitmap & index.resolve(states=group_states) if group_states else tag_bitmap
+    final_bitmap = state_bitmap & index.resolve(priority=priority) if priority else state_bitmap
+    
+    skipped = {
+        "tags": len(index) - tag_bitmap.bit_count(),
+        "state": tag_bitmap.bit_count() - state_bitmap.bit_count(),
+        "priority": state_bitmap.bit_count() - final_bitmap.bit_count(),
+    }
+    return index.select_bitmap(final_bitmap), skipped
+
+def _page_filter(group_states, priority, tags_any):
+    """Per-monitor check for the filters /api/v1/monitor does not apply itself"""
+    states = {state.lower() for state in group_states} if group_states else None
+    priority = normalize_priority(priority) if priority else None
+    tags_any = set(tags_any) if tags_any else None
+    
+    def skip_reason(monitor):
+        if tags_any and tags_any.isdisjoint(scope_tags(monitor.get('query'))):
+            return 'tags'
+        if states and (monitor.get('overall_state') or '').lower() not in states:
+            return 'state'
+        if priority and normalize_priority(monitor.get('priority')) != priority:
+            return 'priority'
+        return None
+    return skip_reason
+
+def _select_from_pages(url, headers, group_states, priority, names, tags, monitor_tags, tag_match, limit):
+    """
+    Stream /api/v1/monitor page by page, keeping only matching monitors
+    
+    The API filters by state, name, scope tags and monitor tags; priority
+    and match-any scope tags are checked per monitor. Paging stops once `limit`
+    monitors matched. Returns (raw monitors, skip counts, pages fetched,
+    monitors fetched, stopped early).
+    
+    Raises:
+        CacheLoadError: When a page failed
+    """
     params = {}
     if group_states:
-        # Join multiple states with comma for API call
         params['group_states'] = ','.join(group_states)
-    
     if names:
         params['name'] = ','.join(names)
-    
-    if tags:
+    if tags and tag_match != 'any':
         params['tags'] = ','.join(tags)
-    
     if monitor_tags:
         params['monitor_tags'] = ','.join(monitor_tags)
+    if params:
+        logger.debug("📋 API Params: %s", preview(params), extra=VERBOSE)
+    
+    skip_reason = _page_filter(group_states, priority, tags if tag_match == 'any' else None)
+    matched = []
+    skipped = {"tags": 0, "state": 0, "priority": 0}
+    pages_fetched = 0
+    total_fetched = 0
+    for page_number, response, monitors in _iter_monitor_pages(url, headers, params):
+        if monitors is None:
+            raise CacheLoadError(f"API Error {response.status_code}: {response.text}")
+        pages_fetched += 1
+        total_fetched += len(monitors)
+        logger.debug("📥 API Response: page %s - %s monitors received from DataDog", page_number, len(monitors))
+        
+        for monitor in monitors:
+            reason = skip_reason(monitor)
+            if reason:
+                skipped[reason] += 1
+                continue
+            matched.append(monitor)
+            if limit and len(matched) >= limit:
+                logger.debug("⏹️ Limit of %s monitors reached after %s page(s) - stopping early",
+                             limit, pages_fetched)
+                return matched, skipped, pages_fetched, total_fetched, True
+    return matched, skipped, pages_fetched, total_fetched, False
+
+def get_monitors(group_states=None, priority=None, names=None, tags=None, monitor_tags=None, tag_match='all', limit=None):
+    """
+    Get monitors from Datadog with optional filtering.
+    
+    When the monitor inventory is cached and neither a limit nor names are
+    given, filters resolve against the persisted inventory index without
+    calling Datadog. Otherwise /api/v1/monitor is paged with the filters sent
+    along (names are always matched by the API), only matching monitors are
+    kept, and paging stops once `limit` matched - so a limited query returns
+    after the first page(s) instead of loading the whole inventory.
+    
+    `tags` and `monitor_tags` keep the meaning of the API parameters: `tags`
+    matches the scope of the monitor query (e.g. 'host:web-1' in
+    `...{env:prod,host:web-1}`), `monitor_tags` the tags set on the monitor.
+    
+    Args:
+        group_states: List of states to filter by (e.g., ['alert', 'warn'])
+        priority: Priority to filter by (e.g., 'P1', 'P2', etc.)
+        names: List of monitor names to filter by
+        tags: List of scope tags to filter by
+        monitor_tags: List of monitor tags to filter by (all must match)
+        tag_match: 'all' for monitors scoped to every tag (AND), 'any' for at
+                   least one of the tags (OR)
+        limit: Stop once this many monitors matched (None = all matches)
+    """
+    api = _monitor_api()
+    if api is None:
+        return {"error": "Missing DD_API_KEY or DD_APP_KEY environment variables"}
+    url, headers = api
     
     try:
-        # Debug: Show API call being made
+        limit = int(limit) if limit else None
+        
+        # Debug: Show the filters being resolved
         debug_info = []
         if group_states:
             debug_info.append(f"group_states={group_states}")
@@ -66,133 +260,92 @@ def get_monitors(group_states=None, priority=None, names=None, tags=None, monito
         if names:
             debug_info.append(f"names={names}")
         if tags:
-            debug_info.append(f"tags={tags}")
+            debug_info.append(f"tags={tags}" + (" (match any)" if tag_match == 'any' else ""))
         if monitor_tags:
             debug_info.append(f"monitor_tags={monitor_tags}")
+        if limit:
+            debug_info.append(f"limit={limit}")
         
         debug_params = ", ".join(debug_info) if debug_info else "no filters"
-        print(f"🔄 YODA: Calling DataDog API with {debug_params}")
-        print(f"🌐 API URL: {url}")
-        if params:
-            print(f"📋 API Params: {params}")
         
-        response = requests.get(url, headers=headers, params=params, timeout=30, verify=get_requests_verify())
+        cached = None if (limit or names) else _cached_monitor_index()
+        if cached is not None:
+            index, lookup = cached
+            logger.debug("🔄 YODA: Filtering cached monitor inventory with %s", preview(debug_params))
+            monitors, skipped = _select_from_index(index, group_states, priority, tags, monitor_tags, tag_match)
+            summary = {
+                "source": "inventory_index",
+                "total_in_inventory": len(index),
+                "inventory_age_seconds": round(lookup.age_seconds),
+            }
+            logger.debug("🎯 Filtering Summary:")
+            logger.debug("   📊 Monitors in inventory: %s (%s, %.0fs old)", len(index), lookup.source,
+                         lookup.age_seconds)
+        else:
+            logger.debug("🔄 YODA: Calling DataDog API with %s", preview(debug_params))
+            logger.debug("🌐 API URL: %s", url)
+            monitors, skipped, pages_fetched, total_fetched, stopped_early = _select_from_pages(
+                url, headers, group_states, priority, names, tags, monitor_tags, tag_match, limit)
+            summary = {
+                "source": "api_pages",
+                "total_fetched_from_api": total_fetched,
+                "pages_fetched": pages_fetched,
+                "stopped_early": stopped_early,
+            }
+            logger.debug("🎯 Filtering Summary:")
+            logger.debug("   📊 Total received from API: %s (%s page(s))", total_fetched, pages_fetched)
+        
+        filtered_monitors = [MonitorRecord(monitor) for monitor in monitors]
+        total_filtered = len(filtered_monitors)
         
-        if response.status_code == 200:
-            monitors = response.json()
-            print(f"📥 API Response: {len(monitors)} monitors received from DataDog")
-            
-            # Client-side filtering for more precise control
-            filtered_monitors = []
-            skipped_by_state = 0
-            skipped_by_priority = 0
-            
-            for monitor in monitors:
-                # State filtering (if needed for extra precision)
-                if group_states:
-                    monitor_state = monitor.get('overall_state', '').lower()
-                    # Convert API states to lowercase for comparison
-                    target_states = [state.lower() for state in group_states]
-                    
-                    if monitor_state not in target_states:
-                        skipped_by_state += 1
-                        continue
-                
-                # Priority filtering
-                if priority:
-                    monitor_priority = monitor.get('priority')
-                    # Handle both string and numeric priority formats
-                    # Convert both to strings for comparison
-                    if monitor_priority is not None:
-                        monitor_priority_str = str(monitor_priority)
-                        search_priority = str(priority)
-                        search_priority_no_p = search_priority.replace('P', '')
-                        
-                        # Check if priorities match (P1/1, P2/2, etc.)
-                        if (monitor_priority_str != search_priority and 
-                            monitor_priority_str != search_priority_no_p and
-                            f"P{monitor_priority_str}" != search_priority):
-                            skipped_by_priority += 1
-                            continue
-                    else:
-                        # If monitor has no priority but we're filtering by priority, skip it
-                        skipped_by_priority += 1
-                        continue
-                
-                # Add monitor to results
-                filtered_monitors.append({
-                    "id": monitor.get('id'),
-                    "name": monitor.get('name'),
-                    "status": monitor.get('overall_state'),  # Changed from 'state' to 'status'
-                    "priority": monitor.get('priority'),
-                    "type": monitor.get('type'),
-                    "query": monitor.get('query'),
-                    "message": monitor.get('message'),
-                    "tags": monitor.get('tags', []),
-                    "created": monitor.get('created'),
-                    "modified": monitor.get('modified'),
-                    "creator": monitor.get('creator', {}).get('name'),
-                })
-            
-            # Summary with clean output
-            total_fetched = len(monitors)
-            total_filtered = len(filtered_monitors)
-            
-            # Debug summary
-            print(f"🎯 Filtering Summary:")
-            print(f"   📊 Total received from API: {total_fetched}")
-            print(f"   🚫 Skipped by state filter: {skipped_by_state}")
-            print(f"   🚫 Skipped by priority filter: {skipped_by_priority}")
-            print(f"   ✅ Final results: {total_filtered}")
-            print()
-            
-            result = {
-                "monitors": filtered_monitors,
-                "summary": {
-                    "total_fetched_from_api": total_fetched,
-                    "total_after_filtering": total_filtered,
-                    "filters_applied": {
-                        "group_states": group_states,
-                        "priority": priority,
-                        "names": names,
-                        "tags": tags,
-                        "monitor_tags": monitor_tags
-                    }
+        logger.debug("   🚫 Skipped by tag filter: %s", skipped['tags'])
+        logger.debug("   🚫 Skipped by state filter: %s", skipped['state'])
+        logger.debug("   🚫 Skipped by priority filter: %s", skipped['priority'])
+        logger.debug("   ✅ Final results: %s", total_filtered)
+        
+        result = {
+            "monitors": filtered_monitors,
+            "summary": dict(summary, **{
+                "total_after_filtering": total_filtered,
+                "filters_applied": {
+                    "group_states": group_states,
+                    "priority": priority,
+                    "names": names,
+                    "tags": tags,
+                    "tag_match": tag_match,
+                    "monitor_tags": monitor_tags,
+                    "limit": limit
                 }
-            }
-            
-            print(f"📊 Found {total_filtered} results:")
-            print()
-            
+            })
+        }
+        
+        logger.debug("📊 Found %s results:", total_filtered)
+        
+        if logger.isEnabledFor(logging.DEBUG):
             for i, monitor in enumerate(filtered_monitors, 1):
                 state_emoji = "🔴" if monitor['status'] == 'Alert' else "🟡" if monitor['status'] == 'Warn' else "🟢"
-                print(f"{state_emoji} {i}. {monitor['name']}")
-                print(f"   Status: {monitor['status']}")
-                if monitor['priority']:
-                    print(f"   Priority: {monitor['priority']}")
-                print()
-            
-            return result
-            
-        else:
-            error_msg = f"API Error {response.status_code}: {response.text}"
-            print(f"❌ {error_msg}")
-            return {
-                "success": False,
-                "error": error_msg,
-                "data": []
-            }
-            
+                logger.debug("%s %s. %s (status: %s, priority: %s)", state_emoji, i, monitor['name'],
+                             monitor['status'], monitor['priority'] or '-', extra=VERBOSE)
+        
+        return result
+    
+    except CacheLoadError as e:
+        logger.error("❌ %s", e)
+        return {
+            "success": False,
+            "error": str(e),
+            "data": []
+        }
     except Exception as e:
         error_msg = f"Request failed: {str(e)}"
-        print(f"💥 {error_msg}")
+        logger.error("💥 %s", error_msg)
         return {
             "success": False,
             "error": error_msg,
             "data": []
         }
 
-def get_monitors_mcp(group_states=None, priority=None, names=None, tags=None, monitor_tags=None, **kwargs):
+def get_monitors_mcp(group_states=None, priority=None, names=None, tags=None, monitor_tags=None, limit=None, **kwargs):
     """
     MCP Function to get monitors from Datadog
     
@@ -200,10 +353,11 @@ def get_monitors_mcp(group_states=None, priority=None, names=None, tags=None, mo
         group_states (list): List of states to filter by (e.g., ['alert', 'warn'])
         priority (str): Priority to filter by (e.g., 'P1', 'P2', etc.)
         names (list): List of monitor names to filter by
-        tags (list): List of tags to filter by
-        monitor_tags (list): List of monitor tags to filter by
+        tags (list): List of scope tags to filter by (tags in the monitor query)
+        monitor_tags (list): List of tags set on the monitor to filter by
+        limit (int): Maximum number of monitors to return (pages the API and stops early)
     """
-    result = get_monitors(group_states=group_states, priority=priority, names=names, tags=tags, monitor_tags=monitor_tags)
+    result = get_monitors(group_states=group_states, priority=priority, names=names, tags=tags, monitor_tags=monitor_tags, limit=limit)
     
     # Transform to standard MCP format
     if isinstance(result, dict) and 'monitors' in result:
@@ -217,7 +371,8 @@ def get_monitors_mcp(group_states=None, priority=None, names=None, tags=None, mo
                 "priority": priority,
                 "names": names,
                 "tags": tags,
-                "monitor_tags": monitor_tags
+                "monitor_tags": monitor_tags,
+                "limit": limit
             },
             "total_monitors": len(monitors),
             "summary": result.get('summary', {})
@@ -237,10 +392,10 @@ def get_monitors_mcp(group_states=None, priority=None, names=None, tags=None, mo
 
 def get_monitors_by_tag_mcp(tag_filter, group_states=None, priority=None, **kwargs):
     """
-    MCP Function to get monitors filtered by a specific tag
+    MCP Function to get monitors filtered by a specific scope tag
     
     Args:
-        tag_filter (str): Tag to filter by (e.g., "env:production", "service:web")
+        tag_filter (str): Scope tag of the monitor query to filter by (e.g., "env:production", "host:web-1")
         group_states (list): List of states to filter by (e.g., ['alert', 'warn'])
         priority (str): Priority to filter by (e.g., 'P1', 'P2', etc.)
     
@@ -249,13 +404,13 @@ def get_monitors_by_tag_mcp(tag_filter, group_states=None, priority=None, **kwar
         get_monitors_by_tag_mcp("service:web", group_states=["alert"])
         get_monitors_by_tag_mcp("product:apm", priority="P1")
     """
-    print(f"🏷️ MCP: Getting monitors for tag '{tag_filter}'")
+    logger.info("🏷️ MCP: Getting monitors for tag '%s'", tag_filter)
     
-    result = get_monitors(group_states=group_states, priority=priority, tags=[tag_filter])
+    result = get_monitors(group_states=group_states, priority=priority, tags=[tag_filter], limit=kwargs.get('limit'))
     
     if isinstance(result, dict) and 'monitors' in result:
         monitors = result['monitors']
-        print(f"📊 MCP Result: Found {len(monitors)} monitors with tag '{tag_filter}'")
+        logger.debug("📊 MCP Result: Found %s monitors with tag '%s'", len(monitors), tag_filter)
         
         return {
             "success": True,
@@ -296,7 +451,7 @@ def get_monitors_by_environment_mcp(environment, group_states=None, priority=Non
         get_monitors_by_environment_mcp("staging", group_states=["alert"])
     """
     tag_filter = f"env:{environment}"
-    print(f"🌍 MCP: Getting monitors for environment '{environment}' (tag: {tag_filter})")
+    logger.info("🌍 MCP: Getting monitors for environment '%s' (tag: %s)", environment, tag_filter)
     
     return get_monitors_by_tag_mcp(tag_filter, group_states=group_states, priority=priority, **kwargs)
 
@@ -314,30 +469,36 @@ def get_monitors_by_service_mcp(service, group_states=None, priority=None, **kwa
         get_monitors_by_service_mcp("api", group_states=["alert", "warn"])
     """
     tag_filter = f"service:{service}"
-    print(f"🔧 MCP: Getting monitors for service '{service}' (tag: {tag_filter})")
+    logger.info("🔧 MCP: Getting monitors for service '%s' (tag: %s)", service, tag_filter)
     
     return get_monitors_by_tag_mcp(tag_filter, group_states=group_states, priority=priority, **kwargs)
 
-def get_monitors_by_multiple_tags_mcp(tags, group_states=None, priority=None, **kwargs):
+def get_monitors_by_multiple_tags_mcp(tags, group_states=None, priority=None, match="all", **kwargs):
     """
-    MCP Function to get monitors filtered by multiple tags (AND logic)
+    MCP Function to get monitors filtered by multiple scope tags (AND logic by default)
     
     Args:
-        tags (list): List of tags to filter by (e.g., ["env:production", "service:web-backend"])
+        tags (list): List of scope tags to filter by (e.g., ["env:production", "service:web-backend"])
         group_states (list): List of states to filter by (e.g., ['alert', 'warn'])
         priority (str): Priority to filter by (e.g., 'P1', 'P2', etc.)
+        match (str): "all" for monitors scoped to every tag, "any" for at least one
     
     Examples:
         get_monitors_by_multiple_tags_mcp(["env:production", "service:web-backend"])
         get_monitors_by_multiple_tags_mcp(["product:apm", "check_status:live"], group_states=["alert"])
+        get_monitors_by_multiple_tags_mcp(["service:api", "service:web"], match="any")
     """
-    print(f"🏷️ MCP: Getting monitors for tags {tags}")
+    if isinstance(tags, str):
+        tags = [tag.strip() for tag in tags.split(',') if tag.strip()]
+    match = 'any' if str(match).lower() == 'any' else 'all'
     
-    result = get_monitors(group_states=group_states, priority=priority, tags=tags)
+    logger.info("🏷️ MCP: Getting monitors for tags %s (match %s)", tags, match)
+    
+    result = get_monitors(group_states=group_states, priority=priority, tags=tags, tag_match=match, limit=kwargs.get('limit'))
     
     if isinstance(result, dict) and 'monitors' in result:
         monitors = result['monitors']
-        print(f"📊 MCP Result: Found {len(monitors)} monitors with tags {tags}")
+        logger.debug("📊 MCP Result: Found %s monitors with tags %s", len(monitors), tags)
         
         return {
             "success": True,
@@ -345,6 +506,7 @@ def get_monitors_by_multiple_tags_mcp(tags, group_states=None, priority=None, **
             "data": monitors,
             "filters": {
                 "tags": tags,
+                "match": match,
                 "group_states": group_states,
                 "priority": priority
             },
@@ -364,6 +526,67 @@ def get_monitors_by_multiple_tags_mcp(tags, group_states=None, priority=None, **
             "data": []
         } 
 
+def _discover_monitor_tags():
+    """
+    Categorize the tags of the monitor inventory (cache loader)
+    
+    Raises:
+        CacheLoadError: When the monitor list could not be fetched
+    """
+    # The shared inventory index already holds a posting list per tag
+    index, _ = get_monitor_index()
+    logger.debug("📊 Analyzing %s monitors for tag discovery", len(index))
+    
+    tag_counts = index.tag_counts()
+    environment_tags = {}
+    service_tags = {}
+    product_tags = {}
+    other_tags = {}
+    
+    for tag, count in tag_counts.items():
+        # Categorize tags
+        if tag.startswith('env:'):
+            env_name = tag.replace('env:', '')
+            environment_tags[env_name] = environment_tags.get(env_name, 0) + count
+        elif tag.startswith('service:'):
+            service_name = tag.replace('service:', '')
+            service_tags[service_name] = service_tags.get(service_name, 0) + count
+        elif tag.startswith('product:'):
+            product_name = tag.replace('product:', '')
+            product_tags[product_name] = product_tags.get(product_name, 0) + count
+        else:
+            other_tags[tag] = other_tags.get(tag, 0) + count
+    
+    # Sort by frequency
+    sorted_tags = sorted(tag_counts.items(), key=lambda x: x[1], reverse=True)
+    sorted_environments = sorted(environment_tags.items(), key=lambda x: x[1], reverse=True)
+    sorted_services = sorted(service_tags.items(), key=lambda x: x[1], reverse=True)
+    sorted_products = sorted(product_tags.items(), key=lambda x: x[1], reverse=True)
+    sorted_others = sorted(other_tags.items(), key=lambda x: x[1], reverse=True)
+    
+    logger.debug("🔍 Found %s unique tags:", len(tag_counts))
+    logger.debug("   🌍 %s environments", len(environment_tags))
+    logger.debug("   🔧 %s services", len(service_tags))
+    logger.debug("   📦 %s products", len(product_tags))
+    logger.debug("   🏷️ %s other tags", len(other_tags))
+    
+    # Prepare data for caching and response
+    return {
+        "total_monitors_analyzed": len(index),
+        "total_unique_tags": len(tag_counts),
+        "all_tags": sorted_tags,
+        "environments": sorted_environments,
+        "services": sorted_services, 
+        "products": sorted_products,
+        "other_tags": sorted_others,
+        "tag_summary": {
+            "most_common_tag": sorted_tags[0] if sorted_tags else None,
+            "environment_count": len(environment_tags),
+            "service_count": len(service_tags),
+            "product_count": len(product_tags)
+        }
+    }
+
 def get_available_monitor_tags_mcp(force_refresh=False, **kwargs):
     """
     MCP Function to get all available tags from monitors with intelligent caching
@@ -371,136 +594,46 @@ def get_available_monitor_tags_mcp(force_refresh=False, **kwargs):
     Args:
         force_refresh (bool): Force refresh cache even if valid
     """
-    import json
-    import os
     from datetime import datetime
-    import time
-    
-    # Cache configuration
-    CACHE_FILE = 'monitor_tags_cache.json'
-    CACHE_DURATION_HOURS = 4  # Cache expires after 4 hours
-    
-    print(f"🏷️ MCP: Discovering available monitor tags...")
-    
-    # Check cache first (unless force refresh)
-    if not force_refresh and os.path.exists(CACHE_FILE):
-        try:
-            with open(CACHE_FILE, 'r') as f:
-                cache_data = json.load(f)
-            
-            cache_age_hours = (datetime.now() - datetime.fromtimestamp(cache_data['timestamp'])).total_seconds() / 3600
-            
-            # Check if cache is fresh
-            if 'timestamp' in cache_data and cache_age_hours < CACHE_DURATION_HOURS:
-                print(f"✅ Using cached monitor tags from {datetime.fromtimestamp(cache_data['timestamp']).strftime('%Y-%m-%d %H:%M:%S')} (age: {cache_age_hours:.1f}h)")
-                
-                return {
-                    "success": True,
-                    "error": None,
-                    "data": cache_data['tags_data'],
-                    "cache_info": {
-                        "cache_age_hours": round(cache_age_hours, 1),
-                        "cache_file": CACHE_FILE,
-                        "discovery_method": "cache"
-                    }
-                }
-            else:
-                print(f"⚠️ Cache expired ({cache_age_hours:.1f}h old, max {CACHE_DURATION_HOURS}h). Refreshing from API.")
-        except Exception as e:
-            print(f"⚠️ Error loading cache: {e}. Refreshing from API.")
-    elif force_refresh:
-        print(f"🔄 Force refresh requested. Fetching fresh data from API.")
     
-    # Get all monitors (no filtering) - this is the expensive call
-    print(f"📊 Fetching ALL monitors from Datadog API...")
-    result = get_monitors()
+    logger.info("🏷️ MCP: Discovering available monitor tags...")
+    if force_refresh:
+        logger.debug("🔄 Force refresh requested. Fetching fresh data from API.")
     
-    if isinstance(result, dict) and 'monitors' in result:
-        monitors = result['monitors']
-        print(f"📊 Analyzing {len(monitors)} monitors for tag discovery")
-        
-        # Extract and count tags
-        tag_counts = {}
-        environment_tags = {}
-        service_tags = {}
-        product_tags = {}
-        other_tags = {}
-        
-        for monitor in monitors:
-            tags = monitor.get('tags', [])
-            for tag in tags:
-                # Count all tags
-                tag_counts[tag] = tag_counts.get(tag, 0) + 1
-                
-                # Categorize tags
-                if tag.startswith('env:'):
-                    env_name = tag.replace('env:', '')
-                    environment_tags[env_name] = environment_tags.get(env_name, 0) + 1
-                elif tag.startswith('service:'):
-                    service_name = tag.replace('service:', '')
-                    service_tags[service_name] = service_tags.get(service_name, 0) + 1
-                elif tag.startswith('product:'):
-                    product_name = tag.replace('product:', '')
-                    product_tags[product_name] = product_tags.get(product_name, 0) + 1
-                else:
-                    other_tags[tag] = other_tags.get(tag, 0) + 1
-        
-        # Sort by frequency
-        sorted_tags = sorted(tag_counts.items(), key=lambda x: x[1], reverse=True)
-        sorted_environments = sorted(environment_tags.items(), key=lambda x: x[1], reverse=True)
-        sorted_services = sorted(service_tags.items(), key=lambda x: x[1], reverse=True)
-        sorted_products = sorted(product_tags.items(), key=lambda x: x[1], reverse=True)
-        sorted_others = sorted(other_tags.items(), key=lambda x: x[1], reverse=True)
-        
-        print(f"🔍 Found {len(tag_counts)} unique tags:")
-        print(f"   🌍 {len(environment_tags)} environments")
-        print(f"   🔧 {len(service_tags)} services")
-        print(f"   📦 {len(product_tags)} products")
-        print(f"   🏷️ {len(other_tags)} other tags")
-        
-        # Prepare data for caching and response
-        tags_data = {
-            "total_monitors_analyzed": len(monitors),
-            "total_unique_tags": len(tag_counts),
-            "all_tags": sorted_tags,
-            "environments": sorted_environments,
-            "services": sorted_services, 
-            "products": sorted_products,
-            "other_tags": sorted_others,
-            "tag_summary": {
-                "most_common_tag": sorted_tags[0] if sorted_tags else None,
-                "environment_count": len(environment_tags),
-                "service_count": len(service_tags),
-                "product_count": len(product_tags)
-            }
-        }
-        
-        # Save to cache
-        cache_data = {
-            'timestamp': int(time.time()),
-            'tags_data': tags_data,
-            'total_monitors': len(monitors)
-        }
-        try:
-            with open(CACHE_FILE, 'w') as f:
-                json.dump(cache_data, f, indent=4)
-            print(f"✅ Monitor tags cached to {CACHE_FILE}")
-        except Exception as e:
-            print(f"⚠️ Error saving cache: {e}")
-        
-        return {
-            "success": True,
-            "error": None,
-            "data": tags_data,
-            "cache_info": {
-                "cache_file": CACHE_FILE,
-                "discovery_method": "fresh_api_call",
-                "cached_at": datetime.now().isoformat()
-            }
-        }
-    else:
+    cache = get_cache()
+    try:
+        if force_refresh:
+            get_monitor_index(force_refresh=True)
+        lookup = cache.get_or_load('monitor_tags', 'all', _discover_monitor_tags, force_refresh=force_refresh,
+                                   keep_warm=True)
+    except CacheLoadError as e:
         return {
             "success": False,
-            "error": "Failed to fetch monitors for tag discovery",
+            "error": str(e),
             "data": []
-        } 
+        }
+    
+    if lookup.from_cache:
+        cache_age_hours = lookup.age_seconds / 3600
+        logger.debug("✅ Using cached monitor tags from %s (age: %.1fh, %s)",
+                     datetime.fromtimestamp(lookup.stored_at).strftime('%Y-%m-%d %H:%M:%S'),
+                     cache_age_hours, lookup.source)
+        cache_info = {
+            "cache_age_hours": round(cache_age_hours, 1),
+            "cache_file": cache.path,
+            "discovery_method": "cache"
+        }
+    else:
+        logger.debug("✅ Monitor tags cached to %s", cache.path)
+        cache_info = {
+            "cache_file": cache.path,
+            "discovery_method": "fresh_api_call",
+            "cached_at": datetime.fromtimestamp(lookup.stored_at).isoformat()
+        }
+    
+    return {
+        "success": True,
+        "error": None,
+        "data": lookup.value,
+        "cache_info": cache_info
+    }
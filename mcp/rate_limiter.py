@@ -0,0 +1,223 @@
+"""
+Rate-limit aware scheduling for Datadog API calls.
+
+Datadog reports per-endpoint limits on every response:
+X-RateLimit-Limit / -Period / -Remaining / -Reset (seconds until the window
+resets). Requests are grouped into endpoint families ('v1/query',
+'v2/logs', 'v1/monitor', ...). Each family has a token bucket that starts
+unlimited and learns its capacity and refill rate from those headers.
+
+When a family runs out of tokens, callers queue in FIFO order and are paced
+until tokens are available or the window resets. 429 and 5xx responses are
+retried with backoff, honoring X-RateLimit-Reset when present. Queue depth,
+waits and throttling are counted per family.
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from urllib.parse import urlsplit
+from dotenv import load_dotenv
+
+from env_settings import validate_number
+
+load_dotenv()
+
+RETRY_STATUS_CODES = frozenset([429, 500, 502, 503, 504])
+_BACKOFF_BASE_SECONDS = 0.5
+_BACKOFF_CAP_SECONDS = 10.0
+
+
+# Retries for 429/5xx responses
+DD_MAX_RETRIES = validate_number('DD_MAX_RETRIES', 3, 0, 10, cast=int)
+# Longest a request waits in the rate-limit queue (seconds)
+DD_RATE_LIMIT_MAX_WAIT = validate_number('DD_RATE_LIMIT_MAX_WAIT', 30.0, 0, 300)
+
+
+def endpoint_family(url):
+    """
+    Map a Datadog URL to its rate-limit family
+
+    Examples:
+    - https://api.datadoghq.com/api/v1/query -> 'v1/query'
+    - https://api.datadoghq.com/api/v2/logs/events/search -> 'v2/logs'
+    - https://api.datadoghq.com/api/v1/dashboard/abc-123 -> 'v1/dashboard'
+    """
+    parts = [part for part in urlsplit(url).path.split('/') if part]
+    if parts and parts[0] == 'api':
+        parts = parts[1:]
+    return '/'.join(parts[:2]) or 'default'
+
+
+def _header_number(headers, name):
+    value = headers.get(name) if headers else None
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """
+    Token bucket for one endpoint family
+
+    Unlimited until the first response carrying X-RateLimit headers. After
+    that it holds `capacity` tokens refilled at capacity/period per second;
+    the server's Remaining count caps the local estimate, and Remaining=0
+    blocks the family until the reported reset.
+    """
+
+    def __init__(self):
+        self.capacity = None
+        self.refill_per_second = None
+        self.tokens = None
+        self.blocked_until = 0.0
+        self.updated = time.monotonic()
+        self.queue = deque()
+        self.max_queue_depth = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.throttled = 0
+        self.retries = 0
+
+    def _refill(self, now):
+        if self.capacity is not None:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_per_second)
+        self.updated = now
+
+    def wait_time(self, now):
+        """Seconds until a token is available (0 when one can be taken now)"""
+        self._refill(now)
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if self.capacity is None or self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.refill_per_second
+
+    def take(self):
+        if self.capacity is not None:
+            self.tokens -= 1
+
+    def observe(self, headers, now):
+        """Learn limits from X-RateLimit-* response headers"""
+        limit = _header_number(headers, 'X-RateLimit-Limit')
+        period = _header_number(headers, 'X-RateLimit-Period')
+        remaining = _header_number(headers, 'X-RateLimit-Remaining')
+        reset = _header_number(headers, 'X-RateLimit-Reset')
+        self._refill(now)
+        if limit and period:
+            if self.capacity is None:
+                self.tokens = limit
+            self.capacity = limit
+            self.refill_per_second = limit / period
+        if remaining is not None and self.tokens is not None:
+            self.tokens = min(self.tokens, remaining)
+        if remaining is not None and remaining <= 0 and reset is not None:
+            self.blocked_until = max(self.blocked_until, now + reset)
+
+    def block(self, seconds, now):
+        self.blocked_until = max(self.blocked_until, now + seconds)
+
+
+class RateLimiter:
+    """Per-endpoint-family token buckets with a FIFO wait queue"""
+
+    def __init__(self, max_wait=None, max_retries=None):
+        self.max_wait = DD_RATE_LIMIT_MAX_WAIT if max_wait is None else max_wait
+        self.max_retries = DD_MAX_RETRIES if max_retries is None else max_retries
+        self._buckets = {}
+        self._cond = threading.Condition()
+
+    def _bucket(self, family):
+        bucket = self._buckets.get(family)
+        if bucket is None:
+            bucket = self._buckets[family] = TokenBucket()
+        return bucket
+
+    def acquire(self, family, max_wait=None):
+        """
+        Block until the family has a token (or max_wait elapsed), in arrival order
+
+        Args:
+            max_wait (float): Shorter wait limit for this call (e.g. the time left before its deadline)
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        ticket = object()
+        start = time.monotonic()
+        deadline = start + (self.max_wait if max_wait is None else max(0.0, min(self.max_wait, max_wait)))
+        with self._cond:
+            bucket = self._bucket(family)
+            bucket.queue.append(ticket)
+            bucket.max_queue_depth = max(bucket.max_queue_depth, len(bucket.queue))
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait = bucket.wait_time(now) if bucket.queue[0] is ticket else None
+                    if wait == 0 or now >= deadline:
+                        # Past max_wait we send anyway; a 429 is retried with backoff
+                        bucket.take()
+                        break
+                    timeout = min(wait, deadline - now) if wait is not None else deadline - now
+                    self._cond.wait(timeout)
+            finally:
+                bucket.queue.remove(ticket)
+                self._cond.notify_all()
+            waited = time.monotonic() - start
+            if waited > 0.001:
+                bucket.waits += 1
+                bucket.wait_seconds += waited
+        return waited
+
+    def try_acquire(self, family):
+        """Take a token only if one is free now and nobody is queued (for optional extra calls)"""
+        with self._cond:
+            bucket = self._bucket(family)
+            if bucket.queue or bucket.wait_time(time.monotonic()) > 0:
+                return False
+            bucket.take()
+            return True
+
+    def observe(self, family, status_code, headers):
+        """Feed a response's status and rate-limit headers back into the family's bucket"""
+        with self._cond:
+            bucket = self._bucket(family)
+            now = time.monotonic()
+            bucket.observe(headers, now)
+            if status_code == 429:
+                bucket.throttled += 1
+                reset = _header_number(headers, 'X-RateLimit-Reset')
+                if reset is not None:
+                    bucket.block(reset, now)
+            self._cond.notify_all()
+
+    def retry_delay(self, family, attempt, status_code, headers):
+        """Backoff before retrying a 429/5xx: the reported reset if known, else jittered exponential"""
+        with self._cond:
+            self._bucket(family).retries += 1
+        reset = _header_number(headers, 'X-RateLimit-Reset') if status_code == 429 else None
+        if reset is not None:
+            return min(reset + random.uniform(0, _BACKOFF_BASE_SECONDS), _BACKOFF_CAP_SECONDS)
+        return random.uniform(0, min(_BACKOFF_CAP_SECONDS, _BACKOFF_BASE_SECONDS * (2 ** attempt)))
+
+    def stats(self):
+        """Return {family: {limit, tokens, queued, max_queued, waits, wait_seconds, throttled, retries}}"""
+        with self._cond:
+            now = time.monotonic()
+            snapshot = {}
+            for family, bucket in self._buckets.items():
+                bucket._refill(now)
+                snapshot[family] = {
+                    "limit": bucket.capacity,
+                    "period_seconds": round(bucket.capacity / bucket.refill_per_second, 3) if bucket.capacity else None,
+                    "tokens": round(bucket.tokens, 2) if bucket.tokens is not None else None,
+                    "queued": len(bucket.queue),
+                    "max_queued": bucket.max_queue_depth,
+                    "waits": bucket.waits,
+                    "wait_seconds": round(bucket.wait_seconds, 3),
+                    "throttled": bucket.throttled,
+                    "retries": bucket.retries,
+                }
+            return snapshot
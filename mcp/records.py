@@ -0,0 +1,189 @@
+"""
+Compact __slots__ record types used inside the MCP tools.
+
+Tools used to build one dict per log/series/event/monitor (plus a copied
+`attributes` dict per log). These records keep the same field names in
+slots instead, and answer the small read/write mapping API the analyzers
+already use (`record.get(...)`, `record['field']`, `'field' in record`).
+They are converted to plain dicts only at the LLM/UI boundary
+(`MCPLoader.call_tool`) via `to_plain`.
+"""
+
+_LOG_CORE_FIELDS = frozenset(['timestamp', 'message', 'status', 'service', 'source', 'host', 'tags'])
+
+
+class _Record:
+    """Base class providing a read/write mapping view over slots"""
+
+    __slots__ = ()
+    _fields = ()
+    _optional_fields = ()
+
+    def _has(self, key):
+        if key not in self._fields:
+            return False
+        return key not in self._optional_fields or getattr(self, key, None) is not None
+
+    def get(self, key, default=None):
+        if not self._has(key):
+            return default
+        return getattr(self, key)
+
+    def __getitem__(self, key):
+        if not self._has(key):
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        if key not in self._fields:
+            raise KeyError(f"{type(self).__name__} has no field '{key}'")
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return self._has(key)
+
+    def keys(self):
+        return [key for key in self._fields if self._has(key)]
+
+    def items(self):
+        return [(key, getattr(self, key)) for key in self.keys()]
+
+    def to_dict(self):
+        return {key: getattr(self, key) for key in self.keys()}
+
+    def __eq__(self, other):
+        if isinstance(other, (_Record, dict)):
+            return self.to_dict() == (other.to_dict() if isinstance(other, _Record) else other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(self.to_dict())
+
+
+class LogRecord(_Record):
+    """
+    A log entry from /api/v2/logs/events/search
+
+    The raw `attributes` dict is referenced, not copied; the non-core
+    attributes are only materialized when `attributes` is read.
+    """
+
+    __slots__ = ('timestamp', 'message', 'status', 'service', 'source', 'host', 'tags', '_raw_attributes')
+    _fields = ('timestamp', 'message', 'status', 'service', 'source', 'host', 'tags', 'attributes')
+
+    def __init__(self, raw_attributes):
+        get = raw_attributes.get
+        self.timestamp = get('timestamp')
+        self.message = get('message', '')
+        self.status = get('status', '')
+        self.service = get('service', '')
+        self.source = get('source', '')
+        self.host = get('host', '')
+        self.tags = get('tags', [])
+        self._raw_attributes = raw_attributes
+
+    @property
+    def attributes(self):
+        return {k: v for k, v in self._raw_attributes.items() if k not in _LOG_CORE_FIELDS}
+
+
+class MetricSeries(_Record):
+    """A formatted series from /api/v1/query with precomputed statistics"""
+
+    __slots__ = ('metric', 'scope', 'pointlist', 'data_points_count', 'latest_value', 'latest_timestamp',
+                 'min_value', 'max_value', 'avg_value', 'metric_type', 'operation', 'full_metric_name')
+    _fields = __slots__
+    # Only present when an auto-discovery tool annotates the series
+    _optional_fields = ('metric_type', 'operation', 'full_metric_name')
+
+    def __init__(self, metric, scope, pointlist):
+        self.metric = metric
+        self.scope = scope
+        self.pointlist = pointlist
+        self.data_points_count = len(pointlist)
+        self.latest_value = None
+        self.latest_timestamp = None
+        self.min_value = None
+        self.max_value = None
+        self.avg_value = None
+        self.metric_type = None
+        self.operation = None
+        self.full_metric_name = None
+
+
+class EventRecord(_Record):
+    """An event from /api/v1/events"""
+
+    __slots__ = ('id', 'title', 'text', 'date_happened', 'timestamp', 'priority', 'source_type_name',
+                 'host', 'tags', 'url', 'alert_type', 'aggregation_key', 'source')
+    _fields = __slots__
+
+    def __init__(self, event, timestamp):
+        get = event.get
+        self.id = get('id')
+        self.title = get('title', '')
+        self.text = get('text', '')
+        self.date_happened = get('date_happened')
+        self.timestamp = timestamp
+        self.priority = get('priority', 'normal')
+        self.source_type_name = get('source_type_name', '')
+        self.host = get('host', '')
+        self.tags = get('tags', [])
+        self.url = get('url', '')
+        self.alert_type = get('alert_type', '')
+        self.aggregation_key = get('aggregation_key', '')
+        self.source = get('source', '')
+
+
+class MonitorRecord(_Record):
+    """A monitor from /api/v1/monitor (overall_state exposed as `status`)"""
+
+    __slots__ = ('id', 'name', 'status', 'priority', 'type', 'query', 'message', 'tags',
+                 'created', 'modified', 'creator')
+    _fields = __slots__
+
+    def __init__(self, monitor):
+        get = monitor.get
+        self.id = get('id')
+        self.name = get('name')
+        self.status = get('overall_state')
+        self.priority = get('priority')
+        self.type = get('type')
+        self.query = get('query')
+        self.message = get('message')
+        self.tags = get('tags', [])
+        self.created = get('created')
+        self.modified = get('modified')
+        self.creator = (get('creator') or {}).get('name')
+
+
+def to_plain(value):
+    """
+    Recursively convert records inside a tool result into plain dicts/lists
+
+    Containers without records are returned as-is, so plain results cost a
+    single walk and no copies.
+    """
+    if isinstance(value, _Record):
+        return {key: to_plain(item) for key, item in value.items()}
+    if isinstance(value, dict):
+        converted = None
+        for key, item in value.items():
+            plain = to_plain(item)
+            if plain is not item:
+                if converted is None:
+                    converted = dict(value)
+                converted[key] = plain
+        return value if converted is None else converted
+    if isinstance(value, list):
+        converted = None
+        for i, item in enumerate(value):
+            plain = to_plain(item)
+            if plain is not item:
+                if converted is None:
+                    converted = list(value)
+                converted[i] = plain
+        return value if converted is None else converted
+    return value
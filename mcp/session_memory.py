@@ -0,0 +1,341 @@
+"""
+Per-session memory of structured tool results.
+
+Each chat session keeps the plain-dict results of its recent tool calls,
+keyed by conversation turn. Follow-ups such as "now show me the max of
+that" are answered by the `reuse_result` tool, which filters, projects or
+re-aggregates a stored result locally instead of calling Datadog again.
+
+Memory is bounded: at most SESSION_MEMORY_MAX_RESULTS results and
+SESSION_MEMORY_MAX_MB of (JSON-estimated) data per session, at most
+SESSION_MEMORY_MAX_SESSIONS sessions, and sessions idle for
+SESSION_MEMORY_TTL_MINUTES are dropped. Oldest results go first.
+
+The session a call belongs to is carried in a context variable set by the
+UI handler with `session_scope(session_id)`.
+"""
+
+import contextvars
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dotenv import load_dotenv
+from yoda_logging import get_logger
+from env_settings import validate_number
+
+load_dotenv()
+
+logger = get_logger(__name__)
+
+DEFAULT_SESSION = 'default'
+REUSE_TOOL_NAME = 'reuse_result'
+AGGREGATES = ('count', 'max', 'min', 'avg', 'sum', 'latest')
+
+
+SESSION_MEMORY_MAX_RESULTS = validate_number('SESSION_MEMORY_MAX_RESULTS', 10, 1, 100, cast=int)
+SESSION_MEMORY_MAX_MB = validate_number('SESSION_MEMORY_MAX_MB', 5, 1, 500, cast=int)
+SESSION_MEMORY_MAX_SESSIONS = validate_number('SESSION_MEMORY_MAX_SESSIONS', 100, 1, 10000, cast=int)
+SESSION_MEMORY_TTL_MINUTES = validate_number('SESSION_MEMORY_TTL_MINUTES', 60, 1, 1440, cast=int)
+
+_current_session = contextvars.ContextVar('yoda_session_id', default=DEFAULT_SESSION)
+
+
+@contextmanager
+def session_scope(session_id):
+    """Run the enclosed tool calls on behalf of `session_id`"""
+    token = _current_session.set(session_id or DEFAULT_SESSION)
+    try:
+        yield
+    finally:
+        _current_session.reset(token)
+
+
+def current_session_id():
+    return _current_session.get()
+
+
+class StoredResult:
+    """A tool result kept for later turns"""
+
+    __slots__ = ('turn', 'tool_name', 'params', 'result', 'size_bytes', 'stored_at')
+
+    def __init__(self, turn, tool_name, params, result, size_bytes):
+        self.turn = turn
+        self.tool_name = tool_name
+        self.params = params
+        self.result = result
+        self.size_bytes = size_bytes
+        self.stored_at = time.time()
+
+    def describe(self):
+        """One-line description used in prompts and listings"""
+        args = ", ".join(f"{key}={value!r}" for key, value in self.params.items())
+        data = self.result.get('data') if isinstance(self.result, dict) else None
+        count = f"{len(data)} items" if isinstance(data, list) else type(data).__name__
+        return f"turn {self.turn}: {self.tool_name}({args}) -> {count}"
+
+
+class _Session:
+    __slots__ = ('results', 'size_bytes', 'last_used')
+
+    def __init__(self):
+        self.results = OrderedDict()
+        self.size_bytes = 0
+        self.last_used = time.time()
+
+
+class SessionMemory:
+    """Bounded per-session store of structured tool results"""
+
+    def __init__(self, max_results=None, max_bytes=None, max_sessions=None, ttl_seconds=None):
+        self.max_results = max_results or SESSION_MEMORY_MAX_RESULTS
+        self.max_bytes = max_bytes or SESSION_MEMORY_MAX_MB * 1024 * 1024
+        self.max_sessions = max_sessions or SESSION_MEMORY_MAX_SESSIONS
+        self.ttl_seconds = ttl_seconds or SESSION_MEMORY_TTL_MINUTES * 60
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _expire(self, now):
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if now - session.last_used <= self.ttl_seconds and len(self._sessions) <= self.max_sessions:
+                break
+            del self._sessions[session_id]
+
+    def remember(self, turn, tool_name, params, result, session_id=None):
+        """
+        Store a tool result for `turn`, evicting the session's oldest results to stay in bounds
+
+        Returns:
+            StoredResult or None when the result alone exceeds the per-session budget
+        """
+        session_id = session_id or current_session_id()
+        size_bytes = len(json.dumps(result, default=str))
+        if size_bytes > self.max_bytes:
+            logger.warning("⚠️ Result of %s (%s bytes) exceeds the session memory budget - not kept",
+                           tool_name, size_bytes)
+            return None
+        entry = StoredResult(turn, tool_name, dict(params or {}), result, size_bytes)
+        now = time.time()
+        with self._lock:
+            session = self._sessions.pop(session_id, None) or _Session()
+            self._sessions[session_id] = session
+            session.last_used = now
+            previous = session.results.pop(turn, None)
+            if previous is not None:
+                session.size_bytes -= previous.size_bytes
+            session.results[turn] = entry
+            session.size_bytes += size_bytes
+            while len(session.results) > self.max_results or session.size_bytes > self.max_bytes:
+                _, evicted = session.results.popitem(last=False)
+                session.size_bytes -= evicted.size_bytes
+            self._expire(now)
+        return entry
+
+    def results(self, session_id=None):
+        """Stored results of a session, oldest first"""
+        session_id = session_id or current_session_id()
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return []
+            session.last_used = time.time()
+            self._sessions.move_to_end(session_id)
+            return list(session.results.values())
+
+    def find(self, turn=None, tool_name=None, session_id=None):
+        """The result of `turn`, else the latest result (of `tool_name` when given)"""
+        results = self.results(session_id)
+        if turn is not None:
+            turn = int(turn)
+            if turn < 0:
+                return results[turn] if len(results) >= -turn else None
+            return next((entry for entry in results if entry.turn == turn), None)
+        for entry in reversed(results):
+            if tool_name is None or entry.tool_name == tool_name:
+                return entry
+        return None
+
+    def clear(self, session_id=None):
+        with self._lock:
+            self._sessions.pop(session_id or current_session_id(), None)
+
+    def describe(self, session_id=None):
+        """Prompt snippet listing the session's reusable results (None when empty)"""
+        results = self.results(session_id)
+        if not results:
+            return None
+        lines = "\n".join(f"- {entry.describe()}" for entry in results)
+        return ("SESSION RESULTS (reuse with TOOL_CALL: reuse_result(turn=N, ...) instead of re-querying):\n"
+                + lines)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "results": sum(len(session.results) for session in self._sessions.values()),
+                "bytes": sum(session.size_bytes for session in self._sessions.values()),
+            }
+
+
+_memory = SessionMemory()
+
+
+def get_session_memory():
+    """Return the process-wide session memory"""
+    return _memory
+
+
+# ---------------------------------------------------------------------------
+# reuse_result tool
+# ---------------------------------------------------------------------------
+
+_FILTER = re.compile(r'^\s*([\w.@-]+)\s*(>=|<=|!=|=|~|>|<)\s*(.*?)\s*$')
+
+
+def _lookup(item, path):
+    """Read a (dotted) field from a result item"""
+    value = item
+    for part in path.split('.'):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def _as_number(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _matches(item, condition):
+    field, operator, expected = condition
+    value = _lookup(item, field)
+    if operator == '~':
+        return value is not None and expected.lower() in str(value).lower()
+    if operator in ('=', '!='):
+        equal = str(value).lower() == expected.lower() if value is not None else expected.lower() in ('', 'none', 'null')
+        return equal if operator == '=' else not equal
+    number, bound = _as_number(value), _as_number(expected)
+    if number is None or bound is None:
+        return False
+    return {'>': number > bound, '<': number < bound, '>=': number >= bound, '<=': number <= bound}[operator]
+
+
+def _aggregate(values, aggregate):
+    """Aggregate (timestamp, number) pairs; returns (value, timestamp or None)"""
+    numbers = [(ts, value) for ts, value in values if value is not None]
+    if aggregate == 'count':
+        return len(numbers), None
+    if not numbers:
+        return None, None
+    if aggregate == 'max':
+        ts, value = max(numbers, key=lambda pair: pair[1])
+        return value, ts
+    if aggregate == 'min':
+        ts, value = min(numbers, key=lambda pair: pair[1])
+        return value, ts
+    if aggregate == 'latest':
+        ts, value = numbers[-1]
+        return value, ts
+    total = sum(value for _, value in numbers)
+    return (total / len(numbers) if aggregate == 'avg' else total), None
+
+
+def reuse_result_mcp(turn=None, tool=None, filter=None, fields=None, aggregate=None, field=None,
+                     group_by=None, limit=None, **kwargs):
+    """
+    MCP Function to reuse a tool result from an earlier turn of this session
+
+    Args:
+        turn (int): Turn number from SESSION RESULTS (negative counts back, -1 = latest)
+        tool (str): Use the latest result of this tool when no turn is given
+        filter (str|list): Conditions like "status=error", "service~pay", "max_value>80"
+        fields (list): Only keep these fields of each item
+        aggregate (str): count, max, min, avg, sum or latest. Metric series aggregate their
+                         pointlist per series; other items aggregate `field`.
+        field (str): Numeric field to aggregate on non-metric items
+        group_by (str): Count items per value of this field
+        limit (int): Maximum number of items to return
+    """
+    memory = get_session_memory()
+    entry = memory.find(turn=turn, tool_name=tool)
+    available = [stored.describe() for stored in memory.results()]
+    if entry is None:
+        return {
+            "success": False,
+            "error": "No stored result matches - query the tool again" if not available else
+                     f"No stored result for turn={turn!r} tool={tool!r}",
+            "data": [],
+            "available_results": available,
+        }
+
+    data = entry.result.get('data') if isinstance(entry.result, dict) else entry.result
+    source = {"turn": entry.turn, "tool": entry.tool_name, "params": entry.params}
+    if not isinstance(data, list):
+        return {"success": True, "error": None, "data": data, "source": source}
+
+    items = data
+    conditions = [filter] if isinstance(filter, str) else list(filter or [])
+    for condition in conditions:
+        parsed = _FILTER.match(condition)
+        if not parsed:
+            return {"success": False, "error": f"Invalid filter '{condition}' - use field=value, field~text or field>number",
+                    "data": [], "source": source}
+        items = [item for item in items if isinstance(item, dict) and _matches(item, parsed.groups())]
+
+    result = {"success": True, "error": None, "source": source, "matched_items": len(items)}
+
+    if group_by:
+        counts = {}
+        for item in items:
+            key = str(_lookup(item, group_by)) if isinstance(item, dict) else 'unknown'
+            counts[key] = counts.get(key, 0) + 1
+        result["data"] = dict(sorted(counts.items(), key=lambda pair: pair[1], reverse=True))
+        return result
+
+    if aggregate:
+        aggregate = str(aggregate).lower()
+        if aggregate not in AGGREGATES:
+            return {"success": False, "error": f"Unknown aggregate '{aggregate}' - use one of {list(AGGREGATES)}",
+                    "data": [], "source": source}
+        if items and all(isinstance(item, dict) and 'pointlist' in item for item in items):
+            per_series = []
+            overall = []
+            for item in items:
+                points = [(point[0], point[1]) for point in item.get('pointlist') or [] if len(point) >= 2]
+                value, ts = _aggregate(points, aggregate)
+                per_series.append({"metric": item.get('metric'), "scope": item.get('scope'), aggregate: value,
+                                   "timestamp": ts})
+                overall.extend(points)
+            value, ts = _aggregate(overall, aggregate)
+            result["data"] = per_series[:limit] if limit else per_series
+            result["overall"] = {aggregate: value, "timestamp": ts}
+            return result
+        if aggregate == 'count' and not field:
+            result["data"] = {"count": len(items)}
+            return result
+        if not field:
+            return {"success": False, "error": f"'{aggregate}' needs field= for non-metric results",
+                    "data": [], "source": source}
+        values = [(None, _as_number(_lookup(item, field))) for item in items if isinstance(item, dict)]
+        value, _ = _aggregate(values, aggregate)
+        result["data"] = {aggregate: value, "field": field}
+        return result
+
+    if fields:
+        fields = [fields] if isinstance(fields, str) else fields
+        items = [{name: _lookup(item, name) for name in fields} if isinstance(item, dict) else item for item in items]
+    if limit:
+        items = items[:int(limit)]
+    result["data"] = items
+    return result
@@ -9,6 +9,14 @@ from colorama import Fore, Style, init
 from pathlib import Path
 from dotenv import load_dotenv
 
+from telemetry import TOOL_METRIC, span
+from tracing import params_hash, trace_span
+from tool_memory import tool_memory
+from deadlines import DeadlineExceeded, deadline_scope, tool_timeout
+from yoda_logging import get_logger
+
+logger = get_logger(__name__)
+
 # Load environment variables first
 load_dotenv()
 
@@ -88,31 +96,32 @@ def configure_ssl_warnings():
         urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
         if hasattr(requests.packages, 'urllib3'):
             requests.packages.urllib3.disable_warnings()
-        print(f"🔒 SSL verification: DISABLED (SSL_VERIFY={os.getenv('SSL_VERIFY', 'true')})")
+        logger.info("🔒 SSL verification: DISABLED (SSL_VERIFY=%s)", os.getenv('SSL_VERIFY', 'true'))
     else:
-        print(f"🔒 SSL verification: ENABLED (SSL_VERIFY={os.getenv('SSL_VERIFY', 'true')})")
+        logger.info("🔒 SSL verification: ENABLED (SSL_VERIFY=%s)", os.getenv('SSL_VERIFY', 'true'))
     
     # Show LLM API configuration
     llm_env_value = os.getenv('LLM_API_URL')
     if llm_env_value:
-        print(f"🤖 LLM API: CUSTOM ({LLM_API_URL})")
+        logger.info("🤖 LLM API: CUSTOM (%s)", LLM_API_URL)
     else:
-        print(f"🤖 LLM API: DEFAULT (https://api.openai.com/v1/chat/completions)")
+        logger.info("🤖 LLM API: DEFAULT (https://api.openai.com/v1/chat/completions)")
     
     # Show conversation limit configuration
     conv_env_value = os.getenv('CONVERSATION_LIMIT')
     if conv_env_value:
-        print(f"💭 Conversation History: {CONVERSATION_LIMIT} conversations ({CONVERSATION_LIMIT * 2} messages)")
+        logger.info("💭 Conversation History: %s conversations (%s messages)",
+                    CONVERSATION_LIMIT, CONVERSATION_LIMIT * 2)
     else:
-        print(f"💭 Conversation History: DEFAULT (5 conversations, 10 messages)")
+        logger.info("💭 Conversation History: DEFAULT (5 conversations, 10 messages)")
     
     # Show token optimization settings
     log_env_value = os.getenv('LOG_DISPLAY_LIMIT')
     msg_env_value = os.getenv('MAX_MESSAGE_LENGTH')
     if log_env_value or msg_env_value:
-        print(f"🚨 Token Limits: {LOG_DISPLAY_LIMIT} logs max, {MAX_MESSAGE_LENGTH} chars per message")
+        logger.info("🚨 Token Limits: %s logs max, %s chars per message", LOG_DISPLAY_LIMIT, MAX_MESSAGE_LENGTH)
     else:
-        print(f"🚨 Token Limits: DEFAULT (10 logs max, 80 chars per message)")
+        logger.info("🚨 Token Limits: DEFAULT (10 logs max, 80 chars per message)")
 
 # Initialize SSL configuration
 configure_ssl_warnings()
@@ -198,11 +207,11 @@ class MCPLoader:
     def load_all_schemas(self):
         """Load all JSON schemas from the schemas directory"""
         if not self.schemas_dir.exists():
-            print(f"❌ Schemas directory {self.schemas_dir} not found")
+            logger.error("❌ Schemas directory %s not found", self.schemas_dir)
             return
         
         schema_files = list(self.schemas_dir.glob("*_schema.json"))
-        print(f"🔍 Found {len(schema_files)} schema files")
+        logger.info("🔍 Found %s schema files", len(schema_files))
         
         for schema_file in schema_files:
             try:
@@ -210,9 +219,9 @@ class MCPLoader:
                     schema = json.load(f)
                     mcp_name = schema['name']
                     self.tools[mcp_name] = schema
-                    print(f"✅ Loaded {mcp_name} MCP with {len(schema['tools'])} tools")
+                    logger.info("✅ Loaded %s MCP with %s tools", mcp_name, len(schema['tools']))
             except Exception as e:
-                print(f"❌ Error loading {schema_file}: {e}")
+                logger.error("❌ Error loading %s: %s", schema_file, e)
     
     def register_functions(self):
         """Register actual Python functions for each tool using dynamic imports"""
@@ -224,7 +233,7 @@ class MCPLoader:
                 handler = tool.get('handler')
                 
                 if not handler:
-                    print(f"⚠️ No handler specified for tool: {tool_name}")
+                    logger.warning("⚠️ No handler specified for tool: %s", tool_name)
                     continue
                 
                 try:
@@ -237,12 +246,12 @@ class MCPLoader:
                     
                     # Register the function
                     self.tool_functions[tool_name] = function
-                    print(f"🔧 Registered {tool_name} → {handler}")
+                    logger.debug("🔧 Registered %s → %s", tool_name, handler)
                     
                 except Exception as e:
-                    print(f"❌ Error registering {tool_name} from {handler}: {e}")
+                    logger.error("❌ Error registering %s from %s: %s", tool_name, handler, e)
         
-        print(f"✅ Successfully registered {len(self.tool_functions)} tool functions")
+        logger.info("✅ Successfully registered %s tool functions", len(self.tool_functions))
     
     def get_all_tools_for_llm(self):
         """
@@ -285,6 +294,8 @@ class MCPLoader:
     def call_tool(self, tool_name, **kwargs):
         """
         Call a tool function dynamically
+
+        The tool runs under its deadline (deadlines.py) and memory budget (tool_memory.py).
         """
         if tool_name not in self.tool_functions:
             return {
@@ -292,15 +303,46 @@ class MCPLoader:
                 "error": f"Tool '{tool_name}' not found. Available tools: {list(self.tool_functions.keys())}"
             }
         
-        try:
-            function = self.tool_functions[tool_name]
-            result = function(**kwargs)
-            return result
-        except Exception as e:
-            return {
-                "success": False,
-                "error": f"Error calling {tool_name}: {str(e)}"
-            }
+        trace_attributes = {'tool.name': tool_name, 'tool.params_hash': params_hash(kwargs),
+                            'tool.params': json.dumps(kwargs, sort_keys=True, default=str)[:500]}
+        with span(TOOL_METRIC, tool=tool_name, outcome='error') as labels, \
+                trace_span('mcp.tool', **trace_attributes) as trace:
+            try:
+                from mcp.records import to_plain
+                
+                function = self.tool_functions[tool_name]
+                with deadline_scope(tool_timeout(tool_name)), tool_memory(tool_name) as memory:
+                    result = function(**kwargs)
+                    # Tools work on compact records internally - hand plain dicts to the LLM/UI
+                    result = memory.fit(to_plain(result))
+                if isinstance(result, dict):
+                    trace.set_attribute('tool.success', bool(result.get('success')))
+                    if isinstance(result.get('data'), (list, dict)):
+                        trace.set_attribute('tool.result_count', len(result['data']))
+                    if result.get('success'):
+                        labels['outcome'] = 'success'
+                return result
+            except DeadlineExceeded as e:
+                labels['outcome'] = 'timeout'
+                logger.error("❌ %s: %s", tool_name, e)
+                return {
+                    "success": False,
+                    "error": f"Error calling {tool_name}: {e}. Narrow the time range or query.",
+                    "data": None
+                }
+            except MemoryError:
+                labels['outcome'] = 'memory_error'
+                logger.error("❌ %s ran out of memory", tool_name)
+                return {
+                    "success": False,
+                    "error": f"Error calling {tool_name}: out of memory. Narrow the time range or query.",
+                    "data": None
+                }
+            except Exception as e:
+                return {
+                    "success": False,
+                    "error": f"Error calling {tool_name}: {str(e)}"
+                }
     
     def get_available_tools(self):
         """Get list of all available tool names"""
@@ -313,6 +355,15 @@ class MCPLoader:
                 if tool['name'] == tool_name:
                     return tool
         return None
+    
+    def get_tool_examples(self):
+        """Get (tool_name, description, call) for every schema example"""
+        examples = []
+        for mcp_name, schema in self.tools.items():
+            for tool in schema['tools']:
+                for example in tool.get('examples', []):
+                    examples.append((tool['name'], example['description'], example['call']))
+        return examples
 
 # Global loader instance
 mcp_loader = MCPLoader()
@@ -329,6 +380,14 @@ def get_available_mcp_tools():
     """Get list of available tools"""
     return mcp_loader.get_available_tools()
 
+def get_mcp_tool_info(tool_name):
+    """Get the schema entry of a tool"""
+    return mcp_loader.get_tool_info(tool_name)
+
+def get_mcp_tool_examples():
+    """Get (tool_name, description, call) for every schema example"""
+    return mcp_loader.get_tool_examples()
+
 if __name__ == "__main__":
     # Test the loader
     print("🧪 Testing MCP Loader...")
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Opt-in per-turn profiling with pstats and flamegraph dumps.
+
+A profiled chat turn runs under a profiler on the handler thread and on every
+tool-pool thread that works for it (the active profile is a context
+variable, so it follows tool calls into the pool like the session id and
+trace span do). When the turn ends, one file is written to PROFILE_DIR,
+named after the turn id and the tool it called:
+
+    20261019-142233-3f9a1c-search_logs.prof     PROFILE_MODE=cprofile (default)
+    20261019-142233-3f9a1c-search_logs.folded   PROFILE_MODE=sample
+
+`.prof` files are merged cProfile stats (`python -m pstats FILE`, snakeviz,
+gprof2dot). `.folded` files hold stacks sampled every
+PROFILE_SAMPLE_INTERVAL_MS in the folded format read by flamegraph.pl,
+speedscope and inferno - sampling costs far less than cProfile and keeps the
+call-path shape of the analyzers and parsers.
+
+A turn is profiled when:
+    - the chat message starts with `profile ` (e.g. `profile show me all P1 alerts`)
+    - or it is picked by PROFILE_SAMPLE_RATE (fraction of all turns, default 0)
+"""
+
+import contextvars
+import cProfile
+import os
+import pstats
+import random
+import re
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dotenv import load_dotenv
+
+from env_settings import validate_number
+from yoda_logging import get_logger
+
+load_dotenv()
+
+logger = get_logger(__name__)
+
+_PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROFILE_MODES = ('cprofile', 'sample')
+PROFILE_COMMAND = 'profile'
+
+
+def _validate_profile_mode():
+    """Validate and return the PROFILE_MODE profiler"""
+    mode = os.getenv('PROFILE_MODE', 'cprofile').lower().strip()
+    if mode in PROFILE_MODES:
+        return mode
+    print(f"⚠️  Invalid PROFILE_MODE='{mode}'. Using default: cprofile")
+    return 'cprofile'
+
+
+PROFILE_MODE = _validate_profile_mode()
+PROFILE_SAMPLE_RATE = validate_number('PROFILE_SAMPLE_RATE', 0.0, 0.0, 1.0)
+PROFILE_SAMPLE_INTERVAL_MS = validate_number('PROFILE_SAMPLE_INTERVAL_MS', 5, 1, 1000, cast=int)
+PROFILE_DIR = os.getenv('PROFILE_DIR') or os.path.join(_PROJECT_DIR, 'profiles')
+
+
+def _safe(text):
+    return re.sub(r'[^A-Za-z0-9_.-]+', '_', text)[:60]
+
+
+def parse_profile_command(message):
+    """Split `profile <message>` into (message, True); other messages return (message, False)"""
+    head, _, rest = message.strip().partition(' ')
+    if head.lower() == PROFILE_COMMAND and rest.strip():
+        return rest.strip(), True
+    return message, False
+
+
+class TurnProfile:
+    """Profiler state of one chat turn, shared with the pool threads working for it"""
+
+    def __init__(self, mode=None, directory=None, interval_ms=None):
+        self.mode = mode or PROFILE_MODE
+        self.directory = directory or PROFILE_DIR
+        self.interval = (interval_ms or PROFILE_SAMPLE_INTERVAL_MS) / 1000
+        self.turn_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{secrets.token_hex(3)}"
+        self.tool_name = None
+        self.started = time.perf_counter()
+        self.seconds = 0.0
+        self.closed = False
+        self._lock = threading.Lock()
+        self._threads = {}          # thread ident -> thread name (threads being profiled)
+        self._profiles = []         # finished cProfile.Profile objects (cprofile mode)
+        self._stacks = Counter()    # folded stack -> samples (sample mode)
+        self._sampler = None
+
+    @property
+    def path(self):
+        extension = 'prof' if self.mode == 'cprofile' else 'folded'
+        return os.path.join(self.directory, f"{self.turn_id}-{_safe(self.tool_name or 'chat')}.{extension}")
+
+    @contextmanager
+    def thread(self):
+        """Profile the calling thread for the duration of the block"""
+        ident = threading.get_ident()
+        with self._lock:
+            nested = self.closed or ident in self._threads
+            if not nested:
+                self._threads[ident] = threading.current_thread().name
+        if nested:
+            yield
+            return
+        profiler = None
+        if self.mode == 'cprofile':
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:  # another profiler owns this interpreter (Python 3.12+)
+                profiler = None
+        try:
+            yield
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            with self._lock:
+                del self._threads[ident]
+                if profiler is not None and not self.closed:
+                    self._profiles.append(profiler)
+
+    def _sample(self):
+        """Sampler thread: record the stacks of the profiled threads until the turn closes"""
+        while not self.closed:
+            frames = sys._current_frames()
+            with self._lock:
+                threads = dict(self._threads)
+            for ident, name in threads.items():
+                frame = frames.get(ident)
+                if frame is None:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(_safe(name))
+                self._stacks[';'.join(reversed(stack))] += 1
+            time.sleep(self.interval)
+
+    def start(self):
+        if self.mode == 'sample':
+            self._sampler = threading.Thread(target=self._sample, name='yoda-profile-sampler', daemon=True)
+            self._sampler.start()
+
+    def stop(self):
+        """Close the profile and write it; returns the file path (None if nothing was recorded)"""
+        with self._lock:
+            self.closed = True
+        self.seconds = time.perf_counter() - self.started
+        if self._sampler is not None:
+            self._sampler.join()
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path
+        if self.mode == 'cprofile':
+            if not self._profiles:
+                return None
+            stats = pstats.Stats(self._profiles[0])
+            for profiler in self._profiles[1:]:
+                stats.add(profiler)
+            stats.dump_stats(path)
+        else:
+            if not self._stacks:
+                return None
+            with open(path, 'w', encoding='utf-8') as f:
+                for stack, count in sorted(self._stacks.items()):
+                    f.write(f"{stack} {count}\n")
+        return path
+
+
+_current_profile = contextvars.ContextVar('turn_profile', default=None)
+
+
+@contextmanager
+def profile_turn(force=False, mode=None, directory=None):
+    """
+    Profile the turn run inside the block when forced or sampled by PROFILE_SAMPLE_RATE
+
+    Yields the TurnProfile, or None when the turn is not profiled.
+    """
+    if not force and (PROFILE_SAMPLE_RATE <= 0 or random.random() >= PROFILE_SAMPLE_RATE):
+        yield None
+        return
+    profile = TurnProfile(mode=mode, directory=directory)
+    token = _current_profile.set(profile)
+    profile.start()
+    try:
+        with profile.thread():
+            yield profile
+    finally:
+        _current_profile.reset(token)
+        try:
+            path = profile.stop()
+        except OSError as e:
+            logger.warning("⚠️ Turn profile not written: %s", e)
+        else:
+            if path:
+                logger.info("🔬 Turn profile (%.2fs, %s) written to %s", profile.seconds, profile.mode, path)
+
+
+def current_profile():
+    """TurnProfile of the turn being profiled, or None"""
+    return _current_profile.get()
+
+
+def run_profiled(fn, *args, **kwargs):
+    """Run fn, profiling this thread when it works for a profiled turn (used by the tool pool)"""
+    profile = _current_profile.get()
+    if profile is None:
+        return fn(*args, **kwargs)
+    with profile.thread():
+        return fn(*args, **kwargs)
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Per-session state for chat handlers.
+
+Every browser session (identified by the id held in its gr.State) gets a
+SessionState. Its lock serializes that session's turns, so a double submit
+cannot interleave two turns of one conversation, while turns of different
+sessions run concurrently. Handlers work on a copy of the history they
+receive and never mutate shared lists.
+
+Sessions idle longer than SESSION_MEMORY_TTL_MINUTES are dropped, and at most
+SESSION_MEMORY_MAX_SESSIONS are kept (least recently used go first).
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from mcp.session_memory import DEFAULT_SESSION, SESSION_MEMORY_MAX_SESSIONS, SESSION_MEMORY_TTL_MINUTES
+
+
+class SessionState:
+    """Mutable state of one chat session"""
+
+    def __init__(self, session_id):
+        self.session_id = session_id
+        self.lock = threading.Lock()
+        self.created = time.time()
+        self.last_active = self.created
+        self.turns = 0
+        self.waited_turns = 0
+
+    @contextmanager
+    def turn(self):
+        """Hold the session for one turn (later turns of the same session wait)"""
+        if not self.lock.acquire(blocking=False):
+            self.waited_turns += 1
+            self.lock.acquire()
+        try:
+            self.turns += 1
+            self.last_active = time.time()
+            yield self
+        finally:
+            self.last_active = time.time()
+            self.lock.release()
+
+
+class SessionRegistry:
+    """Bounded map of session id -> SessionState"""
+
+    def __init__(self, max_sessions=None, ttl_seconds=None):
+        self.max_sessions = max_sessions or SESSION_MEMORY_MAX_SESSIONS
+        self.ttl_seconds = ttl_seconds or SESSION_MEMORY_TTL_MINUTES * 60
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id):
+        session_id = session_id or DEFAULT_SESSION
+        now = time.time()
+        with self._lock:
+            state = self._sessions.pop(session_id, None) or SessionState(session_id)
+            self._sessions[session_id] = state
+            while self._sessions:
+                oldest_id, oldest = next(iter(self._sessions.items()))
+                expired = now - oldest.last_active > self.ttl_seconds
+                if oldest is state or not (expired or len(self._sessions) > self.max_sessions):
+                    break
+                if oldest.lock.locked():
+                    # Mid-turn - keep it until the turn finishes
+                    self._sessions.move_to_end(oldest_id)
+                    break
+                del self._sessions[oldest_id]
+            return state
+
+    def stats(self):
+        with self._lock:
+            sessions = list(self._sessions.values())
+        return {
+            "sessions": len(sessions),
+            "active_turns": sum(1 for state in sessions if state.lock.locked()),
+            "turns": sum(state.turns for state in sessions),
+            "waited_turns": sum(state.waited_turns for state in sessions),
+        }
+
+
+_registry = SessionRegistry()
+
+
+def get_session_state(session_id):
+    """Return the SessionState for `session_id` (created on first use)"""
+    return _registry.get(session_id)
+
+
+def get_session_stats():
+    return _registry.stats()
@@ -69,6 +69,14 @@ def main():
     # Warm up caches if enabled
     warm_up_caches()
     
+    # Keep discovery caches renewed in the background so chat turns never wait on them
+    from mcp.cache import start_background_refresh
+    start_background_refresh()
+    
+    # Latency histograms for Prometheus (METRICS_PORT=0 disables)
+    from telemetry import start_metrics_server
+    start_metrics_server()
+    
     # Create the Gradio interface
     interface = create_yoda_ui()
     
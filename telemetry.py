@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+In-process timing spans, latency histograms and a Prometheus /metrics endpoint.
+
+Code under measurement wraps itself in `span(metric, **labels)`. Each span's
+duration is observed into a histogram keyed by metric name and labels, and
+also added to the timings of the chat turn it belongs to (a context variable
+set by `turn_scope()`, which follows tool calls into the worker pool). The
+turn timings feed the debug section of the reply; the histograms are served
+in Prometheus text format on METRICS_PORT (0 disables the endpoint).
+
+Metrics:
+    yoda_turn_seconds              whole chat turns
+    yoda_turn_phase_seconds        route / decision / tool / format / analysis {phase}
+    yoda_tool_seconds              MCP tool dispatch {tool, outcome}
+    yoda_datadog_request_seconds   upstream Datadog HTTP calls {endpoint, method, status}
+
+Usage:
+    from telemetry import span
+
+    with span('yoda_datadog_request_seconds', endpoint='v1/query', method='GET') as labels:
+        response = send()
+        labels['status'] = response.status_code
+"""
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from dotenv import load_dotenv
+
+from env_settings import validate_number
+
+load_dotenv()
+
+TURN_METRIC = 'yoda_turn_seconds'
+PHASE_METRIC = 'yoda_turn_phase_seconds'
+TOOL_METRIC = 'yoda_tool_seconds'
+DATADOG_METRIC = 'yoda_datadog_request_seconds'
+PHASES = ('route', 'decision', 'tool', 'format', 'analysis')
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+_HELP = {
+    TURN_METRIC: "Duration of chat turns",
+    PHASE_METRIC: "Duration of each phase of a chat turn",
+    TOOL_METRIC: "Duration of MCP tool calls",
+    DATADOG_METRIC: "Duration of upstream Datadog HTTP requests",
+}
+
+
+# /metrics port (0 disables the endpoint)
+METRICS_PORT = validate_number('METRICS_PORT', 9464, 0, 65535, cast=int)
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram (Prometheus semantics)"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        self.count += 1
+        self.sum += seconds
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                self.counts[i] += 1
+                break
+
+    def quantile(self, q):
+        """Estimate a quantile by linear interpolation inside its bucket"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for bound, count in zip(self.buckets, self.counts):
+            if count and seen + count >= rank:
+                return lower + (bound - lower) * (rank - seen) / count
+            seen += count
+            lower = bound
+        return self.buckets[-1]
+
+
+class MetricsRegistry:
+    """Histograms keyed by (metric, sorted labels)"""
+
+    def __init__(self):
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def observe(self, metric, seconds, labels):
+        key = (metric, tuple(sorted((name, str(value)) for name, value in labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    def snapshot(self):
+        """Return {(metric, labels): {count, sum, p50, p95}}"""
+        with self._lock:
+            return {key: {"count": h.count, "sum": h.sum, "p50": h.quantile(0.5), "p95": h.quantile(0.95)}
+                    for key, h in self._histograms.items()}
+
+    def render_prometheus(self):
+        """Return all histograms in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            items = sorted(self._histograms.items())
+            current = None
+            for (metric, labels), histogram in items:
+                if metric != current:
+                    current = metric
+                    lines.append(f"# HELP {metric} {_HELP.get(metric, metric)}")
+                    lines.append(f"# TYPE {metric} histogram")
+                label_text = ','.join(f'{name}="{_escape(value)}"' for name, value in labels)
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f"{metric}_bucket{{{_join(label_text, _le(bound))}}} {cumulative}")
+                lines.append(f"{metric}_bucket{{{_join(label_text, _le('+Inf'))}}} {histogram.count}")
+                suffix = f"{{{label_text}}}" if label_text else ''
+                lines.append(f"{metric}_sum{suffix} {histogram.sum:.6f}")
+                lines.append(f"{metric}_count{suffix} {histogram.count}")
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _le(bound):
+    return f'le="{bound}"'
+
+
+def _join(*parts):
+    return ','.join(part for part in parts if part)
+
+
+class TurnTimings:
+    """Spans recorded during one chat turn (shared with its tool threads)"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def add(self, metric, labels, seconds):
+        with self._lock:
+            self.spans.append((metric, dict(labels), seconds))
+
+    def phases(self):
+        """Return {phase: seconds} for the phases seen so far"""
+        with self._lock:
+            spans = list(self.spans)
+        phases = {}
+        for metric, labels, seconds in spans:
+            if metric == PHASE_METRIC:
+                phases[labels['phase']] = phases.get(labels['phase'], 0.0) + seconds
+        return phases
+
+    def datadog_calls(self):
+        """Return (count, seconds) of upstream Datadog requests in this turn"""
+        with self._lock:
+            durations = [seconds for metric, _, seconds in self.spans if metric == DATADOG_METRIC]
+        return len(durations), sum(durations)
+
+    def summary(self):
+        """One-line breakdown, e.g. 'decision 1.20s | tool 0.35s (3 Datadog calls, 0.30s) | ... | total 3.71s'"""
+        phases = self.phases()
+        calls, call_seconds = self.datadog_calls()
+        parts = []
+        for phase in PHASES:
+            if phase not in phases:
+                continue
+            part = f"{phase} {phases[phase]:.2f}s"
+            if phase == 'tool' and calls:
+                part += f" ({calls} Datadog call{'s' if calls != 1 else ''}, {call_seconds:.2f}s)"
+            parts.append(part)
+        parts.append(f"total {time.perf_counter() - self.started:.2f}s")
+        return ' | '.join(parts)
+
+
+_registry = MetricsRegistry()
+_current_turn = contextvars.ContextVar('telemetry_turn', default=None)
+
+
+@contextmanager
+def span(metric, **labels):
+    """
+    Time the block into `metric` with `labels`
+
+    Yields the labels dict; labels known only afterwards (status codes,
+    outcomes) can be added to it inside the block.
+    """
+    start = time.perf_counter()
+    try:
+        yield labels
+    finally:
+        seconds = time.perf_counter() - start
+        _registry.observe(metric, seconds, labels)
+        turn = _current_turn.get()
+        if turn is not None:
+            turn.add(metric, labels, seconds)
+
+
+@contextmanager
+def turn_scope():
+    """Collect the spans of one chat turn; yields its TurnTimings"""
+    timings = TurnTimings()
+    token = _current_turn.set(timings)
+    try:
+        yield timings
+    finally:
+        _current_turn.reset(token)
+
+
+def current_turn():
+    """TurnTimings of the turn being handled, or None outside a turn"""
+    return _current_turn.get()
+
+
+def get_metrics_registry():
+    return _registry
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = _registry.render_prometheus().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port=None, host='0.0.0.0'):
+    """
+    Serve /metrics on a background thread (once per process)
+
+    Returns:
+        The HTTP server, or None when disabled (METRICS_PORT=0) or the port is taken
+    """
+    global _server
+    port = METRICS_PORT if port is None else port
+    if not port:
+        return None
+    with _server_lock:
+        if _server is None:
+            try:
+                _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            except OSError as e:
+                print(f"⚠️  Metrics endpoint not started on port {port}: {e}")
+                return None
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, daemon=True).start()
+            print(f"📈 Prometheus metrics on http://{host}:{port}/metrics")
+    return _server
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import mcp_loader  # noqa: F401  (loads tools before importing mcp modules directly)
+import mcp.cache
+from mcp.cache import Cache, CacheLoadError, CacheRefresher
+
+
+def _cache(cache_dir, **ttl_hours):
+    return Cache(path=os.path.join(cache_dir, 'cache.sqlite3'), ttl_hours=ttl_hours)
+
+
+def _age(cache, namespace, key, seconds):
+    """Pretend an entry was stored `seconds` earlier, in both tiers"""
+    memory_key = (namespace, key)
+    value, stored_at = cache._memory[memory_key]
+    cache._memory[memory_key] = (value, stored_at - seconds)
+    cache._conn.execute("UPDATE cache_entries SET stored_at = stored_at - ? WHERE namespace = ? AND key = ?",
+                        (seconds, namespace, key))
+
+
+class _Loader:
+    """Loader returning an increasing version number"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return {"version": self.calls}
+
+
+def test_entries_expire_after_their_namespace_ttl():
+    """Fresh entries are hits; past the TTL they are misses unless stale serving is allowed"""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = _cache(cache_dir, services=1, dashboards=0.25)
+        cache.set('services', '1h', ['web-api'])
+        cache.set('dashboards', 'all', ['overview'])
+        assert cache.get('services', '1h').source == 'memory'
+
+        _age(cache, 'services', '1h', 3601)
+        _age(cache, 'dashboards', 'all', 3601)
+        assert cache.get('services', '1h') is None
+        assert cache.get('services', '1h', allow_stale=True).source == 'stale'
+        assert cache.get('dashboards', 'all', allow_stale=True) is None, "past the stale window"
+        assert cache.stats() == {}
+    print("✅ TTLs and stale windows applied per namespace")
+
+
+def test_stale_entries_are_served_while_refreshed_in_the_background():
+    """Stale-while-revalidate returns the old value at once and reloads it off the caller's path"""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = _cache(cache_dir, services=1)
+        release = threading.Event()
+        calls = []
+
+        def loader():
+            calls.append(1)
+            if len(calls) > 1:
+                release.wait(5)
+            return {"version": len(calls)}
+
+        cache.get_or_load('services', '1h', loader)
+        _age(cache, 'services', '1h', 3700)
+        started = time.perf_counter()
+        stale = cache.get_or_load('services', '1h', loader)
+        assert time.perf_counter() - started < 1
+        assert stale.source == 'stale' and stale.value == {"version": 1}
+
+        release.set()
+        deadline = time.time() + 5
+        while cache.get('services', '1h') is None and time.time() < deadline:
+            time.sleep(0.01)
+        assert cache.get_or_load('services', '1h', loader).value == {"version": 2}
+        assert len(calls) == 2
+
+        _age(cache, 'services', '1h', 3700)
+        assert cache.get_or_load('services', '1h', loader, revalidate=False).source == 'loaded'
+        assert cache.stats()['services']['stale'] == 1
+    print("✅ Stale value served immediately, refreshed in the background")
+
+
+def test_concurrent_loads_of_a_key_share_one_call():
+    """Single-flight: concurrent misses wait for one loader call, and share its error too"""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = _cache(cache_dir, services=1)
+        calls = []
+
+        def loader():
+            calls.append(1)
+            time.sleep(0.2)
+            return ['web-api', 'checkout']
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: cache.get_or_load('services', '1h', loader), range(8)))
+        assert len(calls) == 1
+        assert all(result.value == ['web-api', 'checkout'] for result in results)
+
+        def failing():
+            calls.append(1)
+            time.sleep(0.2)
+            raise CacheLoadError("API Error 500")
+
+        def load_failing(_):
+            try:
+                cache.get_or_load('services', '7d', failing)
+            except CacheLoadError as e:
+                return str(e)
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            errors = list(pool.map(load_failing, range(4)))
+        assert errors == ["API Error 500"] * 4 and len(calls) == 2
+        assert cache.get('services', '7d') is None, "failed loads are not cached"
+    print("✅ 8 concurrent misses, 1 upstream call")
+
+
+def test_memory_tier_is_lru_over_the_sqlite_store():
+    """The memory tier evicts least recently used entries; the SQLite file keeps everything"""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        path = os.path.join(cache_dir, 'cache.sqlite3')
+        cache = Cache(path=path, memory_entries=2, ttl_hours={'services': 1})
+        cache.set('services', 'a', ['a'])
+        cache.set('services', 'b', ['b'])
+        assert cache.get('services', 'a').source == 'memory'
+        cache.set('services', 'c', {'c': ('tuple',)})
+        assert list(cache._memory) == [('services', 'a'), ('services', 'c')]
+
+        assert cache.get('services', 'b').source == 'disk'
+        assert list(cache._memory) == [('services', 'c'), ('services', 'b')]
+
+        # Another worker process opening the same file sees every entry, as stored
+        other = Cache(path=path, ttl_hours={'services': 1})
+        for key, value in (('a', ['a']), ('b', ['b']), ('c', {'c': ['tuple']})):
+            lookup = other.get('services', key)
+            assert lookup.source == 'disk' and lookup.value == value
+        assert cache.get('services', 'c').value == {'c': ['tuple']}, "memory holds what disk returns"
+    print("✅ LRU memory tier over a persistent SQLite store")
+
+
+class _SlowJSON:
+    """json stand-in whose encoding and decoding take a while, like a multi-MB inventory"""
+
+    def dumps(self, value, **kwargs):
+        time.sleep(0.3)
+        return json.dumps(value, **kwargs)
+
+    def loads(self, payload):
+        time.sleep(0.3)
+        return json.loads(payload)
+
+
+def test_serializing_a_large_value_does_not_block_readers():
+    """Reads of other keys proceed while a big value is encoded, decoded and stored"""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = _cache(cache_dir, services=1, monitors=1)
+        cache.set('services', '1h', ['web-api'])
+        mcp.cache.json = _SlowJSON()
+        try:
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                storing = pool.submit(cache.set, 'monitors', 'inventory', [{'id': 1}])
+                waits = []
+                while not storing.done():
+                    started = time.perf_counter()
+                    assert cache.get('services', '1h').value == ['web-api']
+                    waits.append(time.perf_counter() - started)
+                    time.sleep(0.05)
+        finally:
+            mcp.cache.json = json
+        assert len(waits) > 5 and max(waits) < 0.1, f"reader waited {max(waits):.2f}s for the cache lock"
+        assert cache.get('monitors', 'inventory').value == [{'id': 1}]
+    print(f"✅ {len(waits)} reads served (slowest {max(waits) * 1000:.1f}ms) while a value was serialized")
+
+
+def test_refresher_renews_keep_warm_entries_ahead_of_expiry():
+    """Due keep-warm keys are reloaded off the request path; fresh and plain keys are left alone"""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = _cache(cache_dir, monitors=0.05)
+        inventory, tags, plain = _Loader(), _Loader(), _Loader()
+        cache.get_or_load('monitors', 'inventory', inventory, keep_warm=True, revalidate=False)
+        cache.get_or_load('monitors', 'tags', tags, keep_warm=True)
+        cache.get_or_load('monitors', 'plain', plain)
+        refresher = CacheRefresher(cache, interval_seconds=60, refresh_ahead=0.8)
+
+        assert refresher.run_once() == []
+        for key in ('inventory', 'plain'):
+            _age(cache, 'monitors', key, 170)
+        assert refresher.run_once() == [('monitors', 'inventory')]
+        assert (inventory.calls, tags.calls, plain.calls) == (2, 1, 1)
+
+        lookup = cache.get_or_load('monitors', 'inventory', inventory, keep_warm=True, revalidate=False)
+        assert lookup.value == {"version": 2} and lookup.source == 'memory'
+    print("✅ Inventory renewed at 94% of its TTL; the chat read hit the cache")
+
+
+def test_refresher_interval_fits_the_shortest_keep_warm_ttl():
+    """A 3-minute TTL cannot expire between checks of a 60s refresher"""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = _cache(cache_dir, services=4, monitors=0.05)
+        refresher = CacheRefresher(cache, interval_seconds=60, refresh_ahead=0.8)
+        assert refresher.current_interval() == 60
+
+        cache.get_or_load('services', '1h', _Loader(), keep_warm=True)
+        assert refresher.current_interval() == 60
+        cache.get_or_load('monitors', 'inventory', _Loader(), keep_warm=True, revalidate=False)
+        # 180s TTL renewed from 144s on: checks every 18s land inside that window
+        assert round(refresher.current_interval(), 6) == 18
+        assert CacheRefresher(cache, interval_seconds=10, refresh_ahead=0.8).current_interval() == 10
+    print("✅ Refresher checks every 18s while the 3-minute monitor inventory is kept warm")
+
+
+def test_keys_not_read_recently_stop_being_kept_warm():
+    """Keep-warm keys nobody read for KEEP_WARM_IDLE_TTLS TTLs are dropped instead of re-fetched"""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = _cache(cache_dir, services=1)
+        old_range, busy_range = _Loader(), _Loader()
+        cache.get_or_load('services', '7d', old_range, keep_warm=True)
+        cache.get_or_load('services', '1h', busy_range, keep_warm=True)
+        for key in ('7d', '1h'):
+            _age(cache, 'services', key, 3000)
+            cache._keep_warm[('services', key)][1] -= 4 * 3600
+        # A plain read (like the monitor index lookup) counts as use
+        assert cache.get('services', '1h') is not None
+
+        refreshed = CacheRefresher(cache, interval_seconds=60, refresh_ahead=0.8).run_once()
+        assert refreshed == [('services', '1h')]
+        assert [key for key, _ in cache.keep_warm_items()] == [('services', '1h')]
+        assert (old_range.calls, busy_range.calls) == (1, 2)
+
+        # Reading the key again registers it again
+        cache.get_or_load('services', '7d', old_range, keep_warm=True)
+        assert ('services', '7d') in dict(cache.keep_warm_items())
+    print("✅ Idle keep-warm key dropped; the key still being read was renewed")
+
+
+def test_background_refresher_thread_renews_due_entries():
+    """The refresher thread wakes on the scaled interval and renews an entry before it expires"""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = _cache(cache_dir, fast=10 / 3600)
+        loader = _Loader()
+        cache.get_or_load('fast', 'key', loader, keep_warm=True)
+        _age(cache, 'fast', 'key', 9)
+        refresher = CacheRefresher(cache, interval_seconds=60, refresh_ahead=0.8)
+        assert refresher.current_interval() == 1
+        assert refresher.start()
+        try:
+            deadline = time.time() + 5
+            while loader.calls < 2 and time.time() < deadline:
+                time.sleep(0.05)
+        finally:
+            refresher.stop()
+        assert loader.calls >= 2
+        assert cache.get('fast', 'key').value == {"version": loader.calls}
+    print("✅ Background thread renewed the entry within its 10s TTL")
+
+
+if __name__ == "__main__":
+    test_entries_expire_after_their_namespace_ttl()
+    test_stale_entries_are_served_while_refreshed_in_the_background()
+    test_concurrent_loads_of_a_key_share_one_call()
+    test_memory_tier_is_lru_over_the_sqlite_store()
+    test_serializing_a_large_value_does_not_block_readers()
+    test_refresher_renews_keep_warm_entries_ahead_of_expiry()
+    test_refresher_interval_fits_the_shortest_keep_warm_ttl()
+    test_keys_not_read_recently_stop_being_kept_warm()
+    test_background_refresher_thread_renews_due_entries()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+
+import mcp_loader  # noqa: F401  (loads tools before importing the router used for time phrases)
+from conversation_memory import build_history_context, compact_assistant_message
+
+
+def _tool_reply(command, analysis):
+    return (f"⚡ **YODA Systems Engaged**: `{command}`\n\n"
+            f"🔍 **MCP INTERACTION DEBUG**:\n```\nTool Called: x\nData Count: 500\n```\n\n\n"
+            f"🎯 **Imperial Scan Results**:\n```\n{'2024-05-01 ERROR payment-api timeout ' * 500}\n```\n\n"
+            f"🤖 **YODA DROID ANALYSIS**:\n{analysis}\n\n"
+            f"*End transmission. May the Force be with your infrastructure, Commander.*\n")
+
+
+def test_tool_dumps_are_stripped():
+    compacted = compact_assistant_message(_tool_reply("search_error_logs(service='payment-api')",
+                                                      "42 errors, mostly DB timeouts."))
+    print(compacted)
+    assert compacted == "Ran `search_error_logs(service='payment-api')`. Analysis: 42 errors, mostly DB timeouts."
+    print("✅ Debug section and scan results removed")
+
+
+def test_older_turns_are_summarized_within_budget():
+    """Old turns fold into a summary keeping services, time ranges, tools and findings"""
+    turns = [
+        ("show error logs for payment-api service in the last 4 hours",
+         "search_error_logs(service='payment-api', time_range='4 hours')", "42 errors in payment-api. Mostly DB timeouts."),
+        ("show me all P1 alerts", "get_monitors(group_states=['alert'], priority='P1')", "Two P1 alerts: checkout latency."),
+        ("cpu metrics for front-prod", "get_kubernetes_metrics(service='front-prod')", "CPU at 85% on front-prod pods."),
+        ("deployments for web-api service", "get_deployment_events(service='web-api')", "3 deploys today."),
+    ]
+    history = []
+    for request, command, analysis in turns:
+        history.append({"role": "user", "content": request})
+        history.append({"role": "assistant", "content": _tool_reply(command, analysis)})
+
+    summary, recent, stats = build_history_context(history, max_messages=4, token_budget=2000)
+    print(stats)
+    print(summary['content'])
+    assert stats['kept_messages'] == 4 and stats['summarized_messages'] == 4
+    assert stats['context_tokens'] <= 2000 < stats['original_tokens']
+    assert recent[0] == {"role": "user", "content": "cpu metrics for front-prod"}
+    assert "Imperial Scan Results" not in str(recent)
+    assert "payment-api" in summary['content']
+    assert "4 hours" in summary['content']
+    assert "get_monitors(group_states=['alert'], priority='P1')" in summary['content']
+    assert "42 errors in payment-api." in summary['content']
+    print("✅ Older turns summarized, prompt history within budget")
+
+
+if __name__ == "__main__":
+    test_tool_dumps_are_stripped()
+    test_older_turns_are_summarized_within_budget()
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import mcp_loader  # noqa: F401  (loads tools before importing mcp modules directly)
+import requests
+from benchmarks.datadog_standin import StandinConfig, start_standin
+from mcp.datadog_client import BufferedResponse, DatadogClient, datadog_api_base
+from mcp.hedging import Hedger
+from mcp.rate_limiter import RateLimiter
+
+
+class _StubDatadog(BaseHTTPRequestHandler):
+    """Slow stub endpoint that counts how many requests actually reach it"""
+
+    hits = 0
+    hits_lock = threading.Lock()
+    delay = 0.3
+
+    def do_GET(self):
+        with _StubDatadog.hits_lock:
+            _StubDatadog.hits += 1
+        time.sleep(_StubDatadog.delay)
+        body = json.dumps([{"id": 1, "name": "P1 alert", "path": self.path}]).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _RateLimitedDatadog(BaseHTTPRequestHandler):
+    """
+    Stub emitting Datadog-style X-RateLimit headers
+
+    /api/v1/query allows `limit` requests per fixed `period` window and answers
+    429 beyond that. /api/v1/flaky answers 503 `failures` times, then 200.
+    """
+
+    limit = 3
+    period = 1.0
+    lock = threading.Lock()
+    window_start = None
+    window_count = 0
+    ok_count = 0
+    throttled_count = 0
+    failures = 0
+
+    def do_GET(self):
+        cls = _RateLimitedDatadog
+        with cls.lock:
+            if self.path.startswith('/api/v1/flaky'):
+                status = 503 if cls.failures > 0 else 200
+                cls.failures = max(0, cls.failures - 1)
+                self._reply(status, {})
+                return
+
+            now = time.monotonic()
+            if cls.window_start is None or now - cls.window_start >= cls.period:
+                cls.window_start = now
+                cls.window_count = 0
+            cls.window_count += 1
+            reset = max(0.0, cls.period - (now - cls.window_start))
+            remaining = max(0, cls.limit - cls.window_count)
+            if cls.window_count > cls.limit:
+                cls.throttled_count += 1
+                status = 429
+            else:
+                cls.ok_count += 1
+                status = 200
+        self._reply(status, {
+            'X-RateLimit-Limit': str(cls.limit),
+            'X-RateLimit-Period': str(cls.period),
+            'X-RateLimit-Remaining': str(remaining),
+            'X-RateLimit-Reset': f"{reset:.3f}",
+            'X-RateLimit-Name': 'query',
+        })
+
+    def _reply(self, status, headers):
+        body = json.dumps({"status": "ok" if status == 200 else "error"}).encode()
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _SlowTailDatadog(BaseHTTPRequestHandler):
+    """Answers 200 in 10ms, except for the (seconds, status) replies queued in `script`"""
+
+    script = []
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with _SlowTailDatadog.lock:
+            delay, status = _SlowTailDatadog.script.pop(0) if _SlowTailDatadog.script else (0.01, 200)
+        time.sleep(delay)
+        body = b'[]'
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _start_stub(handler=_StubDatadog):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/api/v1/monitor"
+
+
+def _concurrent_get(client, url, params_list, stream=False):
+    results = [None] * len(params_list)
+    barrier = threading.Barrier(len(params_list))
+
+    def worker(i):
+        barrier.wait()
+        results[i] = client.get(url, headers={'DD-API-KEY': 'test'}, params=params_list[i], timeout=5, stream=stream)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(len(params_list))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_identical_concurrent_requests_share_one_call():
+    """Concurrent identical requests (within the aligned window) hit Datadog once"""
+    server, url = _start_stub()
+    try:
+        client = DatadogClient(coalesce_window=5)
+        _StubDatadog.hits = 0
+
+        # Same query, 'from' differs by a second: same aligned window
+        params = [{'monitor_tags': 'priority:p1', 'from': 1700000000 + (i % 2)} for i in range(8)]
+        responses = _concurrent_get(client, url, params)
+
+        stats = client.stats()
+        print(f"Stub hits: {_StubDatadog.hits}, client stats: {stats}")
+        assert _StubDatadog.hits == 1
+        assert stats['upstream_calls'] == 1
+        assert stats['coalesced'] == 7
+        assert stats['in_flight'] == 0
+        assert all(response.status_code == 200 for response in responses)
+        assert all(response.json() == responses[0].json() for response in responses)
+
+        # Every waiter can stream the shared body independently
+        assert b''.join(responses[-1].iter_content(chunk_size=7)) == responses[0].content
+        print("✅ 8 concurrent identical requests coalesced into 1 upstream call")
+    finally:
+        server.shutdown()
+
+
+def test_streamed_requests_are_buffered_only_when_shared():
+    """A lone streamed call reads from the socket; identical concurrent ones still share one buffered call"""
+    server, url = _start_stub()
+    try:
+        client = DatadogClient(coalesce_window=5)
+        _StubDatadog.hits = 0
+
+        alone = client.get(url, params={'monitor_tags': 'priority:p1'}, timeout=5, stream=True)
+        assert isinstance(alone, requests.Response) and not alone._content_consumed
+        assert json.loads(b''.join(alone.iter_content(chunk_size=16)))[0]["id"] == 1
+        alone.close()
+
+        shared = _concurrent_get(client, url, [{'monitor_tags': 'priority:p2'}] * 4, stream=True)
+        stats = client.stats()
+        assert _StubDatadog.hits == 2
+        assert stats['streamed'] == 1 and stats['coalesced'] == 3 and stats['in_flight'] == 0
+        assert all(isinstance(response, BufferedResponse) for response in shared)
+        assert all(response.json() == shared[0].json() for response in shared)
+        print("✅ Unshared streamed call left on the socket; 4 identical streamed calls shared 1 buffer")
+    finally:
+        server.shutdown()
+
+
+def test_different_requests_are_not_coalesced():
+    """Different params, or requests after the first completed, get their own call"""
+    server, url = _start_stub()
+    try:
+        client = DatadogClient(coalesce_window=5)
+        _StubDatadog.hits = 0
+
+        _concurrent_get(client, url, [{'monitor_tags': 'priority:p1'}, {'monitor_tags': 'priority:p2'}])
+        assert _StubDatadog.hits == 2
+
+        # Nothing in flight any more - a repeat is a fresh call, not a stale shared result
+        client.get(url, params={'monitor_tags': 'priority:p1'}, timeout=5)
+        assert _StubDatadog.hits == 3
+        assert client.stats()['coalesced'] == 0
+        print("✅ Distinct and sequential requests each reached the API")
+    finally:
+        server.shutdown()
+
+
+def test_rate_limit_headers_pace_requests():
+    """Limits learned from X-RateLimit headers queue and pace a burst instead of drawing 429s"""
+    server, monitor_url = _start_stub(_RateLimitedDatadog)
+    url = monitor_url.replace('/api/v1/monitor', '/api/v1/query')
+    try:
+        client = DatadogClient(rate_limiter=RateLimiter(max_wait=10, max_retries=3))
+
+        # First call teaches the limiter the query family's limit
+        start = time.monotonic()
+        assert client.get(url, params={'query': 'warmup'}, timeout=5).status_code == 200
+
+        # Burst of 5 distinct queries (not coalesced): only 2 fit in the current window
+        responses = _concurrent_get(client, url, [{'query': f'avg:metric.{i}{{*}}'} for i in range(5)])
+        elapsed = time.monotonic() - start
+
+        family = client.stats()['rate_limits']['v1/query']
+        print(f"Burst took {elapsed:.2f}s, stub 429s: {_RateLimitedDatadog.throttled_count}, limiter: {family}")
+        assert all(response.status_code == 200 for response in responses)
+        assert family['limit'] == 3
+        assert family['max_queued'] >= 2
+        assert family['waits'] >= 1
+        # Requests beyond the first window were held back until it reset
+        assert elapsed >= 0.8
+        assert _RateLimitedDatadog.throttled_count <= 1
+        print("✅ Burst paced across rate-limit windows")
+    finally:
+        server.shutdown()
+
+
+def test_5xx_responses_are_retried():
+    """Transient 503s are retried with backoff and counted"""
+    server, monitor_url = _start_stub(_RateLimitedDatadog)
+    url = monitor_url.replace('/api/v1/monitor', '/api/v1/flaky')
+    try:
+        _RateLimitedDatadog.failures = 2
+        client = DatadogClient(rate_limiter=RateLimiter(max_retries=3))
+        response = client.get(url, timeout=5)
+
+        stats = client.stats()
+        assert response.status_code == 200
+        assert stats['upstream_calls'] == 3
+        assert stats['rate_limits']['v1/flaky']['retries'] == 2
+        print("✅ 503 retried until success")
+    finally:
+        server.shutdown()
+
+
+def test_slow_reads_are_hedged_within_the_budget():
+    """A read slower than the family's p95 is sent again and the fast copy wins; the budget caps hedges"""
+    server, url = _start_stub(_SlowTailDatadog)
+    try:
+        client = DatadogClient(coalesce_window=0, hedger=Hedger(enabled=True, budget=0.0, min_delay=0.05))
+        for i in range(20):
+            client.get(url, params={'page': i}, timeout=5)
+
+        _SlowTailDatadog.script = [(1.0, 200)]
+        start = time.perf_counter()
+        assert client.get(url, params={'page': 'hedged'}, timeout=5).status_code == 200
+        hedged = time.perf_counter() - start
+
+        # budget=0: the one starting token is spent, so the next slow read is not hedged
+        _SlowTailDatadog.script = [(1.0, 200)]
+        start = time.perf_counter()
+        client.get(url, params={'page': 'denied'}, timeout=5)
+        denied = time.perf_counter() - start
+
+        stats = client.stats()
+        hedging = stats['hedging']['v1/monitor']
+        assert hedged < 0.5 <= 1.0 <= denied
+        assert hedging['hedged'] == 1 and hedging['hedge_wins'] == 1 and hedging['denied'] == 1
+        assert stats['upstream_calls'] == 23
+        print(f"✅ Hedged slow read in {hedged:.2f}s; over budget it took {denied:.2f}s")
+    finally:
+        server.shutdown()
+
+
+def test_retryable_status_does_not_beat_a_successful_hedge():
+    """A 503 that arrives first loses to the slower hedge's 200; no retry is needed"""
+    server, url = _start_stub(_SlowTailDatadog)
+    try:
+        client = DatadogClient(coalesce_window=0, rate_limiter=RateLimiter(max_retries=3),
+                               hedger=Hedger(enabled=True, budget=1.0, min_delay=0.05))
+        for i in range(20):
+            client.get(url, params={'page': i}, timeout=5)
+
+        # Primary: 503 after 0.3s; the hedge (sent at ~p95) answers 200 after 0.5s
+        _SlowTailDatadog.script = [(0.3, 503), (0.5, 200)]
+        response = client.get(url, params={'page': 'flaky'}, timeout=5)
+
+        stats = client.stats()
+        assert response.status_code == 200
+        assert stats['upstream_calls'] == 22
+        assert stats['rate_limits']['v1/monitor']['retries'] == 0
+        assert stats['hedging']['v1/monitor']['hedge_wins'] == 1
+        print("✅ Hedge's 200 preferred over the primary's earlier 503")
+    finally:
+        server.shutdown()
+
+
+def test_standin_serves_filtered_log_pages():
+    """DD_SITE may be a local URL; the stand-in filters and pages synthetic logs"""
+    server, base_url = start_standin(StandinConfig(logs=200_000, monitors=500, dashboards=50))
+    try:
+        assert datadog_api_base('api.datadoghq.eu') == 'https://api.datadoghq.eu'
+        assert datadog_api_base(base_url) == base_url
+        url = f"{datadog_api_base(base_url)}/api/v2/logs/events/search"
+        headers = {'DD-API-KEY': 'test', 'DD-APPLICATION-KEY': 'test'}
+        now_ms = int(time.time() * 1000)
+        body = {"filter": {"from": now_ms - 24 * 3600 * 1000, "to": now_ms, "query": "status:error service:checkout"},
+                "page": {"limit": 20}, "sort": "-timestamp"}
+        client = DatadogClient()
+        first = client.post(url, headers=headers, json=body, timeout=5).json()
+        body["page"]["cursor"] = first["meta"]["page"]["after"]
+        second = client.post(url, headers=headers, json=body, timeout=5).json()
+
+        logs = first["data"] + second["data"]
+        assert len(logs) == 40
+        assert len({log["id"] for log in logs}) == 40
+        assert all(log["attributes"]["status"] == "error" for log in logs)
+        assert all(log["attributes"]["service"] == "checkout" for log in logs)
+        assert client.get(url.replace('/api/v2/logs/events/search', '/api/v1/monitor'), timeout=5).status_code == 403
+        print(f"✅ Stand-in returned 2 filtered pages of {len(first['data'])} logs")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    test_identical_concurrent_requests_share_one_call()
+    test_streamed_requests_are_buffered_only_when_shared()
+    test_different_requests_are_not_coalesced()
+    test_rate_limit_headers_pace_requests()
+    test_5xx_responses_are_retried()
+    test_slow_reads_are_hedged_within_the_budget()
+    test_retryable_status_does_not_beat_a_successful_hedge()
+    test_standin_serves_filtered_log_pages()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import mcp_loader  # loads tools before importing mcp modules directly
+import deadlines
+import mcp.metrics
+import requests
+from benchmarks.datadog_standin import StandinConfig, start_standin
+from deadlines import DeadlineExceeded, current_deadline, deadline_scope, request_timeout
+from mcp.datadog_client import DatadogClient
+from worker_pool import run_tool
+
+
+class _StuckDatadog(BaseHTTPRequestHandler):
+    """Accepts the request and never answers in time"""
+
+    def do_GET(self):
+        time.sleep(3)
+        self.send_response(200)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def test_request_timeout_is_capped_by_the_deadline():
+    """Nested scopes keep the sooner deadline; HTTP timeouts never outlive it"""
+    assert request_timeout() == deadlines.REQUEST_TIMEOUT
+    with deadline_scope(0.5) as outer:
+        with deadline_scope(60) as inner:
+            assert inner is outer
+            assert run_tool(current_deadline) is outer
+            assert 0 < request_timeout(30) <= 0.5
+        time.sleep(0.55)
+        try:
+            request_timeout(30)
+            raise AssertionError("expected DeadlineExceeded")
+        except DeadlineExceeded:
+            pass
+    assert current_deadline() is None
+    print("✅ Deadline caps request timeouts")
+
+
+def test_stuck_socket_is_released_at_the_deadline():
+    """A Datadog call that never answers fails at the deadline instead of hanging the worker"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _StuckDatadog)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/api/v1/monitor"
+    start = time.perf_counter()
+    try:
+        with deadline_scope(0.4):
+            DatadogClient().get(url, headers={'DD-API-KEY': 'test'})
+        raise AssertionError("expected a timeout")
+    except requests.exceptions.Timeout:
+        pass
+    finally:
+        server.shutdown()
+    elapsed = time.perf_counter() - start
+    assert elapsed < 1.5
+    print(f"✅ Stuck request released after {elapsed:.2f}s")
+
+
+def test_multi_query_tool_returns_partial_results_at_the_deadline():
+    """get_system_metrics runs 4 queries; with time for about two it returns those, marked partial"""
+    server, base_url = start_standin(StandinConfig(logs=1000, monitors=10, dashboards=5, events=10, latency=0.25))
+    saved = (mcp.metrics.DD_SITE, mcp.metrics.DD_API_KEY, mcp.metrics.DD_APP_KEY)
+    mcp.metrics.DD_SITE, mcp.metrics.DD_API_KEY, mcp.metrics.DD_APP_KEY = base_url, 'test', 'test'
+    deadlines.TOOL_TIMEOUTS['get_system_metrics'] = 0.6
+    try:
+        start = time.perf_counter()
+        result = mcp_loader.call_mcp_tool('get_system_metrics', time_range='1 hour')
+        elapsed = time.perf_counter() - start
+    finally:
+        del deadlines.TOOL_TIMEOUTS['get_system_metrics']
+        mcp.metrics.DD_SITE, mcp.metrics.DD_API_KEY, mcp.metrics.DD_APP_KEY = saved
+        server.shutdown()
+
+    assert result["success"] is True and result["partial"] is True
+    assert "of 4 queries completed" in result["partial_reason"]
+    assert result["data"], "the queries that finished in time are returned"
+    assert elapsed < 1.0
+    print(f"✅ Partial result after {elapsed:.2f}s: {result['partial_reason']}")
+
+
+if __name__ == "__main__":
+    test_request_timeout_is_capped_by_the_deadline()
+    test_stuck_socket_is_released_at_the_deadline()
+    test_multi_query_tool_returns_partial_results_at_the_deadline()
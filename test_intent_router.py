@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+
+import mcp_loader  # noqa: F401  (loads tools before importing the router)
+from intent_router import IntentRouter
+from time_ranges import extract_time_range
+
+
+def test_common_requests_route_without_llm():
+    """Unambiguous requests map straight to one tool call, with time phrases applied"""
+    router = IntentRouter()
+    cases = {
+        "show me all P1 alerts": ('get_monitors', {'group_states': ['alert'], 'priority': 'P1'}),
+        "Show me al P1 alrts!": ('get_monitors', {'group_states': ['alert'], 'priority': 'P1'}),
+        "search error logs from last hour": ('search_error_logs', {'time_range': '1 hour'}),
+        "query CPU metrics for last hour": ('query_metrics', {'query': 'avg:system.cpu.user{*}', 'time_range': '1 hour'}),
+        "errors for payment-api service in the last 4 hours": ('search_error_logs', {'service': 'payment-api', 'time_range': '4 hours'}),
+        "list production dashboards": ('list_dashboards', {'name': 'production'}),
+        "get system metrics for the past 2 days": ('get_system_metrics', {'time_range': '2 days'}),
+    }
+    for message, (tool_name, params) in cases.items():
+        route = router.route(message)
+        print(f"{message!r} -> {route}")
+        assert route is not None
+        assert (route.tool_name, route.params) == (tool_name, params)
+    print("✅ Common requests routed locally")
+
+
+def test_ambiguous_requests_fall_back_to_llm():
+    """Vague requests, environments mistaken for services and unknown entities are left to the LLM"""
+    router = IntentRouter()
+    for message in ["show alerts", "show errors in production", "find API errors in production",
+                    "search for azure metrics", "why is checkout slow since the last deploy?", "hello"]:
+        route = router.route(message)
+        print(f"{message!r} -> {route}")
+        assert route is None
+    print("✅ Ambiguous requests left to the LLM")
+
+
+def test_error_logs_without_a_service_fall_back_to_llm():
+    """A bare "errors" does not name what to search, so only requests with a service are routed"""
+    router = IntentRouter()
+    for message in ["errors", "show errors", "get recent logs with errors", "error logs in the last hour"]:
+        route = router.route(message)
+        print(f"{message!r} -> {route}")
+        assert route is None
+    route = router.route("show recent errors for checkout")
+    assert (route.tool_name, route.params) == ('search_error_logs', {'service': 'checkout'})
+    print("✅ Error logs routed only with a service")
+
+
+def test_extract_time_range():
+    assert extract_time_range("errors from the last 4 hours") == ('4 hours', 'errors')
+    assert extract_time_range("cpu metrics past day") == ('1 day', 'cpu metrics')
+    assert extract_time_range("cpu metrics") == (None, 'cpu metrics')
+
+
+if __name__ == "__main__":
+    test_common_requests_route_without_llm()
+    test_ambiguous_requests_fall_back_to_llm()
+    test_error_logs_without_a_service_fall_back_to_llm()
+    test_extract_time_range()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+
+import json
+
+import mcp_loader  # noqa: F401  (loads tools before importing mcp modules directly)
+from mcp.json_stream import iter_json_array
+
+
+class _ChunkedResponse:
+    """Stands in for a streamed requests.Response"""
+
+    def __init__(self, body):
+        self.body = body.encode() if isinstance(body, str) else body
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.body), chunk_size):
+            yield self.body[start:start + chunk_size]
+
+
+def _every_split(body, array_key=None):
+    """Decode `body` at every chunk size; returns [(chunk_size, items, extra)]"""
+    results = []
+    for chunk_size in range(1, len(body.encode()) + 1):
+        extra = {}
+        items = list(iter_json_array(_ChunkedResponse(body), array_key, extra=extra, chunk_size=chunk_size))
+        results.append((chunk_size, items, extra))
+    return results
+
+
+def test_scalars_split_at_any_chunk_boundary():
+    """Numbers and literals cut inside the token ('2.' | '5', '1e' | '3') decode whole"""
+    body = '[2.5, 1e3, -0.25, 1.5E-3 , 10, true, false, null, "2.5", 7]'
+    for chunk_size, items, _ in _every_split(body):
+        assert items == json.loads(body), chunk_size
+
+
+def test_nested_values_and_top_level_keys_split_at_any_chunk_boundary():
+    """Array elements and the other top-level keys survive every split, including multi-byte UTF-8"""
+    body = json.dumps({
+        "status": "ok",
+        "took": 12.75,
+        "data": [{"id": 1, "value": 2.5, "tags": ["env:prod"]}, {"id": 2, "message": "café ☕"}, 3.25],
+        "meta": {"page": {"after": None}, "elapsed": 0.5},
+        "count": 3,
+    }, ensure_ascii=False)
+    expected = json.loads(body)
+    for chunk_size, items, extra in _every_split(body, array_key='data'):
+        assert items == expected['data'], chunk_size
+        assert extra == {key: value for key, value in expected.items() if key != 'data'}, chunk_size
+
+
+def test_truncated_stream_raises():
+    """A body cut off inside the array is an error, not a short result"""
+    for body in ('[1, 2', '[{"id": 1}, {"id"', '[2.'):
+        try:
+            list(iter_json_array(_ChunkedResponse(body), chunk_size=2))
+        except ValueError:
+            continue
+        raise AssertionError(f"{body!r} decoded without error")
+
+
+if __name__ == "__main__":
+    test_scalars_split_at_any_chunk_boundary()
+    test_nested_values_and_top_level_keys_split_at_any_chunk_boundary()
+    test_truncated_stream_raises()
+    print("✅ JSON stream decodes identically at every chunk size")
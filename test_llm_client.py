@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import mcp_loader  # noqa: F401  (loads tools before importing the client)
+import main_processing
+import mcp.cache
+import requests
+from benchmarks.fake_llm_server import FakeLLMConfig, start_fake_llm
+from llm_client import LLMClient, LLMError
+from mcp.cache import Cache
+
+
+class _FakeOpenAI(BaseHTTPRequestHandler):
+    """
+    OpenAI-compatible /v1/chat/completions stub
+
+    `script` is a list of (status, delay_seconds, headers) consumed one per
+    request; once empty every request succeeds. Successful replies echo the
+    prompt unless `reply` is set. Client ports are recorded to check
+    connection reuse.
+    """
+
+    protocol_version = 'HTTP/1.1'
+    script = []
+    reply = None
+    requests_seen = 0
+    client_ports = set()
+    lock = threading.Lock()
+
+    def do_POST(self):
+        cls = _FakeOpenAI
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+        with cls.lock:
+            cls.requests_seen += 1
+            cls.client_ports.add(self.client_address[1])
+            status, delay, headers = cls.script.pop(0) if cls.script else (200, 0, {})
+        time.sleep(delay)
+        if status == 200:
+            prompt = body['messages'][-1]['content']
+            payload = {
+                "model": body['model'],
+                "choices": [{"index": 0, "message": {"role": "assistant",
+                                                      "content": f"echo: {prompt}" if cls.reply is None else cls.reply}}],
+                "usage": {"prompt_tokens": 12, "completion_tokens": 5, "total_tokens": 17},
+            }
+        else:
+            payload = {"error": {"message": f"status {status}"}}
+        encoded = json.dumps(payload).encode()
+        try:
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(encoded)))
+            self.end_headers()
+            self.wfile.write(encoded)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+def _start_fake(script=()):
+    _FakeOpenAI.script = list(script)
+    _FakeOpenAI.reply = None
+    _FakeOpenAI.requests_seen = 0
+    _FakeOpenAI.client_ports = set()
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _FakeOpenAI)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1/chat/completions"
+
+
+def _data(prompt):
+    return {"model": "gpt-4o-mini", "messages": [{"role": "user", "content": prompt}], "max_tokens": 50}
+
+
+def test_completions_reuse_connection_and_count_tokens():
+    """Sequential calls share one keep-alive connection; usage and latency are accounted"""
+    server, url = _start_fake()
+    try:
+        client = LLMClient(max_retries=0)
+        for i in range(3):
+            completion = client.complete(url, {'Authorization': 'Bearer test'}, _data(f"hello {i}"))
+            assert completion['content'] == f"echo: hello {i}"
+            assert completion['attempts'] == 1
+
+        stats = client.stats()
+        print(f"Connections: {len(_FakeOpenAI.client_ports)}, stats: {stats['calls']} calls, {stats['total_tokens']} tokens")
+        assert len(_FakeOpenAI.client_ports) == 1
+        assert stats['calls'] == 3
+        assert (stats['prompt_tokens'], stats['completion_tokens'], stats['total_tokens']) == (36, 15, 51)
+        assert stats['last_call']['latency_seconds'] >= 0
+        print("✅ 3 completions over one connection with token accounting")
+    finally:
+        server.shutdown()
+
+
+def test_429_and_5xx_are_retried():
+    """Retry-After is honored for 429, 5xx gets backoff, and both count as retries"""
+    server, url = _start_fake([(429, 0, {'Retry-After': '0.2'}), (503, 0, {})])
+    try:
+        client = LLMClient(max_retries=2)
+        start = time.monotonic()
+        completion = client.complete(url, {}, _data("retry me"))
+        elapsed = time.monotonic() - start
+
+        assert completion['content'] == "echo: retry me"
+        assert completion['attempts'] == 3
+        assert _FakeOpenAI.requests_seen == 3
+        assert elapsed >= 0.2
+        assert client.stats()['retries'] == 2
+        print(f"✅ 429 + 503 retried in {elapsed:.2f}s")
+    finally:
+        server.shutdown()
+
+
+def test_errors_are_bounded():
+    """Client errors are not retried, retries stop at max_retries, slow endpoints time out"""
+    server, url = _start_fake([(400, 0, {})] + [(500, 0, {})] * 3 + [(200, 2.0, {})])
+    try:
+        client = LLMClient(max_retries=2, read_timeout=0.3)
+        for expected_status in (400, 500):
+            try:
+                client.complete(url, {}, _data("fail"))
+                assert False, "expected LLMError"
+            except LLMError as e:
+                assert e.status_code == expected_status
+        # 1 request for the 400, 3 (1 + 2 retries) for the 500s
+        assert _FakeOpenAI.requests_seen == 4
+
+        start = time.monotonic()
+        try:
+            client.complete(url, {}, _data("slow"))
+            assert False, "expected LLMError"
+        except LLMError as e:
+            assert 'timeout' in str(e)
+        assert time.monotonic() - start < 1.5
+
+        stats = client.stats()
+        assert (stats['calls'], stats['failures'], stats['timeouts']) == (3, 3, 1)
+        print("✅ 4xx not retried, 5xx retries bounded, read timeout enforced")
+    finally:
+        server.shutdown()
+
+
+def test_fake_llm_server_scripts_decisions_analysis_and_streams():
+    """The benchmark LLM server answers from its script, also as SSE"""
+    server, url = start_fake_llm(FakeLLMConfig(ttft=0, analysis_tokens=60))
+    headers = {'Content-Type': 'application/json', 'Authorization': 'Bearer test'}
+    try:
+        client = LLMClient(max_retries=0)
+        decision = client.complete(url, headers, _data("get recent logs with errors"))
+        analysis = client.complete(url, headers, _data("TOOL_RESULT: TOOL_RESULT from search_logs: {}"))
+        assert decision['content'].startswith("TOOL_CALL: search_error_logs(")
+        assert "search_logs" in analysis['content']
+        assert analysis['usage']['completion_tokens'] >= 60
+
+        response = requests.post(url, headers=headers, json=dict(_data("hello"), stream=True), stream=True, timeout=5)
+        lines = [line for line in response.iter_lines(decode_unicode=True) if line.startswith('data: ')]
+        assert lines[-1] == 'data: [DONE]'
+        streamed = ''.join(json.loads(line[6:])['choices'][0]['delta'].get('content', '') for line in lines[:-1])
+        assert streamed.startswith("Greetings, Commander")
+        assert server.stats['decision'] == 2 and server.stats['analysis'] == 1
+        print(f"✅ Fake LLM scripted 3 replies, streamed {len(lines) - 1} chunks")
+    finally:
+        server.shutdown()
+
+
+@contextmanager
+def _cached_llm(mode, script=()):
+    """Route call_openai to the stub with an empty LLM cache in the given LLM_CACHE_MODE"""
+    server, url = _start_fake(script)
+    saved = (main_processing.OPENAI_API_KEY, main_processing.LLM_CACHE_MODE, main_processing.get_llm_api_url,
+             main_processing.get_llm_client, mcp.cache._cache)
+    client = LLMClient(max_retries=0)
+    main_processing.OPENAI_API_KEY = 'test'
+    main_processing.LLM_CACHE_MODE = mode
+    main_processing.get_llm_api_url = lambda: url
+    main_processing.get_llm_client = lambda: client
+    with tempfile.TemporaryDirectory() as cache_dir:
+        mcp.cache._cache = Cache(path=os.path.join(cache_dir, 'cache.sqlite3'))
+        try:
+            yield server
+        finally:
+            (main_processing.OPENAI_API_KEY, main_processing.LLM_CACHE_MODE, main_processing.get_llm_api_url,
+             main_processing.get_llm_client, mcp.cache._cache) = saved
+            server.shutdown()
+
+
+def _conversation(user_message, history=(), system="You are YODA."):
+    return [{"role": "system", "content": system}, *history, {"role": "user", "content": user_message}]
+
+
+def test_llm_cache_modes_select_the_cached_turns():
+    """'decision' caches only tool selection, 'all' also analysis, 'off' nothing"""
+    expected = {'off': (4, 0), 'decision': (3, 1), 'all': (2, 2)}
+    for mode, (requests_sent, hits) in expected.items():
+        with _cached_llm(mode):
+            for _ in range(2):
+                decision = main_processing.call_openai(_conversation("show me all P1 alerts"), turn="decision")
+                analysis = main_processing.call_openai(_conversation("TOOL_RESULT: 3 monitors"), turn="analysis")
+            assert decision == "echo: show me all P1 alerts" and analysis == "echo: TOOL_RESULT: 3 monitors"
+            assert _FakeOpenAI.requests_seen == requests_sent, mode
+            assert main_processing.get_llm_cache_stats()['hits'] == hits, mode
+            assert main_processing.get_llm_cache_stats()['mode'] == mode
+    print("✅ LLM cache modes: off 4 calls, decision 3, all 2")
+
+
+def test_llm_cache_key_normalizes_the_message_but_not_the_conversation():
+    """Whitespace and case of the user message share a key; history, order, prompt and params do not"""
+    data = {"model": "gpt-4o-mini", "max_tokens": 1500, "temperature": 0.3}
+    key = main_processing._llm_cache_key
+    first, second = {"role": "user", "content": "errors in checkout"}, {"role": "assistant", "content": "3 errors"}
+    base = key(_conversation("Show me  P1 alerts", [first, second]), data)
+
+    assert key(_conversation(" show me p1\talerts ", [first, second]), data) == base
+    assert key(_conversation("Show me P1 alerts", [first, second]), dict(data)) == base
+    different = [
+        key(_conversation("show me P2 alerts", [first, second]), data),
+        key(_conversation("Show me P1 alerts", [second, first]), data),
+        key(_conversation("Show me P1 alerts", [first]), data),
+        key(_conversation("Show me P1 alerts", [first, second], system="You are YODA v2."), data),
+        key(_conversation("Show me P1 alerts", [first, second]), dict(data, temperature=0.7)),
+        key(_conversation("Show me P1 alerts", [first, second]), dict(data, max_tokens=500)),
+        key(_conversation("Show me P1 alerts", [first, second]), dict(data, model="gpt-4o")),
+    ]
+    assert base not in different and len(set(different)) == len(different)
+    # The prefix identifies the system prompt version
+    assert different[3].split(':')[0] != base.split(':')[0] == different[4].split(':')[0]
+    print("✅ LLM cache keys: message normalized, history/prompt/params kept distinct")
+
+
+def test_llm_errors_and_empty_replies_are_not_cached():
+    """A failed or empty completion is returned once and the next identical call asks again"""
+    with _cached_llm('all', script=[(500, 0, {})]) as server:
+        messages = _conversation("show me all P1 alerts")
+        error = main_processing.call_openai(messages, turn="decision")
+        assert error.startswith("❌ OpenAI API error: 500")
+        assert main_processing.call_openai(messages, turn="decision") == "echo: show me all P1 alerts"
+        assert _FakeOpenAI.requests_seen == 2
+
+        _FakeOpenAI.reply = "  "
+        empty = _conversation("summarize")
+        assert main_processing.call_openai(empty, turn="analysis") == "  "
+        _FakeOpenAI.reply = "All systems nominal."
+        assert main_processing.call_openai(empty, turn="analysis") == "All systems nominal."
+        assert main_processing.call_openai(empty, turn="analysis") == "All systems nominal."
+        assert _FakeOpenAI.requests_seen == 4
+
+        stats = main_processing.get_llm_cache_stats()
+        assert (stats['loads'], stats['errors'], stats['hits']) == (2, 2, 1)
+    print("✅ Errors and empty replies were not cached")
+
+
+if __name__ == "__main__":
+    test_completions_reuse_connection_and_count_tokens()
+    test_429_and_5xx_are_retried()
+    test_errors_are_bounded()
+    test_fake_llm_server_scripts_decisions_analysis_and_streams()
+    test_llm_cache_modes_select_the_cached_turns()
+    test_llm_cache_key_normalizes_the_message_but_not_the_conversation()
+    test_llm_errors_and_empty_replies_are_not_cached()
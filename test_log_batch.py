@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+
+import os
+import time
+from datetime import datetime
+
+import mcp_loader  # noqa: F401  (loads tools before importing mcp modules directly)
+from mcp.log_batch import LogBatch
+from mcp.records import LogRecord
+
+
+def _legacy_patterns(logs):
+    """The per-record counters analyze_log_patterns_mcp used before LogBatch"""
+    patterns = {"status_distribution": {}, "service_distribution": {}, "source_distribution": {},
+                "host_distribution": {}, "common_messages": {}, "timeline": {}}
+    for log in logs:
+        for field in ('status', 'service', 'source', 'host'):
+            value = log.get(field, 'unknown')
+            counts = patterns[f"{field}_distribution"]
+            counts[value] = counts.get(value, 0) + 1
+        message_key = log.get('message', '')[:100]
+        patterns["common_messages"][message_key] = patterns["common_messages"].get(message_key, 0) + 1
+        if log.get('timestamp'):
+            try:
+                if isinstance(log['timestamp'], str):
+                    dt = datetime.fromisoformat(log['timestamp'].replace('Z', '+00:00'))
+                else:
+                    dt = datetime.fromtimestamp(log['timestamp'] / 1000)
+                hour_key = dt.strftime('%Y-%m-%d %H:00')
+                patterns["timeline"][hour_key] = patterns["timeline"].get(hour_key, 0) + 1
+            except Exception:
+                pass
+    return patterns
+
+
+def _batch_patterns(logs):
+    batch = LogBatch.from_logs(logs)
+    patterns = {f"{field}_distribution": batch.distribution(field) for field in ('status', 'service', 'source', 'host')}
+    patterns["common_messages"] = batch.distribution('message_key')
+    patterns["timeline"] = batch.hourly_histogram()
+    return patterns
+
+
+def _logs():
+    # 2024-03-10 06:00-08:59 UTC spans the US spring-forward at 07:00 UTC
+    start = 1710050400000
+    stamps = [
+        "2024-05-01T12:34:56.789Z", "2024-05-01T12:59:59Z", "2024-05-01T13:00:00.000Z",
+        "2024-05-01T23:30:00+02:00", "2024-05-01T23:30:00", "2024-05-01T23:45:00.5-05:30",
+        start, start + 3599999, start + 3600000, start + 2 * 3600000 + 1, float(start + 5400000),
+        None, "", "not a timestamp", 0,
+    ]
+    logs = []
+    for i in range(300):
+        log = {
+            "status": ['info', 'warn', 'error'][i % 3],
+            "service": f"service-{i % 7}",
+            "host": f"host-{i % 11}",
+            "message": f"GET /api/orders/{i % 13} " + "x" * (i % 150),
+            "timestamp": stamps[i % len(stamps)],
+        }
+        if i % 5:
+            log["source"] = "python"
+        logs.append(LogRecord(log) if i % 2 else log)
+    return logs
+
+
+def test_batch_counters_match_the_per_record_loop():
+    """Distributions and timeline equal the old per-log output, in a non-UTC local timezone"""
+    saved_tz = os.environ.get('TZ')
+    os.environ['TZ'] = 'America/New_York'
+    time.tzset()
+    try:
+        logs = _logs()
+        legacy, batch = _legacy_patterns(logs), _batch_patterns(logs)
+    finally:
+        if saved_tz is None:
+            os.environ.pop('TZ', None)
+        else:
+            os.environ['TZ'] = saved_tz
+        time.tzset()
+
+    for key in legacy:
+        assert batch[key] == legacy[key], key
+    # Epoch timestamps are labelled in local time (EST, then EDT after 02:00 local)
+    assert {'2024-03-10 01:00', '2024-03-10 03:00', '2024-03-10 04:00'} <= set(batch["timeline"])
+    assert '2024-05-01 23:00' in batch["timeline"] and '2024-05-01 12:00' in batch["timeline"]
+    assert list(batch["timeline"]) == sorted(batch["timeline"])
+    print(f"✅ {len(logs)} logs: LogBatch counters match the per-record loop "
+          f"({len(batch['timeline'])} timeline hours)")
+
+
+if __name__ == "__main__":
+    test_batch_counters_match_the_per_record_loop()
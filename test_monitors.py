@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+
+import os
+import tempfile
+from contextlib import contextmanager
+
+import mcp_loader  # noqa: F401  (loads tools before importing mcp modules directly)
+import mcp.cache
+import mcp.monitors
+from benchmarks.datadog_standin import StandinConfig, start_standin
+from mcp.cache import Cache
+from mcp.monitor_index import normalize_priority, scope_tags
+
+
+@contextmanager
+def _standin_monitors(count):
+    """Point the monitor tools at a stand-in with `count` monitors and an empty cache"""
+    server, base_url = start_standin(StandinConfig(logs=100, monitors=count, dashboards=5, events=10))
+    saved_env = {name: os.environ.get(name) for name in ('DD_SITE', 'DD_API_KEY', 'DD_APP_KEY')}
+    os.environ.update(DD_SITE=base_url, DD_API_KEY='test', DD_APP_KEY='test')
+    saved_cache = mcp.cache._cache
+    with tempfile.TemporaryDirectory() as cache_dir:
+        mcp.cache._cache = Cache(path=os.path.join(cache_dir, 'cache.sqlite3'))
+        try:
+            yield server
+        finally:
+            mcp.cache._cache = saved_cache
+            for name, value in saved_env.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+            server.shutdown()
+
+
+def test_chat_questions_filter_the_persisted_inventory_index():
+    """Once the inventory is loaded, later questions resolve against the same index"""
+    with _standin_monitors(2500) as server:
+        index, _ = mcp.monitors.get_monitor_index()
+        pages = server.stats['GET v1/monitor']
+        alerts = mcp.monitors.get_monitors_mcp(group_states=['alert'], priority='P1')
+        production = mcp.monitors.get_monitors_by_multiple_tags_mcp(['env:production', 'service:checkout'],
+                                                                    group_states=['alert', 'warn'])
+        tags = mcp.monitors.get_available_monitor_tags_mcp()
+        again, _ = mcp.monitors.get_monitor_index()
+        fetched = server.stats['GET v1/monitor']
+
+    assert alerts["success"] and production["success"] and tags["success"]
+    assert fetched == pages >= 3, "later questions must not refetch the inventory"
+    assert again is index and len(index) == 2500
+    assert alerts["summary"]["source"] == "inventory_index"
+
+    inventory = index.monitors
+    expected = [m['id'] for m in inventory if (m.get('overall_state') or '').lower() == 'alert'
+                and normalize_priority(m.get('priority')) == 'P1']
+    assert [m['id'] for m in alerts["data"]] == expected
+    expected = [m['id'] for m in inventory if {'env:production', 'service:checkout'} <= set(scope_tags(m['query']))
+                and (m.get('overall_state') or '').lower() in ('alert', 'warn')]
+    assert [m['id'] for m in production["data"]] == expected
+    assert tags["data"]["total_monitors_analyzed"] == 2500
+    print(f"✅ {pages} inventory pages fetched once; {len(alerts['data'])} P1 alerts, "
+          f"{len(production['data'])} production/checkout monitors from the same index")
+
+
+def test_limited_query_stops_paging_early():
+    """Without a cached inventory a limited query pages the API and stops once the limit matched"""
+    saved_page_size = mcp.monitors.MONITOR_PAGE_SIZE
+    mcp.monitors.MONITOR_PAGE_SIZE = 100
+    try:
+        with _standin_monitors(2500) as server:
+            limited = mcp.monitors.get_monitors_mcp(group_states=['alert'], limit=5)
+            limited_pages = server.stats['GET v1/monitor']
+            everything = mcp.monitors.get_monitors_mcp(group_states=['alert'])
+            cached = mcp.cache._cache.get('monitors', 'inventory')
+    finally:
+        mcp.monitors.MONITOR_PAGE_SIZE = saved_page_size
+
+    assert limited["success"] and everything["success"]
+    assert limited["summary"]["source"] == everything["summary"]["source"] == "api_pages"
+    assert limited["summary"]["stopped_early"] and limited_pages == limited["summary"]["pages_fetched"] == 1
+    assert [m['id'] for m in limited["data"]] == [m['id'] for m in everything["data"]][:5]
+    assert everything["summary"]["pages_fetched"] > 1 and cached is None
+    print(f"✅ limit=5 answered from {limited_pages} page; the unlimited query paged "
+          f"{everything['summary']['pages_fetched']} filtered pages")
+
+
+def test_tags_match_the_query_scope_and_monitor_tags_the_monitor():
+    """`tags` filters by the monitor query scope and `monitor_tags` by the monitor's own tags, on both paths"""
+    with _standin_monitors(1000):
+        mcp.monitors.get_monitor_index()
+        by_host = mcp.monitors.get_monitors_by_tag_mcp('host:checkout-1')
+        by_host_paged = mcp.monitors.get_monitors_by_tag_mcp('host:checkout-1', limit=1000)
+        any_host = mcp.monitors.get_monitors_by_multiple_tags_mcp(['host:checkout-1', 'host:cart-2'], match='any')
+        any_host_paged = mcp.monitors.get_monitors_by_multiple_tags_mcp(['host:checkout-1', 'host:cart-2'],
+                                                                        match='any', limit=1000)
+        team_as_scope = mcp.monitors.get_monitors_by_tag_mcp('team:payments')
+        team = mcp.monitors.get_monitors_mcp(monitor_tags=['team:payments'])
+        team_paged = mcp.monitors.get_monitors_mcp(monitor_tags=['team:payments'], limit=1000)
+        named = mcp.monitors.get_monitors_mcp(names=['checkout'])
+
+    assert by_host["summary"]["source"] == "inventory_index" and by_host_paged["summary"]["source"] == "api_pages"
+    assert by_host["data"] and [m['id'] for m in by_host["data"]] == [m['id'] for m in by_host_paged["data"]]
+    assert all('host:checkout-1' in m['query'] and 'host:checkout-1' not in m['tags'] for m in by_host["data"])
+    assert len(any_host["data"]) > len(by_host["data"])
+    assert [m['id'] for m in any_host["data"]] == [m['id'] for m in any_host_paged["data"]]
+    assert team_as_scope["data"] == [], "monitor tags are not scope tags"
+    assert team["data"] and [m['id'] for m in team["data"]] == [m['id'] for m in team_paged["data"]]
+    assert named["summary"]["source"] == "api_pages", "names are matched by the API"
+    assert named["data"] and all('checkout' in m['name'].lower() for m in named["data"])
+    print(f"✅ host:checkout-1 scopes {len(by_host['data'])} monitors; team:payments tags {len(team['data'])}")
+
+
+if __name__ == "__main__":
+    test_chat_questions_filter_the_persisted_inventory_index()
+    test_limited_query_stops_paging_early()
+    test_tags_match_the_query_scope_and_monitor_tags_the_monitor()
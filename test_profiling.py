@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+
+import os
+import pstats
+import tempfile
+import time
+
+import mcp_loader  # noqa: F401  (loads tools before importing mcp modules directly)
+from profiling import current_profile, parse_profile_command, profile_turn
+from worker_pool import run_tool
+
+
+def _busy_tool(seconds):
+    """Stands in for an analyzer: burns CPU on a pool thread"""
+    deadline = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < deadline:
+        total += sum(range(200))
+    return total
+
+
+def test_profile_command_is_parsed():
+    """`profile <message>` forces profiling; other messages pass through"""
+    assert parse_profile_command("profile show me all P1 alerts") == ("show me all P1 alerts", True)
+    assert parse_profile_command("Profile   get recent logs") == ("get recent logs", True)
+    assert parse_profile_command("profile") == ("profile", False)
+    assert parse_profile_command("show my profile page") == ("show my profile page", False)
+    print("✅ profile command parsing")
+
+
+def test_cprofile_turn_includes_pool_threads():
+    """The .prof file merges the handler thread and the tool pool thread"""
+    directory = tempfile.mkdtemp(prefix='yoda-profile-')
+    with profile_turn(force=True, mode='cprofile', directory=directory) as profile:
+        profile.tool_name = 'analyze_log_patterns'
+        run_tool(_busy_tool, 0.05)
+    assert current_profile() is None
+
+    path = profile.path
+    assert os.path.exists(path) and path.endswith('-analyze_log_patterns.prof')
+    functions = {name for (_, _, name) in pstats.Stats(path).stats}
+    assert '_busy_tool' in functions
+    print(f"✅ cProfile dump: {os.path.basename(path)}")
+
+
+def test_sampled_turn_writes_folded_stacks():
+    """Sample mode writes flamegraph-ready folded stacks"""
+    directory = tempfile.mkdtemp(prefix='yoda-profile-')
+    with profile_turn(force=True, mode='sample', directory=directory) as profile:
+        run_tool(_busy_tool, 0.1)
+
+    with open(profile.path) as f:
+        lines = f.read().splitlines()
+    assert profile.path.endswith('-chat.folded')
+    assert any('_busy_tool (test_profiling.py:' in line for line in lines)
+    assert all(line.rsplit(' ', 1)[1].isdigit() for line in lines)
+    print(f"✅ Folded stacks: {len(lines)} distinct stacks")
+
+
+def test_unprofiled_turn_records_nothing():
+    """Without a request or sampling, no profiler runs"""
+    with profile_turn() as profile:
+        assert profile is None
+        assert run_tool(current_profile) is None
+    print("✅ Profiling off by default")
+
+
+if __name__ == "__main__":
+    test_profile_command_is_parsed()
+    test_cprofile_turn_includes_pool_threads()
+    test_sampled_turn_writes_folded_stacks()
+    test_unprofiled_turn_records_nothing()
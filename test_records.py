@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+
+import json
+import os
+import tempfile
+
+import mcp_loader
+from mcp.cache import Cache
+from mcp.records import EventRecord, LogRecord, MetricSeries, MonitorRecord, to_plain
+from mcp.session_memory import get_session_memory, session_scope
+
+
+def _log():
+    return LogRecord({"timestamp": "2024-05-01T12:00:00Z", "message": "payment failed", "status": "error",
+                      "service": "payment-api", "host": "web-01", "tags": ["env:prod"], "trace_id": "abc"})
+
+
+def _series():
+    series = MetricSeries("system.cpu.user", "host:web-01", [[1000, 20.0], [2000, 85.5]])
+    series.latest_value, series.latest_timestamp = 85.5, 2000
+    series.min_value, series.max_value, series.avg_value = 20.0, 85.5, 52.75
+    return series
+
+
+def _event():
+    return EventRecord({"id": 7, "title": "Deploy", "priority": "low", "tags": ["service:checkout"]},
+                       "2024-05-01T12:00:00")
+
+
+def _monitor():
+    return MonitorRecord({"id": 42, "name": "High CPU", "overall_state": "Alert", "priority": 1,
+                          "query": "avg(last_5m):avg:system.cpu.user{env:prod} > 90", "tags": ["team:sre"],
+                          "creator": {"name": "Ops"}})
+
+
+def _result():
+    return {"success": True, "data": {"logs": [_log()], "series": [_series()], "events": [_event()],
+                                      "monitors": [_monitor()]}, "summary": {"total": 4}}
+
+
+def test_records_answer_the_dict_api():
+    """Tools and analyzers read records like the dicts they replaced"""
+    log, series, event, monitor = _log(), _series(), _event(), _monitor()
+
+    assert monitor['id'] == 42 and monitor['status'] == 'Alert' and monitor['creator'] == 'Ops'
+    assert monitor.get('priority') == 1 and monitor.get('overall_state', 'n/a') == 'n/a'
+    assert log['service'] == 'payment-api' and log.get('source') == '' and log['attributes'] == {"trace_id": "abc"}
+    assert event['priority'] == 'low' and event.get('text') == '' and event['timestamp'] == "2024-05-01T12:00:00"
+    assert series['max_value'] == 85.5 and series['data_points_count'] == 2
+
+    # Optional series fields only exist once a discovery tool sets them
+    assert 'metric_type' not in series and series.get('metric_type', 'raw') == 'raw'
+    assert 'metric_type' not in series.keys()
+    series['metric_type'] = 'gauge'
+    assert series['metric_type'] == 'gauge' and 'metric_type' in series
+
+    for record, missing in ((log, 'duration'), (monitor, 'overall_state'), (_series(), 'operation')):
+        try:
+            record[missing]
+        except KeyError:
+            continue
+        raise AssertionError(f"{missing} should be missing from {type(record).__name__}")
+    try:
+        monitor['unknown'] = 1
+    except KeyError:
+        pass
+    else:
+        raise AssertionError("records must not grow new fields")
+
+    assert monitor == monitor.to_dict() and dict(monitor.items()) == monitor.to_dict()
+    print("✅ Records answer [], .get, in, keys and items like dicts")
+
+
+def test_to_plain_converts_only_what_holds_records():
+    """Records become dicts at any depth; plain containers are returned as the same objects"""
+    result = _result()
+    plain = to_plain(result)
+
+    assert type(plain["data"]["monitors"][0]) is dict and type(plain["data"]["logs"][0]) is dict
+    assert plain["data"]["monitors"][0] == result["data"]["monitors"][0].to_dict()
+    assert plain["summary"] is result["summary"], "unchanged containers are not copied"
+    assert result["data"]["logs"][0].__class__ is LogRecord, "the tool's result is not mutated"
+    assert json.loads(json.dumps(plain)) == plain
+
+    untouched = {"success": True, "data": [{"id": 1}], "summary": {"total": 1}}
+    assert to_plain(untouched) is untouched
+    print("✅ to_plain converted nested records without copying plain containers")
+
+
+def test_tool_results_are_plain_at_the_call_tool_boundary():
+    """What call_tool returns survives JSON round-trips through the cache and session memory"""
+    loader = mcp_loader.mcp_loader
+    loader.tool_functions['records_probe'] = lambda: _result()
+    try:
+        result = mcp_loader.call_mcp_tool('records_probe')
+    finally:
+        del loader.tool_functions['records_probe']
+
+    assert result["success"]
+    assert json.dumps(result, sort_keys=True) == json.dumps(to_plain(_result()), sort_keys=True)
+    assert result["data"]["monitors"][0]['id'] == 42 and result["data"]["monitors"][0].get('status') == 'Alert'
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        path = os.path.join(cache_dir, 'cache.sqlite3')
+        Cache(path=path, ttl_hours={'tools': 1}).set('tools', 'records_probe', result)
+        cached = Cache(path=path, ttl_hours={'tools': 1}).get('tools', 'records_probe')
+        assert cached.source == 'disk' and cached.value == result
+        assert cached.value["data"]["monitors"][0] == _monitor()
+
+    memory = get_session_memory()
+    with session_scope('records-test'):
+        stored = memory.remember(1, 'records_probe', {}, result)
+        assert stored is not None and stored.size_bytes == len(json.dumps(result))
+        assert memory.results()[-1].result["data"]["logs"][0]['attributes'] == {"trace_id": "abc"}
+    print("✅ Tool results left call_tool as plain dicts and round-tripped through cache and session memory")
+
+
+if __name__ == "__main__":
+    test_records_answer_the_dict_api()
+    test_to_plain_converts_only_what_holds_records()
+    test_tool_results_are_plain_at_the_call_tool_boundary()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+
+from mcp_loader import call_mcp_tool
+from mcp.session_memory import SessionMemory, current_session_id, get_session_memory, session_scope
+from worker_pool import run_tool
+
+
+def _metrics_result():
+    return {"success": True, "data": [
+        {"metric": "system.cpu.user", "scope": "host:web-01", "pointlist": [[1000, 20.0], [2000, 85.5], [3000, 40.0]]},
+        {"metric": "system.cpu.user", "scope": "host:web-02", "pointlist": [[1000, 10.0], [2000, None], [3000, 95.0]]},
+    ]}
+
+
+def _logs_result():
+    return {"success": True, "data": [
+        {"status": "error", "service": "payment-api", "duration": 120},
+        {"status": "info", "service": "payment-api", "duration": 30},
+        {"status": "error", "service": "checkout", "duration": 300},
+    ]}
+
+
+def test_reuse_result_reaggregates_previous_turn():
+    """`reuse_result` answers follow-ups from the stored result of this session only"""
+    memory = get_session_memory()
+    with session_scope('session-a'):
+        memory.remember(1, 'query_metrics', {'query': 'avg:system.cpu.user{*}'}, _metrics_result())
+        memory.remember(2, 'search_logs', {'query': 'service:payment-api'}, _logs_result())
+
+        maximum = call_mcp_tool('reuse_result', tool='query_metrics', aggregate='max')
+        print(maximum)
+        assert maximum['success']
+        assert maximum['overall'] == {'max': 95.0, 'timestamp': 3000}
+        assert [series['max'] for series in maximum['data']] == [85.5, 95.0]
+
+        errors = call_mcp_tool('reuse_result', turn=-1, filter=['status=error'], fields=['service'])
+        assert errors['data'] == [{'service': 'payment-api'}, {'service': 'checkout'}]
+        assert call_mcp_tool('reuse_result', turn=2, group_by='service')['data'] == {'payment-api': 2, 'checkout': 1}
+        assert call_mcp_tool('reuse_result', turn=2, aggregate='avg', field='duration')['data']['avg'] == 150
+        assert "turn 1: query_metrics(query='avg:system.cpu.user{*}') -> 2 items" in memory.describe()
+
+    with session_scope('session-b'):
+        other = call_mcp_tool('reuse_result', turn=-1)
+        assert not other['success'] and other['available_results'] == []
+    print("✅ Follow-ups answered locally, sessions isolated")
+
+
+def test_memory_is_bounded():
+    """Oldest results are evicted past the per-session count/size limits and the session limit"""
+    memory = SessionMemory(max_results=3, max_bytes=2000, max_sessions=2, ttl_seconds=3600)
+    for turn in range(1, 6):
+        memory.remember(turn, 'search_logs', {}, _logs_result(), session_id='s1')
+    assert [entry.turn for entry in memory.results('s1')] == [3, 4, 5]
+
+    big = {"success": True, "data": ["x" * 700]}
+    for turn in range(6, 9):
+        memory.remember(turn, 'search_logs', {}, big, session_id='s1')
+    assert sum(entry.size_bytes for entry in memory.results('s1')) <= 2000
+    assert memory.remember(9, 'search_logs', {}, {"data": ["x" * 5000]}, session_id='s1') is None
+
+    memory.remember(1, 'get_monitors', {}, _logs_result(), session_id='s2')
+    memory.remember(1, 'get_monitors', {}, _logs_result(), session_id='s3')
+    assert memory.results('s1') == [] and memory.stats()['sessions'] == 2
+    print(f"✅ Bounded: {memory.stats()}")
+
+
+def test_tool_pool_keeps_session_context():
+    """Tool calls offloaded to the shared pool still see the caller's session"""
+    with session_scope('pool-session'):
+        assert run_tool(current_session_id) == 'pool-session'
+    assert run_tool(current_session_id) == 'default'
+    print("✅ Session context follows tool calls into the pool")
+
+
+if __name__ == "__main__":
+    test_reuse_result_reaggregates_previous_turn()
+    test_memory_is_bounded()
+    test_tool_pool_keeps_session_context()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+
+import time
+
+import mcp_loader  # noqa: F401  (loads tools before importing mcp modules directly)
+import requests
+from telemetry import (DATADOG_METRIC, PHASE_METRIC, current_turn, get_metrics_registry, span,
+                       start_metrics_server, turn_scope)
+from tracing import current_span, set_exporter, trace_span
+from worker_pool import run_tool
+
+
+class _ListExporter:
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+
+def test_turn_timings_follow_tool_calls_into_the_pool():
+    """Spans inside pooled tool calls land in the caller's turn timings"""
+    def tool():
+        with span(DATADOG_METRIC, endpoint='v1/query', method='GET') as labels:
+            time.sleep(0.02)
+            labels['status'] = 200
+        return current_turn()
+
+    with turn_scope() as timings:
+        with span(PHASE_METRIC, phase='decision'):
+            time.sleep(0.01)
+        with span(PHASE_METRIC, phase='tool'):
+            seen = run_tool(tool)
+
+    phases = timings.phases()
+    calls, seconds = timings.datadog_calls()
+    summary = timings.summary()
+    assert seen is timings
+    assert set(phases) == {'decision', 'tool'}
+    assert calls == 1 and seconds >= 0.02
+    assert summary.startswith("decision ") and "(1 Datadog call, " in summary
+    assert current_turn() is None
+    print(f"✅ Turn timings: {summary}")
+
+
+def test_metrics_endpoint_serves_prometheus_histograms():
+    """/metrics exposes cumulative buckets, sum and count per label set"""
+    for seconds in (0.003, 0.2, 0.2):
+        get_metrics_registry().observe('yoda_test_seconds', seconds, {'phase': 'format'})
+
+    server = start_metrics_server(port=19464, host='127.0.0.1')
+    assert server is not None
+    port = server.server_address[1]
+    body = requests.get(f"http://127.0.0.1:{port}/metrics", timeout=5).text
+
+    assert '# TYPE yoda_test_seconds histogram' in body
+    assert 'yoda_test_seconds_bucket{phase="format",le="0.005"} 1' in body
+    assert 'yoda_test_seconds_bucket{phase="format",le="0.25"} 3' in body
+    assert 'yoda_test_seconds_bucket{phase="format",le="+Inf"} 3' in body
+    assert 'yoda_test_seconds_count{phase="format"} 3' in body
+    print("✅ Prometheus histograms served on /metrics")
+
+
+def test_trace_spans_link_turn_tool_and_datadog_request():
+    """Spans opened in pooled tool calls are children of the turn's span"""
+    exporter = _ListExporter()
+    set_exporter(exporter)
+    try:
+        def tool():
+            with trace_span('datadog.request', **{'datadog.endpoint': 'v1/query'}):
+                current_span().set_attribute('http.status_code', 200)
+
+        with trace_span('chat.turn'):
+            with trace_span('mcp.tool', **{'tool.name': 'query_metrics'}):
+                run_tool(tool)
+    finally:
+        set_exporter(None)
+
+    spans = {span['name']: span for span in exporter.spans}
+    assert [span['name'] for span in exporter.spans] == ['datadog.request', 'mcp.tool', 'chat.turn']
+    assert len({span['traceId'] for span in exporter.spans}) == 1
+    assert spans['chat.turn']['parentSpanId'] is None
+    assert spans['mcp.tool']['parentSpanId'] == spans['chat.turn']['spanId']
+    assert spans['datadog.request']['parentSpanId'] == spans['mcp.tool']['spanId']
+    assert spans['datadog.request']['attributes']['http.status_code'] == 200
+    assert not current_span().is_recording()
+    print("✅ Trace: chat.turn -> mcp.tool -> datadog.request")
+
+
+if __name__ == "__main__":
+    test_turn_timings_follow_tool_calls_into_the_pool()
+    test_metrics_endpoint_serves_prometheus_histograms()
+    test_trace_spans_link_turn_tool_and_datadog_request()
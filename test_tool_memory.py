@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+
+import threading
+import time
+
+import mcp_loader
+from tool_memory import ToolMemoryTracker, estimate_size, fit_to_budget, get_tool_memory_stats
+
+_MB = 1024 * 1024
+
+
+def test_oversized_results_are_reduced_without_touching_the_original():
+    """Records are truncated, metric points downsampled, and the cached original is left intact"""
+    logs = [{"timestamp": i, "service": "checkout", "message": "payment declined " * 40} for i in range(20000)]
+    series = {"metric": "system.cpu.user", "pointlist": [[i * 1000, float(i)] for i in range(50000)]}
+    result = {"success": True, "error": None, "data": {"logs": logs, "series": [series]}}
+    original_size = estimate_size(result)
+
+    fitted, before, after = fit_to_budget(result, 2 * _MB)
+
+    assert before == original_size > 2 * _MB >= after
+    assert fitted["partial"] is True and "memory budget" in fitted["partial_reason"]
+    assert fitted["success"] is True
+    assert "partial" not in result and len(result["data"]["logs"]) == 20000
+    assert len(series["pointlist"]) == 50000
+    kept_logs = fitted["data"]["logs"]
+    assert kept_logs == logs[:len(kept_logs)]
+    points = fitted["data"]["series"][0]["pointlist"]
+    assert 0 < len(points) < 50000 and points[0] == [0, 0.0] and points[-1][0] > 40_000_000
+    print(f"✅ {before / _MB:.1f} MB -> {after / _MB:.1f} MB ({len(kept_logs)} logs, {len(points)} points)")
+
+
+def test_small_results_pass_through_untouched():
+    result = {"success": True, "error": None, "data": [{"id": 1}]}
+    fitted, _, _ = fit_to_budget(result, 64 * _MB)
+    assert fitted is result
+    print("✅ Results within budget are returned as-is")
+
+
+def test_memory_error_in_a_tool_becomes_an_error_result():
+    """A MemoryError is reported and counted instead of escaping the worker"""
+    def exploding_tool(**kwargs):
+        raise MemoryError()
+
+    mcp_loader.mcp_loader.tool_functions['test_exploding_tool'] = exploding_tool
+    try:
+        result = mcp_loader.call_mcp_tool('test_exploding_tool')
+    finally:
+        del mcp_loader.mcp_loader.tool_functions['test_exploding_tool']
+
+    assert result["success"] is False and "out of memory" in result["error"]
+    assert get_tool_memory_stats()['test_exploding_tool']['memory_errors'] == 1
+    print("✅ MemoryError -> error result")
+
+
+def test_calls_wait_while_running_tools_use_the_total_budget():
+    """A tool known to need most of the total waits for the running call to finish"""
+    tracker = ToolMemoryTracker(budget_mb=0, total_mb=10)
+    big = {"data": "x" * (8 * _MB)}
+    with tracker.track('analyze_log_patterns') as account:
+        account.fit(big)
+    order = []
+
+    def second_call():
+        with tracker.track('analyze_log_patterns'):
+            order.append('second')
+
+    with tracker.track('analyze_log_patterns'):
+        worker = threading.Thread(target=second_call)
+        worker.start()
+        time.sleep(0.1)
+        order.append('first done')
+    worker.join(timeout=5)
+
+    stats = tracker.stats()['analyze_log_patterns']
+    assert order == ['first done', 'second']
+    assert stats['waits'] == 1 and stats['peak_bytes'] >= 8 * _MB
+    print("✅ Total memory budget serializes heavy calls")
+
+
+if __name__ == "__main__":
+    test_oversized_results_are_reduced_without_touching_the_original()
+    test_small_results_pass_through_untouched()
+    test_memory_error_in_a_tool_becomes_an_error_result()
+    test_calls_wait_while_running_tools_use_the_total_budget()
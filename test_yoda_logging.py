@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+
+import logging
+import queue
+
+import yoda_logging
+from yoda_logging import VERBOSE, get_logger, get_logging_stats, preview
+
+
+class _Exploding:
+    def __repr__(self):
+        raise AssertionError("repr() built for a record that was not emitted")
+
+
+def test_preview_is_lazy_and_bounded():
+    """preview() builds nothing for filtered records and caps large payloads"""
+    logger = get_logger('test.preview')
+    logger.setLevel(logging.INFO)
+    logger.debug("payload: %s", preview(_Exploding()))
+
+    text = str(preview({"logs": [{"message": "x" * 5000}] * 500}, limit=300))
+    assert len(text) < 400 and text.endswith("chars)")
+    assert str(preview("short")) == "short"
+    print(f"✅ preview(): {len(text)} chars for a ~2.5MB payload")
+
+
+def test_verbose_records_are_sampled_and_long_messages_truncated():
+    """extra=VERBOSE records are sampled; messages over LOG_MAX_CHARS are cut"""
+    record_filter = yoda_logging._CapAndSampleFilter()
+
+    def record(message, verbose=False):
+        item = logging.LogRecord('yoda.test', logging.DEBUG, __file__, 1, message, None, None)
+        if verbose:
+            item.__dict__.update(VERBOSE)
+        return item
+
+    saved = yoda_logging.LOG_VERBOSE_SAMPLE_RATE
+    try:
+        yoda_logging.LOG_VERBOSE_SAMPLE_RATE = 0.0
+        assert not record_filter.filter(record("per-item line", verbose=True))
+        assert record_filter.filter(record("summary line"))
+        yoda_logging.LOG_VERBOSE_SAMPLE_RATE = 1.0
+        assert record_filter.filter(record("per-item line", verbose=True))
+    finally:
+        yoda_logging.LOG_VERBOSE_SAMPLE_RATE = saved
+
+    long_record = record("y" * (yoda_logging.LOG_MAX_CHARS + 500))
+    assert record_filter.filter(long_record)
+    assert long_record.args is None
+    assert long_record.msg.endswith("(+500 chars)")
+    print("✅ Verbose sampling and truncation")
+
+
+def test_full_queue_drops_instead_of_blocking():
+    """The queue handler never waits for the writer thread"""
+    handler = yoda_logging._DroppingQueueHandler(queue.Queue(maxsize=1))
+    before = get_logging_stats()['dropped']
+    for i in range(5):
+        handler.handle(logging.LogRecord('yoda.test', logging.INFO, __file__, 1, "line %s", (i,), None))
+    assert handler.queue.qsize() == 1
+    assert get_logging_stats()['dropped'] - before == 4
+    print("✅ Full log queue drops records")
+
+
+if __name__ == "__main__":
+    test_preview_is_lazy_and_bounded()
+    test_verbose_records_are_sampled_and_long_messages_truncated()
+    test_full_queue_drops_instead_of_blocking()
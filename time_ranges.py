@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Relative time phrases in chat messages.
+
+The intent router passes the phrase as a tool's `time_range`, and
+conversation memory records it as a fact of the turn:
+
+    extract_time_range("errors from the last 4 hours")  # ('4 hours', 'errors')
+"""
+
+import re
+
+_TIME_PHRASE = re.compile(
+    r'\b(?:(?:from|for|in|over|during)\s+)?(?:the\s+)?(?:last|past)\s+(?:(\d+)\s*)?(minute|hour|day|week)s?\b'
+)
+
+
+def extract_time_range(message):
+    """
+    Find a relative time phrase and return (time_range, message without it)
+
+    Examples:
+    - "errors from the last 4 hours" -> ('4 hours', 'errors')
+    - "cpu metrics past day" -> ('1 day', 'cpu metrics')
+    """
+    match = _TIME_PHRASE.search(message)
+    if not match:
+        return None, message
+    count = int(match.group(1) or 1)
+    unit = match.group(2)
+    time_range = f"{count} {unit}{'s' if count != 1 else ''}"
+    return time_range, (message[:match.start()] + message[match.end():]).strip()
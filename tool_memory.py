@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Memory accounting and per-call budgets for MCP tool invocations.
+
+`MCPLoader.call_tool` runs every tool inside `tool_memory(tool_name)`:
+
+    with tool_memory(tool_name) as account:
+        result = account.fit(function(**kwargs))
+
+Accounting (TOOL_MEMORY_TRACKING):
+    estimate     (default) size of the returned result, estimated by walking it
+                 (large lists are sampled, so the walk stays cheap)
+    tracemalloc  additionally the Python heap peak during the call. tracemalloc
+                 slows allocations down and its peak is process-wide: with
+                 several tools running at once it is an upper bound.
+The largest size seen per tool is kept in `get_tool_memory_stats()` and set on
+the call's trace span (tool.result_bytes, tool.peak_bytes).
+
+Budgets:
+    TOOL_MEMORY_BUDGET_MB  results larger than this (default 64, 0 disables) are
+                           reduced before they leave the worker: the biggest lists
+                           are truncated (records) or downsampled (metric points)
+                           and the result gets "partial": true with a
+                           "partial_reason". Shared/cached objects are never
+                           modified - reduced containers are copies.
+    TOOL_MEMORY_TOTAL_MB   memory the tools running at once may use together
+                           (default 0 = unlimited). A call reserves the peak its
+                           tool has needed before and waits while the reservations
+                           of running calls would exceed the total; a call always
+                           runs when nothing else is running.
+
+A MemoryError inside a tool becomes an error result instead of killing the
+worker thread.
+"""
+
+import os
+import sys
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from dotenv import load_dotenv
+
+from env_settings import validate_number
+from tracing import current_span
+from yoda_logging import get_logger
+
+load_dotenv()
+
+logger = get_logger(__name__)
+
+TRACKING_MODES = ('estimate', 'tracemalloc')
+_MB = 1024 * 1024
+# Lists longer than this are estimated from an evenly spaced sample
+_SAMPLE_ABOVE = 256
+_SAMPLE_SIZE = 64
+_MAX_DEPTH = 32
+# Reduction passes before giving up on a result that will not shrink further
+_MAX_PASSES = 12
+
+
+def _validate_tracking_mode():
+    """Validate and return the TOOL_MEMORY_TRACKING mode"""
+    mode = os.getenv('TOOL_MEMORY_TRACKING', 'estimate').lower().strip()
+    if mode in TRACKING_MODES:
+        return mode
+    print(f"⚠️  Invalid TOOL_MEMORY_TRACKING='{mode}'. Using default: estimate")
+    return 'estimate'
+
+
+TOOL_MEMORY_BUDGET_MB = validate_number('TOOL_MEMORY_BUDGET_MB', 64, 0, 1024 * 1024)
+TOOL_MEMORY_TOTAL_MB = validate_number('TOOL_MEMORY_TOTAL_MB', 0, 0, 1024 * 1024)
+TOOL_MEMORY_TRACKING = _validate_tracking_mode()
+
+
+def estimate_size(value, _depth=0):
+    """Estimated deep size of a tool result in bytes (containers, strings and numbers)"""
+    size = sys.getsizeof(value)
+    if _depth >= _MAX_DEPTH:
+        return size
+    if isinstance(value, dict):
+        for key, item in value.items():
+            size += estimate_size(key, _depth + 1) + estimate_size(item, _depth + 1)
+    elif isinstance(value, (list, tuple)):
+        count = len(value)
+        if count > _SAMPLE_ABOVE:
+            step = count // _SAMPLE_SIZE
+            sample = value[::step]
+            size += sum(estimate_size(item, _depth + 1) for item in sample) * count // len(sample)
+        else:
+            size += sum(estimate_size(item, _depth + 1) for item in value)
+    elif isinstance(value, (set, frozenset)):
+        size += sum(estimate_size(item, _depth + 1) for item in value)
+    return size
+
+
+def _is_point_list(value):
+    """Metric points: [[timestamp, value], ...] - downsampled rather than cut"""
+    first = value[0]
+    return isinstance(first, (list, tuple)) and first and all(
+        isinstance(item, (int, float)) or item is None for item in first)
+
+
+def _reduce(value, target):
+    """Return a copy of value reduced toward `target` bytes; untouched children are shared"""
+    size = estimate_size(value)
+    if size <= target:
+        return value
+    if isinstance(value, str):
+        keep = max(64, len(value) * target // size)
+        return value[:keep] + f"… [truncated {len(value) - keep} chars]"
+    if isinstance(value, list) and len(value) > 1:
+        keep = max(1, len(value) * target // size)
+        if _is_point_list(value):
+            step = -(-len(value) // keep)
+            return value[::step]
+        return value[:keep]
+    if isinstance(value, (dict, list)) and value:
+        # Scale the largest child (e.g. 'data', a widget's series) by the overall ratio, in a copy;
+        # repeated passes spread the reduction over the big children
+        keys = value.keys() if isinstance(value, dict) else range(len(value))
+        sizes = {key: estimate_size(value[key]) for key in keys}
+        largest = max(sizes, key=sizes.get)
+        reduced = _reduce(value[largest], sizes[largest] * target // size)
+        if reduced is value[largest]:
+            return value
+        copy = dict(value) if isinstance(value, dict) else list(value)
+        copy[largest] = reduced
+        return copy
+    return value
+
+
+def fit_to_budget(result, budget_bytes):
+    """
+    Reduce a tool result to `budget_bytes`
+
+    Returns:
+        (result, original_bytes, final_bytes); a reduced result is a copy
+        marked "partial": true with a "partial_reason".
+    """
+    original = size = estimate_size(result)
+    if not budget_bytes or size <= budget_bytes or not isinstance(result, dict):
+        return result, original, size
+    reduced = result
+    for _ in range(_MAX_PASSES):
+        smaller = _reduce(reduced, budget_bytes)
+        if smaller is reduced:
+            break
+        reduced = smaller
+        size = estimate_size(reduced)
+        if size <= budget_bytes:
+            break
+    reduced = dict(reduced, partial=True,
+                   partial_reason=f"memory budget: result reduced from {original / _MB:.1f} MB to "
+                                  f"{size / _MB:.1f} MB (TOOL_MEMORY_BUDGET_MB={budget_bytes / _MB:g})")
+    return reduced, original, size
+
+
+class ToolMemoryAccount:
+    """Memory used by one tool call"""
+
+    def __init__(self, tool_name, budget_bytes):
+        self.tool_name = tool_name
+        self.budget_bytes = budget_bytes
+        self.result_bytes = 0
+        self.heap_peak_bytes = 0
+        self.partial = False
+
+    @property
+    def peak_bytes(self):
+        return max(self.result_bytes, self.heap_peak_bytes)
+
+    def fit(self, result):
+        """Account for the result and reduce it to the per-call budget"""
+        fitted, original, final = fit_to_budget(result, self.budget_bytes)
+        self.result_bytes = original
+        if fitted is not result:
+            self.partial = True
+            logger.warning("⚠️ %s returned ~%.1f MB, over the %.0f MB budget - reduced to ~%.1f MB (partial)",
+                           self.tool_name, original / _MB, self.budget_bytes / _MB, final / _MB)
+        return fitted
+
+
+class ToolMemoryTracker:
+    """Per-tool peaks and the reservations of running calls"""
+
+    def __init__(self, budget_mb=None, total_mb=None, tracking=None):
+        self.budget_bytes = int((TOOL_MEMORY_BUDGET_MB if budget_mb is None else budget_mb) * _MB)
+        self.total_bytes = int((TOOL_MEMORY_TOTAL_MB if total_mb is None else total_mb) * _MB)
+        self.tracking = tracking or TOOL_MEMORY_TRACKING
+        self._condition = threading.Condition()
+        self._reserved = 0
+        self._running = 0
+        self._stats = {}
+
+    def _expected_bytes(self, tool_name):
+        entry = self._stats.get(tool_name)
+        return entry['peak_bytes'] if entry else 0
+
+    def _admit(self, tool_name):
+        """Wait until the tool's expected peak fits next to the running calls; returns the reservation"""
+        with self._condition:
+            expected = self._expected_bytes(tool_name)
+            waited = False
+            while self.total_bytes and self._running and self._reserved + expected > self.total_bytes:
+                waited = True
+                self._condition.wait()
+            self._reserved += expected
+            self._running += 1
+            if waited:
+                self._entry(tool_name)['waits'] += 1
+            return expected
+
+    def _release(self, reservation):
+        with self._condition:
+            self._reserved -= reservation
+            self._running -= 1
+            self._condition.notify_all()
+
+    def _entry(self, tool_name):
+        return self._stats.setdefault(tool_name, {'calls': 0, 'peak_bytes': 0, 'last_bytes': 0, 'partial': 0,
+                                                  'memory_errors': 0, 'waits': 0})
+
+    def _record(self, account, memory_error):
+        with self._condition:
+            entry = self._entry(account.tool_name)
+            entry['calls'] += 1
+            entry['last_bytes'] = account.peak_bytes
+            entry['peak_bytes'] = max(entry['peak_bytes'], account.peak_bytes)
+            entry['partial'] += account.partial
+            entry['memory_errors'] += memory_error
+
+    @contextmanager
+    def track(self, tool_name):
+        """Account for one tool call; yields its ToolMemoryAccount"""
+        account = ToolMemoryAccount(tool_name, self.budget_bytes)
+        reservation = self._admit(tool_name)
+        traced = self.tracking == 'tracemalloc'
+        if traced:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            baseline, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+        memory_error = False
+        try:
+            yield account
+        except MemoryError:
+            memory_error = True
+            raise
+        finally:
+            if traced:
+                account.heap_peak_bytes = max(0, tracemalloc.get_traced_memory()[1] - baseline)
+            self._release(reservation)
+            self._record(account, memory_error)
+            current_span().set_attributes({'tool.result_bytes': account.result_bytes,
+                                           'tool.peak_bytes': account.peak_bytes,
+                                           'tool.partial': account.partial})
+
+    def stats(self):
+        """Return {tool: {calls, peak_bytes, last_bytes, partial, memory_errors, waits}}"""
+        with self._condition:
+            return {tool: dict(entry) for tool, entry in self._stats.items()}
+
+
+_tracker = None
+_tracker_lock = threading.Lock()
+
+
+def get_tool_memory_tracker():
+    """Return the process-wide tracker"""
+    global _tracker
+    if _tracker is None:
+        with _tracker_lock:
+            if _tracker is None:
+                _tracker = ToolMemoryTracker()
+    return _tracker
+
+
+def tool_memory(tool_name):
+    """Context manager accounting for one call of `tool_name` (see module docstring)"""
+    return get_tool_memory_tracker().track(tool_name)
+
+
+def get_tool_memory_stats():
+    return get_tool_memory_tracker().stats()
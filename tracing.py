@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Distributed-trace-style spans: chat turn -> LLM calls -> MCP tool -> Datadog HTTP.
+
+`trace_span(name, **attributes)` opens a span that is a child of the span
+active in the current context. Context variables follow tool calls into the
+worker pool, so one trace covers a whole chat turn:
+
+    chat.turn            session.id, message.length, route.source, tool.name
+      llm.call           llm.turn, llm.cache_hit, llm.prompt_tokens, llm.completion_tokens
+      mcp.tool           tool.name, tool.params_hash, tool.params, tool.success, tool.result_count,
+                         cache.<namespace> (hit source or 'miss')
+        datadog.request  datadog.endpoint, http.method, http.status_code, http.response_bytes,
+                         datadog.attempts, datadog.coalesced
+
+TRACING selects the exporter:
+    off      (default) spans are no-ops
+    console  one line per finished span on stdout
+    file     OTLP-style JSON lines appended to TRACING_FILE (default yoda_traces.jsonl)
+    otlp     OpenTelemetry SDK + OTLP/HTTP exporter (OTEL_EXPORTER_OTLP_ENDPOINT etc.)
+             when opentelemetry-sdk and opentelemetry-exporter-otlp are installed;
+             falls back to `file` otherwise
+
+console and file need no extra packages and work offline. Any object with an
+`export(span_dict)` method can be installed with `set_exporter()`.
+
+Find the slowest tool/parameter combinations across recorded turns:
+    python tracing.py report yoda_traces.jsonl [--top 15]
+"""
+
+import argparse
+import contextvars
+import hashlib
+import json
+import os
+import secrets
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dotenv import load_dotenv
+
+load_dotenv()
+
+_PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+TRACING_MODES = ('off', 'console', 'file', 'otlp')
+
+
+def _validate_tracing_mode():
+    """Validate and return the TRACING exporter mode"""
+    mode = os.getenv('TRACING', 'off').lower().strip()
+    if mode in TRACING_MODES:
+        return mode
+    print(f"⚠️  Invalid TRACING='{mode}'. Using default: off")
+    return 'off'
+
+
+TRACING = _validate_tracing_mode()
+TRACING_FILE = os.getenv('TRACING_FILE') or os.path.join(_PROJECT_DIR, 'yoda_traces.jsonl')
+
+
+def params_hash(params):
+    """Stable short hash of tool parameters (groups identical calls across turns)"""
+    payload = json.dumps(params or {}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:12]
+
+
+class Span:
+    """Built-in span (mirrors the OpenTelemetry span methods the app uses)"""
+
+    __slots__ = ('name', 'trace_id', 'span_id', 'parent_id', 'start_ns', 'end_ns', 'attributes', 'status',
+                 'error')
+
+    def __init__(self, name, parent, attributes):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent else None
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = dict(attributes)
+        self.status = 'OK'
+        self.error = None
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def set_attributes(self, attributes):
+        self.attributes.update(attributes)
+
+    def record_exception(self, exception):
+        self.status = 'ERROR'
+        self.error = f"{type(exception).__name__}: {exception}"
+
+    def is_recording(self):
+        return True
+
+    def to_dict(self):
+        """OTLP-style JSON representation"""
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id,
+            "name": self.name,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "durationMs": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "status": {"code": self.status, "message": self.error},
+        }
+
+
+class _NoopSpan:
+    """Returned when tracing is off; every method does nothing"""
+
+    __slots__ = ()
+
+    def set_attribute(self, key, value):
+        pass
+
+    def set_attributes(self, attributes):
+        pass
+
+    def record_exception(self, exception):
+        pass
+
+    def is_recording(self):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class ConsoleExporter:
+    """Prints one line per finished span"""
+
+    def export(self, span):
+        indent = '  ' if span['parentSpanId'] else ''
+        attributes = ', '.join(f"{key}={value}" for key, value in span['attributes'].items())
+        print(f"🛰️  {indent}{span['name']} {span['durationMs']:.1f}ms trace={span['traceId'][:8]} {attributes}")
+
+
+class FileExporter:
+    """Appends spans as JSON lines"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, span):
+        line = json.dumps(span, default=str) + '\n'
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+
+
+_current_span = contextvars.ContextVar('trace_span', default=None)
+_exporter = None
+_otel_tracer = None
+
+
+def _configure():
+    """Pick the exporter for the TRACING mode"""
+    global _exporter, _otel_tracer
+    if TRACING == 'otlp':
+        try:
+            from opentelemetry import trace as otel_trace
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+            from opentelemetry.sdk.resources import Resource
+            from opentelemetry.sdk.trace import TracerProvider
+            from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        except ImportError:  # opentelemetry is optional - fall back to the JSON lines file
+            print(f"⚠️  TRACING=otlp needs opentelemetry-sdk and opentelemetry-exporter-otlp. "
+                  f"Writing spans to {TRACING_FILE} instead")
+            _exporter = FileExporter(TRACING_FILE)
+            return
+        provider = TracerProvider(resource=Resource.create({"service.name": "yoda"}))
+        provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+        otel_trace.set_tracer_provider(provider)
+        _otel_tracer = otel_trace.get_tracer('yoda')
+    elif TRACING == 'console':
+        _exporter = ConsoleExporter()
+    elif TRACING == 'file':
+        _exporter = FileExporter(TRACING_FILE)
+
+
+_configure()
+
+
+def set_exporter(exporter):
+    """Install an exporter (object with export(span_dict)); None turns built-in tracing off"""
+    global _exporter
+    _exporter = exporter
+
+
+def tracing_enabled():
+    return _exporter is not None or _otel_tracer is not None
+
+
+@contextmanager
+def trace_span(name, **attributes):
+    """Open a child span of the current one; yields the span (a no-op when tracing is off)"""
+    if _otel_tracer is not None:
+        with _otel_tracer.start_as_current_span(name, attributes=attributes) as otel_span:
+            yield otel_span
+        return
+    if _exporter is None:
+        yield NOOP_SPAN
+        return
+    span = Span(name, _current_span.get(), attributes)
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.record_exception(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        span.end_ns = time.time_ns()
+        exporter = _exporter
+        if exporter is not None:
+            try:
+                exporter.export(span.to_dict())
+            except Exception as e:
+                print(f"⚠️  Span export failed: {e}")
+
+
+def current_span():
+    """The active span, or a no-op span outside traces"""
+    if _otel_tracer is not None:
+        from opentelemetry import trace as otel_trace
+        return otel_trace.get_current_span()
+    return _current_span.get() or NOOP_SPAN
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def report(path, top=15):
+    """Print the slowest tool/parameter combinations and Datadog endpoints in a span file"""
+    tools = {}
+    endpoints = {}
+    turns = 0
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                span = json.loads(line)
+            except ValueError:
+                continue
+            attributes = span.get('attributes', {})
+            if span['name'] == 'chat.turn':
+                turns += 1
+            elif span['name'] == 'mcp.tool':
+                key = (attributes.get('tool.name'), attributes.get('tool.params_hash'))
+                entry = tools.setdefault(key, {"durations": [], "params": attributes.get('tool.params', '')})
+                entry["durations"].append(span['durationMs'])
+            elif span['name'] == 'datadog.request':
+                endpoints.setdefault(attributes.get('datadog.endpoint'), []).append(span['durationMs'])
+
+    print(f"{turns} turns, {sum(len(e['durations']) for e in tools.values())} tool calls in {path}\n")
+    print(f"{'tool':<28} {'params':<12} {'calls':>6} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}  parameters")
+    ranked = sorted(tools.items(), key=lambda item: _percentile(item[1]["durations"], 95), reverse=True)
+    for (tool, digest), entry in ranked[:top]:
+        durations = entry["durations"]
+        print(f"{str(tool):<28} {str(digest):<12} {len(durations):>6} {_percentile(durations, 50):9.1f} "
+              f"{_percentile(durations, 95):9.1f} {max(durations):9.1f}  {entry['params'][:60]}")
+    print(f"\n{'datadog endpoint':<28} {'calls':>6} {'p50 ms':>9} {'p95 ms':>9}")
+    for endpoint, durations in sorted(endpoints.items(), key=lambda item: -_percentile(item[1], 95)):
+        print(f"{str(endpoint):<28} {len(durations):>6} {_percentile(durations, 50):9.1f} "
+              f"{_percentile(durations, 95):9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize recorded YODA traces")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    report_parser = subparsers.add_parser('report', help="Slowest tool/parameter combinations")
+    report_parser.add_argument('path', nargs='?', default=TRACING_FILE)
+    report_parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+    if not os.path.exists(args.path):
+        sys.exit(f"No trace file at {args.path} (record one with TRACING=file)")
+    report(args.path, args.top)
+
+
+if __name__ == "__main__":
+    main()
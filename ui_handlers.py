@@ -1,9 +1,36 @@
 #!/usr/bin/env python3
 
 from mcp_loader import get_mcp_tools_description, call_mcp_tool, get_conversation_limit
-from main_processing import parse_tool_call, call_openai, format_tool_result
+from main_processing import parse_tool_call, call_openai, format_tool_result, get_llm_cache_stats
+from intent_router import route_intent
+from llm_client import get_llm_client
+from conversation_memory import build_history_context
+from mcp.session_memory import get_session_memory, session_scope, REUSE_TOOL_NAME
+from session_state import get_session_state
+from worker_pool import run_tool
+from telemetry import PHASE_METRIC, TURN_METRIC, current_turn, span, turn_scope
+from tracing import current_span, trace_span
+from profiling import current_profile, parse_profile_command, profile_turn
+from yoda_logging import get_logger, preview, VERBOSE
 
-def process_yoda_message(message, history):
+logger = get_logger(__name__)
+
+def process_yoda_message(message, history, session_id=None):
+    """
+    Process YODA message for a chat session
+    
+    Turns of one session run one at a time on a copy of its history; tool calls
+    run on the shared tool pool with the session's context. `profile <message>`
+    runs the message as a profiled turn (see profiling.py).
+    """
+    state = get_session_state(session_id)
+    message, profile_requested = parse_profile_command(message)
+    with state.turn(), session_scope(state.session_id), turn_scope(), span(TURN_METRIC), \
+            trace_span('chat.turn', **{'session.id': state.session_id, 'message.length': len(message)}), \
+            profile_turn(force=profile_requested):
+        return _process_yoda_message(message, list(history))
+
+def _process_yoda_message(message, history):
     """Process YODA message with Star Wars theming"""
     if not message.strip():
         return history, ""
@@ -41,6 +68,7 @@ Available MCP Tools in the Imperial Arsenal:
 - `query CPU metrics for last hour`
 - `list production dashboards`
 - `search for deployment events`
+- `profile show me all P1 alerts` (profiles one turn)
 
 *May the Force guide your monitoring operations!*"""
             
@@ -48,7 +76,7 @@ Available MCP Tools in the Imperial Arsenal:
             return history, ""
             
         except Exception as e:
-            print(f"Error getting tools: {e}")
+            logger.warning("Error getting tools: %s", e)
     
     try:
         # Get the tools description
@@ -130,24 +158,21 @@ Remember: You are not just a droid - you are the Empire's most trusted SRE guard
         
         # LIMIT CONVERSATIONS TO AVOID TOKEN ISSUES (configurable via .env)
         conversation_limit = get_conversation_limit() * 2  # conversations = user + assistant messages
-        recent_history = history[:-1]  # Exclude current message
         
-        # Take only the most recent messages within the limit
-        if len(recent_history) > conversation_limit:
-            recent_history = recent_history[-conversation_limit:]
-            print(f"🔄 CONTEXT LIMIT: Using last {conversation_limit//2} conversations ({len(recent_history)} messages)")
+        # Recent turns (tool dumps stripped) within the token budget, older turns folded into a summary
+        summary_message, recent_history, context_stats = build_history_context(history[:-1], conversation_limit)
+        if context_stats['summarized_messages']:
+            logger.debug("🔄 CONTEXT: %s recent messages + summary of %s older (%s → ~%s tokens)",
+                         context_stats['kept_messages'], context_stats['summarized_messages'],
+                         context_stats['original_tokens'], context_stats['context_tokens'])
+        if summary_message:
+            messages.append(summary_message)
         
-        # Add limited conversation history
-        for msg in recent_history:
-            if isinstance(msg, dict) and "role" in msg and "content" in msg:
-                messages.append(msg)
-            elif isinstance(msg, list) and len(msg) >= 2:
-                # Handle legacy tuple format if still present
-                user_msg, assistant_msg = msg[0], msg[1]
-                if user_msg:
-                    messages.append({"role": "user", "content": user_msg})
-                if assistant_msg:
-                    messages.append({"role": "assistant", "content": assistant_msg})
+        # Structured results of earlier turns the LLM can reuse instead of re-querying
+        session_results = get_session_memory().describe()
+        if session_results:
+            messages.append({"role": "system", "content": session_results})
+        messages.extend(recent_history)
         
         # Add current message
         current_msg = history[-1]
@@ -156,42 +181,64 @@ Remember: You are not just a droid - you are the Empire's most trusted SRE guard
         else:
             messages.append({"role": "user", "content": message})
         
-        # Get LLM response
-        llm_response = call_openai(messages)
-        
-        print(f"🧠 YODA DECISION DEBUG:")
-        print(f"   💭 LLM Response: {llm_response[:200]}{'...' if len(llm_response) > 200 else ''}")
+        # Unambiguous requests are routed locally - the LLM is only needed for analysis
+        with span(PHASE_METRIC, phase='route'):
+            route = route_intent(message)
         
-        # Check if LLM wants to call a tool
-        tool_name, params = parse_tool_call(llm_response)
+        logger.debug("🧠 YODA DECISION DEBUG:")
+        if route:
+            llm_response = route.tool_call
+            tool_name, params = route.tool_name, route.params
+            logger.info("   ⚡ Fast-path route (%s, confidence %.2f): %s",
+                        route.source, route.confidence, llm_response)
+        else:
+            # Get LLM response
+            with span(PHASE_METRIC, phase='decision'), trace_span('llm.call', **{'llm.turn': 'decision'}):
+                llm_response = call_openai(messages, turn="decision")
+            logger.debug("   💭 LLM Response: %s%s", llm_response[:200], '...' if len(llm_response) > 200 else '')
+            
+            # Check if LLM wants to call a tool
+            tool_name, params = parse_tool_call(llm_response)
         
-        print(f"   🔍 Tool Parse Result: tool='{tool_name}', params={params}")
+        logger.debug("   🔍 Tool Parse Result: tool='%s', params=%s", tool_name, preview(params))
+        current_span().set_attributes({'route.source': route.source if route else 'llm', 'tool.name': tool_name or ''})
+        profile = current_profile()
+        if profile:
+            profile.tool_name = tool_name
         
         if tool_name:
             # Show tool call debugging info
-            print(f"🤖 YODA TOOL CALL DEBUG:")
-            print(f"   🎯 Tool: {tool_name}")
-            print(f"   📋 Params: {params}")
-            print(f"   🔄 Executing MCP call...")
+            logger.debug("🤖 YODA TOOL CALL DEBUG:")
+            logger.debug("   🎯 Tool: %s", tool_name)
+            logger.debug("   📋 Params: %s", preview(params))
+            logger.debug("   🔄 Executing MCP call...")
             
-            # Execute the tool
-            tool_result = call_mcp_tool(tool_name, **params)
+            # Execute the tool on the shared worker pool
+            with span(PHASE_METRIC, phase='tool'):
+                tool_result = run_tool(call_mcp_tool, tool_name, **params)
             
             # Show raw result for debugging
-            print(f"   📥 Raw MCP Result: {tool_result}")
-            print(f"   ✅ Tool execution complete")
+            logger.debug("   📥 Raw MCP Result: %s", preview(tool_result), extra=VERBOSE)
+            logger.debug("   ✅ Tool execution complete")
+            
+            # Keep the structured result for follow-up questions in this session
+            if tool_name != REUSE_TOOL_NAME and isinstance(tool_result, dict) and tool_result.get('success'):
+                turn = sum(1 for msg in history if isinstance(msg, dict) and msg.get("role") == "user")
+                get_session_memory().remember(turn, tool_name, params, tool_result)
             
             # Format result
-            formatted_result = format_tool_result(tool_result)
+            with span(PHASE_METRIC, phase='format'):
+                formatted_result = format_tool_result(tool_result)
             
             # Add tool context for LLM analysis
             tool_context = f"TOOL_RESULT from {tool_name}: {tool_result}"
             messages.append({"role": "user", "content": f"TOOL_RESULT: {tool_context}"})
             
-            print(f"   🧠 Requesting YODA analysis...")
+            logger.debug("   🧠 Requesting YODA analysis...")
             # Get LLM analysis
-            analysis = call_openai(messages)
-            print(f"   ✨ Analysis complete")
+            with span(PHASE_METRIC, phase='analysis'), trace_span('llm.call', **{'llm.turn': 'analysis'}):
+                analysis = call_openai(messages, turn="analysis")
+            logger.debug("   ✨ Analysis complete")
             
             # Format final response with Star Wars styling
             if params:
@@ -207,6 +254,10 @@ Remember: You are not just a droid - you are the Empire's most trusted SRE guard
             else:
                 command_display = f"{tool_name}()"
             
+            llm_cache = get_llm_cache_stats()
+            llm_usage = get_llm_client().stats()
+            profile_line = f"\nProfile: {profile.path}" if profile else ''
+            
             # Include debugging section in UI response
             debug_section = f"""🔍 **MCP INTERACTION DEBUG**:
 ```
@@ -215,6 +266,10 @@ Parameters: {params if params else 'None'}
 Success: {tool_result.get('success', 'Unknown')}
 Data Type: {type(tool_result.get('data', [])).__name__}
 Data Count: {len(tool_result.get('data', [])) if isinstance(tool_result.get('data'), list) else 'N/A'}
+Routing: {f"fast-path ({route.source}, confidence {route.confidence:.2f})" if route else 'LLM decision'}
+LLM Calls: {llm_usage['calls']} (avg {llm_usage['avg_latency_seconds']:.2f}s, {llm_usage['retries']} retries, {llm_usage['total_tokens']} tokens)
+LLM Cache: mode={llm_cache['mode']}, hits={llm_cache['hits']}, misses={llm_cache['misses']}, hit rate={llm_cache['hit_rate']:.0%}
+Timings: {current_turn().summary()}{profile_line}
 ```
 """
                 
@@ -235,19 +290,14 @@ Data Count: {len(tool_result.get('data', [])) if isinstance(tool_result.get('dat
             
         else:
             # No tool call, just regular response with droid personality
-            print(f"   ℹ️ No tool call detected - responding with droid personality")
+            logger.debug("   ℹ️ No tool call detected - responding with droid personality")
             final_response = f"🤖 **YODA DROID TRANSMISSION**: {llm_response}\n\n*Roger roger, Commander. YODA standing by for further orders.*"
         
         # Add assistant response to history
         history.append({"role": "assistant", "content": final_response})
         
     except Exception as e:
-        print(f"💥 ERROR DEBUG:")
-        print(f"   🚨 Exception Type: {type(e).__name__}")
-        print(f"   📝 Exception Message: {str(e)}")
-        import traceback
-        print(f"   📋 Full Traceback:")
-        traceback.print_exc()
+        logger.exception("💥 ERROR DEBUG: %s: %s", type(e).__name__, e)
         
         error_response = f"💥 **CRITICAL MALFUNCTION DETECTED**: {str(e)}\n\n🔧 *YODA systems compromised, young Padawan. Initiating emergency repair protocols... The dark side clouds everything!*"
         history.append({"role": "assistant", "content": error_response})
@@ -260,16 +310,17 @@ def on_dropdown_change(selected_command, current_message):
         return selected_command  # Populate the text field
     return current_message
 
-def execute_command(dropdown_value, text_value, history):
+def execute_command(dropdown_value, text_value, history, session_id=None):
     """Execute command from either dropdown or text input"""
     # Use dropdown value if selected, otherwise use text input
     command = dropdown_value if dropdown_value and dropdown_value.strip() else text_value
     if command and command.strip():
-        new_history, _ = process_yoda_message(command, history)
+        new_history, _ = process_yoda_message(command, history, session_id)
         return new_history, "", ""  # Clear both inputs after execution
     return history, dropdown_value, text_value
 
-def clear_history():
-    """Clear the conversation history"""
+def clear_history(session_id=None):
+    """Clear the conversation history and the session's stored tool results"""
     from ui_components import get_initial_messages
+    get_session_memory().clear(session_id)
     return get_initial_messages(), "", "" 
\ No newline at end of file
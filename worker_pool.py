@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Concurrency settings and the shared tool worker pool.
+
+Gradio runs each chat turn on a queue worker; GRADIO_CONCURRENCY_LIMIT turns
+run at once and up to GRADIO_QUEUE_MAX_SIZE wait. Most of a turn is spent
+waiting on the LLM, so the limit can be well above the number of Datadog
+calls the process should make at once. Tool execution is therefore offloaded
+to one shared ThreadPoolExecutor of TOOL_WORKERS threads: heavy tool calls
+queue there instead of multiplying with the chat concurrency.
+
+Tasks run in a copy of the caller's context, so context variables (such as
+the session id used by mcp.session_memory) follow the call into the pool,
+and a turn being profiled (profiling.py) is profiled on the pool thread too.
+"""
+
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+
+from profiling import run_profiled
+from env_settings import validate_number
+
+load_dotenv()
+
+_THREAD_PREFIX = 'yoda-tool'
+
+
+GRADIO_CONCURRENCY_LIMIT = validate_number('GRADIO_CONCURRENCY_LIMIT', 16, 1, 256, cast=int)
+GRADIO_QUEUE_MAX_SIZE = validate_number('GRADIO_QUEUE_MAX_SIZE', 128, 1, 10000, cast=int)
+TOOL_WORKERS = validate_number('TOOL_WORKERS', 8, 1, 128, cast=int)
+
+
+class ToolPool:
+    """Shared executor for tool calls with queue/active counters"""
+
+    def __init__(self, workers=None):
+        self.workers = workers or TOOL_WORKERS
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=_THREAD_PREFIX)
+        self._lock = threading.Lock()
+        self._stats = {'submitted': 0, 'active': 0, 'completed': 0, 'failed': 0, 'max_active': 0}
+
+    def _run(self, context, fn, args, kwargs):
+        with self._lock:
+            self._stats['active'] += 1
+            self._stats['max_active'] = max(self._stats['max_active'], self._stats['active'])
+        try:
+            return context.run(run_profiled, fn, *args, **kwargs)
+        except Exception:
+            with self._lock:
+                self._stats['failed'] += 1
+            raise
+        finally:
+            with self._lock:
+                self._stats['active'] -= 1
+                self._stats['completed'] += 1
+
+    def submit(self, fn, *args, **kwargs):
+        """Schedule fn in the pool with the caller's context variables; returns a Future"""
+        with self._lock:
+            self._stats['submitted'] += 1
+        return self._executor.submit(self._run, contextvars.copy_context(), fn, args, kwargs)
+
+    def run(self, fn, *args, **kwargs):
+        """Run fn in the pool and wait for its result"""
+        if threading.current_thread().name.startswith(_THREAD_PREFIX):
+            # Already on a pool thread - waiting on the pool from here could deadlock it
+            return fn(*args, **kwargs)
+        return self.submit(fn, *args, **kwargs).result()
+
+    def stats(self):
+        """Return workers, submitted, active, queued, completed, failed, max_active"""
+        with self._lock:
+            stats = dict(self._stats, workers=self.workers)
+        stats['queued'] = stats['submitted'] - stats['completed'] - stats['active']
+        return stats
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_tool_pool():
+    """Return the process-wide tool pool"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ToolPool()
+    return _pool
+
+
+def run_tool(fn, *args, **kwargs):
+    """Run a tool call on the shared pool and return its result"""
+    return get_tool_pool().run(fn, *args, **kwargs)
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Leveled, non-blocking logging for the app and the MCP tools.
+
+Modules log through `get_logger(__name__)` with lazy %-style arguments, so
+nothing is formatted unless the record passes LOG_LEVEL:
+
+    logger = get_logger(__name__)
+    logger.debug("📥 Raw MCP Result: %s", preview(tool_result))
+    logger.debug("📋 API Params: %s", preview(params), extra=VERBOSE)
+
+Records go through a bounded queue to one writer thread (QueueHandler +
+QueueListener), so a slow stdout never stalls a chat turn. When the queue is
+full, records are dropped and counted, never waited for.
+
+Size and volume caps:
+    preview(obj)             bounded repr of large payloads (built only when emitted)
+    LOG_MAX_CHARS            messages are truncated to this many characters
+    LOG_VERBOSE_SAMPLE_RATE  fraction of records tagged extra=VERBOSE that are kept
+                             (per-item and raw-payload lines in loops)
+
+Settings: LOG_LEVEL (DEBUG/INFO/WARNING/ERROR, default INFO), LOG_FORMAT
+(plain = message only, as before; detailed = time, level and logger),
+LOG_MAX_CHARS (2000), LOG_VERBOSE_SAMPLE_RATE (0.1), LOG_QUEUE_SIZE (10000).
+"""
+
+import atexit
+import logging
+import os
+import queue
+import random
+import reprlib
+import sys
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from dotenv import load_dotenv
+from env_settings import validate_number
+
+load_dotenv()
+
+LOG_LEVELS = ('DEBUG', 'INFO', 'WARNING', 'ERROR')
+ROOT_LOGGER = 'yoda'
+# Pass as extra= to mark per-item / raw-payload lines that are sampled
+VERBOSE = {'verbose': True}
+
+
+def _validate_log_level():
+    """Validate and return the LOG_LEVEL name"""
+    level = os.getenv('LOG_LEVEL', 'INFO').upper().strip()
+    if level in LOG_LEVELS:
+        return level
+    print(f"⚠️  Invalid LOG_LEVEL='{level}'. Using default: INFO")
+    return 'INFO'
+
+
+LOG_LEVEL = _validate_log_level()
+LOG_FORMAT = 'detailed' if os.getenv('LOG_FORMAT', 'plain').lower().strip() == 'detailed' else 'plain'
+LOG_MAX_CHARS = validate_number('LOG_MAX_CHARS', 2000, 200, 1_000_000, cast=int)
+LOG_VERBOSE_SAMPLE_RATE = validate_number('LOG_VERBOSE_SAMPLE_RATE', 0.1, 0.0, 1.0)
+LOG_QUEUE_SIZE = validate_number('LOG_QUEUE_SIZE', 10000, 100, 1_000_000, cast=int)
+
+_repr = reprlib.Repr()
+_repr.maxstring = 200
+_repr.maxother = 200
+_repr.maxlist = _repr.maxtuple = _repr.maxset = 10
+_repr.maxdict = 10
+_repr.maxlevel = 4
+
+
+class preview:
+    """Bounded repr of a payload, computed only if the record is emitted"""
+
+    __slots__ = ('value', 'limit')
+
+    def __init__(self, value, limit=500):
+        self.value = value
+        self.limit = limit
+
+    def __str__(self):
+        text = self.value if isinstance(self.value, str) else _repr.repr(self.value)
+        if len(text) > self.limit:
+            text = f"{text[:self.limit]}… ({len(text)} chars)"
+        return text
+
+    __repr__ = __str__
+
+
+_stats = {'emitted': 0, 'dropped': 0, 'sampled_out': 0, 'truncated': 0}
+_stats_lock = threading.Lock()
+
+
+def _count(key):
+    with _stats_lock:
+        _stats[key] += 1
+
+
+class _CapAndSampleFilter(logging.Filter):
+    """Drops sampled-out verbose records and truncates oversized messages"""
+
+    def filter(self, record):
+        if getattr(record, 'verbose', False) and random.random() >= LOG_VERBOSE_SAMPLE_RATE:
+            _count('sampled_out')
+            return False
+        message = record.getMessage()
+        if len(message) > LOG_MAX_CHARS:
+            _count('truncated')
+            message = f"{message[:LOG_MAX_CHARS]}… (+{len(message) - LOG_MAX_CHARS} chars)"
+        # Freeze the message now; the writer thread must not format live objects
+        record.msg, record.args = message, None
+        return True
+
+
+class _DroppingQueueHandler(QueueHandler):
+    """Never blocks the caller: records that do not fit the queue are dropped"""
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+            _count('emitted')
+        except queue.Full:
+            _count('dropped')
+
+    def prepare(self, record):
+        # The filter already froze msg/args - skip QueueHandler's re-format
+        record.exc_text = logging.Formatter().formatException(record.exc_info) if record.exc_info else None
+        record.exc_info = None
+        return record
+
+
+class _StdoutHandler(logging.StreamHandler):
+    """Writes to whatever sys.stdout is at emit time (redirects and test capture keep working)"""
+
+    def __init__(self):
+        super().__init__(sys.stdout)
+
+    @property
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+
+_listener = None
+_configure_lock = threading.Lock()
+
+
+def configure_logging():
+    """Attach the queue handler and writer thread to the 'yoda' logger (idempotent)"""
+    global _listener
+    if _listener is not None:
+        return
+    with _configure_lock:
+        if _listener is not None:
+            return
+        log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        output = _StdoutHandler()
+        if LOG_FORMAT == 'detailed':
+            output.setFormatter(logging.Formatter('%(asctime)s %(levelname)-7s %(name)s: %(message)s'))
+        else:
+            output.setFormatter(logging.Formatter('%(message)s'))
+        handler = _DroppingQueueHandler(log_queue)
+        handler.addFilter(_CapAndSampleFilter())
+        root = logging.getLogger(ROOT_LOGGER)
+        root.setLevel(LOG_LEVEL)
+        root.propagate = False
+        root.addHandler(handler)
+        _listener = QueueListener(log_queue, output, respect_handler_level=False)
+        _listener.start()
+        atexit.register(_listener.stop)
+
+
+def get_logger(name):
+    """Return the logger for a module (under the 'yoda' hierarchy)"""
+    configure_logging()
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+def flush_logs():
+    """Wait until queued records have been written"""
+    if _listener is not None:
+        _listener.stop()
+        _listener.start()
+
+
+def get_logging_stats():
+    """Return emitted/dropped/sampled_out/truncated counters"""
+    with _stats_lock:
+        return dict(_stats)
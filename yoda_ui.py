@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 
+import uuid
 import gradio as gr
 from dotenv import load_dotenv
 
@@ -14,6 +15,8 @@ from ui_handlers import (
     process_yoda_message, on_dropdown_change, 
     execute_command, clear_history
 )
+from worker_pool import GRADIO_CONCURRENCY_LIMIT, GRADIO_QUEUE_MAX_SIZE
+from telemetry import start_metrics_server
 
 # Initialize
 load_dotenv()
@@ -31,6 +34,9 @@ def create_yoda_ui():
         <meta name="description" content="Strategic SRE Operations & DataDog Analytics - Star Wars themed monitoring interface">
         """
     ) as interface:
+        # One id per browser session - keys the session's tool result memory
+        session_id = gr.State(lambda: uuid.uuid4().hex)
+        
         # Intro animation
         gr.HTML(create_simple_intro())
         
@@ -92,13 +98,16 @@ def create_yoda_ui():
         
         # Wire up events
         command_dropdown.change(on_dropdown_change, [command_dropdown, msg], [msg])
-        msg.submit(execute_command, [command_dropdown, msg, chatbot], [chatbot, command_dropdown, msg])
-        send_btn.click(execute_command, [command_dropdown, msg, chatbot], [chatbot, command_dropdown, msg])
-        clear_btn.click(clear_history, outputs=[chatbot, command_dropdown, msg])
+        msg.submit(execute_command, [command_dropdown, msg, chatbot, session_id], [chatbot, command_dropdown, msg])
+        send_btn.click(execute_command, [command_dropdown, msg, chatbot, session_id], [chatbot, command_dropdown, msg])
+        clear_btn.click(clear_history, inputs=[session_id], outputs=[chatbot, command_dropdown, msg])
         
         # Load initial messages
         interface.load(lambda: get_initial_messages(), outputs=[chatbot])
     
+    # Chat turns mostly wait on the LLM - let several sessions run at once
+    interface.queue(default_concurrency_limit=GRADIO_CONCURRENCY_LIMIT, max_size=GRADIO_QUEUE_MAX_SIZE)
+    
     return interface
 
 
@@ -106,6 +115,7 @@ def create_yoda_ui():
 if __name__ == "__main__":
     # Create and launch the interface
     ui = create_yoda_ui()
+    start_metrics_server()
     
     print("🚀 Launching YODA Galactic Command Center...")
     print("🌟 May the Force be with your Infrastructure!")